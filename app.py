@@ -95,16 +95,9 @@ def make_celery(app):
     celery.conf.task_default_exchange = "default"
     celery.conf.task_default_routing_key = "default"
     celery.conf.task_default_priority = 5  # 0 is the highest
+    # LLM calls are throttled against the provider quota by the shared limiter
+    # in src.ml.openai_wrappers rather than with per-task rate limits here.
     celery.conf.task_annotations = {
-        f"src.message_generation.services.research_and_generate_outreaches_for_prospect": {
-            "rate_limit": "2/s",
-        },
-        f"src.message_generation.services.generate_prospect_email": {
-            "rate_limit": "2/s",
-        },
-        f"src.ml.services.icp_classify": {
-            "rate_limit": "2/s",
-        },
         f"app.add_together": {
             "rate_limit": "1/s",
         },
@@ -194,6 +187,9 @@ migrate = Migrate(app, db)
 # chroma_client = chromadb.HttpClient(host='https://vector-db-zakq.onrender.com', port=8000)
 
 from model_import import *
+import src.utils.slack_outbox  # Registers the Slack outbox flush task
+import src.email_outbound.email_store.bulk_enrichment  # Registers the bulk email enrichment task
+import src.analytics.services_campaign_rollups  # Registers the campaign analytics rollup tasks
 
 
 @celery.task()
@@ -0,0 +1,61 @@
+"""Added trigram search indexes
+
+Revision ID: 2d9c4b7e5a10
+Revises: 8e3f1a6c0d47
+Create Date: 2026-10-17 19:12:54.630921
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d9c4b7e5a10'
+down_revision = '8e3f1a6c0d47'
+branch_labels = None
+depends_on = None
+
+
+# (table, column) pairs searched with ILIKE '%keyword%' by src/utils/keyword_search.py
+TRIGRAM_INDEXED_COLUMNS = [
+    ('prospect', 'title'),
+    ('prospect', 'company'),
+    ('prospect', 'industry'),
+    ('prospect', 'linkedin_bio'),
+    ('prospect', 'prospect_location'),
+    ('prospect', 'full_name'),
+    ('prospect', 'email'),
+    ('prospect', 'linkedin_url'),
+    ('individual', 'title'),
+    ('individual', 'industry'),
+    ('individual', 'company_name'),
+    ('individual', 'bio'),
+    ('company', 'description'),
+]
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Built concurrently so that writes to these tables aren't blocked
+    with op.get_context().autocommit_block():
+        for table, column in TRIGRAM_INDEXED_COLUMNS:
+            op.create_index(
+                f'ix_{table}_{column}_trgm',
+                table,
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table, column in reversed(TRIGRAM_INDEXED_COLUMNS):
+            op.drop_index(
+                f'ix_{table}_{column}_trgm',
+                table_name=table,
+                postgresql_concurrently=True,
+            )
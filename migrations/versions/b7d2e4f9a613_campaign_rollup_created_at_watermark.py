@@ -0,0 +1,65 @@
+"""Track campaign analytics rollups with a created_at watermark
+
+Revision ID: b7d2e4f9a613
+Revises: 8e3a6c1f4b27
+Create Date: 2026-10-18 11:27:05.341872
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2e4f9a613'
+down_revision = '8e3a6c1f4b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The id watermarks can't be converted, so the rollups are recounted from scratch
+    # by the next refreshes
+    op.execute('DELETE FROM campaign_analytics_rollup')
+    op.execute('DELETE FROM campaign_analytics_rollup_watermark')
+
+    op.add_column('campaign_analytics_rollup_watermark', sa.Column('last_created_at', sa.DateTime(), nullable=True))
+    op.drop_column('campaign_analytics_rollup_watermark', 'last_prospect_email_status_record_id')
+    op.drop_column('campaign_analytics_rollup_watermark', 'last_prospect_status_record_id')
+
+    # Built concurrently so that writes to these tables aren't blocked
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_prospect_status_records_created_at',
+            'prospect_status_records',
+            ['created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_prospect_email_status_records_created_at',
+            'prospect_email_status_records',
+            ['created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_prospect_email_status_records_created_at',
+            table_name='prospect_email_status_records',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_prospect_status_records_created_at',
+            table_name='prospect_status_records',
+            postgresql_concurrently=True,
+        )
+
+    op.execute('DELETE FROM campaign_analytics_rollup')
+    op.execute('DELETE FROM campaign_analytics_rollup_watermark')
+
+    op.add_column('campaign_analytics_rollup_watermark', sa.Column('last_prospect_status_record_id', sa.Integer(), nullable=False))
+    op.add_column('campaign_analytics_rollup_watermark', sa.Column('last_prospect_email_status_record_id', sa.Integer(), nullable=False))
+    op.drop_column('campaign_analytics_rollup_watermark', 'last_created_at')
@@ -51,6 +51,10 @@ from src.ml.models import (
     AIResearcher,
     AIResearcherAnswer,
     AIResearcherQuestion,
+    LLMBatchJob,
+    LLMBatchJobStatus,
+    LLMBatchRequest,
+    LLMBatchRequestStatus,
 )
 from src.automation.models import (
     PhantomBusterConfig,
@@ -108,7 +112,12 @@ from src.company.models import Company, CompanyRelation
 from src.email_outbound.models import EmailConversationMessage
 from src.simulation.models import Simulation
 from src.individual.models import Individual
-from src.analytics.models import SDRHealthStats, ChatBotDataRepository
+from src.analytics.models import (
+    SDRHealthStats,
+    ChatBotDataRepository,
+    CampaignAnalyticsRollup,
+    CampaignAnalyticsRollupWatermark,
+)
 from src.prospecting.icp_score.models import ICPScoringRuleset
 from src.webhooks.models import (
     NylasWebhookPayloads,
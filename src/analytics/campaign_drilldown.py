@@ -1,9 +1,8 @@
-import json
-from app import db
+from src.utils.query_registry import query_registry
 
-
-def get_campaign_drilldown_data(archetype_id):
-    sql = """
+CAMPAIGN_DRILLDOWN_QUERY = query_registry.register(
+    "campaign_analytics.drilldown",
+    """
     SELECT
 	prospect.id "prospect_id",
 	prospect.full_name "prospect_name",
@@ -78,12 +77,9 @@ ORDER BY
 		0
 	END,
 	li_last_message_timestamp DESC;
-    """
-
-    # Execute Query with parameters
-    result = db.session.execute(sql, {"archetype_id": archetype_id})
+    """,
+)
 
-    # Convert to list of dictionaries
-    data = [dict(row) for row in result]
 
-    return data
+def get_campaign_drilldown_data(archetype_id):
+    return CAMPAIGN_DRILLDOWN_QUERY.dicts(archetype_id=archetype_id)
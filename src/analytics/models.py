@@ -90,4 +90,45 @@ class RetentionActivityLogs(db.Model):
             "activity_tag": self.activity_tag,
             "activity_date": self.activity_date,
             "created_at": self.created_at,
-        }
\ No newline at end of file
+        }
+
+class CampaignAnalyticsRollup(db.Model):
+    """Funnel counters per campaign, SDR, day and channel.
+
+    Each prospect is counted once per funnel stage, on the day and channel of
+    the first status record that reached the stage. Maintained by
+    `src.analytics.services_campaign_rollups`.
+    """
+
+    __tablename__ = "campaign_analytics_rollup"
+
+    client_archetype_id = db.Column(db.Integer, db.ForeignKey("client_archetype.id"))
+    client_sdr_id = db.Column(db.Integer, db.ForeignKey("client_sdr.id"))
+    date = db.Column(db.Date)
+    channel = db.Column(db.String)  # ProspectChannels: LINKEDIN or EMAIL
+    client_id = db.Column(db.Integer, db.ForeignKey("client.id"), index=True)
+
+    num_sent = db.Column(db.Integer, nullable=False, default=0)
+    num_opens = db.Column(db.Integer, nullable=False, default=0)
+    num_replies = db.Column(db.Integer, nullable=False, default=0)
+    num_positive_replies = db.Column(db.Integer, nullable=False, default=0)
+    num_demos = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.PrimaryKeyConstraint(
+            "client_archetype_id", "client_sdr_id", "date", "channel"
+        ),
+        db.Index("idx_campaign_analytics_rollup_client_sdr_date", "client_sdr_id", "date"),
+    )
+
+
+class CampaignAnalyticsRollupWatermark(db.Model):
+    """How far the campaign analytics rollups have counted the status records. Single row.
+
+    Status records of both channels created up to `last_created_at` are counted.
+    """
+
+    __tablename__ = "campaign_analytics_rollup_watermark"
+
+    id = db.Column(db.Integer, primary_key=True)
+    last_created_at = db.Column(db.DateTime, nullable=True)
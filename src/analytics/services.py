@@ -9,17 +9,23 @@ from src.prospecting.models import *
 from src.email_outbound.models import *
 
 from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
 from sqlalchemy import and_, or_, not_, func, distinct
 
 from src.sockets.services import send_socket_message
+from src.utils.query_registry import query_registry
 
 
-def get_weekly_client_sdr_outbound_goal_map():
-    results = db.session.execute(
-        """
-        select client_sdr.client_id, sum(client_sdr.weekly_li_outbound_target) from client_sdr group by 1;
+WEEKLY_OUTBOUND_GOAL_QUERY = query_registry.register(
+    "analytics.weekly_outbound_goal_by_client",
     """
-    ).fetchall()
+        select client_sdr.client_id, sum(client_sdr.weekly_li_outbound_target) from client_sdr group by 1;
+    """,
+)
+
+
+def get_weekly_client_sdr_outbound_goal_map():
+    results = WEEKLY_OUTBOUND_GOAL_QUERY.all()
 
     outbound_goal_map = {}
     for res in results:
@@ -132,41 +138,71 @@ def flag_is_value(feature: str, value: int) -> bool:
     return False
 
 
-def get_all_campaign_analytics_for_client(
-    client_id: int, client_archetype_id: Optional[int] = None, start_date: Optional[str] = None, end_date: Optional[str] = None, verbose: bool = False, room_id: Optional[int] = None
-):
-    date_filter = ""
-    if start_date and end_date:
-        date_filter = f"and (prospect_status_records.created_at between '{start_date} 00:00:00' and '{end_date} 23:59:59' or prospect_email_status_records.created_at between '{start_date} 00:00:00' and '{end_date} 23:59:59')"
-
-    query = """
-        with d as (
+class CampaignAnalyticsSummaryRow(NamedTuple):
+    emoji: str
+    archetype: str
+    active: bool
+    persona_fit_reason: str
+    auth_token: str
+    num_sent: int
+    num_opens: int
+    num_replies: int
+    positive_reply: int
+    num_demos: int
+    name: str
+    img_url: str
+    included_individual_title_keywords: list
+    included_individual_seniority_keywords: list
+    included_individual_locations_keywords: list
+    included_individual_industry_keywords: list
+    included_individual_generalized_keywords: list
+    included_individual_skills_keywords: list
+    included_company_name_keywords: list
+    included_company_locations_keywords: list
+    included_company_generalized_keywords: list
+    included_company_industries_keywords: list
+    company_size_start: int
+    company_size_end: int
+    id: int
+    sent_percent: int
+    open_percent: float
+    reply_percent: float
+    demo_percent: float
+
+
+# Funnel counts come from the campaign analytics rollups, see services_campaign_rollups
+CAMPAIGN_ANALYTICS_SUMMARY_QUERY = query_registry.register(
+    "campaign_analytics.summary",
+    """
+        with rollup as (
+            select
+                campaign_analytics_rollup.client_archetype_id,
+                cast(sum(campaign_analytics_rollup.num_sent) as integer) num_sent,
+                cast(sum(campaign_analytics_rollup.num_opens) as integer) num_opens,
+                cast(sum(campaign_analytics_rollup.num_replies) as integer) num_replies,
+                cast(sum(campaign_analytics_rollup.num_positive_replies) as integer) num_positive_replies,
+                cast(sum(campaign_analytics_rollup.num_demos) as integer) num_demos
+            from campaign_analytics_rollup
+            where campaign_analytics_rollup.client_id = :client_id
+                and (
+                    cast(:start_date as date) is null
+                    or cast(:end_date as date) is null
+                    or campaign_analytics_rollup.date between cast(:start_date as date) and cast(:end_date as date)
+                )
+            group by 1
+        ),
+        d as (
             select 
                 client_archetype.emoji,
                 client_archetype.archetype,
                 client_archetype.active,
                 client_archetype.persona_fit_reason,
                 client_sdr.auth_token,
-                count(distinct prospect.id) filter (
-                    where prospect_status_records.to_status = 'SENT_OUTREACH' or 
-                        prospect_email_status_records.to_status = 'SENT_OUTREACH'
-                ) num_sent,
-                count(distinct prospect.id) filter (
-                    where prospect_status_records.to_status = 'ACCEPTED' or 
-                        prospect_email_status_records.to_status = 'EMAIL_OPENED'
-                ) num_opens,
-                count(distinct prospect.id) filter (
-                    where prospect_status_records.to_status = 'ACTIVE_CONVO' or 
-                        cast(prospect_email_status_records.to_status as varchar) ilike '%ACTIVE_CONVO_%'
-                ) num_replies,
-                count (distinct prospect.id) filter (
-                    where prospect_status_records.to_status in ('ACTIVE_CONVO_SCHEDULING', 'ACTIVE_CONVO_QUESTION', 'ACTIVE_CONVO_NEXT_STEPS') or
-                        prospect_email_status_records.to_status = 'DEMO_SET'
-                ) positive_reply,
-                count(distinct prospect.id) filter (
-                    where prospect_status_records.to_status = 'DEMO_SET' or
-                        prospect_email_status_records.to_status = 'DEMO_SET'
-                ) num_demos,
+                coalesce(rollup.num_sent, 0) num_sent,
+                coalesce(rollup.num_opens, 0) num_opens,
+                coalesce(rollup.num_replies, 0) num_replies,
+                coalesce(rollup.num_positive_replies, 0) positive_reply,
+                coalesce(rollup.num_demos, 0) num_demos,
                 client_sdr.name,
                 client_sdr.img_url,
                 icp_scoring_ruleset.included_individual_title_keywords,
@@ -184,73 +220,173 @@ def get_all_campaign_analytics_for_client(
                 client_archetype.id as id
             from client_archetype
                 join client_sdr on client_sdr.id = client_archetype.client_sdr_id
-                join prospect on prospect.client_sdr_id = client_sdr.id
-                left join prospect_status_records on prospect_status_records.prospect_id = prospect.id and prospect_status_records.created_at > client_archetype.created_at
-                left join prospect_email on prospect_email.id = prospect.approved_prospect_email_id
-                left join prospect_email_status_records on prospect_email_status_records.prospect_email_id = prospect_email.id and prospect_email_status_records.created_at > client_archetype.created_at
+                left join rollup on rollup.client_archetype_id = client_archetype.id
                 left join icp_scoring_ruleset on icp_scoring_ruleset.client_archetype_id = client_archetype.id
-            where client_archetype.client_id = {client_id}
+            where client_archetype.client_id = :client_id
                 and not client_archetype.is_unassigned_contact_archetype
-                {client_archetype_id_filter}
-                {date_filter}
-            group by 1,2,3,4,5, client_archetype.updated_at, client_sdr.name, client_sdr.img_url, icp_scoring_ruleset.included_individual_title_keywords, icp_scoring_ruleset.included_individual_locations_keywords, icp_scoring_ruleset.included_individual_industry_keywords, icp_scoring_ruleset.included_company_name_keywords, icp_scoring_ruleset.included_company_locations_keywords, icp_scoring_ruleset.included_individual_generalized_keywords, icp_scoring_ruleset.included_individual_skills_keywords, icp_scoring_ruleset.included_company_generalized_keywords,icp_scoring_ruleset.included_company_industries_keywords, icp_scoring_ruleset.company_size_start, icp_scoring_ruleset.company_size_end, client_archetype.id, icp_scoring_ruleset.included_individual_seniority_keywords
+                and (cast(:client_archetype_id as integer) is null or client_archetype.id = :client_archetype_id)
             order by client_archetype.updated_at desc
         )
         select 
             *,
             100 "sent_percent",
             num_opens / (0.0001 + cast(num_sent as float)) "open_percent",
-            num_replies / (0.0001 + cast(num_sent as float)) "num_replies",
-            num_demos / (0.0001 + cast(num_sent as float)) "num_demos"
+            num_replies / (0.0001 + cast(num_sent as float)) "reply_percent",
+            num_demos / (0.0001 + cast(num_sent as float)) "demo_percent"
+        from d;
+    """,
+    row_type=CampaignAnalyticsSummaryRow,
+)
+
+
+class CampaignAnalyticsDailyRow(NamedTuple):
+    date: str
+    num_sent: int
+    num_opens: int
+    num_replies: int
+    positive_reply: int
+    num_demos: int
+    positive_reply_details: list
+    client_archetype_ids: list
+
+
+CAMPAIGN_ANALYTICS_DAILY_QUERY = query_registry.register(
+    "campaign_analytics.daily",
+    """
+        with d as (
+            select 
+                case 
+                    when prospect_status_records.created_at is not null then to_char(prospect_status_records.created_at, 'YYYY-MM-DD')
+                    when prospect_email_status_records.created_at is not null then to_char(prospect_email_status_records.created_at, 'YYYY-MM-DD')
+                end date,
+                count(distinct prospect.id) filter (
+                    where prospect_status_records.to_status = 'SENT_OUTREACH' or 
+                        prospect_email_status_records.to_status = 'SENT_OUTREACH'
+                ) num_sent,
+                count(distinct prospect.id) filter (
+                    where prospect_status_records.to_status = 'ACCEPTED' or 
+                        prospect_email_status_records.to_status = 'EMAIL_OPENED'
+                ) num_opens,
+                count(distinct prospect.id) filter (
+                    where prospect_status_records.to_status = 'ACTIVE_CONVO' or 
+                        cast(prospect_email_status_records.to_status as varchar) ilike '%ACTIVE_CONVO_%'
+                ) num_replies,
+                count (distinct prospect.id) filter (
+                    where prospect_status_records.to_status in ('ACTIVE_CONVO_SCHEDULING', 'ACTIVE_CONVO_QUESTION', 'ACTIVE_CONVO_NEXT_STEPS') or
+                        prospect_email_status_records.to_status = 'DEMO_SET'
+                ) positive_reply,
+                count(distinct prospect.id) filter (
+                    where prospect_status_records.to_status = 'DEMO_SET' or
+                        prospect_email_status_records.to_status = 'DEMO_SET'
+                ) num_demos,
+                array_agg (
+                    concat(prospect.id, '###', prospect.full_name, '###', prospect_status_records.to_status, '###', case
+                        when prospect.li_last_message_from_prospect is not null then prospect.li_last_message_from_prospect
+                        when prospect.email_last_message_from_prospect is not null then prospect.email_last_message_from_prospect
+                        else ''
+                    end)
+                ) filter (
+                    where prospect_status_records.to_status in ('ACTIVE_CONVO_SCHEDULING', 'ACTIVE_CONVO_QUESTION', 'ACTIVE_CONVO_NEXT_STEPS') or
+                        prospect_email_status_records.to_status = 'DEMO_SET'
+                ) positive_reply_details,
+                array_agg(distinct client_archetype.id) client_archetype_ids
+            from client_archetype
+                join client_sdr on client_sdr.id = client_archetype.client_sdr_id
+                join prospect on prospect.archetype_id = client_archetype.id
+                left join prospect_status_records on prospect_status_records.prospect_id = prospect.id
+                left join prospect_email on prospect_email.id = prospect.approved_prospect_email_id
+                left join prospect_email_status_records on prospect_email_status_records.prospect_email_id = prospect_email.id
+            where client_archetype.id = :client_archetype_id
+            group by 1
+            order by 1 desc
+        )
+        select 
+            *
         from d;
-    """.format(
+    """,
+    row_type=CampaignAnalyticsDailyRow,
+)
+
+
+class TopICPProspectRow(NamedTuple):
+    id: int
+    full_name: str
+    icp_fit_score: int
+    status_created_at: datetime
+    email_status_created_at: datetime
+    company: str
+    title: str
+
+
+CAMPAIGN_ANALYTICS_TOP_ICP_PROSPECTS_QUERY = query_registry.register(
+    "campaign_analytics.top_icp_prospects",
+    """
+        select 
+            prospect.id,
+            prospect.full_name,
+            prospect.icp_fit_score,
+            prospect_status_records.created_at as status_created_at,
+            prospect_email_status_records.created_at as email_status_created_at,
+            prospect.company,
+            prospect.title
+        from prospect
+            left join prospect_status_records on prospect_status_records.prospect_id = prospect.id
+            left join prospect_email on prospect_email.prospect_id = prospect.id
+            left join prospect_email_status_records on prospect_email_status_records.prospect_email_id = prospect_email.id    
+        where prospect.icp_fit_score is not null
+            and prospect.archetype_id = :client_archetype_id
+            and prospect.overall_status not in ('REMOVED')
+        order by prospect.icp_fit_score desc
+        limit 5;
+    """,
+    row_type=TopICPProspectRow,
+)
+
+
+def get_all_campaign_analytics_for_client(
+    client_id: int, client_archetype_id: Optional[int] = None, start_date: Optional[str] = None, end_date: Optional[str] = None, verbose: bool = False, room_id: Optional[int] = None
+):
+    data = CAMPAIGN_ANALYTICS_SUMMARY_QUERY.all(
         client_id=client_id,
-        client_archetype_id_filter=(
-            "and prospect.archetype_id = {} and client_archetype.id = {}".format(
-                client_archetype_id,
-                client_archetype_id,
-            )
-            if client_archetype_id
-            else ""
-        ),
-        date_filter=date_filter
+        client_archetype_id=client_archetype_id,
+        # Blank query params (?start_date=&end_date=) mean no bound, not a date
+        start_date=start_date or None,
+        end_date=end_date or None,
     )
 
-    data = db.session.execute(query).fetchall()
-
     data_arr = []
     for row in data:
         data_arr.append(
             {
-                "emoji": row[0],
-                "archetype": row[1],
-                "active": row[2],
-                "persona_fit_reason": row[3],
-                "auth_token": row[4],
-                "num_sent": row[5],
-                "num_opens": row[6],
-                "num_replies": row[7],
-                "num_pos_replies": row[8],
-                "num_demos": row[9],
-                "name": row[10],
-                "img_url": row[11],
-                "included_individual_title_keywords": row[12],
-                "included_individual_seniority_keywords": row[13],
-                "included_individual_locations_keywords": row[14],
-                "included_individual_industry_keywords": row[15],
-                "included_individual_generalized_keywords": row[16],
-                "included_individual_skills_keywords": row[17],
-                "included_company_name_keywords": row[18],
-                "included_company_locations_keywords": row[19],
-                "included_company_generalized_keywords": row[20],
-                "included_company_industries_keywords": row[21],
-                "company_size_start": row[22],
-                "company_size_end": row[23],
-                "sent_percent": row[24],
-                "open_percent": row[25],
-                "reply_percent": row[26],
-                "demo_percent": row[27],
-                "id": client_archetype_id,
+                "emoji": row.emoji,
+                "archetype": row.archetype,
+                "active": row.active,
+                "persona_fit_reason": row.persona_fit_reason,
+                "auth_token": row.auth_token,
+                "num_sent": row.num_sent,
+                "num_opens": row.num_opens,
+                "num_replies": row.num_replies,
+                "num_pos_replies": row.positive_reply,
+                "num_demos": row.num_demos,
+                "name": row.name,
+                "img_url": row.img_url,
+                "included_individual_title_keywords": row.included_individual_title_keywords,
+                "included_individual_seniority_keywords": row.included_individual_seniority_keywords,
+                "included_individual_locations_keywords": row.included_individual_locations_keywords,
+                "included_individual_industry_keywords": row.included_individual_industry_keywords,
+                "included_individual_generalized_keywords": row.included_individual_generalized_keywords,
+                "included_individual_skills_keywords": row.included_individual_skills_keywords,
+                "included_company_name_keywords": row.included_company_name_keywords,
+                "included_company_locations_keywords": row.included_company_locations_keywords,
+                "included_company_generalized_keywords": row.included_company_generalized_keywords,
+                "included_company_industries_keywords": row.included_company_industries_keywords,
+                "company_size_start": row.company_size_start,
+                "company_size_end": row.company_size_end,
+                "sent_percent": row.sent_percent,
+                "open_percent": row.open_percent,
+                "reply_percent": row.reply_percent,
+                "demo_percent": row.demo_percent,
+                "id": row.id,
             }
         )
 
@@ -258,95 +394,15 @@ def get_all_campaign_analytics_for_client(
         if room_id:
             print("Sending socket message")
             send_socket_message('+1', {"message": "+1", "room_id": room_id}, room_id)
-        
-        verbose_query = f"""
-            with d as (
-                select 
-                    case 
-                        when prospect_status_records.created_at is not null then to_char(prospect_status_records.created_at, 'YYYY-MM-DD')
-                        when prospect_email_status_records.created_at is not null then to_char(prospect_email_status_records.created_at, 'YYYY-MM-DD')
-                    end date,
-                    count(distinct prospect.id) filter (
-                        where prospect_status_records.to_status = 'SENT_OUTREACH' or 
-                            prospect_email_status_records.to_status = 'SENT_OUTREACH'
-                    ) num_sent,
-                    count(distinct prospect.id) filter (
-                        where prospect_status_records.to_status = 'ACCEPTED' or 
-                            prospect_email_status_records.to_status = 'EMAIL_OPENED'
-                    ) num_opens,
-                    count(distinct prospect.id) filter (
-                        where prospect_status_records.to_status = 'ACTIVE_CONVO' or 
-                            cast(prospect_email_status_records.to_status as varchar) ilike '%ACTIVE_CONVO_%'
-                    ) num_replies,
-                    count (distinct prospect.id) filter (
-                        where prospect_status_records.to_status in ('ACTIVE_CONVO_SCHEDULING', 'ACTIVE_CONVO_QUESTION', 'ACTIVE_CONVO_NEXT_STEPS') or
-                            prospect_email_status_records.to_status = 'DEMO_SET'
-                    ) positive_reply,
-                    count(distinct prospect.id) filter (
-                        where prospect_status_records.to_status = 'DEMO_SET' or
-                            prospect_email_status_records.to_status = 'DEMO_SET'
-                    ) num_demos,
-                    array_agg (
-                        concat(prospect.id, '###', prospect.full_name, '###', prospect_status_records.to_status, '###', case
-                            when prospect.li_last_message_from_prospect is not null then prospect.li_last_message_from_prospect
-                            when prospect.email_last_message_from_prospect is not null then prospect.email_last_message_from_prospect
-                            else ''
-                        end)
-                    ) filter (
-                        where prospect_status_records.to_status in ('ACTIVE_CONVO_SCHEDULING', 'ACTIVE_CONVO_QUESTION', 'ACTIVE_CONVO_NEXT_STEPS') or
-                            prospect_email_status_records.to_status = 'DEMO_SET'
-                    ) positive_reply_details,
-                    array_agg(distinct client_archetype.id)
-                from client_archetype
-                    join client_sdr on client_sdr.id = client_archetype.client_sdr_id
-                    join prospect on prospect.archetype_id = client_archetype.id
-                    left join prospect_status_records on prospect_status_records.prospect_id = prospect.id
-                    left join prospect_email on prospect_email.id = prospect.approved_prospect_email_id
-                    left join prospect_email_status_records on prospect_email_status_records.prospect_email_id = prospect_email.id
-                where client_archetype.id = {client_archetype_id}
-                group by 1
-                order by 1 desc
-            )
-            select 
-                *
-            from d;
-        """
 
+        top_icp_people = CAMPAIGN_ANALYTICS_TOP_ICP_PROSPECTS_QUERY.all(
+            client_archetype_id=client_archetype_id
+        )
+        top_icp_people_list = [person._asdict() for person in top_icp_people]
 
-        top_icp_query = f"""
-            select 
-                prospect.id,
-                prospect.full_name,
-                prospect.icp_fit_score,
-                prospect_status_records.created_at as status_created_at,
-                prospect_email_status_records.created_at as email_status_created_at,
-                prospect.company,
-                prospect.title
-            from prospect
-                left join prospect_status_records on prospect_status_records.prospect_id = prospect.id
-                left join prospect_email on prospect_email.prospect_id = prospect.id
-                left join prospect_email_status_records on prospect_email_status_records.prospect_email_id = prospect_email.id    
-            where prospect.icp_fit_score is not null
-                and prospect.archetype_id = {client_archetype_id}
-                and prospect.overall_status not in ('REMOVED')
-            order by prospect.icp_fit_score desc
-            limit 5;
-        """
-        top_icp_people = db.session.execute(top_icp_query).fetchall()
-        top_icp_people_list = [
-            {
-                "id": row[0],
-                "full_name": row[1],
-                "icp_fit_score": row[2],
-                "status_created_at": row[3],
-                "email_status_created_at": row[4],
-                "company": row[5],
-                "title": row[6]
-            } 
-            for row in top_icp_people
-        ]
-
-        verbose_data = db.session.execute(verbose_query).fetchall()
+        verbose_data = CAMPAIGN_ANALYTICS_DAILY_QUERY.all(
+            client_archetype_id=client_archetype_id
+        )
         verbose_data_arr = []
         for row in verbose_data:
             start_date_obj = datetime.strptime(start_date, '%Y-%m-%d') if isinstance(start_date, str) else start_date
@@ -379,57 +435,40 @@ def get_all_campaign_analytics_for_client(
         return {"summary": data_arr, "daily": verbose_data_arr, "top_icp_people": filtered_top_icp_people_list}
 
     return data_arr
-def get_outreach_over_time(
-    client_id: int,
-    num_days: int = 365,
-):
-    query = """
+class OutreachOverTimeRow(NamedTuple):
+    date: str
+    sent_outreach: int
+    opened: int
+    active_convo: int
+    positive_reply: int
+    demo_set: int
+
+
+OUTREACH_OVER_TIME_QUERY = query_registry.register(
+    "campaign_analytics.outreach_over_time",
+    """
         select 
-            case 
-                when prospect_status_records.created_at is not null 
-                    then to_char(prospect_status_records.created_at, 'YYYY-MM-DD')
-                when prospect_email_status_records.created_at is not null
-                    then to_char(prospect_email_status_records.created_at, 'YYYY-MM-DD')
-            end date,
-            count(distinct prospect.id) filter (
-                where prospect_status_records.to_status = 'SENT_OUTREACH' or 
-                    prospect_email_status_records.to_status = 'SENT_OUTREACH'
-            ) sent_outreach,
-            count(distinct prospect.id) filter (
-                where prospect_status_records.to_status = 'ACCEPTED' or 
-                    prospect_email_status_records.to_status = 'EMAIL_OPENED'
-            ) opened,
-            count(distinct prospect.id) filter (
-                where prospect_status_records.to_status = 'ACTIVE_CONVO' or 
-                    cast(prospect_email_status_records.to_status as varchar) ilike '%ACTIVE_CONVO_%'
-            ) active_convo,
-            count(distinct prospect.id) filter (
-                where prospect_status_records.to_status in ('ACTIVE_CONVO_SCHEDULING', 'ACTIVE_CONVO_QUESTION', 'ACTIVE_CONVO_NEXT_STEPS') or
-                    prospect_email_status_records.to_status = 'DEMO_SET'
-            ) positive_reply,
-            count(distinct prospect.id) filter (
-                where prospect_status_records.to_status = 'DEMO_SET' or
-                    prospect_email_status_records.to_status = 'DEMO_SET'
-            ) demo_set
-        from client_archetype
-            join client_sdr on client_sdr.id = client_archetype.client_sdr_id
-            join prospect on prospect.client_sdr_id = client_sdr.id
-            left join prospect_status_records on prospect_status_records.prospect_id = prospect.id
-            left join prospect_email on prospect_email.prospect_id = prospect.id
-            left join prospect_email_status_records on prospect_email_status_records.prospect_email_id = prospect_email.id
-        where (
-                prospect_status_records.created_at > NOW() - '{days} days'::INTERVAL
-                or 
-                prospect_email_status_records.created_at > NOW() - '{days} days'::INTERVAL
-            )
-            and prospect.client_id = {client_id}
+            to_char(campaign_analytics_rollup.date, 'YYYY-MM-DD') date,
+            cast(sum(campaign_analytics_rollup.num_sent) as integer) sent_outreach,
+            cast(sum(campaign_analytics_rollup.num_opens) as integer) opened,
+            cast(sum(campaign_analytics_rollup.num_replies) as integer) active_convo,
+            cast(sum(campaign_analytics_rollup.num_positive_replies) as integer) positive_reply,
+            cast(sum(campaign_analytics_rollup.num_demos) as integer) demo_set
+        from campaign_analytics_rollup
+        where campaign_analytics_rollup.client_id = :client_id
+            and campaign_analytics_rollup.date > cast(NOW() - :num_days * '1 day'::INTERVAL as date)
         group by 1
         order by 1 asc;
-    """.format(
-        client_id=client_id, days=num_days
-    )
+    """,
+    row_type=OutreachOverTimeRow,
+)
+
 
-    data = db.session.execute(query).fetchall()
+def get_outreach_over_time(
+    client_id: int,
+    num_days: int = 365,
+):
+    data = OUTREACH_OVER_TIME_QUERY.all(client_id=client_id, num_days=num_days)
 
     dates = []
     sent_outreach = []
@@ -483,8 +522,9 @@ def get_outreach_over_time(
     return modes
 
 
-def get_all_campaign_analytics_for_client_campaigns_page(client_id: int):
-    query = """
+CAMPAIGNS_PAGE_QUERY = query_registry.register(
+    "campaign_analytics.campaigns_page",
+    """
         select 
             concat(client_archetype.emoji, ' ', client_archetype.archetype) "Campaign",
             client_sdr.name "Account",
@@ -533,13 +573,14 @@ def get_all_campaign_analytics_for_client_campaigns_page(client_id: int):
             left join prospect_email on prospect_email.id = prospect.approved_prospect_email_id
             left join prospect_email_status_records on prospect_email_status_records.prospect_email_id = prospect_email.id
             left join generated_message on generated_message.prospect_id = prospect.id and generated_message.message_status = 'SENT'
-        where client_archetype.client_id = {client_id}
+        where client_archetype.client_id = :client_id
         group by 1,2, client_archetype.active, client_sdr.img_url
-    """.format(
-        client_id=client_id
-    )
+    """,
+)
+
 
-    data = db.session.execute(query).fetchall()
+def get_all_campaign_analytics_for_client_campaigns_page(client_id: int):
+    data = CAMPAIGNS_PAGE_QUERY.all(client_id=client_id)
 
     data_arr = []
     for row in data:
@@ -669,6 +710,39 @@ def get_activity_logs(client_sdr_id: int) -> list[dict]:
     ).all()
     return [activity_log.to_dict() for activity_log in activity_logs]
 
+OVERVIEW_PIPELINE_LEADS_QUERY = query_registry.register(
+    "analytics.overview_pipeline_leads",
+    """
+        select 
+            count(distinct prospect.id) filter (where prospect.merge_opportunity_id is not null) "num_opportunities_all_time",
+            sum(prospect.contract_size) filter (where prospect.merge_opportunity_id is not null) "pipeline_generated_all_time",
+            count(distinct prospect.id) filter (where prospect.created_at > NOW() - '3 month'::INTERVAL) "leads_created_last_3_month",
+            count(distinct prospect.id) filter (where prospect.created_at > NOW() - '1 month'::INTERVAL) "leads_created_last_1_month"
+        from prospect
+        where prospect.client_id = :client_id;
+    """,
+)
+OVERVIEW_ACTIVITY_QUERY = query_registry.register(
+    "analytics.overview_activity",
+    """
+        select 
+            count(distinct prospect.id) filter (where 
+                (prospect_status_records.to_status = 'SENT_OUTREACH' and prospect_status_records.created_at > NOW() - '3 month'::INTERVAL) or 
+                (prospect_email_status_records.to_status = 'SENT_OUTREACH' and prospect_email_status_records.created_at > NOW() - '3 month'::INTERVAL)
+            ) "activity_3_mon",
+            count(distinct prospect.id) filter (where 
+                (prospect_status_records.to_status = 'SENT_OUTREACH' and prospect_status_records.created_at > NOW() - '24 hours'::INTERVAL) or 
+                (prospect_email_status_records.to_status = 'SENT_OUTREACH' and prospect_email_status_records.created_at > NOW() - '24 hours'::INTERVAL)
+            ) "activity_1_day"
+        from prospect
+            left join prospect_status_records on prospect_status_records.prospect_id = prospect.id 
+            left join prospect_email on prospect_email.prospect_id = prospect.id 
+            left join prospect_email_status_records on prospect_email_status_records.prospect_email_id = prospect_email.id
+        where prospect.client_id = :client_id;
+    """,
+)
+
+
 def get_overview_pipeline_activity(client_sdr_id: int) -> dict:
     """
     Gets the following stats for the Client that the ClientSDR is associated with:
@@ -686,35 +760,8 @@ def get_overview_pipeline_activity(client_sdr_id: int) -> dict:
     client_sdr: ClientSDR = ClientSDR.query.get(client_sdr_id)
     client_id = client_sdr.client_id
 
-    opps_pipeline_leads_stats_query = """
-        select 
-            count(distinct prospect.id) filter (where prospect.merge_opportunity_id is not null) "num_opportunities_all_time",
-            sum(prospect.contract_size) filter (where prospect.merge_opportunity_id is not null) "pipeline_generated_all_time",
-            count(distinct prospect.id) filter (where prospect.created_at > NOW() - '3 month'::INTERVAL) "leads_created_last_3_month",
-            count(distinct prospect.id) filter (where prospect.created_at > NOW() - '1 month'::INTERVAL) "leads_created_last_1_month"
-        from prospect
-        where prospect.client_id = {client_id};
-    """
-
-    distinct_activity_stats = """
-    select 
-        count(distinct prospect.id) filter (where 
-            (prospect_status_records.to_status = 'SENT_OUTREACH' and prospect_status_records.created_at > NOW() - '3 month'::INTERVAL) or 
-            (prospect_email_status_records.to_status = 'SENT_OUTREACH' and prospect_email_status_records.created_at > NOW() - '3 month'::INTERVAL)
-        ) "activity_3_mon",
-        count(distinct prospect.id) filter (where 
-            (prospect_status_records.to_status = 'SENT_OUTREACH' and prospect_status_records.created_at > NOW() - '24 hours'::INTERVAL) or 
-            (prospect_email_status_records.to_status = 'SENT_OUTREACH' and prospect_email_status_records.created_at > NOW() - '24 hours'::INTERVAL)
-        ) "activity_1_day"
-    from prospect
-        left join prospect_status_records on prospect_status_records.prospect_id = prospect.id 
-        left join prospect_email on prospect_email.prospect_id = prospect.id 
-        left join prospect_email_status_records on prospect_email_status_records.prospect_email_id = prospect_email.id
-    where prospect.client_id = {client_id};
-    """
-
-    opps_pipeline_leads_stats = db.session.execute(opps_pipeline_leads_stats_query.format(client_id=client_id)).fetchone()
-    distinct_activity_stats = db.session.execute(distinct_activity_stats.format(client_id=client_id)).fetchone()
+    opps_pipeline_leads_stats = OVERVIEW_PIPELINE_LEADS_QUERY.first(client_id=client_id)
+    distinct_activity_stats = OVERVIEW_ACTIVITY_QUERY.first(client_id=client_id)
 
     return {
         "opportunities_created": opps_pipeline_leads_stats[0],
@@ -785,15 +832,9 @@ def get_cycle_dates_for_campaign(client_sdr_id: int, campaign_id: Optional[int]
 
 #template analytics endpoint
 
-def get_template_analytics_for_archetype(archetype_id: int, start_date: Optional[str] = None):
-    from sqlalchemy import text
-    from datetime import datetime
-
-    if start_date is None:
-        start_date = datetime.now().strftime('%Y-%m-%d')
-
-    # CTA Analytics
-    cta_analytics_query = text("""
+TEMPLATE_ANALYTICS_CTA_QUERY = query_registry.register(
+    "template_analytics.ctas",
+    """
         select 
             generated_message_cta.text_value,
             count(distinct prospect.id) filter (where prospect_status_records.to_status = 'SENT_OUTREACH') as num_sent,
@@ -811,14 +852,12 @@ def get_template_analytics_for_archetype(archetype_id: int, start_date: Optional
             and generated_message_cta.text_value is not null
         group by generated_message_cta.text_value
         limit 5;
-    """)
-    print('params are', {'archetype_id': archetype_id, 'start_date': start_date})
-    cta_analytics = db.session.execute(cta_analytics_query, {'archetype_id': archetype_id, 'start_date': start_date}).fetchall()
+    """,
+)
 
-    print('cta_analytics', cta_analytics)
-
-    # Linkedin Template Analytics
-    linkedin_template_analytics_query = text("""
+TEMPLATE_ANALYTICS_LINKEDIN_QUERY = query_registry.register(
+    "template_analytics.linkedin_templates",
+    """
         select 
             linkedin_initial_message_template.message,
             count(distinct prospect.id) filter (where prospect_status_records.to_status = 'SENT_OUTREACH') as num_sent,
@@ -836,13 +875,12 @@ def get_template_analytics_for_archetype(archetype_id: int, start_date: Optional
             and linkedin_initial_message_template.message is not null
         group by linkedin_initial_message_template.message
         limit 5;
-    """)
-    linkedin_template_analytics = db.session.execute(linkedin_template_analytics_query, {'archetype_id': archetype_id, 'start_date': start_date}).fetchall()
-
-    print('linkedin_template_analytics', linkedin_template_analytics)
+    """,
+)
 
-    # Subject Lines
-    subject_lines_analytics_query = text("""
+TEMPLATE_ANALYTICS_SUBJECT_LINES_QUERY = query_registry.register(
+    "template_analytics.subject_lines",
+    """
         select 
             email_subject_line_template.subject_line,
             count(distinct prospect_email.prospect_id) filter (where prospect_email_status_records.to_status = 'SENT_OUTREACH') as num_sent,
@@ -862,13 +900,12 @@ def get_template_analytics_for_archetype(archetype_id: int, start_date: Optional
             and email_subject_line_template.subject_line is not null
         group by email_subject_line_template.subject_line
         limit 5;
-    """)
-    subject_lines_analytics = db.session.execute(subject_lines_analytics_query, {'archetype_id': archetype_id, 'start_date': start_date}).fetchall()
+    """,
+)
 
-    print('subject_lines_analytics', subject_lines_analytics)
-
-    # Email Templates
-    email_templates_analytics_query = text("""
+TEMPLATE_ANALYTICS_EMAIL_TEMPLATES_QUERY = query_registry.register(
+    "template_analytics.email_templates",
+    """
         select 
             email_sequence_step.title,
             count(distinct prospect_email.prospect_id) filter (where prospect_email_status_records.to_status = 'SENT_OUTREACH') as num_sent,
@@ -886,16 +923,42 @@ def get_template_analytics_for_archetype(archetype_id: int, start_date: Optional
             )
             and prospect.archetype_id = :archetype_id
         group by 1;
-    """)
-    email_templates_analytics = db.session.execute(email_templates_analytics_query, {'archetype_id': archetype_id, 'start_date': start_date}).fetchall()
+    """,
+)
+
+
+def get_template_analytics_for_archetype(archetype_id: int, start_date: Optional[str] = None):
+    from datetime import datetime
+
+    if start_date is None:
+        start_date = datetime.now().strftime('%Y-%m-%d')
+
+    # CTA Analytics
+    print('params are', {'archetype_id': archetype_id, 'start_date': start_date})
+    cta_analytics = TEMPLATE_ANALYTICS_CTA_QUERY.dicts(archetype_id=archetype_id, start_date=start_date)
+
+    print('cta_analytics', cta_analytics)
+
+    # Linkedin Template Analytics
+    linkedin_template_analytics = TEMPLATE_ANALYTICS_LINKEDIN_QUERY.dicts(archetype_id=archetype_id, start_date=start_date)
+
+    print('linkedin_template_analytics', linkedin_template_analytics)
+
+    # Subject Lines
+    subject_lines_analytics = TEMPLATE_ANALYTICS_SUBJECT_LINES_QUERY.dicts(archetype_id=archetype_id, start_date=start_date)
+
+    print('subject_lines_analytics', subject_lines_analytics)
+
+    # Email Templates
+    email_templates_analytics = TEMPLATE_ANALYTICS_EMAIL_TEMPLATES_QUERY.dicts(archetype_id=archetype_id, start_date=start_date)
 
     print('email_templates_analytics', email_templates_analytics)
 
     return {
-        "cta_analytics": [dict(row) for row in cta_analytics],
-        "linkedin_template_analytics": [dict(row) for row in linkedin_template_analytics],
-        "subject_lines_analytics": [dict(row) for row in subject_lines_analytics],
-        "email_templates_analytics": [dict(row) for row in email_templates_analytics]
+        "cta_analytics": cta_analytics,
+        "linkedin_template_analytics": linkedin_template_analytics,
+        "subject_lines_analytics": subject_lines_analytics,
+        "email_templates_analytics": email_templates_analytics
     }
 
 def process_cycle_data_and_generate_report(client_sdr_id: int, cycle_data: dict) -> dict:
@@ -0,0 +1,363 @@
+""" Campaign analytics rollups.
+
+The sent/open/reply/demo funnels of the campaign pages and weekly reports used
+to be computed on every request, with `count(distinct prospect.id) filter`
+over a fan-out join of prospects and their LinkedIn and email status records.
+They now read `campaign_analytics_rollup`: one row of counters per
+(campaign, SDR, day, channel).
+
+A prospect is counted once per funnel stage, on the day and channel of the
+first status record that reached the stage, so summing the counters over any
+set of days, channels, SDRs or campaigns gives the number of distinct
+prospects.
+
+`refresh_campaign_analytics_rollups` runs every minute. Both status record
+tables are processed together, up to a common `created_at` horizon that trails
+the clock by CAMPAIGN_ROLLUP_SAFETY_LAG, so rows still being inserted aren't
+skipped. A stage is counted in the batch that contains its earliest event in
+either channel: once that event is behind the horizon, later events of the
+stage (in either channel) never count again. Its first runs backfill the whole
+history in batches. `rebuild_campaign_analytics_rollups` recomputes a client's
+counters from scratch, ex. after prospects were moved between campaigns.
+"""
+
+import datetime
+
+from sqlalchemy import text
+
+from app import celery, db
+from src.analytics.models import CampaignAnalyticsRollupWatermark
+from src.email_outbound.models import ProspectEmailOutreachStatus
+from src.prospecting.models import ProspectChannels, ProspectStatus
+from src.utils.query_registry import query_registry
+
+# Status records per table and refresh, roughly. The first refreshes backfill in batches of this size.
+CAMPAIGN_ROLLUP_REFRESH_BATCH_SIZE = 50000
+# How far the horizon trails the clock, so that records of transactions still in flight aren't skipped
+CAMPAIGN_ROLLUP_SAFETY_LAG = datetime.timedelta(minutes=5)
+
+# Funnel stage (counter column) -> channel -> the statuses that reach it
+FUNNEL_STAGE_STATUSES: dict[str, dict[str, list[str]]] = {
+    "num_sent": {
+        ProspectChannels.LINKEDIN.value: [ProspectStatus.SENT_OUTREACH.value],
+        ProspectChannels.EMAIL.value: [ProspectEmailOutreachStatus.SENT_OUTREACH.value],
+    },
+    "num_opens": {
+        ProspectChannels.LINKEDIN.value: [ProspectStatus.ACCEPTED.value],
+        ProspectChannels.EMAIL.value: [ProspectEmailOutreachStatus.EMAIL_OPENED.value],
+    },
+    "num_replies": {
+        ProspectChannels.LINKEDIN.value: [ProspectStatus.ACTIVE_CONVO.value],
+        ProspectChannels.EMAIL.value: [
+            status.value
+            for status in ProspectEmailOutreachStatus
+            if status.value.startswith("ACTIVE_CONVO_")
+        ],
+    },
+    "num_positive_replies": {
+        ProspectChannels.LINKEDIN.value: [
+            ProspectStatus.ACTIVE_CONVO_SCHEDULING.value,
+            ProspectStatus.ACTIVE_CONVO_QUESTION.value,
+            ProspectStatus.ACTIVE_CONVO_NEXT_STEPS.value,
+        ],
+        ProspectChannels.EMAIL.value: [ProspectEmailOutreachStatus.DEMO_SET.value],
+    },
+    "num_demos": {
+        ProspectChannels.LINKEDIN.value: [ProspectStatus.DEMO_SET.value],
+        ProspectChannels.EMAIL.value: [ProspectEmailOutreachStatus.DEMO_SET.value],
+    },
+}
+FUNNEL_STAGES = list(FUNNEL_STAGE_STATUSES.keys())
+
+
+def get_stage_statuses_values() -> str:
+    """The `FUNNEL_STAGE_STATUSES` as a SQL VALUES list of (channel, to_status, stage)"""
+    return ",\n".join(
+        f"('{channel}', '{status}', '{stage}')"
+        for stage, channel_statuses in FUNNEL_STAGE_STATUSES.items()
+        for channel, statuses in channel_statuses.items()
+        for status in statuses
+    )
+
+
+def get_rollup_upsert_query(
+    touched_prospects_only: bool = False, for_client: bool = False
+) -> str:
+    """Builds the query that counts first-reached funnel stages into the rollups.
+
+    Only status records created up to :horizon are considered.
+
+    Args:
+        touched_prospects_only (bool, optional): Only count stages whose earliest event, in either
+            channel, was created after :last_created_at. Defaults to False (count everything).
+        for_client (bool, optional): Only count the prospects of client :client_id. Defaults to False.
+    """
+    touched_prospects_cte = ""
+    events_filter = ""
+    first_events_filter = ""
+    if touched_prospects_only:
+        touched_prospects_cte = """
+        touched_prospects as (
+            select prospect_status_records.prospect_id
+            from prospect_status_records
+            where prospect_status_records.created_at > :last_created_at
+                and prospect_status_records.created_at <= :horizon
+            union
+            select prospect_email.prospect_id
+            from prospect_email_status_records
+                join prospect_email on prospect_email.id = prospect_email_status_records.prospect_email_id
+            where prospect_email_status_records.created_at > :last_created_at
+                and prospect_email_status_records.created_at <= :horizon
+        ),"""
+        events_filter = "and {prospect_id} in (select prospect_id from touched_prospects)"
+        # Stages with an earlier event, in either channel, were counted by a previous batch
+        first_events_filter = "and first_events.created_at > :last_created_at"
+
+    stage_counters = ",\n".join(
+        f"count(*) filter (where first_events.stage = '{stage}') {stage}"
+        for stage in FUNNEL_STAGES
+    )
+    stage_increments = ",\n".join(
+        f"{stage} = campaign_analytics_rollup.{stage} + excluded.{stage}"
+        for stage in FUNNEL_STAGES
+    )
+
+    return """
+        with stage_statuses(channel, to_status, stage) as (
+            values {stage_statuses}
+        ),{touched_prospects_cte}
+        events as (
+            select
+                'LINKEDIN' channel,
+                prospect_status_records.id record_id,
+                prospect_status_records.prospect_id,
+                prospect_status_records.created_at,
+                stage_statuses.stage
+            from prospect_status_records
+                join stage_statuses on stage_statuses.channel = 'LINKEDIN'
+                    and stage_statuses.to_status = cast(prospect_status_records.to_status as varchar)
+            where prospect_status_records.created_at <= :horizon
+                {linkedin_events_filter}
+            union all
+            select
+                'EMAIL' channel,
+                prospect_email_status_records.id record_id,
+                prospect_email.prospect_id,
+                prospect_email_status_records.created_at,
+                stage_statuses.stage
+            from prospect_email_status_records
+                join prospect_email on prospect_email.id = prospect_email_status_records.prospect_email_id
+                join stage_statuses on stage_statuses.channel = 'EMAIL'
+                    and stage_statuses.to_status = cast(prospect_email_status_records.to_status as varchar)
+            where prospect_email_status_records.created_at <= :horizon
+                {email_events_filter}
+        ),
+        first_events as (
+            select distinct on (events.prospect_id, events.stage) *
+            from events
+            order by events.prospect_id, events.stage, events.created_at, events.channel, events.record_id
+        )
+        insert into campaign_analytics_rollup (
+            created_at, updated_at, client_id, client_sdr_id, client_archetype_id, date, channel,
+            {stages}
+        )
+        select
+            NOW(),
+            NOW(),
+            prospect.client_id,
+            prospect.client_sdr_id,
+            prospect.archetype_id,
+            cast(first_events.created_at as date),
+            first_events.channel,
+            {stage_counters}
+        from first_events
+            join prospect on prospect.id = first_events.prospect_id
+        where prospect.archetype_id is not null
+            and prospect.client_sdr_id is not null
+            {client_filter}
+            {first_events_filter}
+        group by 3, 4, 5, 6, 7
+        on conflict (client_archetype_id, client_sdr_id, date, channel) do update set
+            {stage_increments},
+            updated_at = NOW();
+    """.format(
+        stage_statuses=get_stage_statuses_values(),
+        touched_prospects_cte=touched_prospects_cte,
+        linkedin_events_filter=events_filter.format(
+            prospect_id="prospect_status_records.prospect_id"
+        ),
+        email_events_filter=events_filter.format(prospect_id="prospect_email.prospect_id"),
+        stages=", ".join(FUNNEL_STAGES),
+        stage_counters=stage_counters,
+        client_filter="and prospect.client_id = :client_id" if for_client else "",
+        first_events_filter=first_events_filter,
+        stage_increments=stage_increments,
+    )
+
+
+REFRESH_ROLLUPS_QUERY = query_registry.register(
+    "campaign_rollups.refresh",
+    get_rollup_upsert_query(touched_prospects_only=True),
+)
+REBUILD_CLIENT_ROLLUPS_QUERY = query_registry.register(
+    "campaign_rollups.rebuild_client",
+    get_rollup_upsert_query(for_client=True),
+)
+
+
+# Where a batch of up to :batch_size records after the watermark ends, per table.
+# NULL if fewer records are left before the safe horizon.
+ROLLUP_BATCH_ENDS_QUERY = query_registry.register(
+    "campaign_rollups.batch_ends",
+    """
+    select
+        (
+            select prospect_status_records.created_at
+            from prospect_status_records
+            where prospect_status_records.created_at > :last_created_at
+                and prospect_status_records.created_at <= :safe_horizon
+            order by prospect_status_records.created_at
+            offset :batch_size - 1
+            limit 1
+        ) status_records_batch_end,
+        (
+            select prospect_email_status_records.created_at
+            from prospect_email_status_records
+            where prospect_email_status_records.created_at > :last_created_at
+                and prospect_email_status_records.created_at <= :safe_horizon
+            order by prospect_email_status_records.created_at
+            offset :batch_size - 1
+            limit 1
+        ) email_status_records_batch_end
+    """,
+)
+ROLLUP_BATCH_COUNT_QUERY = query_registry.register(
+    "campaign_rollups.batch_count",
+    """
+    select
+        (
+            select count(*)
+            from prospect_status_records
+            where prospect_status_records.created_at > :last_created_at
+                and prospect_status_records.created_at <= :horizon
+        ) + (
+            select count(*)
+            from prospect_email_status_records
+            where prospect_email_status_records.created_at > :last_created_at
+                and prospect_email_status_records.created_at <= :horizon
+        )
+    """,
+)
+
+
+def lock_campaign_rollup_watermark() -> CampaignAnalyticsRollupWatermark:
+    """Gets the watermark row, locked until the end of the transaction, so refreshes and rebuilds don't overlap"""
+    db.session.execute(
+        text(
+            """
+            insert into campaign_analytics_rollup_watermark (
+                id, created_at, updated_at, last_created_at
+            )
+            values (1, NOW(), NOW(), NULL)
+            on conflict (id) do nothing;
+            """
+        )
+    )
+    return (
+        CampaignAnalyticsRollupWatermark.query.filter_by(id=1)
+        .with_for_update()
+        .one()
+    )
+
+
+def refresh_campaign_analytics_rollups_batch(
+    batch_size: int = CAMPAIGN_ROLLUP_REFRESH_BATCH_SIZE,
+    safety_lag: datetime.timedelta = CAMPAIGN_ROLLUP_SAFETY_LAG,
+) -> int:
+    """Counts the next batch of status records, of both channels, into the rollups
+
+    The batch ends at a common created_at horizon: `safety_lag` before now, or
+    earlier if either table has more than `batch_size` records before that.
+
+    Returns:
+        int: The number of status records processed, 0 once caught up
+    """
+    watermark = lock_campaign_rollup_watermark()
+    last_created_at: datetime.datetime = watermark.last_created_at or datetime.datetime.min
+    safe_horizon = datetime.datetime.now() - safety_lag
+    if safe_horizon <= last_created_at:
+        db.session.commit()
+        return 0
+
+    batch_ends = ROLLUP_BATCH_ENDS_QUERY.first(
+        last_created_at=last_created_at,
+        safe_horizon=safe_horizon,
+        batch_size=batch_size,
+    )
+    horizon = min(
+        end
+        for end in [
+            safe_horizon,
+            batch_ends.status_records_batch_end,
+            batch_ends.email_status_records_batch_end,
+        ]
+        if end is not None
+    )
+    processed = ROLLUP_BATCH_COUNT_QUERY.scalar(
+        last_created_at=last_created_at, horizon=horizon
+    )
+    if processed:
+        REFRESH_ROLLUPS_QUERY.execute(last_created_at=last_created_at, horizon=horizon)
+    watermark.last_created_at = horizon
+    db.session.commit()
+
+    return processed
+
+
+@celery.task(bind=True, max_retries=3)
+def refresh_campaign_analytics_rollups(self, max_batches: int = 10) -> int:
+    """Brings the campaign analytics rollups up to date with the status records
+
+    Args:
+        max_batches (int, optional): Stop after this many batches, the next run continues. Defaults to 10.
+
+    Returns:
+        int: The number of status records processed
+    """
+    try:
+        processed = 0
+        for _ in range(max_batches):
+            batch_processed = refresh_campaign_analytics_rollups_batch()
+            processed += batch_processed
+            if not batch_processed:
+                break
+        return processed
+    except Exception as e:
+        db.session.rollback()
+        raise self.retry(exc=e, countdown=60)
+
+
+@celery.task(bind=True, max_retries=3)
+def rebuild_campaign_analytics_rollups(self, client_id: int) -> bool:
+    """Recomputes a client's campaign analytics rollups from its status records
+
+    Only records up to the watermark are counted, the refresh adds the rest.
+
+    Args:
+        client_id (int): ID of the client
+    """
+    try:
+        watermark = lock_campaign_rollup_watermark()
+        db.session.execute(
+            text("delete from campaign_analytics_rollup where client_id = :client_id"),
+            {"client_id": client_id},
+        )
+        if watermark.last_created_at is not None:
+            REBUILD_CLIENT_ROLLUPS_QUERY.execute(
+                client_id=client_id, horizon=watermark.last_created_at
+            )
+        db.session.commit()
+        return True
+    except Exception as e:
+        db.session.rollback()
+        raise self.retry(exc=e, countdown=60)
@@ -1,4 +1,4 @@
-from model_import import ClientSDR
+from src.authentication.token_cache import auth_token_cache
 from flask import request, jsonify
 from functools import wraps
 import time
@@ -77,10 +77,8 @@ def require_user(f):
         if not token:
             return jsonify({"message": "Bearer token is missing."}), 401
 
-        try:
-            sdr: ClientSDR = ClientSDR.query.filter_by(auth_token=token).first()
-            sdr_id = sdr.id
-        except AttributeError:
+        sdr_id = auth_token_cache.get_client_sdr_id(token)
+        if sdr_id is None:
             return jsonify({"message": "Authentication token is invalid."}), 401
 
         return f(sdr_id, *args, **kwargs)
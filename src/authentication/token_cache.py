@@ -0,0 +1,144 @@
+""" Cache of auth token -> client_sdr_id lookups for `require_user`.
+
+Every authenticated request resolves its bearer token to an SDR. Lookups go
+through a small in-process TTL LRU, then a shared Redis cache, and only then
+to Postgres with a narrow query on the indexed `client_sdr.auth_token` column.
+
+Tokens are stored in Redis as SHA-256 hashes, never in plain text. Rotating a
+token or deactivating an SDR must call `invalidate_client_sdr`, which drops
+the SDR's tokens from Redis and from this process. Other processes may keep
+serving a rotated token from their local cache for up to `local_ttl` seconds.
+Unknown tokens are not cached, so new tokens work immediately.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import redis
+
+from app import db
+from src.client.models import ClientSDR
+from src.utils.redis_client import get_redis_client
+
+AUTH_TOKEN_CACHE_LOCAL_TTL_SECONDS = 30
+AUTH_TOKEN_CACHE_REDIS_TTL_SECONDS = 60 * 60
+AUTH_TOKEN_CACHE_MAX_SIZE = 10000
+
+
+class AuthTokenCache:
+    """Two-tier cache of auth token -> client_sdr_id.
+
+    Args:
+        local_ttl (int): Seconds a lookup is served from this process without checking Redis
+        redis_ttl (int): Seconds a lookup is kept in Redis
+        max_size (int): Evict the least recently used tokens beyond this many
+    """
+
+    def __init__(
+        self,
+        local_ttl: int = AUTH_TOKEN_CACHE_LOCAL_TTL_SECONDS,
+        redis_ttl: int = AUTH_TOKEN_CACHE_REDIS_TTL_SECONDS,
+        max_size: int = AUTH_TOKEN_CACHE_MAX_SIZE,
+    ):
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        # token hash -> (client_sdr_id, expires at)
+        self._tokens: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    @staticmethod
+    def hash_token(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get_client_sdr_id(self, token: str) -> Optional[int]:
+        """Gets the ID of the SDR with this auth token, or None if the token is invalid"""
+        token_hash = self.hash_token(token)
+
+        now = time.time()
+        with self._lock:
+            entry = self._tokens.get(token_hash)
+            if entry is not None and entry[1] > now:
+                self._tokens.move_to_end(token_hash)
+                return entry[0]
+
+        client_sdr_id = self._get_from_redis(token_hash)
+        if client_sdr_id is None:
+            row = (
+                db.session.query(ClientSDR.id)
+                .filter(ClientSDR.auth_token == token)
+                .first()
+            )
+            if not row:
+                return None
+            client_sdr_id = row.id
+            self._set_in_redis(token_hash, client_sdr_id)
+
+        self._set_local(token_hash, client_sdr_id)
+        return client_sdr_id
+
+    def invalidate_client_sdr(self, client_sdr_id: int):
+        """Drops every cached token of the SDR. Call after rotating its token or deactivating it."""
+        with self._lock:
+            for token_hash, (cached_sdr_id, _) in list(self._tokens.items()):
+                if cached_sdr_id == client_sdr_id:
+                    del self._tokens[token_hash]
+
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return
+        sdr_key = f"auth_token_sdr:{client_sdr_id}"
+        try:
+            token_hashes = redis_client.smembers(sdr_key)
+            pipeline = redis_client.pipeline()
+            for token_hash in token_hashes:
+                if isinstance(token_hash, bytes):
+                    token_hash = token_hash.decode("utf-8")
+                pipeline.delete(f"auth_token:{token_hash}")
+            pipeline.delete(sdr_key)
+            pipeline.execute()
+        except redis.exceptions.RedisError as e:
+            print(f"Auth token cache invalidation failed for SDR #{client_sdr_id}: {e}")
+
+    def clear(self):
+        """Clears this process's cache"""
+        with self._lock:
+            self._tokens.clear()
+
+    def _set_local(self, token_hash: str, client_sdr_id: int):
+        with self._lock:
+            self._tokens[token_hash] = (client_sdr_id, time.time() + self.local_ttl)
+            self._tokens.move_to_end(token_hash)
+            while len(self._tokens) > self.max_size:
+                self._tokens.popitem(last=False)
+
+    def _get_from_redis(self, token_hash: str) -> Optional[int]:
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return None
+        try:
+            value = redis_client.get(f"auth_token:{token_hash}")
+        except redis.exceptions.RedisError as e:
+            print(f"Auth token cache unavailable: {e}")
+            return None
+        return int(value) if value is not None else None
+
+    def _set_in_redis(self, token_hash: str, client_sdr_id: int):
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return
+        sdr_key = f"auth_token_sdr:{client_sdr_id}"
+        try:
+            pipeline = redis_client.pipeline()
+            pipeline.set(f"auth_token:{token_hash}", client_sdr_id, ex=self.redis_ttl)
+            pipeline.sadd(sdr_key, token_hash)
+            pipeline.expire(sdr_key, self.redis_ttl)
+            pipeline.execute()
+        except redis.exceptions.RedisError as e:
+            print(f"Auth token cache unavailable: {e}")
+
+
+auth_token_cache = AuthTokenCache()
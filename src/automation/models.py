@@ -409,6 +409,9 @@ class ProcessQueue(db.Model):
     """
 
     __tablename__ = "process_queue"
+    __table_args__ = (
+        db.Index("idx_process_queue_status_execution_date", "status", "execution_date"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     type = db.Column(db.String, nullable=False)
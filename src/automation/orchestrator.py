@@ -38,10 +38,12 @@ from src.automation.models import (
     ProcessQueueStatus,
     ProcessQueueFailedJob,
 )
+from src.utils.redis_client import get_redis_client
 from app import celery, db
 from datetime import datetime, timedelta
 
-from sqlalchemy import or_, and_
+import redis
+from sqlalchemy import or_, and_, case, func
 
 ###############################
 # REGISTER PROCESS TYPES HERE #
@@ -49,6 +51,7 @@ from sqlalchemy import or_, and_
 # Define what process types call what functions (these functions need '@celery.task' decorator)
 # - function must return a boolean for success or failure
 # - args are passed into the function from meta_data.args
+# - max_in_flight (optional) caps how many processes of the type run at once
 PROCESS_TYPE_MAP = {
     "process_queue_test": {
         "function": process_queue_test,
@@ -73,6 +76,7 @@ PROCESS_TYPE_MAP = {
         "priority": 10,
         "queue": "icrawler",
         "routing_key": "icrawler",
+        "max_in_flight": 5,
     },
     "upload_job_for_individual": {
         "function": upload_job_for_individual,
@@ -139,18 +143,21 @@ PROCESS_TYPE_MAP = {
         "priority": 10,
         "queue": None,
         "routing_key": None,
+        "max_in_flight": 10,
     },
     "daily_generate_linkedin_campaign_for_sdr": {
         "function": daily_generate_linkedin_campaign_for_sdr,
         "priority": 10,
         "queue": None,
         "routing_key": None,
+        "max_in_flight": 10,
     },
     "upload_from_apollo": {
         "function": upload_from_apollo,
         "priority": 2,
         "queue": "prospecting",
         "routing_key": "prospecting",
+        "max_in_flight": 5,
     },
     "delayed_trigger_upload_prospects_job_from_linkedin_sales_nav_scrape": {
         "function": delayed_trigger_upload_prospects_job_from_linkedin_sales_nav_scrape,
@@ -168,49 +175,247 @@ PROCESS_TYPE_MAP = {
 ###############################
 
 
-@celery.task
-def process_queue():
-    """Main queue function, this is called every minute
+PROCESS_QUEUE_CLAIM_BATCH_SIZE = 500
+PROCESS_QUEUE_STALE_HOURS = 1  # The stale time for a process to be considered stuck
+PROCESS_QUEUE_LAG_REDIS_KEY = "process_queue:lag_seconds"
 
-    It executes any processes that are ready.
-    """
-    now = datetime.utcnow()
-    wait_time = now - timedelta(
-        hours=1
-    )  # The stale time for a process to be considered stuck
 
+def get_ready_process_filter(now: datetime, wait_time: datetime):
     # Scenarios:
     # 1. Process is QUEUED (or RETRY) and is ready to be executed
     # 2. Process is IN_PROGRESS but has been executing for more than 1 hour (it is stuck)
-    processes: list[ProcessQueue] = ProcessQueue.query.filter(
-        or_(
-            and_(
-                ProcessQueue.execution_date < now,
-                or_(
-                    ProcessQueue.status == ProcessQueueStatus.QUEUED,
-                    ProcessQueue.status == ProcessQueueStatus.RETRY,
-                    ProcessQueue.status == None,
-                ),
+    return or_(
+        and_(
+            ProcessQueue.execution_date < now,
+            or_(
+                ProcessQueue.status == ProcessQueueStatus.QUEUED,
+                ProcessQueue.status == ProcessQueueStatus.RETRY,
+                ProcessQueue.status == None,
             ),
-            and_(
-                ProcessQueue.executed_at < wait_time,
-                ProcessQueue.status == ProcessQueueStatus.IN_PROGRESS,
+        ),
+        and_(
+            ProcessQueue.executed_at < wait_time,
+            ProcessQueue.status == ProcessQueueStatus.IN_PROGRESS,
+        ),
+    )
+
+
+def get_in_flight_process_counts(wait_time: datetime) -> dict[str, int]:
+    """Number of processes of each type that are currently executing (and not stuck)"""
+    rows = (
+        db.session.query(ProcessQueue.type, func.count(ProcessQueue.id))
+        .filter(
+            ProcessQueue.status == ProcessQueueStatus.IN_PROGRESS,
+            ProcessQueue.executed_at >= wait_time,
+        )
+        .group_by(ProcessQueue.type)
+        .all()
+    )
+    return {process_type: count for process_type, count in rows}
+
+
+def record_process_queue_lag(now: datetime) -> float:
+    """Records how long the oldest ready process has been waiting, in seconds
+
+    Stored as a gauge in Redis so it can be watched across scheduler instances.
+    """
+    oldest_execution_date = (
+        db.session.query(func.min(ProcessQueue.execution_date))
+        .filter(
+            ProcessQueue.execution_date < now,
+            or_(
+                ProcessQueue.status == ProcessQueueStatus.QUEUED,
+                ProcessQueue.status == ProcessQueueStatus.RETRY,
+                ProcessQueue.status == None,
             ),
         )
-    ).all()
+        .scalar()
+    )
+    lag_seconds = (
+        (now - oldest_execution_date).total_seconds() if oldest_execution_date else 0
+    )
+
+    redis_client = get_redis_client()
+    if redis_client is not None:
+        try:
+            redis_client.set(PROCESS_QUEUE_LAG_REDIS_KEY, lag_seconds)
+        except redis.exceptions.RedisError as e:
+            print(f"Failed to record process queue lag: {e}")
+
+    return lag_seconds
+
+
+def claim_processes(
+    now: datetime,
+    limit: int = PROCESS_QUEUE_CLAIM_BATCH_SIZE,
+    exclude_ids: Optional[list[int]] = None,
+) -> list[tuple[int, str, Optional[dict]]]:
+    """Claims a batch of ready processes and marks them IN_PROGRESS in one statement
+
+    Rows are locked with FOR UPDATE SKIP LOCKED, so overlapping ticks (or other
+    scheduler instances) never claim the same process. Types at their
+    `max_in_flight` cap are skipped until some of their processes finish, and
+    only as many processes of a capped type as it has room for are candidates,
+    so a capped backlog can't crowd other types out of the batch.
+
+    Args:
+        now (datetime): The time of this tick
+        limit (int): Maximum number of processes to claim
+        exclude_ids (Optional[list[int]]): Processes to skip, ex. ones this tick already tried to dispatch
+
+    Returns:
+        list[tuple]: (process_id, type, meta_data) of every claimed process
+    """
+    wait_time = now - timedelta(hours=PROCESS_QUEUE_STALE_HOURS)
+    ready_filter = get_ready_process_filter(now, wait_time)
+    if exclude_ids:
+        ready_filter = and_(ready_filter, ProcessQueue.id.notin_(exclude_ids))
+
+    # Remaining room per capped type
+    in_flight = get_in_flight_process_counts(wait_time)
+    room = {}
+    for process_type, process_data in PROCESS_TYPE_MAP.items():
+        max_in_flight = process_data.get("max_in_flight")
+        if max_in_flight is not None:
+            room[process_type] = max(max_in_flight - in_flight.get(process_type, 0), 0)
+    saturated_types = [process_type for process_type, r in room.items() if r == 0]
+    open_capped_room = {process_type: r for process_type, r in room.items() if r > 0}
+
+    query = ProcessQueue.query.filter(ready_filter)
+    if saturated_types:
+        query = query.filter(ProcessQueue.type.notin_(saturated_types))
+    if open_capped_room:
+        # The first `room` ready processes of each capped type
+        ranked = (
+            db.session.query(
+                ProcessQueue.id,
+                ProcessQueue.type,
+                func.row_number()
+                .over(
+                    partition_by=ProcessQueue.type,
+                    order_by=ProcessQueue.execution_date,
+                )
+                .label("type_rank"),
+            )
+            .filter(ready_filter, ProcessQueue.type.in_(list(open_capped_room)))
+            .subquery()
+        )
+        capped_candidate_ids = db.session.query(ranked.c.id).filter(
+            ranked.c.type_rank <= case(open_capped_room, value=ranked.c.type, else_=0)
+        )
+        query = query.filter(
+            or_(
+                ProcessQueue.type.notin_(list(open_capped_room)),
+                ProcessQueue.id.in_(capped_candidate_ids),
+            )
+        )
+    candidates: list[ProcessQueue] = (
+        query.order_by(ProcessQueue.execution_date)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
 
+    claimed = []
+    for process in candidates:
+        if process.type in room:
+            if room[process.type] == 0:
+                continue
+            room[process.type] -= 1
+        claimed.append((process.id, process.type, process.meta_data))
+
+    if claimed:
+        ProcessQueue.query.filter(
+            ProcessQueue.id.in_([process_id for process_id, _, _ in claimed])
+        ).update(
+            {
+                ProcessQueue.executed_at: now,
+                ProcessQueue.status: ProcessQueueStatus.IN_PROGRESS,
+            },
+            synchronize_session=False,
+        )
+    db.session.commit()  # Also releases the locks on unclaimed candidates
+
+    return claimed
+
+
+def dispatch_processes(processes: list[tuple[int, str, Optional[dict]]]) -> list[int]:
+    """Dispatches claimed processes, grouped by their celery queue
+
+    Each queue's processes are published over one broker connection. Processes
+    that fail to publish are put back in the queue to be retried next tick, and
+    processes of an unregistered type are marked FAILED.
+
+    Returns:
+        list[int]: The IDs of the processes that were dispatched
+    """
+    processes_by_queue: dict[Optional[str], list] = {}
     for process in processes:
-        process.executed_at = now
-        process.status = ProcessQueueStatus.IN_PROGRESS
+        process_data = PROCESS_TYPE_MAP.get(process[1]) or {}
+        processes_by_queue.setdefault(process_data.get("queue"), []).append(process)
+
+    dispatched_ids = []
+    requeue_ids = []
+    unknown_type_ids = []
+    for queue_processes in processes_by_queue.values():
+        with celery.producer_or_acquire() as producer:
+            for process_id, process_type, meta_data in queue_processes:
+                try:
+                    if handle_process(process_id, process_type, meta_data, producer):
+                        dispatched_ids.append(process_id)
+                    else:
+                        unknown_type_ids.append(process_id)
+                except Exception as e:
+                    print(f"Failed to dispatch process {process_id}: {e}")
+                    requeue_ids.append(process_id)
+
+    if requeue_ids:
+        ProcessQueue.query.filter(ProcessQueue.id.in_(requeue_ids)).update(
+            {ProcessQueue.status: ProcessQueueStatus.RETRY},
+            synchronize_session=False,
+        )
+    if unknown_type_ids:
+        ProcessQueue.query.filter(ProcessQueue.id.in_(unknown_type_ids)).update(
+            {
+                ProcessQueue.status: ProcessQueueStatus.FAILED,
+                ProcessQueue.fail_reason: "Unknown process type",
+            },
+            synchronize_session=False,
+        )
+    db.session.commit()
 
-        process_id = process.id
-        process_type = process.type
-        process_meta_data = process.meta_data
+    return dispatched_ids
 
-        db.session.add(process)
-        db.session.commit()
 
-        handle_process(process_id, process_type, process_meta_data)
+@celery.task
+def process_queue(batch_size: int = PROCESS_QUEUE_CLAIM_BATCH_SIZE):
+    """Main queue function, this is called every minute
+
+    It claims ready processes in batches and dispatches them, until the backlog
+    is drained or only capped types remain. Each process is tried at most once
+    per tick, and the tick stops early if a whole batch fails to dispatch (ex.
+    the broker is down); the failed processes are retried next tick.
+    """
+    now = datetime.utcnow()
+    lag_seconds = record_process_queue_lag(now)
+
+    dispatched_count = 0
+    attempted_ids = []
+    while True:
+        processes = claim_processes(now, limit=batch_size, exclude_ids=attempted_ids)
+        if not processes:
+            break
+        attempted_ids.extend(process_id for process_id, _, _ in processes)
+        dispatched = dispatch_processes(processes)
+        dispatched_count += len(dispatched)
+        if not dispatched or len(processes) < batch_size:
+            break
+
+    print(
+        f"Process queue: dispatched {dispatched_count} processes (lag {lag_seconds:.0f}s)"
+    )
+    return {"dispatched": dispatched_count, "lag_seconds": lag_seconds}
+
 
 def handle_process_by_id(process_id: int) -> bool:
     process: ProcessQueue = ProcessQueue.query.get(process_id)
@@ -219,7 +424,9 @@ def handle_process_by_id(process_id: int) -> bool:
     
     return handle_process(process_id, process.type, process.meta_data)
 
-def handle_process(process_id: int, type: str, meta_data: Optional[dict]) -> bool:
+def handle_process(
+    process_id: int, type: str, meta_data: Optional[dict], producer=None
+) -> bool:
     """Execute the given process
 
     Reads meta data to get args or other information.
@@ -229,6 +436,7 @@ def handle_process(process_id: int, type: str, meta_data: Optional[dict]) -> boo
         process_id (int): The id of the process queue
         type (str): The process type
         meta_data (dict): Any meta data for the process
+        producer (optional): Broker producer to publish with, to share a connection
 
     Returns:
         success (bool): Whether it was scheduled to execute or not
@@ -253,6 +461,7 @@ def handle_process(process_id: int, type: str, meta_data: Optional[dict]) -> boo
         priority=process_data.get("priority", 5),
         link=remove_process_from_queue.s(process_id),
         link_error=on_process_failure.s(process_id),
+        producer=producer,
     )
 
     return True
@@ -431,7 +431,7 @@ class ClientSDR(db.Model):
     weekly_email_outbound_target = db.Column(db.Integer, nullable=True)
     scheduling_link = db.Column(db.String, nullable=True)
 
-    auth_token = db.Column(db.String, nullable=True)
+    auth_token = db.Column(db.String, nullable=True, index=True)
 
     pipeline_notifications_webhook_url = db.Column(db.String, nullable=True)
     notification_allowlist = db.Column(
@@ -3,6 +3,7 @@ import random
 
 import sqlalchemy
 from src.ai_requests.services import create_ai_requests
+from src.authentication.token_cache import auth_token_cache
 from src.automation.orchestrator import add_process_for_future
 from src.bump_framework.services import create_bump_framework
 from src.chatbot.campaign_builder_assistant import chat_with_assistant, edit_strategy
@@ -1171,6 +1172,7 @@ def deactivate_client_sdr(client_sdr_id: int, email: str) -> bool:
     # sdr.weekly_email_outbound_target = 0
 
     db.session.commit()
+    auth_token_cache.invalidate_client_sdr(client_sdr_id)
 
     # Set the launch volume to 0 (stop sending outreach)
     update_phantom_buster_launch_schedule(client_sdr_id=client_sdr_id, custom_volume=0)
@@ -1278,6 +1280,7 @@ def reset_client_sdr_sight_auth_token(client_sdr_id: int):
 
     sdr.auth_token = generate_random_alphanumeric(32)
     db.session.commit()
+    auth_token_cache.invalidate_client_sdr(client_sdr_id)
 
     return {"token": sdr.auth_token}
 
@@ -1512,8 +1515,7 @@ def approve_stytch_client_sdr_token(client_sdr_email: str, token: str):
 
 def verify_client_sdr_auth_token(auth_token: str):
     """Verify a Client SDR auth token"""
-    client_sdr: ClientSDR = ClientSDR.query.filter_by(auth_token=auth_token).first()
-    if not client_sdr:
+    if not auth_token_cache.get_client_sdr_id(auth_token):
         return None
 
     return True
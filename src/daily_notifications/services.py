@@ -10,10 +10,10 @@ from src.daily_notifications.models import (
 from src.prospecting.models import ProspectStatus
 from src.prospecting.models import Prospect
 from src.client.models import ClientSDR, ClientArchetype
-from src.li_conversation.models import LinkedinConversationEntry
 from src.utils.datetime.dateutils import get_datetime_now
 from datetime import timedelta
 from src.utils.slack import send_slack_message, URL_MAP
+from src.utils.query_registry import query_registry
 from typing import Optional
 
 DUE_DATE_DAYS = 1
@@ -43,9 +43,93 @@ def update_daily_notification_status(
     return "OK", 200
 
 
+# For every ACTIVE_CONVO or SCHEDULING prospect, the latest message of its LinkedIn
+# thread decides whether it needs a notification. Notifications are only
+# (re)created if there is none yet, or the existing one was completed or cancelled.
+FILL_IN_DAILY_NOTIFICATIONS_QUERY = query_registry.register(
+    "daily_notifications.fill_in",
+    """
+    with candidates as (
+        select
+            prospect.id prospect_id,
+            prospect.client_sdr_id,
+            prospect.full_name,
+            prospect.li_conversation_thread_id,
+            case prospect.status
+                when 'ACTIVE_CONVO' then 'UNREAD_MESSAGE'
+                else 'SCHEDULING'
+            end notification_type
+        from prospect
+        where prospect.status in ('ACTIVE_CONVO', 'SCHEDULING')
+            and prospect.client_sdr_id is not null
+            and prospect.li_conversation_thread_id is not null
+    ),
+    latest_messages as (
+        select *
+        from (
+            select
+                linkedin_conversation_entry.conversation_url,
+                linkedin_conversation_entry.connection_degree,
+                linkedin_conversation_entry.updated_at,
+                row_number() over (
+                    partition by linkedin_conversation_entry.conversation_url
+                    order by linkedin_conversation_entry.date desc
+                ) message_rank
+            from linkedin_conversation_entry
+            where linkedin_conversation_entry.conversation_url in (
+                select candidates.li_conversation_thread_id from candidates
+            )
+        ) ranked_messages
+        where ranked_messages.message_rank = 1
+    )
+    insert into daily_notifications (
+        created_at, updated_at, client_sdr_id, prospect_id, type, status, title, description, due_date
+    )
+    select
+        NOW(),
+        NOW(),
+        candidates.client_sdr_id,
+        candidates.prospect_id,
+        cast(candidates.notification_type as notificationtype),
+        cast('PENDING' as notificationstatus),
+        case candidates.notification_type
+            when 'UNREAD_MESSAGE' then concat('Unread message from ', candidates.full_name)
+            else concat('Previous scheduling with ', candidates.full_name)
+        end,
+        case candidates.notification_type
+            when 'UNREAD_MESSAGE' then concat('Reply to ', candidates.full_name, ' and update their status if necessary')
+            else concat('Follow up with ', candidates.full_name, ' and update their status if necessary')
+        end,
+        :due_date
+    from candidates
+        join latest_messages on latest_messages.conversation_url = candidates.li_conversation_thread_id
+        left join daily_notifications on daily_notifications.client_sdr_id = candidates.client_sdr_id
+            and daily_notifications.prospect_id = candidates.prospect_id
+            and cast(daily_notifications.type as varchar) = candidates.notification_type
+    where (
+            (candidates.notification_type = 'UNREAD_MESSAGE'
+                and latest_messages.connection_degree is distinct from 'You')
+            or (candidates.notification_type = 'SCHEDULING'
+                and latest_messages.updated_at < :scheduling_cutoff)
+        )
+        and (
+            daily_notifications.status is null
+            or daily_notifications.status in ('CANCELLED', 'COMPLETE')
+        )
+    on conflict (client_sdr_id, prospect_id, type) do update set
+        status = excluded.status,
+        title = excluded.title,
+        description = excluded.description,
+        due_date = excluded.due_date,
+        updated_at = NOW()
+    where daily_notifications.status in ('CANCELLED', 'COMPLETE');
+    """,
+)
+
+
 @celery.task
 def fill_in_daily_notifications():
-    """Finds all prospects with unread messages and creates a daily notification for them.
+    """Finds all prospects with unread messages or stale schedulings and creates a daily notification for them.
 
     Returns:
         HTTPS response: 201 if successful.
@@ -56,120 +140,16 @@ def fill_in_daily_notifications():
         webhook_urls=[URL_MAP["eng-sandbox"]],
     )
 
-    for client_sdr in ClientSDR.query.all():
-        add_unread_messages(client_sdr)
-        add_schedulings(client_sdr)
-
+    now = get_datetime_now()
+    FILL_IN_DAILY_NOTIFICATIONS_QUERY.execute(
+        due_date=now + timedelta(days=DUE_DATE_DAYS),  # DUE_DATE_DAYS days from now
+        scheduling_cutoff=now - timedelta(days=SCHEDULING_CHECK_DAYS),
+    )
     db.session.commit()
 
     return "Created", 201
 
 
-def add_unread_messages(client_sdr):
-    """Adds unread messages to the daily notifications table."""
-
-    prospects = (
-        db.session.query(Prospect)
-        .filter_by(client_sdr_id=client_sdr.id)
-        .filter_by(status="ACTIVE_CONVO")
-        .all()
-    )
-    for prospect in prospects:
-        latest_message = (
-            db.session.query(LinkedinConversationEntry)
-            .filter_by(conversation_url=prospect.li_conversation_thread_id)
-            .order_by(LinkedinConversationEntry.date.desc())
-            .first()
-        )
-
-        if latest_message and latest_message.connection_degree != "You":
-            existing_record = DailyNotification.query.filter_by(
-                client_sdr_id=client_sdr.id,
-                prospect_id=prospect.id,
-                type="UNREAD_MESSAGE",
-            ).first()
-
-            # create daily notification
-            daily_notification = DailyNotification(
-                client_sdr_id=client_sdr.id,
-                prospect_id=prospect.id,
-                type="UNREAD_MESSAGE",
-                title="Unread message from {prospect_name}".format(
-                    prospect_name=prospect.full_name
-                ),
-                description="Reply to {prospect_name} and update their status if necessary".format(
-                    prospect_name=prospect.full_name
-                ),
-                status="PENDING",
-                due_date=get_datetime_now()
-                + timedelta(days=DUE_DATE_DAYS),  # DUE_DATE_DAYS days from now
-            )
-
-            # If it's non-existent, cancelled, or complete, we want to create a new one
-            if not existing_record:
-                db.session.add(daily_notification)
-            elif (
-                existing_record.status.value == "CANCELLED"
-                or existing_record.status.value == "COMPLETE"
-            ):
-                db.session.merge(daily_notification)
-
-
-def add_schedulings(client_sdr):
-    """Adds schedulings to the daily notifications table."""
-
-    prospects = (
-        db.session.query(Prospect)
-        .filter_by(client_sdr_id=client_sdr.id)
-        .filter_by(status="SCHEDULING")
-        .all()
-    )
-    for prospect in prospects:
-        latest_message = (
-            db.session.query(LinkedinConversationEntry)
-            .filter_by(conversation_url=prospect.li_conversation_thread_id)
-            .order_by(LinkedinConversationEntry.date.desc())
-            .first()
-        )
-
-        # If the latest message is older than SCHEDULING_CHECK_DAYS days, create a daily notification
-        if (
-            latest_message
-            and latest_message.updated_at
-            < get_datetime_now() - timedelta(days=SCHEDULING_CHECK_DAYS)
-        ):
-            existing_record = DailyNotification.query.filter_by(
-                client_sdr_id=client_sdr.id,
-                prospect_id=prospect.id,
-                type="SCHEDULING",
-            ).first()
-
-            # create daily notification
-            daily_notification = DailyNotification(
-                client_sdr_id=client_sdr.id,
-                prospect_id=prospect.id,
-                type="SCHEDULING",
-                title="Previous scheduling with {prospect_name}".format(
-                    prospect_name=prospect.full_name
-                ),
-                description="Follow up with {prospect_name} and update their status if necessary".format(
-                    prospect_name=prospect.full_name
-                ),
-                status="PENDING",
-                due_date=get_datetime_now()
-                + timedelta(days=DUE_DATE_DAYS),  # DUE_DATE_DAYS days from now
-            )
-
-            # If it's non-existent, cancelled, or complete, we want to create a new one
-            if not existing_record:
-                db.session.add(daily_notification)
-            elif (
-                existing_record.status.value == "CANCELLED"
-                or existing_record.status.value == "COMPLETE"
-            ):
-                db.session.merge(daily_notification)
-
-
 @celery.task
 def clear_daily_notifications():
     """Clears all daily notifications that are more than 7 days old.
@@ -0,0 +1,299 @@
+""" Bulk email enrichment for every email-less prospect under an archetype.
+
+Prospects are grouped by (first name, last name, company domain), so people
+uploaded more than once cost one lookup. Groups that already have an email in
+EmailStore are filled from it with one set-based query. The rest are looked up
+with DataGMA -> FindyMail -> Hunter on a bounded thread pool, under the shared
+vendor rate limiter. EmailStore and Prospect rows are written per chunk in bulk.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import urlsplit
+
+from sqlalchemy import func, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db, celery
+from src.email_outbound.email_store.models import EmailStore, HunterVerifyStatus
+from src.email_outbound.email_store.services import find_email_from_vendors
+from src.prospecting.models import Prospect
+from src.utils.slack import URL_MAP, send_slack_message
+
+EMAIL_ENRICHMENT_CHUNK_SIZE = 500
+EMAIL_ENRICHMENT_MAX_WORKERS = 8
+
+
+def get_company_domain(company_url: Optional[str]) -> Optional[str]:
+    """ex. 'https://www.Acme.com/about' -> 'acme.com'. None for missing or LinkedIn URLs."""
+    if not company_url or "linkedin.com/" in company_url:
+        return None
+    url = company_url.strip()
+    if "://" not in url:
+        url = "http://" + url
+    host = (urlsplit(url).hostname or "").lower()
+    if host.startswith("www."):
+        host = host[len("www.") :]
+    return host or None
+
+
+def get_enrichment_key(prospect) -> Optional[tuple]:
+    """(first name, last name, domain) used to de-duplicate lookups. The company name stands in for a missing domain."""
+    first_name = (prospect.first_name or "").strip().lower()
+    last_name = (prospect.last_name or "").strip().lower()
+    company = get_company_domain(prospect.company_url) or (
+        (prospect.company or "").strip().lower()
+    )
+    if not first_name or not last_name or not company:
+        return None
+    return (first_name, last_name, company)
+
+
+def get_stored_emails(prospects: list) -> dict[tuple, EmailStore]:
+    """Finds the EmailStore entry for each (first name, last name, company name), in one query"""
+    store_keys = {
+        (
+            (p.first_name or "").strip().lower(),
+            (p.last_name or "").strip().lower(),
+            (p.company or "").strip().lower(),
+        )
+        for p in prospects
+        if p.first_name and p.last_name and p.company
+    }
+    if not store_keys:
+        return {}
+
+    email_stores: list[EmailStore] = EmailStore.query.filter(
+        tuple_(
+            func.lower(func.trim(EmailStore.first_name)),
+            func.lower(func.trim(EmailStore.last_name)),
+            func.lower(func.trim(EmailStore.company_name)),
+        ).in_(list(store_keys)),
+        func.coalesce(EmailStore.hunter_status, "") != "invalid",
+    ).all()
+
+    return {
+        (
+            store.first_name.strip().lower(),
+            store.last_name.strip().lower(),
+            store.company_name.strip().lower(),
+        ): store
+        for store in email_stores
+    }
+
+
+def find_and_verify_email(prospect) -> tuple[Optional[str], Optional[float]]:
+    """Runs the vendor lookup and verification for one group. Makes no database calls, so it's safe on a worker thread."""
+    from src.email_classifier.services import verify_email
+
+    email, verified = find_email_from_vendors(
+        name=prospect.full_name,
+        first_name=prospect.first_name,
+        last_name=prospect.last_name,
+        company=prospect.company,
+        company_url=prospect.company_url,
+    )
+    if not email:
+        return None, None
+    if verified:
+        return email, 0.99  # If the email was already verified, we'll assume it's a good email
+
+    success, email, score = verify_email(email=email)
+    if not success:
+        return None, None
+    return email, score
+
+
+def save_enriched_emails(found: list[tuple]) -> dict[str, int]:
+    """Creates the EmailStore rows for new emails and returns their ids, in two statements.
+
+    Args:
+        found (list[tuple]): (email, first_name, last_name, company_name) per email
+
+    Returns:
+        dict[str, int]: email -> EmailStore id
+    """
+    if not found:
+        return {}
+
+    rows = {}
+    for email, first_name, last_name, company_name in found:
+        rows.setdefault(
+            email,
+            {
+                "email": email,
+                "first_name": first_name,
+                "last_name": last_name,
+                "company_name": company_name,
+                "verification_status_hunter": HunterVerifyStatus.PENDING,
+            },
+        )
+    db.session.execute(
+        insert(EmailStore)
+        .values(list(rows.values()))
+        .on_conflict_do_nothing(index_elements=["email"])
+    )
+
+    return {
+        email: email_store_id
+        for email_store_id, email in db.session.query(EmailStore.id, EmailStore.email)
+        .filter(EmailStore.email.in_(list(rows.keys())))
+        .all()
+    }
+
+
+def enrich_prospect_chunk(prospects: list) -> dict:
+    """Enriches a chunk of prospects. See the module docstring.
+
+    Returns:
+        dict: Counts of prospects filled from EmailStore and from vendors, lookups made, and credits used per SDR
+    """
+    groups: dict[tuple, list] = {}
+    for prospect in prospects:
+        key = get_enrichment_key(prospect)
+        if key is not None:
+            groups.setdefault(key, []).append(prospect)
+
+    updates = []  # (prospect, email, score, email_store_id)
+
+    # Emails we already have
+    stored_emails = get_stored_emails(prospects)
+    for key, group in list(groups.items()):
+        for prospect in group:
+            store = stored_emails.get(
+                (key[0], key[1], (prospect.company or "").strip().lower())
+            )
+            if store is not None:
+                break
+        else:
+            continue
+        score = (store.hunter_score / 100) if store.hunter_score is not None else None
+        for prospect in group:
+            updates.append((prospect, store.email, score, store.id))
+        del groups[key]
+    from_store = len(updates)
+
+    # One paid lookup per remaining group
+    keys = list(groups.keys())
+    with ThreadPoolExecutor(max_workers=EMAIL_ENRICHMENT_MAX_WORKERS) as executor:
+        results = list(
+            executor.map(lambda key: find_and_verify_email(groups[key][0]), keys)
+        )
+
+    found = [
+        (email, groups[key][0].first_name, groups[key][0].last_name, groups[key][0].company)
+        for key, (email, _) in zip(keys, results)
+        if email
+    ]
+    email_store_ids = save_enriched_emails(found)
+
+    credits_used: dict[int, int] = {}
+    for key, (email, score) in zip(keys, results):
+        if not email:
+            continue
+        for prospect in groups[key]:
+            updates.append((prospect, email, score, email_store_ids.get(email)))
+            if prospect.client_sdr_id:
+                credits_used[prospect.client_sdr_id] = (
+                    credits_used.get(prospect.client_sdr_id, 0) + 1
+                )
+
+    if updates:
+        db.session.bulk_update_mappings(
+            Prospect,
+            [
+                {
+                    "id": prospect.id,
+                    "email": email,
+                    "email_score": score,
+                    "valid_primary_email": True,
+                    "email_store_id": email_store_id,
+                }
+                for prospect, email, score, email_store_id in updates
+            ],
+        )
+    for client_sdr_id, credits in credits_used.items():
+        db.session.execute(
+            text(
+                """
+                UPDATE client_sdr
+                SET email_fetching_credits = email_fetching_credits - :credits
+                WHERE id = :client_sdr_id
+                """
+            ),
+            {"credits": credits, "client_sdr_id": client_sdr_id},
+        )
+    db.session.commit()
+
+    return {
+        "from_store": from_store,
+        "from_vendors": len(updates) - from_store,
+        "lookups": len(keys),
+        "credits_used": credits_used,
+    }
+
+
+def enrich_emails_for_archetype(archetype_id: int) -> dict:
+    """Finds emails for all prospects under an archetype that don't have emails.
+
+    Args:
+        archetype_id (int): archetype id
+
+    Returns:
+        dict: Totals for the run
+    """
+    totals = {"prospects": 0, "from_store": 0, "from_vendors": 0, "lookups": 0}
+
+    last_id = 0
+    while True:
+        prospects = (
+            db.session.query(
+                Prospect.id,
+                Prospect.first_name,
+                Prospect.last_name,
+                Prospect.full_name,
+                Prospect.company,
+                Prospect.company_url,
+                Prospect.client_sdr_id,
+            )
+            .filter(
+                Prospect.archetype_id == archetype_id,
+                Prospect.email == None,
+                Prospect.id > last_id,
+            )
+            .order_by(Prospect.id)
+            .limit(EMAIL_ENRICHMENT_CHUNK_SIZE)
+            .all()
+        )
+        if not prospects:
+            break
+        last_id = prospects[-1].id
+
+        result = enrich_prospect_chunk(prospects)
+        totals["prospects"] += len(prospects)
+        for stat in ["from_store", "from_vendors", "lookups"]:
+            totals[stat] += result[stat]
+
+    return totals
+
+
+@celery.task(bind=True, max_retries=3)
+def bulk_find_emails_for_archetype(self, archetype_id: int) -> dict:
+    try:
+        totals = enrich_emails_for_archetype(archetype_id)
+    except Exception as e:
+        db.session.rollback()
+        raise self.retry(exc=e, countdown=2**self.request.retries)
+
+    send_slack_message(
+        "🦊 Bulk email enrichment for archetype #{archetype_id}: {found} of {prospects} prospects found ({from_store} from EmailStore, {lookups} paid lookups)".format(
+            archetype_id=archetype_id,
+            found=totals["from_store"] + totals["from_vendors"],
+            prospects=totals["prospects"],
+            from_store=totals["from_store"],
+            lookups=totals["lookups"],
+        ),
+        webhook_urls=[URL_MAP["eng-sandbox"]],
+    )
+
+    return totals
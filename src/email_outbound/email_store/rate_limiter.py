@@ -0,0 +1,34 @@
+""" Shared rate limiter for the email finder vendors (DataGMA, FindyMail, Hunter).
+
+Every worker draws from the same per-vendor Redis token bucket (see
+src.utils.rate_limiter), so bulk enrichment threads and single-prospect tasks
+together stay under each vendor's quota. If Redis is unavailable, calls are
+spaced out per process instead.
+"""
+
+from src.utils.rate_limiter import TokenBucket, acquire_rate_limit
+
+EMAIL_FINDER_RATE_LIMITS = {  # requests per minute
+    "datagma": 120,
+    "findymail": 300,
+    "hunter": 120,
+}
+EMAIL_FINDER_RATE_LIMIT_MAX_WAIT_SECONDS = 120
+
+
+def acquire_email_finder_rate_limit(vendor: str) -> bool:
+    """Blocks until the vendor's shared bucket has room for one request.
+
+    Returns:
+        bool: True if the shared limiter granted the call, False if it fell back to local spacing
+    """
+    return acquire_rate_limit(
+        [
+            TokenBucket(
+                key=f"email_finder_rate_limit:{vendor}",
+                capacity=EMAIL_FINDER_RATE_LIMITS[vendor],
+            )
+        ],
+        max_wait_seconds=EMAIL_FINDER_RATE_LIMIT_MAX_WAIT_SECONDS,
+        local_fallback=True,
+    )
@@ -1,4 +1,6 @@
 import time
+from typing import Optional
+
 from app import db, celery
 from src.client.models import ClientSDR
 from src.email_outbound.email_store.models import EmailStore, HunterVerifyStatus
@@ -41,6 +43,78 @@ def create_email_store(
     return email_store.id
 
 
+def find_email_from_vendors(
+    name: Optional[str],
+    first_name: Optional[str],
+    last_name: Optional[str],
+    company: Optional[str],
+    company_url: Optional[str],
+) -> tuple[Optional[str], bool]:
+    """Looks up an email with DataGMA, then FindyMail, then Hunter. Makes no database calls.
+
+    Every vendor call waits on the shared per-vendor rate limit first.
+
+    Returns:
+        tuple[Optional[str], bool]: The email found, or None, and whether the vendor already verified it
+    """
+    from src.email_outbound.email_store.rate_limiter import (
+        acquire_email_finder_rate_limit,
+    )
+
+    # Source 1: DataGMA
+    try:
+        from src.email_outbound.email_store.datagma import DataGMA
+
+        acquire_email_finder_rate_limit("datagma")
+        datagma_email = DataGMA().find_from_name_and_company(name=name, company=company)
+        if datagma_email:
+            email = datagma_email.get("email")
+            if email and "," not in email:
+                return email, datagma_email.get("status") == "Valid"
+    except:
+        pass
+
+    # Source 2: FindyMail
+    # Note: There are only 300 active concurrent requests allowed.
+    # If we ever scale to a point where we have more than 300 concurrent requests, we'll need to
+    # implement a queue.
+    try:
+        from src.email_outbound.email_store.findymail import FindyMail
+
+        acquire_email_finder_rate_limit("findymail")
+        findymail_email = FindyMail().find_from_name_and_company(
+            name=name, company=company
+        )
+        if findymail_email:
+            contact = findymail_email.get("contact")
+            if contact:
+                email = contact.get("email")
+                if email and "," not in email:
+                    return email, False
+    except:
+        pass
+
+    # Source 3: Hunter
+    try:
+        from src.email_outbound.email_store.hunter import get_email_from_hunter
+
+        acquire_email_finder_rate_limit("hunter")
+        success, data = get_email_from_hunter(
+            first_name=first_name,
+            last_name=last_name,
+            company_website=company_url,
+            company_name=company,
+        )
+        if success:
+            email = data["email"]
+            if email and "," not in email:
+                return email, False
+    except:
+        pass
+
+    return None, False
+
+
 @celery.task(bind=True, max_retries=3)
 def find_emails_for_archetype(self, archetype_id: int) -> bool:
     """Finds emails for all prospects under an archetype that don't have emails.
@@ -51,19 +125,11 @@ def find_emails_for_archetype(self, archetype_id: int) -> bool:
     Returns:
         bool: True
     """
-    prospects: list[Prospect] = Prospect.query.filter_by(
-        archetype_id=archetype_id,
-        email=None,
-    ).all()
-
-    from src.automation.orchestrator import add_process_list
-
-    add_process_list(
-        type="find_email_for_prospect_id",
-        args_list=[{"prospect_id": prospect.id} for prospect in prospects],
-        chunk_size=50,
-        chunk_wait_minutes=1,
+    from src.email_outbound.email_store.bulk_enrichment import (
+        bulk_find_emails_for_archetype,
     )
+
+    bulk_find_emails_for_archetype.delay(archetype_id=archetype_id)
     return True
 
 
@@ -77,78 +143,23 @@ def find_email_for_prospect_id(self, prospect_id: int) -> str:
     Returns:
         str: The email address found
     """
-    email = None
-    found = False
-    verified = False
-
     # Get the prospect
     prospect: Prospect = Prospect.query.get(prospect_id)
     if not prospect:
         return None
 
     # Get the prospect's name and company
-    name = prospect.full_name
     company = prospect.company
-
-    # Source 1: DataGMA
-    try:
-        from src.email_outbound.email_store.datagma import DataGMA
-
-        datagma = DataGMA()
-        datagma_email = datagma.find_from_name_and_company(name=name, company=company)
-        if datagma_email:
-            email = datagma_email.get("email")
-            if email and "," not in email:
-                email = email
-                found = True
-                if datagma_email.get("status") == "Valid":
-                    verified = True
-    except:
-        pass
-
-    # Source 2: FindyMail
-    # Note: There are only 300 active concurrent requests allowed.
-    # If we ever scale to a point where we have more than 300 concurrent requests, we'll need to
-    # implement a queue.
-    if not found:
-        try:
-            from src.email_outbound.email_store.findymail import FindyMail
-
-            findymail = FindyMail()
-            findymail_email = findymail.find_from_name_and_company(
-                name=name, company=company
-            )
-            if findymail_email:
-                contact = findymail_email.get("contact")
-                if contact:
-                    email = contact.get("email")
-                    if email and "," not in email:
-                        email = email
-                        found = True
-        except:
-            pass
-
-    # Source 3: Hunter
-    if not found:
-        try:
-            from src.email_outbound.email_store.hunter import get_email_from_hunter
-
-            success, data = get_email_from_hunter(
-                first_name=prospect.first_name,
-                last_name=prospect.last_name,
-                company_website=prospect.company_url,
-                company_name=company,
-            )
-            if success:
-                email = data["email"]
-                if email and "," not in email:
-                    email = email
-                    found = True
-        except:
-            pass
+    email, verified = find_email_from_vendors(
+        name=prospect.full_name,
+        first_name=prospect.first_name,
+        last_name=prospect.last_name,
+        company=company,
+        company_url=prospect.company_url,
+    )
 
     # If no email found, return None
-    if not email or not found:
+    if not email:
         return None
 
     # Verify the email
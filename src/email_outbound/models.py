@@ -406,6 +406,10 @@ class ProspectEmailStatusRecords(db.Model):
 
     automated = db.Column(db.Boolean, nullable=True)
 
+    __table_args__ = (
+        db.Index("ix_prospect_email_status_records_created_at", "created_at"),
+    )
+
 
 class EmailInteractionState(enum.Enum):
     """
@@ -105,7 +105,9 @@ def batch_update_emails(
 
 
 def batch_mark_prospects_in_email_campaign_queued(campaign_id: int):
-    from src.automation.orchestrator import add_process_for_future
+    from src.email_scheduling.services import (
+        bulk_populate_email_messaging_schedule_entries,
+    )
 
     outbound_campaign: OutboundCampaign = OutboundCampaign.query.get(campaign_id)
     if not outbound_campaign:
@@ -131,9 +133,32 @@ def batch_mark_prospects_in_email_campaign_queued(campaign_id: int):
     prospects: list[Prospect] = Prospect.query.filter(
         Prospect.id.in_(outbound_campaign.prospect_ids)
     ).all()
+    prospect_emails: dict[int, ProspectEmail] = {
+        prospect_email.id: prospect_email
+        for prospect_email in ProspectEmail.query.filter(
+            ProspectEmail.id.in_(
+                [
+                    prospect.approved_prospect_email_id
+                    for prospect in prospects
+                    if prospect.approved_prospect_email_id
+                ]
+            )
+        )
+    }
+    generated_messages: dict[int, GeneratedMessage] = {
+        message.id: message
+        for message in GeneratedMessage.query.filter(
+            GeneratedMessage.id.in_(
+                [pe.personalized_subject_line for pe in prospect_emails.values()]
+                + [pe.personalized_body for pe in prospect_emails.values()]
+            )
+        )
+    }
+
     bulk_updates = []
-    for index, prospect in enumerate(prospects):
-        prospect_email: ProspectEmail = ProspectEmail.query.get(
+    schedule_entries = []
+    for prospect in prospects:
+        prospect_email: ProspectEmail = prospect_emails.get(
             prospect.approved_prospect_email_id
         )
         if not prospect_email:
@@ -143,10 +168,10 @@ def batch_mark_prospects_in_email_campaign_queued(campaign_id: int):
         ):  # Make sure the prospect_email has not already been sent
             continue
 
-        subject_line: GeneratedMessage = GeneratedMessage.query.get(
+        subject_line: GeneratedMessage = generated_messages.get(
             prospect_email.personalized_subject_line
         )
-        body: GeneratedMessage = GeneratedMessage.query.get(
+        body: GeneratedMessage = generated_messages.get(
             prospect_email.personalized_body
         )
 
@@ -159,26 +184,6 @@ def batch_mark_prospects_in_email_campaign_queued(campaign_id: int):
             db.session.add(prospect)
             continue
 
-        # Check that we haven't been queued already
-        exists: ProcessQueue = ProcessQueue.query.filter(
-            ProcessQueue.type == "populate_email_messaging_schedule_entries",
-            ProcessQueue.meta_data
-            == {
-                "args": {
-                    "client_sdr_id": outbound_campaign.client_sdr_id,
-                    "prospect_email_id": prospect_email.id,
-                    "subject_line_id": prospect_email.personalized_subject_line,
-                    "body_id": prospect_email.personalized_body,
-                    "initial_email_subject_line_template_id": subject_line.email_subject_line_template_id,
-                    "initial_email_body_template_id": body.email_sequence_step_template_id,
-                    "initial_email_send_date": None,
-                    "generate_immediately": generate_immediately,
-                }
-            },
-        ).first()
-        if exists:
-            continue
-
         # LOGGER (delete me eventually): If generate immediately, then we know it is a Smartlead campaign (for now), and we should log this Prospect into the ProspectInSmartlead model
         if generate_immediately:
             from src.prospecting.models import ProspectInSmartlead
@@ -186,38 +191,22 @@ def batch_mark_prospects_in_email_campaign_queued(campaign_id: int):
             log: ProspectInSmartlead = ProspectInSmartlead(
                 prospect_id=prospect.id,
                 log=[
-                    f"batch_mark_prospects_in_email_campaign_queued ({datetime.datetime.utcnow()}): Sending to the process queue."
+                    f"batch_mark_prospects_in_email_campaign_queued ({datetime.datetime.utcnow()}): Sending to the bulk scheduler."
                 ],
             )
             db.session.add(log)
-            db.session.commit()
 
         # Populate the email messaging schedule entries
-        add_process_for_future(
-            type="populate_email_messaging_schedule_entries",
-            args={
-                "client_sdr_id": outbound_campaign.client_sdr_id,
+        schedule_entries.append(
+            {
                 "prospect_email_id": prospect_email.id,
                 "subject_line_id": prospect_email.personalized_subject_line,
                 "body_id": prospect_email.personalized_body,
                 "initial_email_subject_line_template_id": subject_line.email_subject_line_template_id,
                 "initial_email_body_template_id": body.email_sequence_step_template_id,
-                "initial_email_send_date": None,
-                "generate_immediately": generate_immediately,
-            },
-            minutes=index,
+            }
         )
 
-        # populate_email_messaging_schedule_entries(
-        #     client_sdr_id=outbound_campaign.client_sdr_id,
-        #     prospect_email_id=prospect_email.id,
-        #     subject_line_id=prospect_email.personalized_subject_line,
-        #     body_id=prospect_email.personalized_body,
-        #     initial_email_subject_line_template_id=subject_line.email_subject_line_template_id,
-        #     initial_email_body_template_id=body.email_sequence_step_template_id,
-        #     initial_email_send_date=None,
-        # )
-
         prospect_email.outreach_status = ProspectEmailOutreachStatus.NOT_SENT
         prospect_email.email_status = ProspectEmailStatus.APPROVED
 
@@ -226,6 +215,14 @@ def batch_mark_prospects_in_email_campaign_queued(campaign_id: int):
     db.session.bulk_save_objects(bulk_updates)
     db.session.commit()
 
+    # Schedule every prospect email of the campaign in one pass
+    if schedule_entries:
+        bulk_populate_email_messaging_schedule_entries.delay(
+            client_sdr_id=outbound_campaign.client_sdr_id,
+            entries=schedule_entries,
+            generate_immediately=generate_immediately,
+        )
+
     return True
 
 
@@ -3,6 +3,8 @@ import pytz
 from app import celery, db
 
 from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm.attributes import flag_modified
 from typing import Optional
 from src.automation.models import ProcessQueue, ProcessQueueStatus
@@ -49,6 +51,7 @@ from src.smartlead.services import (
 FOLLOWUP_LIMIT = 10
 DEFAULT_SENDING_DELAY_INTERVAL = 3
 DEFAULT_TIMEZONE = "America/Los_Angeles"
+EMAIL_SCHEDULE_INSERT_CHUNK_SIZE = 1000
 
 
 def get_email_messaging_schedule_entries(
@@ -599,10 +602,334 @@ def populate_email_messaging_schedule_entries(
     return [True, email_ids]
 
 
-def get_initial_email_send_date(
+def choose_sequence_step(
+    sequence_steps: list[EmailSequenceStep],
+    used_asset_ids: list[int],
+    asset_ids_by_step: dict[int, list[int]],
+) -> EmailSequenceStep:
+    """Picks the first sequence step that does NOT use an already used asset, otherwise a random one.
+
+    Extends `used_asset_ids` with the assets of the chosen step, if it was chosen for its assets.
+    """
+    chosen_sequence_step = random.choice(sequence_steps)
+    for sequence_step in sequence_steps:
+        new_asset_ids = asset_ids_by_step.get(sequence_step.id, [])
+        if not any(asset_id in used_asset_ids for asset_id in new_asset_ids):
+            chosen_sequence_step = sequence_step
+            used_asset_ids.extend(new_asset_ids)
+            break
+    return chosen_sequence_step
+
+
+@celery.task(bind=True, max_retries=3)
+def bulk_populate_email_messaging_schedule_entries(
+    self,
+    client_sdr_id: int,
+    entries: list[dict],
+    generate_immediately: Optional[bool] = False,
+) -> dict[int, list[int]]:
+    """Populates the email_messaging_schedule table for many prospect emails of an SDR at once
+
+    Schedules the same entries as `populate_email_messaging_schedule_entries`, but loads the
+    sending schedule, SLA schedules, sequence steps and asset mappings once, walks the initial
+    send date forward by the SLA cadence in memory, and inserts all entries in bulk.
+    Prospect emails that already have schedule entries are skipped, so this is safe to retry. If
+    such an email was never sent and its prospect isn't in Smartlead, the prospect is uploaded again.
+    Runs for the same SDR are serialized with an advisory lock.
+
+    Args:
+        client_sdr_id (int): ID of the client_sdr
+        entries (list[dict]): The `populate_email_messaging_schedule_entries` arguments per prospect email:
+            prospect_email_id, subject_line_id, body_id, initial_email_subject_line_template_id and initial_email_body_template_id
+        generate_immediately (Optional[bool], optional): Whether to generate the followups and upload the prospects to Smartlead. Defaults to False.
+
+    Returns:
+        dict[int, list[int]]: prospect_email_id -> the created email_messaging_schedule IDs
+    """
+    try:
+        entries = list({entry["prospect_email_id"]: entry for entry in entries}.values())
+        if not entries:
+            return {}
+
+        # Load the SDR's calendar before taking the lock: creating a default sending schedule commits
+        client_sdr: ClientSDR = ClientSDR.query.get(client_sdr_id)
+        sending_schedule = get_sdr_email_send_schedule(client_sdr_id=client_sdr_id)
+        inbox_tz = get_sending_timezone(sending_schedule, client_sdr)
+        sla_schedules: list[SLASchedule] = SLASchedule.query.filter(
+            SLASchedule.client_sdr_id == client_sdr_id
+        ).all()
+
+        # One schedule run per SDR at a time (until commit), so concurrent tasks don't book the same send slots
+        db.session.execute(
+            text("SELECT pg_advisory_xact_lock(:client_sdr_id)"),
+            {"client_sdr_id": client_sdr_id},
+        )
+
+        # Skip the prospect emails that have already been scheduled
+        already_scheduled = {
+            prospect_email_id
+            for (prospect_email_id,) in db.session.query(
+                EmailMessagingSchedule.prospect_email_id
+            )
+            .filter(
+                EmailMessagingSchedule.prospect_email_id.in_(
+                    [entry["prospect_email_id"] for entry in entries]
+                )
+            )
+            .distinct()
+        }
+        entries = [
+            entry
+            for entry in entries
+            if entry["prospect_email_id"] not in already_scheduled
+        ]
+
+        # Already scheduled but not sent: re-uploaded below if they never reached Smartlead
+        unsent_prospect_ids = [
+            prospect_id
+            for (prospect_id,) in db.session.query(ProspectEmail.prospect_id).filter(
+                ProspectEmail.id.in_(already_scheduled),
+                ProspectEmail.email_status.is_distinct_from(ProspectEmailStatus.SENT),
+            )
+        ]
+
+        # Preload the prospects, sequence steps and asset mappings
+        prospect_by_prospect_email = {
+            prospect_email_id: (prospect_id, archetype_id)
+            for prospect_email_id, prospect_id, archetype_id in db.session.query(
+                ProspectEmail.id, Prospect.id, Prospect.archetype_id
+            )
+            .join(Prospect, Prospect.id == ProspectEmail.prospect_id)
+            .filter(
+                ProspectEmail.id.in_([entry["prospect_email_id"] for entry in entries])
+            )
+        }
+        archetype_ids = {
+            archetype_id for _, archetype_id in prospect_by_prospect_email.values()
+        }
+
+        followup_steps: dict[tuple, list[EmailSequenceStep]] = {}
+        for sequence_step in EmailSequenceStep.query.filter(
+            EmailSequenceStep.client_sdr_id == client_sdr_id,
+            EmailSequenceStep.client_archetype_id.in_(archetype_ids),
+            EmailSequenceStep.overall_status.in_(
+                [ProspectOverallStatus.ACCEPTED, ProspectOverallStatus.BUMPED]
+            ),
+            EmailSequenceStep.active == True,
+        ).order_by(EmailSequenceStep.id):
+            bumped_count = (
+                sequence_step.bumped_count
+                if sequence_step.overall_status == ProspectOverallStatus.BUMPED
+                else None
+            )
+            followup_steps.setdefault(
+                (
+                    sequence_step.client_archetype_id,
+                    sequence_step.overall_status,
+                    bumped_count,
+                ),
+                [],
+            ).append(sequence_step)
+
+        initial_steps: dict[int, EmailSequenceStep] = {
+            sequence_step.id: sequence_step
+            for sequence_step in EmailSequenceStep.query.filter(
+                EmailSequenceStep.id.in_(
+                    {entry["initial_email_body_template_id"] for entry in entries}
+                )
+            )
+        }
+
+        step_ids = set(initial_steps.keys())
+        for sequence_steps in followup_steps.values():
+            step_ids.update(sequence_step.id for sequence_step in sequence_steps)
+        asset_ids_by_step: dict[int, list[int]] = {}
+        for step_id, asset_id in db.session.query(
+            EmailSequenceStepToAssetMapping.email_sequence_step_id,
+            EmailSequenceStepToAssetMapping.client_assets_id,
+        ).filter(EmailSequenceStepToAssetMapping.email_sequence_step_id.in_(step_ids)):
+            asset_ids_by_step.setdefault(step_id, []).append(asset_id)
+
+        last_send_date = get_furthest_initial_email_date(client_sdr_id)
+
+        rows = []
+        for entry in entries:
+            prospect_email_id = entry["prospect_email_id"]
+            if prospect_email_id not in prospect_by_prospect_email:
+                continue
+            _, archetype_id = prospect_by_prospect_email[prospect_email_id]
+
+            # The initial email goes out one SLA cadence after the previous one
+            if not last_send_date:
+                # If no initial emails have been sent, choose tomorrow
+                send_date = datetime.utcnow() + timedelta(days=1)
+            else:
+                sla_schedule = next(
+                    (
+                        sla
+                        for sla in sla_schedules
+                        if sla.start_date <= last_send_date
+                        and sla.end_date + timedelta(days=3) >= last_send_date
+                    ),
+                    None,
+                )
+                send_date = last_send_date + timedelta(
+                    minutes=get_email_sla_minute_cadence(sending_schedule, sla_schedule)
+                )
+            initial_email_send_date = fit_initial_email_send_date(
+                send_date=send_date,
+                sending_schedule=sending_schedule,
+                inbox_tz=inbox_tz,
+            )
+            last_send_date = initial_email_send_date.replace(tzinfo=None)
+
+            rows.append(
+                {
+                    "client_sdr_id": client_sdr_id,
+                    "prospect_email_id": prospect_email_id,
+                    "email_type": EmailMessagingType.INITIAL_EMAIL,
+                    "email_subject_line_template_id": entry[
+                        "initial_email_subject_line_template_id"
+                    ],
+                    "email_body_template_id": entry["initial_email_body_template_id"],
+                    "send_status": (
+                        EmailMessagingStatus.SCHEDULED
+                        if not generate_immediately  # Temporary measure to prevent sending (this is through SMARTLEAD for the moment)
+                        else EmailMessagingStatus.SENT
+                    ),
+                    "date_scheduled": initial_email_send_date,
+                    "subject_line_id": entry["subject_line_id"],
+                    "body_id": entry["body_id"],
+                }
+            )
+
+            # The ACCEPTED followup, then one BUMPED followup per bumped count
+            initial_email_template = initial_steps.get(
+                entry["initial_email_body_template_id"]
+            )
+            used_asset_ids = list(
+                asset_ids_by_step.get(entry["initial_email_body_template_id"], [])
+            )
+            followup_email_send_date = initial_email_send_date
+            delay_days = (
+                initial_email_template and initial_email_template.sequence_delay_days
+            ) or DEFAULT_SENDING_DELAY_INTERVAL
+            step_keys = [(archetype_id, ProspectOverallStatus.ACCEPTED, None)] + [
+                (archetype_id, ProspectOverallStatus.BUMPED, bumped_count)
+                for bumped_count in range(1, FOLLOWUP_LIMIT)
+            ]
+            for step_key in step_keys:
+                sequence_steps = followup_steps.get(step_key)
+                if not sequence_steps:
+                    break
+                sequence_step = choose_sequence_step(
+                    sequence_steps, used_asset_ids, asset_ids_by_step
+                )
+
+                random_minute_offset = random.randint(-15, 15)
+                followup_email_send_date = fit_followup_send_date(
+                    followup_send_date=followup_email_send_date
+                    + timedelta(days=delay_days, minutes=random_minute_offset),
+                    sending_schedule=sending_schedule,
+                    inbox_tz=inbox_tz,
+                )
+                rows.append(
+                    {
+                        "client_sdr_id": client_sdr_id,
+                        "prospect_email_id": prospect_email_id,
+                        "email_type": EmailMessagingType.FOLLOW_UP_EMAIL,
+                        "email_subject_line_template_id": None,
+                        "email_body_template_id": sequence_step.id,
+                        "send_status": EmailMessagingStatus.NEEDS_GENERATION,
+                        "date_scheduled": followup_email_send_date,
+                        "subject_line_id": None,
+                        "body_id": None,
+                    }
+                )
+                delay_days = (
+                    sequence_step.sequence_delay_days or DEFAULT_SENDING_DELAY_INTERVAL
+                )
+
+        # Insert the entries in bulk, in the order they were scheduled
+        email_ids: dict[int, list[int]] = {}
+        for i in range(0, len(rows), EMAIL_SCHEDULE_INSERT_CHUNK_SIZE):
+            result = db.session.execute(
+                insert(EmailMessagingSchedule)
+                .values(rows[i : i + EMAIL_SCHEDULE_INSERT_CHUNK_SIZE])
+                .returning(
+                    EmailMessagingSchedule.id, EmailMessagingSchedule.prospect_email_id
+                )
+            )
+            for email_id, prospect_email_id in sorted(result.fetchall()):
+                email_ids.setdefault(prospect_email_id, []).append(email_id)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        raise self.retry(exc=e, countdown=2**self.request.retries)
+
+    # Same edge case as populate_email_messaging_schedule_entries: the email was scheduled
+    # but never sent, and the prospect isn't in Smartlead, so upload it again
+    for prospect_id in unsent_prospect_ids:
+        if not prospect_exists_in_smartlead(prospect_id):
+            upload_prospect_to_campaign.delay(prospect_id)
+
+    # SMARTLEAD: Generate the followups, then send the prospects to Smartlead to upload
+    if generate_immediately:
+        for prospect_email_id in email_ids:
+            generate_email_messaging_schedule_and_upload.delay(
+                prospect_email_id=prospect_email_id
+            )
+
+    return email_ids
+
+
+@celery.task(bind=True, max_retries=3)
+def generate_email_messaging_schedule_and_upload(
+    self, prospect_email_id: int
+) -> tuple[bool, str]:
+    """Generates the followups of a prospect email scheduled by `bulk_populate_email_messaging_schedule_entries`,
+    then uploads the prospect to its Smartlead campaign
+
+    Args:
+        prospect_email_id (int): ID of the prospect_email
+
+    Returns:
+        tuple[bool, str]: A tuple containing a boolean indicating success and a message
+    """
+    try:
+        email_messaging_schedules: list[EmailMessagingSchedule] = (
+            EmailMessagingSchedule.query.filter(
+                EmailMessagingSchedule.prospect_email_id == prospect_email_id,
+                EmailMessagingSchedule.send_status
+                == EmailMessagingStatus.NEEDS_GENERATION,
+            )
+            .order_by(EmailMessagingSchedule.id.asc())
+            .all()
+        )
+        for email_messaging_schedule in email_messaging_schedules:
+            success, reason = generate_email_messaging_schedule_entry(
+                email_messaging_schedule_id=email_messaging_schedule.id
+            )
+            if not success:
+                raise Exception(f"Failed to generate email: {reason}")
+
+            # Temporary measure to prevent sending (this is through SMARTLEAD for the moment)
+            email_messaging_schedule.send_status = EmailMessagingStatus.SENT
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        raise self.retry(exc=e, countdown=2**self.request.retries)
+
+    prospect_email: ProspectEmail = ProspectEmail.query.get(prospect_email_id)
+    upload_prospect_to_campaign.delay(prospect_email.prospect_id)
+
+    return True, "Success"
+
+
+def get_sdr_email_send_schedule(
     client_sdr_id: int, email_bank_id: Optional[int] = None
-) -> datetime:
-    """Gets the next available send date for an email
+) -> SDREmailSendSchedule:
+    """Gets the sending schedule of an SDR's inbox, creating the default one if it is missing
 
     Args:
         client_sdr_id (int): ID of the client_sdr
@@ -612,10 +939,8 @@ def get_initial_email_send_date(
         Exception: If the sending schedule is not set up correctly
 
     Returns:
-        datetime: The next available send date
+        SDREmailSendSchedule: The sending schedule
     """
-    client_sdr: ClientSDR = ClientSDR.query.get(client_sdr_id)
-
     if not email_bank_id:
         # Get the email bank (random for now)
         email_bank: SDREmailBank = SDREmailBank.query.filter(
@@ -643,48 +968,46 @@ def get_initial_email_send_date(
             "This inbox's sending schedule is not set up correctly. No sending days are set."
         )
 
-    # Get the next available date
-    furthest_initial_email: EmailMessagingSchedule = (
-        EmailMessagingSchedule.query.filter(
-            EmailMessagingSchedule.client_sdr_id == client_sdr_id,
-            EmailMessagingSchedule.email_type == EmailMessagingType.INITIAL_EMAIL,
-            EmailMessagingSchedule.send_status == EmailMessagingStatus.NEEDS_GENERATION
-            or EmailMessagingSchedule.send_status == EmailMessagingStatus.SCHEDULED,
-        )
-        .order_by(EmailMessagingSchedule.date_scheduled.desc())
-        .first()
+    return sending_schedule
+
+
+def get_sending_timezone(
+    sending_schedule: SDREmailSendSchedule, client_sdr: ClientSDR
+) -> pytz.BaseTzInfo:
+    """The timezone of the inbox, falling back to the SDR's and then the default timezone"""
+    return pytz.timezone(
+        sending_schedule.time_zone or client_sdr.timezone or DEFAULT_TIMEZONE
     )
-    if not furthest_initial_email:
-        # If no initial emails have been sent, choose tomorrow
-        send_date = datetime.utcnow() + timedelta(days=1)
-    else:
-        send_date = furthest_initial_email.date_scheduled
 
-        # Get the send cadence according to the SDR's Email SLA (Warming Schedule)
-        sla_schedule: SLASchedule = SLASchedule.query.filter(
-            SLASchedule.client_sdr_id == client_sdr_id,
-            SLASchedule.start_date <= send_date,
-            SLASchedule.end_date + timedelta(days=3)
-            >= send_date,  # Give a little buffer
-        ).first()
-        email_sla = sla_schedule.email_volume if sla_schedule else 5
-        email_sla = email_sla or 5
-        try:
-            minute_cadence = 60 / (
-                email_sla
-                / len(sending_schedule.days)
-                / (sending_schedule.end_time.hour - sending_schedule.start_time.hour)
-            )
-        except:
-            minute_cadence = 60
 
-        send_date = send_date + timedelta(minutes=minute_cadence)
+def get_email_sla_minute_cadence(
+    sending_schedule: SDREmailSendSchedule, sla_schedule: Optional[SLASchedule]
+) -> float:
+    """Minutes between initial emails, according to the SDR's Email SLA (Warming Schedule)"""
+    email_sla = sla_schedule.email_volume if sla_schedule else 5
+    email_sla = email_sla or 5
+    try:
+        return 60 / (
+            email_sla
+            / len(sending_schedule.days)
+            / (sending_schedule.end_time.hour - sending_schedule.start_time.hour)
+        )
+    except:
+        return 60
+
 
+def fit_initial_email_send_date(
+    send_date: datetime,
+    sending_schedule: SDREmailSendSchedule,
+    inbox_tz: pytz.BaseTzInfo,
+) -> datetime:
+    """Moves a (naive, UTC) send date into the next sending window of the inbox
+
+    Returns:
+        datetime: The send date, in UTC
+    """
     # Convert the send_date to the Inbox timezone
     utc_tz = pytz.timezone("UTC")
-    inbox_tz = pytz.timezone(
-        sending_schedule.time_zone or client_sdr.timezone or DEFAULT_TIMEZONE
-    )
     localized = utc_tz.localize(send_date)
     send_date = localized.astimezone(inbox_tz)
 
@@ -711,27 +1034,92 @@ def get_initial_email_send_date(
     while send_date.weekday() not in sending_schedule.days:
         send_date = send_date + timedelta(days=1)
 
-    # Get the send cadence according to the SDR's Email SLA (Warming Schedule)
-    sla_schedule: SLASchedule = SLASchedule.query.filter(
-        SLASchedule.client_sdr_id == client_sdr_id,
-        SLASchedule.start_date <= send_date,
-        SLASchedule.end_date + timedelta(days=3) >= send_date,  # Give a little buffer
-    ).first()
-    email_sla = sla_schedule.email_volume if sla_schedule else 5
-    email_sla = email_sla or 5
+    # Convert the send_date back to UTC
+    return send_date.astimezone(utc_tz)
+
+
+def fit_followup_send_date(
+    followup_send_date: datetime,
+    sending_schedule: SDREmailSendSchedule,
+    inbox_tz: pytz.BaseTzInfo,
+) -> datetime:
+    """Moves a followup send date onto the next sending day of the inbox
+
+    Returns:
+        datetime: The send date, in the inbox timezone
+    """
+    # Convert the send_date to the Inbox timezone
+    utc_tz = pytz.timezone("UTC")
     try:
-        minute_cadence = 60 / (
-            email_sla
-            / len(sending_schedule.days)
-            / (sending_schedule.end_time.hour - sending_schedule.start_time.hour)
-        )
+        localized = utc_tz.localize(followup_send_date)
     except:
-        minute_cadence = 60
+        localized = followup_send_date
+    followup_send_date = localized.astimezone(inbox_tz)
 
-    # Convert the send_date back to UTC
-    utc_send_date = send_date.astimezone(utc_tz)
+    # Verify that the date is within the sending schedule, otherwise adjust
+    while followup_send_date.weekday() not in sending_schedule.days:
+        followup_send_date = followup_send_date + timedelta(days=1)
 
-    return utc_send_date
+    return followup_send_date
+
+
+def get_furthest_initial_email_date(client_sdr_id: int) -> Optional[datetime]:
+    """The date of the SDR's last scheduled initial email, if any"""
+    furthest_initial_email: EmailMessagingSchedule = (
+        EmailMessagingSchedule.query.filter(
+            EmailMessagingSchedule.client_sdr_id == client_sdr_id,
+            EmailMessagingSchedule.email_type == EmailMessagingType.INITIAL_EMAIL,
+            EmailMessagingSchedule.send_status == EmailMessagingStatus.NEEDS_GENERATION
+            or EmailMessagingSchedule.send_status == EmailMessagingStatus.SCHEDULED,
+        )
+        .order_by(EmailMessagingSchedule.date_scheduled.desc())
+        .first()
+    )
+    return furthest_initial_email.date_scheduled if furthest_initial_email else None
+
+
+def get_initial_email_send_date(
+    client_sdr_id: int, email_bank_id: Optional[int] = None
+) -> datetime:
+    """Gets the next available send date for an email
+
+    Args:
+        client_sdr_id (int): ID of the client_sdr
+        email_bank_id (Optional[int], optional): ID of the email_bank. Defaults to None.
+
+    Raises:
+        Exception: If the sending schedule is not set up correctly
+
+    Returns:
+        datetime: The next available send date
+    """
+    client_sdr: ClientSDR = ClientSDR.query.get(client_sdr_id)
+    sending_schedule = get_sdr_email_send_schedule(
+        client_sdr_id=client_sdr_id, email_bank_id=email_bank_id
+    )
+
+    # Get the next available date
+    send_date = get_furthest_initial_email_date(client_sdr_id)
+    if not send_date:
+        # If no initial emails have been sent, choose tomorrow
+        send_date = datetime.utcnow() + timedelta(days=1)
+    else:
+        # Get the send cadence according to the SDR's Email SLA (Warming Schedule)
+        sla_schedule: SLASchedule = SLASchedule.query.filter(
+            SLASchedule.client_sdr_id == client_sdr_id,
+            SLASchedule.start_date <= send_date,
+            SLASchedule.end_date + timedelta(days=3)
+            >= send_date,  # Give a little buffer
+        ).first()
+        minute_cadence = get_email_sla_minute_cadence(sending_schedule, sla_schedule)
+
+        send_date = send_date + timedelta(minutes=minute_cadence)
+
+    return fit_initial_email_send_date(
+        send_date=send_date,
+        sending_schedule=sending_schedule,
+        inbox_tz=get_sending_timezone(sending_schedule, client_sdr),
+    )
 
 
 def verify_followup_send_date(
@@ -753,50 +1141,15 @@ def verify_followup_send_date(
         datetime: The next available send date
     """
     client_sdr: ClientSDR = ClientSDR.query.get(client_sdr_id)
-
-    if not email_bank_id:
-        # Get the email bank (random for now)
-        email_bank: SDREmailBank = SDREmailBank.query.filter(
-            SDREmailBank.client_sdr_id == client_sdr_id,
-            # SDREmailBank.nylas_account_id != None, #TODO: Restructure to not use nylas
-            # SDREmailBank.nylas_auth_code != None,
-            # SDREmailBank.nylas_active == True,
-        ).first()
-    else:
-        email_bank: SDREmailBank = SDREmailBank.query.get(email_bank_id)
-
-    # Get this SDRs sending schedule
-    sending_schedule: SDREmailSendSchedule = SDREmailSendSchedule.query.filter_by(
-        client_sdr_id=client_sdr_id,
-        email_bank_id=email_bank.id,
-    ).first()
-    if not sending_schedule:
-        send_schedule_id = create_default_sdr_email_send_schedule(
-            client_sdr_id=client_sdr_id,
-            email_bank_id=email_bank.id,
-        )
-        sending_schedule = SDREmailSendSchedule.query.get(send_schedule_id)
-    if sending_schedule.days == [] or sending_schedule.days is None:
-        raise Exception(
-            "This inbox's sending schedule is not set up correctly. No sending days are set."
-        )
-
-    # Convert the send_date to the Inbox timezone
-    utc_tz = pytz.timezone("UTC")
-    inbox_tz = pytz.timezone(
-        sending_schedule.time_zone or client_sdr.timezone or DEFAULT_TIMEZONE
+    sending_schedule = get_sdr_email_send_schedule(
+        client_sdr_id=client_sdr_id, email_bank_id=email_bank_id
     )
-    try:
-        localized = utc_tz.localize(followup_send_date)
-    except:
-        localized = followup_send_date
-    followup_send_date = localized.astimezone(inbox_tz)
 
-    # Verify that the date is within the sending schedule, otherwise adjust
-    while followup_send_date.weekday() not in sending_schedule.days:
-        followup_send_date = followup_send_date + timedelta(days=1)
-
-    return followup_send_date
+    return fit_followup_send_date(
+        followup_send_date=followup_send_date,
+        sending_schedule=sending_schedule,
+        inbox_tz=get_sending_timezone(sending_schedule, client_sdr),
+    )
 
 
 @celery.task(bind=True, max_retries=3)
@@ -15,6 +15,7 @@ from sqlalchemy import or_, and_, not_, text
 from src.company.models import Company, CompanyRelation
 from src.research.models import IScraperPayloadCache, IScraperPayloadType
 from app import db, celery
+from src.utils.keyword_search import count_rows, keyword_filters
 from src.utils.slack import send_slack_message, URL_MAP
 
 
@@ -911,131 +912,57 @@ def get_all_individuals(client_archetype_id: int, limit: int = 100, offset: int
     )
 
     if ruleset:
-        # # Title
-        if ruleset.included_individual_title_keywords:
-            keyword_filters = [
-                Individual.title.ilike(f"%{keyword}%")
-                for keyword in ruleset.included_individual_title_keywords
-            ]
-            individuals_query = individuals_query.filter(or_(*keyword_filters))
-
-        if ruleset.excluded_individual_title_keywords:
-            exclude_filters = [
-                not_(Individual.title.ilike(f"%{keyword}%"))
-                for keyword in ruleset.excluded_individual_title_keywords
-            ]
-            individuals_query = individuals_query.filter(and_(*exclude_filters))
-
-        # Seniority
-        if ruleset.included_individual_seniority_keywords:
-            keyword_filters = [
-                Individual.title.ilike(f"%{keyword}%")
-                for keyword in ruleset.included_individual_seniority_keywords
-            ]
-            individuals_query = individuals_query.filter(or_(*keyword_filters))
-
-        if ruleset.excluded_individual_seniority_keywords:
-            exclude_filters = [
-                not_(Individual.title.ilike(f"%{keyword}%"))
-                for keyword in ruleset.excluded_individual_seniority_keywords
-            ]
-            individuals_query = individuals_query.filter(and_(*exclude_filters))
-
-        # # Industry
-        if ruleset.included_individual_industry_keywords:
-            keyword_filters = [
-                Individual.industry.ilike(f"%{keyword}%")
-                for keyword in ruleset.included_individual_industry_keywords
-            ]
-            individuals_query = individuals_query.filter(or_(*keyword_filters))
-
-        if ruleset.excluded_individual_industry_keywords:
-            exclude_filters = [
-                not_(Individual.industry.ilike(f"%{keyword}%"))
-                for keyword in ruleset.excluded_individual_industry_keywords
-            ]
-            individuals_query = individuals_query.filter(and_(*exclude_filters))
-
-        # # Company
-        if ruleset.included_company_name_keywords:
-            keyword_filters = [
-                Individual.company_name.ilike(f"%{keyword}%")
-                for keyword in ruleset.included_company_name_keywords
-            ]
-            individuals_query = individuals_query.filter(or_(*keyword_filters))
-
-        if ruleset.excluded_company_name_keywords:
-            exclude_filters = [
-                not_(Individual.company_name.ilike(f"%{keyword}%"))
-                for keyword in ruleset.excluded_company_name_keywords
-            ]
-            individuals_query = individuals_query.filter(and_(*exclude_filters))
-
-        # # Bio
-        if ruleset.included_individual_generalized_keywords:
-            keyword_filters = [
-                Individual.bio.ilike(f"%{keyword}%")
-                for keyword in ruleset.included_individual_generalized_keywords
-            ]
-            individuals_query = individuals_query.filter(or_(*keyword_filters))
-
-        if ruleset.excluded_individual_generalized_keywords:
-            exclude_filters = [
-                not_(Individual.bio.ilike(f"%{keyword}%"))
-                for keyword in ruleset.excluded_individual_generalized_keywords
-            ]
-            individuals_query = individuals_query.filter(and_(*exclude_filters))
-
-        # # Location
-        if ruleset.included_individual_locations_keywords:
-            keyword_filters = [
-                text("CAST(individual.location AS TEXT) ILIKE :keyword").bindparams(
-                    keyword=rf"%{keyword}%"
-                )
-                for keyword in ruleset.included_individual_locations_keywords
-            ]
-            individuals_query = individuals_query.filter(or_(*keyword_filters))
-
-        if ruleset.excluded_individual_locations_keywords:
-            exclude_filters = [
-                ~text("CAST(individual.location AS TEXT) ILIKE :keyword").bindparams(
-                    keyword=rf"%{keyword}%"
+        # Each keyword is an ILIKE that can use the trigram index on its column
+        keyword_searches = [
+            (
+                [Individual.title],
+                ruleset.included_individual_title_keywords,
+                ruleset.excluded_individual_title_keywords,
+            ),
+            (
+                [Individual.title],
+                ruleset.included_individual_seniority_keywords,
+                ruleset.excluded_individual_seniority_keywords,
+            ),
+            (
+                [Individual.industry],
+                ruleset.included_individual_industry_keywords,
+                ruleset.excluded_individual_industry_keywords,
+            ),
+            (
+                [Individual.company_name],
+                ruleset.included_company_name_keywords,
+                ruleset.excluded_company_name_keywords,
+            ),
+            (
+                [Individual.bio],
+                ruleset.included_individual_generalized_keywords,
+                ruleset.excluded_individual_generalized_keywords,
+            ),
+            (
+                [sqlalchemy.cast(Individual.location, sqlalchemy.String)],
+                ruleset.included_individual_locations_keywords,
+                ruleset.excluded_individual_locations_keywords,
+            ),
+            (
+                [sqlalchemy.func.array_to_string(Individual.skills, " ")],
+                ruleset.included_individual_skills_keywords,
+                ruleset.excluded_individual_skills_keywords,
+            ),
+            (
+                [Company.description],
+                ruleset.included_company_generalized_keywords,
+                ruleset.excluded_company_generalized_keywords,
+            ),
+        ]
+        for columns, included, excluded in keyword_searches:
+            individuals_query = individuals_query.filter(
+                *keyword_filters(
+                    columns=columns,
+                    included_keywords=included,
+                    excluded_keywords=excluded,
                 )
-                for keyword in ruleset.excluded_individual_locations_keywords
-            ]
-            individuals_query = individuals_query.filter(and_(*exclude_filters))
-
-        # # Skills
-        if ruleset.included_individual_skills_keywords:
-            keyword_filters = [
-                Individual.skills.any(skill.ilike(f"%{keyword}%"))
-                for keyword in ruleset.included_individual_skills_keywords
-                for skill in Individual.skills
-            ]
-            individuals_query = individuals_query.filter(or_(*keyword_filters))
-
-        if ruleset.excluded_individual_skills_keywords:
-            exclude_filters = [
-                ~Individual.skills.any(skill.ilike(f"%{keyword}%"))
-                for keyword in ruleset.excluded_individual_skills_keywords
-                for skill in Individual.skills
-            ]
-            individuals_query = individuals_query.filter(and_(*exclude_filters))
-
-        # # Company Description
-        if ruleset.included_company_generalized_keywords:
-            keyword_filters = [
-                Company.description.ilike(f"%{keyword}%")
-                for keyword in ruleset.included_company_generalized_keywords
-            ]
-            individuals_query = individuals_query.filter(or_(*keyword_filters))
-
-        if ruleset.excluded_company_generalized_keywords:
-            exclude_filters = [
-                not_(Company.description.ilike(f"%{keyword}%"))
-                for keyword in ruleset.excluded_individual_skills_keywords
-            ]
-            individuals_query = individuals_query.filter(and_(*exclude_filters))
+            )
 
         # # Company Industry
         # # if ruleset.included_company_industries_keywords:
@@ -1067,21 +994,13 @@ def get_all_individuals(client_archetype_id: int, limit: int = 100, offset: int
             )
 
         # Company has 'locations'. not location. cast location to string
-        if ruleset.included_company_locations_keywords:
-            include_location_filters = [
-                Company.locations.cast(sqlalchemy.String).ilike(f"%{keyword}%")
-                for keyword in ruleset.included_company_locations_keywords
-            ]
-            individuals_query = individuals_query.filter(or_(*include_location_filters))
-
-        if ruleset.excluded_company_locations_keywords:
-            exclude_location_filters = [
-                not_(Company.locations.cast(sqlalchemy.String).ilike(f"%{keyword}%"))
-                for keyword in ruleset.excluded_company_locations_keywords
-            ]
-            individuals_query = individuals_query.filter(
-                and_(*exclude_location_filters)
+        individuals_query = individuals_query.filter(
+            *keyword_filters(
+                columns=[Company.locations.cast(sqlalchemy.String)],
+                included_keywords=ruleset.included_company_locations_keywords,
+                excluded_keywords=ruleset.excluded_company_locations_keywords,
             )
+        )
 
         # # TODO the rest of the filters
         # # Experience
@@ -1096,7 +1015,7 @@ def get_all_individuals(client_archetype_id: int, limit: int = 100, offset: int
     filtered_individuals: list[Individual] = (
         individuals_query.limit(limit).offset(offset).all()
     )
-    count_individuals = individuals_query.count()
+    count_individuals = count_rows(individuals_query, distinct_column=Individual.id)
 
     return [
         individual.to_dict() for individual in filtered_individuals
@@ -43,6 +43,7 @@ from src.utils.slack import exception_to_str
 from src.voyager.linkedin import LinkedIn
 
 from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
 from app import db, celery
 
 from model_import import (
@@ -53,6 +54,7 @@ from model_import import (
     Client,
 )
 from src.automation.models import PhantomBusterAgent
+from src.ml.llm_batch_services import defer_chat_completion
 from src.ml.openai_wrappers import wrapped_create_completion
 from src.utils.slack import URL_MAP
 from src.utils.slack import send_slack_message
@@ -62,6 +64,7 @@ from src.utils.slack import send_slack_message
 from model_import import BumpFramework
 from sqlalchemy.sql.expression import func
 
+import os
 import random
 import time
 import pytz
@@ -932,6 +935,7 @@ def generate_chat_gpt_response_to_conversation_thread(
     use_cache: bool = False,
     bump_framework_template_id: Optional[int] = None,
     override_bump_framework_template: Optional[str] = None,
+    defer_bump_msg_id: Optional[int] = None,
 ):
     for _ in range(max_retries):
         # try:
@@ -944,6 +948,7 @@ def generate_chat_gpt_response_to_conversation_thread(
             use_cache=use_cache,
             bump_framework_template_id=bump_framework_template_id,
             override_bump_framework_template=override_bump_framework_template,
+            defer_bump_msg_id=defer_bump_msg_id,
         )
         # except Exception as e:
         #     time.sleep(2)
@@ -1069,6 +1074,62 @@ Transcript:
     return response
 
 
+def append_calendar_times(response: str, client_sdr: ClientSDR) -> str:
+    """Appends the SDR's upcoming availability and scheduling link to a response."""
+    from src.client.services import get_available_times_via_calendly
+
+    def date_suffix(day):
+        day = int(day)
+        if 4 <= day <= 20 or 24 <= day <= 30:
+            return str(day) + "th"
+        else:
+            return str(day) + ["st", "nd", "rd"][day % 10 - 1]
+
+    try:
+        availability = get_available_times_via_calendly(
+            calendly_url=client_sdr.scheduling_link,
+            dt=(datetime.utcnow() + timedelta(days=1)),
+            tz=client_sdr.timezone,
+        )
+
+        if availability:
+            times = availability.get("times", [])
+            other_dates = availability.get("other_dates", [])
+
+            formatted_times = [t.strftime("%-I:%M%p").lower() for t in times]
+            formatted_dates = [date_suffix(d.strftime("%-d")) for d in other_dates]
+
+            if times and len(times) > 0:
+                message = (
+                    "I'm free tomorrow at "
+                    + format_str_join(formatted_times, "or")
+                    + "."
+                )
+                if formatted_dates and len(formatted_dates) > 0:
+                    message += (
+                        " If that doesn't work, I'm also free on the "
+                        + format_str_join(formatted_dates, "or")
+                        + "."
+                    )
+            elif other_dates and len(other_dates) > 0:
+                message = (
+                    "I'm free on the "
+                    + format_str_join(formatted_dates, "or")
+                    + "."
+                )
+
+            message += (
+                f"\n{client_sdr.scheduling_link}\n\nLet me know what works for you!"
+            )
+
+            return f"""{response}\n\n{message}""".strip()
+
+    except Exception as e:
+        print(e)
+
+    return response
+
+
 def generate_chat_gpt_response_to_conversation_thread_helper(
     prospect_id: int,
     convo_history: List[LinkedInConvoMessage],
@@ -1078,9 +1139,15 @@ def generate_chat_gpt_response_to_conversation_thread_helper(
     use_cache: bool = False,
     bump_framework_template_id: Optional[int] = None,
     override_bump_framework_template: Optional[str] = None,
+    defer_bump_msg_id: Optional[int] = None,
 ):
+    """Generates a follow up response to a conversation thread.
+
+    If `defer_bump_msg_id` is given and the bump framework uses a template, the
+    completion is deferred to the LLM batch API and (None, prompt) is returned.
+    The batch callback fills in the GeneratedMessageAutoBump.
+    """
     from model_import import Prospect
-    from src.client.services import get_available_times_via_calendly
 
     # First the first message from the SDR
     msg = next(filter(lambda x: x.connection_degree == "You", convo_history), None)
@@ -1213,6 +1280,20 @@ Important: Only respond with the message you would send to the prospect. Do not
 
 Output:"""
 
+    if defer_bump_msg_id:
+        defer_chat_completion(
+            [{"role": "user", "content": prompt}],
+            callback="auto_bump_message",
+            callback_args={
+                "bump_msg_id": defer_bump_msg_id,
+                "prompt": prompt,
+                "inject_calendar_times": bool(bump_framework.inject_calendar_times),
+            },
+            model="gpt-4o",
+            max_tokens=500,
+        )
+        return None, prompt
+
     response = get_text_generation(
         [{"role": "user", "content": prompt}],
         max_tokens=500,
@@ -1224,55 +1305,7 @@ Output:"""
     )
 
     if bump_framework.inject_calendar_times and client_sdr.scheduling_link:
-
-        def date_suffix(day):
-            day = int(day)
-            if 4 <= day <= 20 or 24 <= day <= 30:
-                return str(day) + "th"
-            else:
-                return str(day) + ["st", "nd", "rd"][day % 10 - 1]
-
-        try:
-            availability = get_available_times_via_calendly(
-                calendly_url=client_sdr.scheduling_link,
-                dt=(datetime.utcnow() + timedelta(days=1)),
-                tz=client_sdr.timezone,
-            )
-
-            if availability:
-                times = availability.get("times", [])
-                other_dates = availability.get("other_dates", [])
-
-                formatted_times = [t.strftime("%-I:%M%p").lower() for t in times]
-                formatted_dates = [date_suffix(d.strftime("%-d")) for d in other_dates]
-
-                if times and len(times) > 0:
-                    message = (
-                        "I'm free tomorrow at "
-                        + format_str_join(formatted_times, "or")
-                        + "."
-                    )
-                    if formatted_dates and len(formatted_dates) > 0:
-                        message += (
-                            " If that doesn't work, I'm also free on the "
-                            + format_str_join(formatted_dates, "or")
-                            + "."
-                        )
-                elif other_dates and len(other_dates) > 0:
-                    message = (
-                        "I'm free on the "
-                        + format_str_join(formatted_dates, "or")
-                        + "."
-                    )
-
-                message += (
-                    f"\n{client_sdr.scheduling_link}\n\nLet me know what works for you!"
-                )
-
-                response = f"""{response}\n\n{message}""".strip()
-
-        except Exception as e:
-            print(e)
+        response = append_calendar_times(response, client_sdr)
 
     print(prompt)
     print(response)
@@ -1601,123 +1634,271 @@ def get_li_conversation_entries(hours: Optional[int] = 168) -> list[dict]:
 
 scrape_time_offset = 30 * 60  # 30 minutes in seconds
 
+# SDR inboxes are scraped by per-SDR tasks, dispatched in waves so that at most
+# INBOX_SCRAPE_MAX_CONCURRENCY SDRs hit LinkedIn at the same time
+INBOX_SCRAPE_MAX_CONCURRENCY = int(os.environ.get("INBOX_SCRAPE_MAX_CONCURRENCY", 8))
+INBOX_SCRAPE_WAVE_SECONDS = 60
+INBOX_SCRAPE_CONVERSATION_LIMIT = 120
 
-@celery.task
-def scrape_conversations_inbox():
-    client_sdr: List[ClientSDR] = ClientSDR.query.filter(
-        ClientSDR.active == True,
-        ClientSDR.li_at_token is not None,
-        ClientSDR.li_at_token != "INVALID",
-        ClientSDR.scrape_time is not None,
-        ClientSDR.next_scrape < datetime.utcnow()
-    ).all()
 
-    for sdr in client_sdr:
-        # Scrape every 3 hours instead #
+def claim_client_sdrs_to_scrape() -> list[int]:
+    """Gets the SDRs whose inbox is due to be scraped and pushes back their next scrape.
 
-        # Sent the next scrape to be 1 day from now (+/- scrape_time_offset)
-        # scrape_datetime = datetime.combine(datetime.utcnow().date(), sdr.scrape_time)
+    Rows are locked with SKIP LOCKED, so overlapping sweeps never claim the same SDR.
+    """
+    client_sdrs: List[ClientSDR] = (
+        ClientSDR.query.filter(
+            ClientSDR.active == True,
+            ClientSDR.li_at_token is not None,
+            ClientSDR.li_at_token != "INVALID",
+            ClientSDR.scrape_time is not None,
+            ClientSDR.next_scrape < datetime.utcnow(),
+        )
+        .with_for_update(skip_locked=True)
+        .all()
+    )
 
-        # new_date = datetime.utcnow() + timedelta(days=1)
+    for sdr in client_sdrs:
+        # Scrape every hour (+/- scrape_time_offset)
         next_time = (
             datetime.utcnow()
             + timedelta(hours=1)
             + timedelta(seconds=random.randint(-scrape_time_offset, scrape_time_offset))
         )
-        next_datetime = datetime(
-            next_time.year,
-            next_time.month,
-            next_time.day,
-            next_time.hour,
-            next_time.minute,
-            next_time.second,
-        )
+        sdr.next_scrape = next_time.replace(microsecond=0)
+    db.session.commit()
 
-        sdr.next_scrape = next_datetime
-        db.session.add(sdr)
-        db.session.commit()
+    return [sdr.id for sdr in client_sdrs]
+
+
+@celery.task
+def scrape_conversations_inbox(fan_out: bool = True):
+    """Scrapes the inbox of every SDR that's due.
+
+    Args:
+        fan_out (bool, optional): Dispatch one task per SDR. Defaults to True. If False, the inboxes are scraped serially in this task.
+    """
+    client_sdr_ids = claim_client_sdrs_to_scrape()
 
-        # Get the conversations
-        api = LinkedIn(sdr.id)
-        convos = api.get_conversations(120)
-        if convos is None:
+    for i, client_sdr_id in enumerate(client_sdr_ids):
+        if not fan_out:
+            scrape_conversations_inbox_for_sdr_helper(client_sdr_id)
             continue
-        for convo in convos:
-            last_msg_urn_id = convo.get("events")[0]["dashEntityUrn"].replace(
-                "urn:li:fsd_message:", ""
-            )
-            convo_entry = LinkedinConversationEntry.query.filter_by(
-                urn_id=last_msg_urn_id
-            ).first()
-            convo_urn_id = convo.get("dashEntityUrn").replace(
-                "urn:li:fsd_conversation:", ""
-            )
-            if len(convo.get("participants", [])) != 1:
-                continue  # Skip group conversations
-            profile_urn_id = (
-                convo.get("participants")[0]
-                .get("com.linkedin.voyager.messaging.MessagingMember", {})
-                .get("miniProfile", {})
-                .get("entityUrn", "")
-                .replace("urn:li:fs_miniProfile:", "")
-            )
-            profile_public_id = (
-                convo.get("participants")[0]
-                .get("com.linkedin.voyager.messaging.MessagingMember", {})
-                .get("miniProfile", {})
-                .get("publicIdentifier", "")
+
+        scrape_conversations_inbox_for_sdr.apply_async(
+            args=[client_sdr_id],
+            countdown=(i // INBOX_SCRAPE_MAX_CONCURRENCY) * INBOX_SCRAPE_WAVE_SECONDS,
+        )
+
+
+@celery.task(bind=True, max_retries=3)
+def scrape_conversations_inbox_for_sdr(self, client_sdr_id: int):
+    try:
+        scrape_conversations_inbox_for_sdr_helper(client_sdr_id)
+    except Exception as e:
+        db.session.rollback()
+        raise self.retry(exc=e, countdown=2**self.request.retries)
+
+
+def parse_inbox_conversation(convo: dict) -> Optional[dict]:
+    """Pulls the URNs and participant info out of a Voyager conversation.
+
+    Returns:
+        Optional[dict]: None for group conversations
+    """
+    if len(convo.get("participants", [])) != 1:
+        return None
+
+    mini_profile = (
+        convo.get("participants")[0]
+        .get("com.linkedin.voyager.messaging.MessagingMember", {})
+        .get("miniProfile", {})
+    )
+    return {
+        "last_msg_urn_id": convo.get("events")[0]["dashEntityUrn"].replace(
+            "urn:li:fsd_message:", ""
+        ),
+        "convo_urn_id": convo.get("dashEntityUrn").replace(
+            "urn:li:fsd_conversation:", ""
+        ),
+        "profile_urn_id": mini_profile.get("entityUrn", "").replace(
+            "urn:li:fs_miniProfile:", ""
+        ),
+        "profile_public_id": mini_profile.get("publicIdentifier", ""),
+        "first_name": mini_profile.get("firstName"),
+        "last_name": mini_profile.get("lastName"),
+    }
+
+
+def full_name_matches(full_name: Optional[str], first_name: str, last_name: str) -> bool:
+    """Python equivalent of `full_name LIKE '%first%last%'`"""
+    if not full_name:
+        return False
+    index = full_name.find(first_name)
+    return index >= 0 and full_name.find(last_name, index + len(first_name)) >= 0
+
+
+def match_inbox_prospects(client_sdr_id: int, conversations: list[dict]) -> dict:
+    """Finds the SDR's prospect for each conversation, with one query per match strategy.
+
+    Prospects are matched by LinkedIn URN, then by public profile ID in their
+    LinkedIn URL, then by name. Prospects matched without their URN get it filled in.
+
+    Returns:
+        dict: convo_urn_id -> Prospect
+    """
+    matches: dict[str, Prospect] = {}
+
+    profile_urn_ids = [c["profile_urn_id"] for c in conversations if c["profile_urn_id"]]
+    prospects_by_urn = {}
+    if profile_urn_ids:
+        prospects_by_urn = {
+            p.li_urn_id: p
+            for p in Prospect.query.filter(
+                Prospect.client_sdr_id == client_sdr_id,
+                Prospect.li_urn_id.in_(profile_urn_ids),
+            ).all()
+        }
+    for convo in conversations:
+        if convo["profile_urn_id"] in prospects_by_urn:
+            matches[convo["convo_urn_id"]] = prospects_by_urn[convo["profile_urn_id"]]
+
+    unmatched = [
+        c for c in conversations if c["convo_urn_id"] not in matches and c["profile_public_id"]
+    ]
+    if unmatched:
+        prospects = Prospect.query.filter(
+            Prospect.client_sdr_id == client_sdr_id,
+            or_(
+                *[
+                    Prospect.linkedin_url.like(f"%/in/{c['profile_public_id']}%")
+                    for c in unmatched
+                ]
+            ),
+        ).all()
+        for convo in unmatched:
+            for prospect in prospects:
+                if f"/in/{convo['profile_public_id']}" in (prospect.linkedin_url or ""):
+                    matches[convo["convo_urn_id"]] = prospect
+                    break
+
+    unmatched = [
+        c
+        for c in conversations
+        if c["convo_urn_id"] not in matches and c["first_name"] and c["last_name"]
+    ]
+    if unmatched:
+        prospects = Prospect.query.filter(
+            Prospect.client_sdr_id == client_sdr_id,
+            or_(
+                *[
+                    Prospect.full_name.like(f"%{c['first_name']}%{c['last_name']}%")
+                    for c in unmatched
+                ]
+            ),
+        ).all()
+        for convo in unmatched:
+            for prospect in prospects:
+                if full_name_matches(
+                    prospect.full_name, convo["first_name"], convo["last_name"]
+                ):
+                    matches[convo["convo_urn_id"]] = prospect
+                    break
+
+    for convo in conversations:
+        prospect = matches.get(convo["convo_urn_id"])
+        if (
+            prospect is not None
+            and convo["profile_urn_id"]
+            and prospect.li_urn_id != convo["profile_urn_id"]
+        ):
+            prospect.li_urn_id = convo["profile_urn_id"]
+            db.session.add(prospect)
+
+    return matches
+
+
+def scrape_conversations_inbox_for_sdr_helper(client_sdr_id: int) -> int:
+    """Queues a scrape for every new conversation in the SDR's inbox.
+
+    Returns:
+        int: The number of conversations queued
+    """
+    sdr: ClientSDR = ClientSDR.query.get(client_sdr_id)
+    if not sdr:
+        return 0
+
+    api = LinkedIn(sdr.id)
+    convos = api.get_conversations(INBOX_SCRAPE_CONVERSATION_LIMIT)
+    if convos is None:
+        return 0
+
+    conversations = {}
+    for convo in convos:
+        parsed = parse_inbox_conversation(convo)
+        if parsed is not None:
+            conversations.setdefault(parsed["convo_urn_id"], parsed)
+    if not conversations:
+        return 0
+
+    # Skip conversations whose last message we already have, or that are already queued
+    scraped_msg_urn_ids = {
+        urn_id
+        for (urn_id,) in db.session.query(LinkedinConversationEntry.urn_id)
+        .filter(
+            LinkedinConversationEntry.urn_id.in_(
+                [c["last_msg_urn_id"] for c in conversations.values()]
             )
-            if (
-                not convo_entry
-                and not db.session.query(LinkedinConversationScrapeQueue)
-                .filter_by(conversation_urn_id=convo_urn_id)
-                .first()
-            ):
-                prospect: Prospect = Prospect.query.filter(
-                    Prospect.li_urn_id == profile_urn_id
-                ).first()
-                if prospect is None:
-                    # Fill in the prospect's urn_id if it's not in the database
-                    prospect = Prospect.query.filter(
-                        Prospect.linkedin_url.like(f"%/in/{profile_public_id}%")
-                    ).first()
-                    if prospect is not None:
-                        prospect.li_urn_id = profile_urn_id
-                        db.session.add(prospect)
-                if prospect is None:
-                    firstName = deep_get(deep_get(convo, 'participants.0').get("com.linkedin.voyager.messaging.MessagingMember", {}), 'miniProfile.firstName')
-                    lastName = deep_get(deep_get(convo, 'participants.0').get("com.linkedin.voyager.messaging.MessagingMember", {}), 'miniProfile.lastName')
-                    query = '%{}%{}%'.format(firstName, lastName)
-                    prospect = Prospect.query.filter(
-                        Prospect.full_name.like(query),
-                        Prospect.client_sdr_id == sdr.id
-                    ).first()
-
-                    if prospect is not None:
-                        prospect.li_urn_id = profile_urn_id
-                        db.session.add(prospect)
-
-                if prospect is None:
-                    continue  # Skip if prospect is not in the database
-                if prospect.client_sdr_id != sdr.id:
-                    continue  # Skip if prospect is not assigned to this SDR
-
-                scrape = LinkedinConversationScrapeQueue(
-                    conversation_urn_id=convo_urn_id,
-                    client_sdr_id=sdr.id,
-                    prospect_id=prospect.id,
-                    scrape_time=(
-                        datetime.utcnow()
-                        + timedelta(seconds=random.randint(0, scrape_time_offset))
-                    ),
-                )
-                db.session.add(scrape)
-                db.session.commit()
+        )
+        .all()
+    }
+    queued_convo_urn_ids = {
+        urn_id
+        for (urn_id,) in db.session.query(
+            LinkedinConversationScrapeQueue.conversation_urn_id
+        )
+        .filter(LinkedinConversationScrapeQueue.conversation_urn_id.in_(conversations.keys()))
+        .all()
+    }
+    new_conversations = [
+        c
+        for c in conversations.values()
+        if c["last_msg_urn_id"] not in scraped_msg_urn_ids
+        and c["convo_urn_id"] not in queued_convo_urn_ids
+    ]
+    if not new_conversations:
+        return 0
+
+    prospects = match_inbox_prospects(sdr.id, new_conversations)
+
+    scrapes = [
+        {
+            "conversation_urn_id": convo_urn_id,
+            "client_sdr_id": sdr.id,
+            "prospect_id": prospect.id,
+            "scrape_time": datetime.utcnow()
+            + timedelta(seconds=random.randint(0, scrape_time_offset)),
+        }
+        for convo_urn_id, prospect in prospects.items()
+    ]
+    if scrapes:
+        db.session.execute(
+            insert(LinkedinConversationScrapeQueue)
+            .values(scrapes)
+            .on_conflict_do_nothing(index_elements=["conversation_urn_id"])
+        )
+    db.session.commit()
 
-                send_slack_message(
-                    message=f"Scheduled scrape for convo between SDR {sdr.name} (#{sdr.id}) and prospect {prospect.full_name} (#{prospect.id}) at {scrape.scrape_time} UTC 👌",
-                    webhook_urls=[URL_MAP["operations-linkedin-scraping-with-voyager"]],
-                )
+    if scrapes:
+        send_slack_message(
+            message=f"Scheduled {len(scrapes)} convo scrapes for SDR {sdr.name} (#{sdr.id}) 👌\n"
+            + "\n".join(
+                f"- {prospect.full_name} (#{prospect.id})" for prospect in prospects.values()
+            ),
+            webhook_urls=[URL_MAP["operations-linkedin-scraping-with-voyager"]],
+        )
+
+    return len(scrapes)
 
 
 @celery.task
@@ -1,4 +1,5 @@
 import email
+import json
 import traceback
 
 from src.bump_framework.models import BumpFrameworkTemplates
@@ -28,6 +29,7 @@ from src.ml.openai_wrappers import (
     wrapped_create_completion,
     OPENAI_COMPLETION_DAVINCI_3_MODEL,
 )
+from src.ml.llm_batch_services import defer_chat_completion, llm_batch_callback
 from model_import import (
     PLGProductLeads,
     ClientArchetype,
@@ -79,6 +81,13 @@ import datetime
 from src.research.linkedin.services import (
     delete_research_points_and_payload_by_prospect_id,
 )
+from src.message_generation.services_batch_generation import (
+    DEFERRED_GENERATION_MESSAGE,
+    MESSAGE_GENERATION_BATCH_SIZE,
+    MESSAGE_GENERATION_MAX_ATTEMPTS,
+    batch_generate_prospect_emails,
+    batch_research_and_generate_outreaches,
+)
 from src.message_generation.services_stack_ranked_configurations import (
     get_top_stack_ranked_config_ordering,
 )
@@ -242,40 +251,48 @@ def run_queued_gm_job():
                 or
                 (generated_message_job_queue.generated_message_type = 'EMAIL')
             ) and
-            attempts < 3
+            attempts < :max_attempts
         order by random()
-        limit 3;
-    """
+        limit :limit;
+    """,
+        {
+            "limit": MESSAGE_GENERATION_BATCH_SIZE,
+            "max_attempts": MESSAGE_GENERATION_MAX_ATTEMPTS,
+        },
     ).fetchall()
 
+    linkedin_jobs = []
+    email_jobs = []
+
     for row in data:
-        prospect_id = row[0]
-        outbound_campaign_id = row[1]
-        cta_id = row[2]
-        gm_job_id = row[3]
+        job = {
+            "prospect_id": row[0],
+            "outbound_campaign_id": row[1],
+            "cta_id": row[2],
+            "gm_job_id": row[3],
+        }
         generated_message_type = row[4]
 
         if generated_message_type == GeneratedMessageType.LINKEDIN.value:
-            # Research and generate outreaches for the prospect
-            research_and_generate_outreaches_for_prospect.apply_async(
-                [
-                    prospect_id,
-                    outbound_campaign_id,
-                    cta_id,
-                    gm_job_id,
-                ],
-                queue="message_generation",
-                routing_key="message_generation",
-                priority=10,
-            )
+            linkedin_jobs.append(job)
         elif generated_message_type == GeneratedMessageType.EMAIL.value:
-            # Research and generate outreaches for the prospect
-            generate_prospect_email.apply_async(
-                args=[prospect_id, outbound_campaign_id, gm_job_id],
-                queue="message_generation",
-                routing_key="message_generation",
-                priority=10,
-            )
+            email_jobs.append(job)
+
+    # Generate each batch concurrently inside a single worker
+    if linkedin_jobs:
+        batch_research_and_generate_outreaches.apply_async(
+            args=[linkedin_jobs],
+            queue="message_generation",
+            routing_key="message_generation",
+            priority=10,
+        )
+    if email_jobs:
+        batch_generate_prospect_emails.apply_async(
+            args=[email_jobs],
+            queue="message_generation",
+            routing_key="message_generation",
+            priority=10,
+        )
 
 
 def update_generated_message_job_queue_status(
@@ -340,8 +357,6 @@ def research_and_generate_outreaches_for_prospect(  # THIS IS A PROTECTED TASK.
     gm_job_id: int = None,
 ) -> tuple[bool, str]:
     try:
-        from src.research.linkedin.services import get_research_and_bullet_points_new
-
         if gm_job_id:
             gm: GeneratedMessageJobQueue = GeneratedMessageJobQueue.query.get(gm_job_id)
             if not gm or gm.status in [
@@ -358,28 +373,22 @@ def research_and_generate_outreaches_for_prospect(  # THIS IS A PROTECTED TASK.
         # Increment the number of attempts
         increment_generated_message_job_queue_attempts(gm_job_id)
 
-        # Check if the prospect exists
-        prospect: Prospect = Prospect.query.get(prospect_id)
-        if not prospect:
+        success, message = research_and_generate_linkedin_outreaches(
+            prospect_id=prospect_id,
+            outbound_campaign_id=outbound_campaign_id,
+            cta_id=cta_id,
+            gm_job_id=gm_job_id,
+        )
+        if success and message == DEFERRED_GENERATION_MESSAGE:
+            # The batch callback completes the job once the completion is back
+            return (True, message)
+        if not success:
             update_generated_message_job_queue_status(
                 gm_job_id,
                 GeneratedMessageJobStatus.FAILED,
-                error_message="Prospect does not exist",
+                error_message=message,
             )
-            return (False, "Prospect does not exist")
-
-        # Create research payload and bullet points for the Prospect
-        get_research_and_bullet_points_new(prospect_id=prospect_id, test_mode=False)
-
-        # Generate outreaches for the Prospect
-        generate_linkedin_outreaches_with_configurations(
-            prospect_id=prospect_id,
-            cta_id=cta_id,
-            outbound_campaign_id=outbound_campaign_id,
-        )
-
-        # Run auto approval
-        # batch_approve_message_generations_by_heuristic(prospect_ids=[prospect_id])
+            return (False, message)
 
         # Mark the job as completed
         update_generated_message_job_queue_status(
@@ -393,6 +402,48 @@ def research_and_generate_outreaches_for_prospect(  # THIS IS A PROTECTED TASK.
         raise self.retry(exc=e, countdown=10**self.request.retries)
 
 
+def research_and_generate_linkedin_outreaches(
+    prospect_id: int,
+    outbound_campaign_id: int,
+    cta_id: str = None,
+    gm_job_id: Optional[int] = None,
+) -> tuple[bool, str]:
+    """Researches a prospect and generates their LinkedIn outreaches.
+
+    Does not touch the GeneratedMessageJobQueue; callers own the job status,
+    unless the completion was deferred to the LLM batch API. Then
+    DEFERRED_GENERATION_MESSAGE is returned, and the batch callback completes
+    or fails `gm_job_id`.
+
+    Returns:
+        tuple[bool, str]: (success, message)
+    """
+    from src.research.linkedin.services import get_research_and_bullet_points_new
+
+    # Check if the prospect exists
+    prospect: Prospect = Prospect.query.get(prospect_id)
+    if not prospect:
+        return (False, "Prospect does not exist")
+
+    # Create research payload and bullet points for the Prospect
+    get_research_and_bullet_points_new(prospect_id=prospect_id, test_mode=False)
+
+    # Generate outreaches for the Prospect
+    outreaches = generate_linkedin_outreaches_with_configurations(
+        prospect_id=prospect_id,
+        cta_id=cta_id,
+        outbound_campaign_id=outbound_campaign_id,
+        gm_job_id=gm_job_id,
+    )
+    if outreaches is None:
+        return (True, DEFERRED_GENERATION_MESSAGE)
+
+    # Run auto approval
+    # batch_approve_message_generations_by_heuristic(prospect_ids=[prospect_id])
+
+    return (True, "Success")
+
+
 def generate_prompt(prospect_id: int, notes: str = ""):
     from model_import import Prospect
     from src.utils.converters.string_converters import clean_company_name
@@ -503,6 +554,69 @@ def get_notes_and_points_from_perm(perm, cta_id: int = None):
     return notes, research_points, cta
 
 
+@llm_batch_callback("linkedin_template_outreach")
+def save_deferred_linkedin_template_outreach(
+    completion: Optional[str],
+    prospect_id: int,
+    outbound_campaign_id: int,
+    template_id: int,
+    prompt: str,
+    gm_job_id: Optional[int] = None,
+    error_message: Optional[str] = None,
+):
+    """Saves and approves a template-mode LinkedIn outreach once its deferred completion is back.
+
+    Completes the GeneratedMessageJobQueue job, or fails it if the deferred request failed.
+    """
+    from model_import import TextGeneration
+
+    if completion is None:
+        update_generated_message_job_queue_status(
+            gm_job_id, GeneratedMessageJobStatus.FAILED, error_message=error_message
+        )
+        return
+
+    prospect: Prospect = Prospect.query.get(prospect_id)
+    campaign: OutboundCampaign = OutboundCampaign.query.get(outbound_campaign_id)
+
+    db.session.add(
+        TextGeneration(
+            prompt=json.dumps([{"role": "user", "content": prompt}]),
+            completion=completion,
+            type="LI_MSG_INIT",
+            model_provider="gpt-4",
+            prospect_id=prospect_id,
+            client_sdr_id=prospect.client_sdr_id,
+            human_edited=False,
+            status="GENERATED",
+        )
+    )
+
+    message: GeneratedMessage = GeneratedMessage(
+        prospect_id=prospect_id,
+        research_points=None,
+        prompt=prompt,
+        completion=completion,
+        message_status=GeneratedMessageStatus.DRAFT,
+        outbound_campaign_id=outbound_campaign_id,
+        adversarial_ai_prediction=False,
+        message_cta=None,
+        message_type=GeneratedMessageType.LINKEDIN,
+        few_shot_prompt=None,
+        stack_ranked_message_generation_configuration_id=None,
+        priority_rating=campaign.priority_rating if campaign else 0,
+        li_init_template_id=template_id,
+    )
+    db.session.add(message)
+    db.session.commit()
+
+    approve_message(message_id=message.id)
+
+    update_generated_message_job_queue_status(
+        gm_job_id, GeneratedMessageJobStatus.COMPLETED
+    )
+
+
 def has_any_linkedin_messages(prospect_id: int):
     from model_import import GeneratedMessage
 
@@ -514,8 +628,11 @@ def has_any_linkedin_messages(prospect_id: int):
 
 
 def generate_linkedin_outreaches_with_configurations(
-    prospect_id: int, outbound_campaign_id: int, cta_id: str = None
-):
+    prospect_id: int,
+    outbound_campaign_id: int,
+    cta_id: str = None,
+    gm_job_id: Optional[int] = None,
+) -> Optional[list]:
     from src.li_conversation.services import ai_initial_li_msg_prompt
 
     campaign: OutboundCampaign = OutboundCampaign.query.get(outbound_campaign_id)
@@ -537,6 +654,23 @@ def generate_linkedin_outreaches_with_configurations(
             research_points=template.research_points or [],
         )
 
+        # Nightly campaigns aren't waited on, so their completions go through the batch API
+        if campaign and campaign.is_daily_generation:
+            defer_chat_completion(
+                [{"role": "user", "content": prompt}],
+                callback="linkedin_template_outreach",
+                callback_args={
+                    "prospect_id": prospect_id,
+                    "outbound_campaign_id": outbound_campaign_id,
+                    "template_id": template.id,
+                    "prompt": prompt,
+                    "gm_job_id": gm_job_id,
+                },
+                model="gpt-4",
+                max_tokens=200,
+            )
+            return None  # Saved by the batch callback
+
         completion = get_text_generation(
             [{"role": "user", "content": prompt}],
             max_tokens=200,
@@ -1142,17 +1276,7 @@ def create_and_start_email_generation_jobs(self, campaign_id: int):
 def generate_prospect_email(  # THIS IS A PROTECTED TASK. DO NOT CHANGE THE NAME OF THIS FUNCTION
     self, prospect_id: int, campaign_id: int, gm_job_id: int
 ) -> tuple[bool, str]:
-    from src.message_generation.email.services import (
-        ai_initial_email_prompt,
-        ai_subject_line_prompt,
-        generate_email,
-        generate_subject_line,
-        generate_magic_subject_line,
-    )
-
     try:
-        campaign: OutboundCampaign = OutboundCampaign.query.get(campaign_id)
-
         if gm_job_id:
             gm: GeneratedMessageJobQueue = GeneratedMessageJobQueue.query.get(gm_job_id)
             if not gm or gm.status in [
@@ -1169,175 +1293,401 @@ def generate_prospect_email(  # THIS IS A PROTECTED TASK. DO NOT CHANGE THE NAME
         # 2. Increment the attempts
         increment_generated_message_job_queue_attempts(gm_job_id)
 
-        # 3. Check if the prospect exists
-        prospect: Prospect = Prospect.query.get(prospect_id)
-        client_archetype: ClientArchetype = ClientArchetype.query.get(prospect.archetype_id)
-        ai_personalization_enabled = client_archetype.is_ai_research_personalization_enabled
-        client_sdr_id = prospect.client_sdr_id
-        if not prospect:
+        # 3 - 11. Research the prospect, then generate and approve the email
+        success, message = generate_email_for_prospect(
+            prospect_id=prospect_id, campaign_id=campaign_id, gm_job_id=gm_job_id
+        )
+        if success and message == DEFERRED_GENERATION_MESSAGE:
+            # The batch callback completes the job once the completion is back
+            return (True, message)
+        if not success:
             update_generated_message_job_queue_status(
                 gm_job_id,
                 GeneratedMessageJobStatus.FAILED,
-                error_message="Prospect does not exist",
+                error_message=message,
             )
-            return (False, "Prospect does not exist")
+            return (False, message)
+    except Exception as e:
+        db.session.rollback()
+        tb = traceback.format_exc()
 
-        # 4. Check if the prospect already has a prospect_email
-        prospect_email: ProspectEmail = ProspectEmail.query.get(
-            prospect.approved_prospect_email_id
+        update_generated_message_job_queue_status(
+            gm_job_id, GeneratedMessageJobStatus.FAILED, tb
         )
-        if prospect_email:
-            update_generated_message_job_queue_status(
-                gm_job_id,
-                GeneratedMessageJobStatus.FAILED,
-                error_message="Prospect already has a prospect_email entry",
-            )
-            return (False, "Prospect already has a prospect_email entry")
-
-        # 5. Perform account research (double down). Only if AI personalization is not enabled
-        # old i-scraper (linkedin) method. else perplexity method
-        template_id = None
-        templates: list[EmailSequenceStep] = EmailSequenceStep.query.filter(
-            EmailSequenceStep.client_archetype_id == prospect.archetype_id,
-            EmailSequenceStep.overall_status == ProspectOverallStatus.PROSPECTED,
-            EmailSequenceStep.active == True,
-        ).all()
-        template: EmailSequenceStep = random.choice(templates) if templates else None
-        if template:
-            template_id = template.id
-        if not (client_archetype.is_ai_research_personalization_enabled):
-            generate_prospect_research(prospect.id, False, False)
-            # 6. Create research points and payload for the prospect
-            try:
-                get_research_and_bullet_points_new(prospect_id=prospect_id, test_mode=False)
-            except Exception as e:
-                print(e)
-
-            # 7a. Get the Email Body prompt
-            initial_email_prompt = ai_initial_email_prompt(
-                client_sdr_id=client_sdr_id,
-                prospect_id=prospect_id,
-                template_id=template_id,
-                ai_personalization_enabled=ai_personalization_enabled,
-            )
-            # 7b. Generate the email body
-            email_body = generate_email(prompt=initial_email_prompt)
-            email_body = email_body.get("body")
-        else:
-            # 10.a. Run AI personalizer on the email body and subject line if enabled
-            # already got personalized if it was a magic subject line
-            initial_email_prompt, email_body = run_ai_personalizer_on_prospect_email(template_id, prospect_id, False)
+        raise self.retry(exc=e, countdown=2**self.request.retries)
 
-        # 8a. Get the Subject Line
-        subjectline_template_id = None
-        subjectline_strict = False  # Tracks if we need to use AI generate. [[ and {{ in template signify AI hence not strict
-        subjectline_templates: list[
-            EmailSubjectLineTemplate
-        ] = EmailSubjectLineTemplate.query.filter(
-            EmailSubjectLineTemplate.client_archetype_id == prospect.archetype_id,
-            EmailSubjectLineTemplate.active == True,
-        ).all()
-        subjectline_template: EmailSubjectLineTemplate = (
-            random.choice(subjectline_templates) if subjectline_templates else None
-        )
-        if subjectline_template:
-            subjectline_template_id = subjectline_template.id
-            subjectline_strict = (
-                "[[" not in subjectline_template.subject_line
-                and "{{" not in subjectline_template.subject_line
-            )
+    update_generated_message_job_queue_status(
+        gm_job_id, GeneratedMessageJobStatus.COMPLETED
+    )
+    return (True, "Success")
 
-        # 8b. Generate the subject line
-        personalized_email_body = None
-        if (subjectline_template and subjectline_template.is_magic_subject_line):
-            subject_line_prompt = "Magic Subject Line"
-            subject_line, personalized_email_body, ai_research_points = generate_magic_subject_line(
-                campaign_id=prospect.archetype_id,
-                prospect_id=prospect_id,
-                sequence_id = template.id,
-                #we should generate an email since personalization must be enabled for magic subject lines.
-                should_generate_email = True,
-                room_id = None,
-                subject_line_id=subjectline_template.id,
-                email_body = email_body
-            )
-            email_body = personalized_email_body
-            # subject_line = subject_line.get("subject_line")
-        elif subjectline_strict:
-            subject_line_prompt = "No AI template detected in subject line template. Using exact template."
-            subject_line = subjectline_template.subject_line
-        else:
-            subject_line_prompt = ai_subject_line_prompt(
-                client_sdr_id=client_sdr_id,
-                prospect_id=prospect_id,
-                email_body=email_body,
-                subject_line_template_id=subjectline_template.id,
-            )
 
-            # 8a. Get the Subject Line
-            subject_line = generate_subject_line(prompt=subject_line_prompt)
-            subject_line = subject_line.get("subject_line")
+def generate_email_for_prospect(
+    prospect_id: int, campaign_id: int, gm_job_id: Optional[int] = None
+) -> tuple[bool, str]:
+    """Researches a prospect and generates, saves and approves their email body and subject line.
 
-        # 9. Create the GeneratedMessage objects
-        ai_generated_body: GeneratedMessage = GeneratedMessage(
+    Does not touch the GeneratedMessageJobQueue; callers own the job status,
+    unless the completion was deferred to the LLM batch API (daily campaigns).
+    Then DEFERRED_GENERATION_MESSAGE is returned, and the batch callbacks
+    complete or fail `gm_job_id`.
+
+    Returns:
+        tuple[bool, str]: (success, message)
+    """
+    from src.message_generation.email.services import (
+        ai_initial_email_prompt,
+        ai_subject_line_prompt,
+        generate_email,
+        generate_subject_line,
+        generate_magic_subject_line,
+    )
+
+    campaign: OutboundCampaign = OutboundCampaign.query.get(campaign_id)
+
+    # 3. Check if the prospect exists
+    prospect: Prospect = Prospect.query.get(prospect_id)
+    client_archetype: ClientArchetype = ClientArchetype.query.get(prospect.archetype_id)
+    ai_personalization_enabled = client_archetype.is_ai_research_personalization_enabled
+    client_sdr_id = prospect.client_sdr_id
+    if not prospect:
+        return (False, "Prospect does not exist")
+
+    # 4. Check if the prospect already has a prospect_email
+    prospect_email: ProspectEmail = ProspectEmail.query.get(
+        prospect.approved_prospect_email_id
+    )
+    if prospect_email:
+        return (False, "Prospect already has a prospect_email entry")
+
+    # 5. Perform account research (double down). Only if AI personalization is not enabled
+    # old i-scraper (linkedin) method. else perplexity method
+    template_id = None
+    templates: list[EmailSequenceStep] = EmailSequenceStep.query.filter(
+        EmailSequenceStep.client_archetype_id == prospect.archetype_id,
+        EmailSequenceStep.overall_status == ProspectOverallStatus.PROSPECTED,
+        EmailSequenceStep.active == True,
+    ).all()
+    template: EmailSequenceStep = random.choice(templates) if templates else None
+    if template:
+        template_id = template.id
+
+    # 5b. Pick the Subject Line template
+    subjectline_template_id = None
+    subjectline_strict = False  # Tracks if we need to use AI generate. [[ and {{ in template signify AI hence not strict
+    subjectline_templates: list[
+        EmailSubjectLineTemplate
+    ] = EmailSubjectLineTemplate.query.filter(
+        EmailSubjectLineTemplate.client_archetype_id == prospect.archetype_id,
+        EmailSubjectLineTemplate.active == True,
+    ).all()
+    subjectline_template: EmailSubjectLineTemplate = (
+        random.choice(subjectline_templates) if subjectline_templates else None
+    )
+    if subjectline_template:
+        subjectline_template_id = subjectline_template.id
+        subjectline_strict = (
+            "[[" not in subjectline_template.subject_line
+            and "{{" not in subjectline_template.subject_line
+        )
+
+    if not (client_archetype.is_ai_research_personalization_enabled):
+        generate_prospect_research(prospect.id, False, False)
+        # 6. Create research points and payload for the prospect
+        try:
+            get_research_and_bullet_points_new(prospect_id=prospect_id, test_mode=False)
+        except Exception as e:
+            print(e)
+
+        # 7a. Get the Email Body prompt
+        initial_email_prompt = ai_initial_email_prompt(
+            client_sdr_id=client_sdr_id,
             prospect_id=prospect_id,
-            outbound_campaign_id=campaign_id,
-            prompt=initial_email_prompt,
-            completion=email_body,
-            message_status=GeneratedMessageStatus.DRAFT,
-            message_type=GeneratedMessageType.EMAIL,
-            priority_rating=campaign.priority_rating if campaign else 0,
-            email_type=GeneratedMessageEmailType.BODY,
-            email_sequence_step_template_id=template_id,
+            template_id=template_id,
+            ai_personalization_enabled=ai_personalization_enabled,
         )
-        ai_generated_subject_line = GeneratedMessage(
+        # 7b. Generate the email body. Daily campaigns aren't waited on, so
+        # the body (and subject line) go through the LLM batch API
+        if (
+            campaign
+            and campaign.is_daily_generation
+            and not (subjectline_template and subjectline_template.is_magic_subject_line)
+        ):
+            defer_chat_completion(
+                [{"role": "system", "content": initial_email_prompt}],
+                callback="email_body",
+                callback_args={
+                    "prospect_id": prospect_id,
+                    "campaign_id": campaign_id,
+                    "prompt": initial_email_prompt,
+                    "template_id": template_id,
+                    "subjectline_template_id": subjectline_template_id,
+                    "gm_job_id": gm_job_id,
+                },
+                model=OPENAI_CHAT_GPT_4_MODEL,
+                max_tokens=400,
+                temperature=0.3,
+            )
+            return (True, DEFERRED_GENERATION_MESSAGE)
+
+        email_body = generate_email(prompt=initial_email_prompt)
+        email_body = email_body.get("body")
+    else:
+        # 10.a. Run AI personalizer on the email body and subject line if enabled
+        # already got personalized if it was a magic subject line
+        initial_email_prompt, email_body = run_ai_personalizer_on_prospect_email(template_id, prospect_id, False)
+
+    # 8b. Generate the subject line
+    personalized_email_body = None
+    if (subjectline_template and subjectline_template.is_magic_subject_line):
+        subject_line_prompt = "Magic Subject Line"
+        subject_line, personalized_email_body, ai_research_points = generate_magic_subject_line(
+            campaign_id=prospect.archetype_id,
             prospect_id=prospect_id,
-            outbound_campaign_id=campaign_id,
-            prompt=subject_line_prompt,
-            completion=subject_line,
-            message_status=GeneratedMessageStatus.DRAFT,
-            message_type=GeneratedMessageType.EMAIL,
-            priority_rating=campaign.priority_rating if campaign else 0,
-            email_type=GeneratedMessageEmailType.SUBJECT_LINE,
-            email_subject_line_template_id=subjectline_template_id,
+            sequence_id = template.id,
+            #we should generate an email since personalization must be enabled for magic subject lines.
+            should_generate_email = True,
+            room_id = None,
+            subject_line_id=subjectline_template.id,
+            email_body = email_body
+        )
+        email_body = personalized_email_body
+        # subject_line = subject_line.get("subject_line")
+    elif subjectline_strict:
+        subject_line_prompt = "No AI template detected in subject line template. Using exact template."
+        subject_line = subjectline_template.subject_line
+    else:
+        subject_line_prompt = ai_subject_line_prompt(
+            client_sdr_id=client_sdr_id,
+            prospect_id=prospect_id,
+            email_body=email_body,
+            subject_line_template_id=subjectline_template.id,
         )
-        db.session.add(ai_generated_body)
-        db.session.add(ai_generated_subject_line)
-        db.session.commit()
 
-        # 9b. Run rule engine on the subject line and body
-        # TODO(Aakash) - commented out rule engine since these are configured for
-        #                   linkedin messages - not email subject lines / bodies
-        #                   replace with engine for email subject lines / bodies
-        # run_message_rule_engine(message_id=ai_generated_subject_line.id)
-        # run_message_rule_engine(message_id=ai_generated_body.id)
+        # 8a. Get the Subject Line
+        subject_line = generate_subject_line(prompt=subject_line_prompt)
+        subject_line = subject_line.get("subject_line")
+
+    # 9 - 11. Save and approve the email
+    save_prospect_email_for_campaign(
+        prospect_id=prospect_id,
+        campaign_id=campaign_id,
+        initial_email_prompt=initial_email_prompt,
+        email_body=email_body,
+        template_id=template_id,
+        subject_line_prompt=subject_line_prompt,
+        subject_line=subject_line,
+        subjectline_template_id=subjectline_template_id,
+    )
+
+    return (True, "Success")
+
+
+def save_prospect_email_for_campaign(
+    prospect_id: int,
+    campaign_id: int,
+    initial_email_prompt: str,
+    email_body: str,
+    template_id: Optional[int],
+    subject_line_prompt: str,
+    subject_line: str,
+    subjectline_template_id: Optional[int],
+) -> ProspectEmail:
+    """Saves a generated email body and subject line as the prospect's approved ProspectEmail."""
+    campaign: OutboundCampaign = OutboundCampaign.query.get(campaign_id)
+
+    # 9. Create the GeneratedMessage objects
+    ai_generated_body: GeneratedMessage = GeneratedMessage(
+        prospect_id=prospect_id,
+        outbound_campaign_id=campaign_id,
+        prompt=initial_email_prompt,
+        completion=email_body,
+        message_status=GeneratedMessageStatus.DRAFT,
+        message_type=GeneratedMessageType.EMAIL,
+        priority_rating=campaign.priority_rating if campaign else 0,
+        email_type=GeneratedMessageEmailType.BODY,
+        email_sequence_step_template_id=template_id,
+    )
+    ai_generated_subject_line = GeneratedMessage(
+        prospect_id=prospect_id,
+        outbound_campaign_id=campaign_id,
+        prompt=subject_line_prompt,
+        completion=subject_line,
+        message_status=GeneratedMessageStatus.DRAFT,
+        message_type=GeneratedMessageType.EMAIL,
+        priority_rating=campaign.priority_rating if campaign else 0,
+        email_type=GeneratedMessageEmailType.SUBJECT_LINE,
+        email_subject_line_template_id=subjectline_template_id,
+    )
+    db.session.add(ai_generated_body)
+    db.session.add(ai_generated_subject_line)
+    db.session.commit()
 
-        # 10. Create the ProspectEmail object
-        prospect_email: ProspectEmail = create_prospect_email(
+    # 9b. Run rule engine on the subject line and body
+    # TODO(Aakash) - commented out rule engine since these are configured for
+    #                   linkedin messages - not email subject lines / bodies
+    #                   replace with engine for email subject lines / bodies
+    # run_message_rule_engine(message_id=ai_generated_subject_line.id)
+    # run_message_rule_engine(message_id=ai_generated_body.id)
+
+    # 10. Create the ProspectEmail object
+    prospect_email: ProspectEmail = create_prospect_email(
+        prospect_id=prospect_id,
+        personalized_subject_line_id=ai_generated_subject_line.id,
+        personalized_body_id=ai_generated_body.id,
+        outbound_campaign_id=campaign_id,
+    )
+
+    # 11. Save the prospect_email_id to the prospect and mark the prospect_email as approved
+    # This also runs rule_engine on the email body and first line
+    mark_prospect_email_approved(
+        prospect_email_id=prospect_email.id,
+    )
+
+    return prospect_email
+
+
+def save_deferred_email_text_generation(
+    completion: str, prompt: str, prospect_id: int, client_sdr_id: int
+):
+    from model_import import TextGeneration
+
+    db.session.add(
+        TextGeneration(
+            prompt=json.dumps([{"role": "system", "content": prompt}]),
+            completion=completion,
+            type="EMAIL",
+            model_provider=OPENAI_CHAT_GPT_4_MODEL,
             prospect_id=prospect_id,
-            personalized_subject_line_id=ai_generated_subject_line.id,
-            personalized_body_id=ai_generated_body.id,
-            outbound_campaign_id=campaign_id,
+            client_sdr_id=client_sdr_id,
+            human_edited=False,
+            status="GENERATED",
         )
+    )
+    db.session.commit()
+
+
+@llm_batch_callback("email_body")
+def save_deferred_email_body(
+    completion: Optional[str],
+    prospect_id: int,
+    campaign_id: int,
+    prompt: str,
+    template_id: Optional[int],
+    subjectline_template_id: Optional[int],
+    gm_job_id: Optional[int] = None,
+    error_message: Optional[str] = None,
+):
+    """Continues a daily campaign email once its deferred body is back.
 
-        # 11. Save the prospect_email_id to the prospect and mark the prospect_email as approved
-        # This also runs rule_engine on the email body and first line
-        mark_prospect_email_approved(
-            prospect_email_id=prospect_email.id,
+    A strict subject line template is used as is and the email is saved.
+    Otherwise the subject line is deferred as well, and its callback saves the
+    email. Fails the GeneratedMessageJobQueue job if the deferred request failed.
+    """
+    from src.message_generation.email.services import ai_subject_line_prompt
+
+    if completion is None:
+        update_generated_message_job_queue_status(
+            gm_job_id, GeneratedMessageJobStatus.FAILED, error_message=error_message
         )
-    except Exception as e:
-        db.session.rollback()
-        tb = traceback.format_exc()
+        return
+
+    prospect: Prospect = Prospect.query.get(prospect_id)
+    save_deferred_email_text_generation(
+        completion, prompt, prospect_id, prospect.client_sdr_id
+    )
 
+    subjectline_template: Optional[EmailSubjectLineTemplate] = (
+        EmailSubjectLineTemplate.query.get(subjectline_template_id)
+        if subjectline_template_id
+        else None
+    )
+    if (
+        subjectline_template
+        and "[[" not in subjectline_template.subject_line
+        and "{{" not in subjectline_template.subject_line
+    ):
+        save_prospect_email_for_campaign(
+            prospect_id=prospect_id,
+            campaign_id=campaign_id,
+            initial_email_prompt=prompt,
+            email_body=completion,
+            template_id=template_id,
+            subject_line_prompt="No AI template detected in subject line template. Using exact template.",
+            subject_line=subjectline_template.subject_line,
+            subjectline_template_id=subjectline_template_id,
+        )
         update_generated_message_job_queue_status(
-            gm_job_id, GeneratedMessageJobStatus.FAILED, tb
+            gm_job_id, GeneratedMessageJobStatus.COMPLETED
         )
-        raise self.retry(exc=e, countdown=2**self.request.retries)
+        return
+
+    subject_line_prompt = ai_subject_line_prompt(
+        client_sdr_id=prospect.client_sdr_id,
+        prospect_id=prospect_id,
+        email_body=completion,
+        subject_line_template_id=subjectline_template_id,
+    )
+    defer_chat_completion(
+        [{"role": "system", "content": subject_line_prompt}],
+        callback="email_subject_line",
+        callback_args={
+            "prospect_id": prospect_id,
+            "campaign_id": campaign_id,
+            "prompt": prompt,
+            "email_body": completion,
+            "template_id": template_id,
+            "subject_line_prompt": subject_line_prompt,
+            "subjectline_template_id": subjectline_template_id,
+            "gm_job_id": gm_job_id,
+        },
+        model=OPENAI_CHAT_GPT_4_MODEL,
+        max_tokens=50,
+        temperature=0.3,
+    )
+
+
+@llm_batch_callback("email_subject_line")
+def save_deferred_email_subject_line(
+    completion: Optional[str],
+    prospect_id: int,
+    campaign_id: int,
+    prompt: str,
+    email_body: str,
+    template_id: Optional[int],
+    subject_line_prompt: str,
+    subjectline_template_id: Optional[int],
+    gm_job_id: Optional[int] = None,
+    error_message: Optional[str] = None,
+):
+    """Saves and approves a daily campaign email once its deferred subject line is back.
 
+    Completes the GeneratedMessageJobQueue job, or fails it if the deferred request failed.
+    """
+    if completion is None:
+        update_generated_message_job_queue_status(
+            gm_job_id, GeneratedMessageJobStatus.FAILED, error_message=error_message
+        )
+        return
+
+    prospect: Prospect = Prospect.query.get(prospect_id)
+    save_deferred_email_text_generation(
+        completion, subject_line_prompt, prospect_id, prospect.client_sdr_id
+    )
+
+    save_prospect_email_for_campaign(
+        prospect_id=prospect_id,
+        campaign_id=campaign_id,
+        initial_email_prompt=prompt,
+        email_body=email_body,
+        template_id=template_id,
+        subject_line_prompt=subject_line_prompt,
+        subject_line=completion.strip('"'),
+        subjectline_template_id=subjectline_template_id,
+    )
     update_generated_message_job_queue_status(
         gm_job_id, GeneratedMessageJobStatus.COMPLETED
     )
-    return (True, "Success")
 
 
 def change_prospect_email_status(
@@ -1600,34 +1950,76 @@ def wipe_prospect_email_and_generations_and_research(prospect_id: int):
 
 
 def batch_approve_message_generations_by_heuristic(prospect_ids: list):
-    from src.message_generation.services import (
-        approve_message,
-    )
-    from app import db
-    from tqdm import tqdm
+    """Approves the LinkedIn message closest to 270 characters for each prospect without an approved message"""
+    if not prospect_ids:
+        return True
 
-    for prospect_id in tqdm(prospect_ids):
-        data = db.session.execute(
-            text(
-                """
-            select length(completion), *
+    rows = db.session.execute(
+        text(
+            """
+            select distinct on (generated_message.prospect_id) generated_message.id
             from generated_message
-            where prospect_id = {prospect_id} and generated_message.message_type = 'LINKEDIN'
-            order by abs(270 - length(completion)) asc
-            limit 1;
-        """.format(
-                    prospect_id=prospect_id
-                )
-            )
-        ).fetchall()
-        if len(data) == 0:
-            continue
-        data = data[0]
-        prospect: Prospect = Prospect.query.get(prospect_id)
-        if prospect.approved_outreach_message_id != None:
-            continue
-        message_id = data["id"]
-        approve_message(message_id=message_id)
+            join prospect on prospect.id = generated_message.prospect_id
+            where generated_message.prospect_id = any(:prospect_ids)
+                and generated_message.message_type = 'LINKEDIN'
+                and prospect.approved_outreach_message_id is null
+            order by generated_message.prospect_id, abs(270 - length(generated_message.completion)) asc
+        """
+        ),
+        {"prospect_ids": prospect_ids},
+    ).fetchall()
+
+    approve_messages(message_ids=[row[0] for row in rows])
+
+    return True
+
+
+def approve_messages(message_ids: list[int]):
+    """Bulk version of approve_message: approves many messages, then runs the rule engine over all of them at once"""
+    from model_import import GeneratedMessage, GeneratedMessageStatus, Prospect
+    from src.ml.rule_engine import message_rule_engine
+
+    if not message_ids:
+        return True
+
+    messages: list[GeneratedMessage] = GeneratedMessage.query.filter(
+        GeneratedMessage.id.in_(message_ids)
+    ).all()
+
+    # Un-approve the prospects' other approved messages of the same type
+    for message_type in set([message.message_type for message in messages]):
+        GeneratedMessage.query.filter(
+            GeneratedMessage.prospect_id.in_(
+                [m.prospect_id for m in messages if m.message_type == message_type]
+            ),
+            GeneratedMessage.message_status == GeneratedMessageStatus.APPROVED,
+            GeneratedMessage.message_type == message_type,
+            GeneratedMessage.id.notin_(message_ids),
+        ).update(
+            {GeneratedMessage.message_status: GeneratedMessageStatus.DRAFT},
+            synchronize_session=False,
+        )
+
+    approved_message_ids = {}
+    for message in messages:
+        message.message_status = GeneratedMessageStatus.APPROVED
+        approved_message_ids[message.prospect_id] = message.id
+    for prospect in Prospect.query.filter(
+        Prospect.id.in_(list(approved_message_ids.keys()))
+    ).all():
+        prospect.approved_outreach_message_id = approved_message_ids[prospect.id]
+    db.session.commit()
+
+    message_rule_engine.run_batch(message_ids)
+
+    # If the message has no problems, mark it as "human approved"
+    for message in GeneratedMessage.query.filter(
+        GeneratedMessage.id.in_(message_ids)
+    ).all():
+        message.ai_approved = (
+            not message.blocking_problems or len(message.blocking_problems) == 0
+        )
+    db.session.commit()
 
     return True
 
@@ -2439,10 +2831,12 @@ def generate_message_bumps():
                         ).days < archetype.first_message_delay_days:
                             continue
 
-            # Generate the bump
+            # Generate the bump. It isn't sent right away, so the completion
+            # goes through the LLM batch API
             success = generate_prospect_bump(
                 client_sdr_id=prospect.client_sdr_id,
                 prospect_id=prospect.id,
+                defer=True,
             )
 
             # IMPORTANT: this short circuits this loop if we successfully generate a bump
@@ -2497,12 +2891,14 @@ def generate_prospect_bumps_from_id_list(client_sdr_id: int, prospect_ids: list)
         # generate_prospect_bump_task(client_sdr_id, prospect_id)
 
 
-def generate_prospect_bump(client_sdr_id: int, prospect_id: int):
+def generate_prospect_bump(client_sdr_id: int, prospect_id: int, defer: bool = False):
     """Generates a follow up message for a prospect, using their convo history and bump frameworks
 
     Args:
         client_sdr_id (int): Client SDR ID
         prospect_id (int): Prospect ID
+        defer (bool, optional): Whether to defer the completion to the LLM batch API. The bump
+            keeps its placeholder message, which is never sent, until the batch callback fills it in. Defaults to False.
     """
 
     try:
@@ -2576,6 +2972,7 @@ def generate_prospect_bump(client_sdr_id: int, prospect_id: int):
             bump_count=prospect.times_bumped,
             convo_history=latest_convo_entries,
             # show_slack_messages=False,
+            defer_bump_msg_id=bump_msg.id if defer else None,
         )
         if not data:
             return False
@@ -2597,7 +2994,8 @@ def generate_prospect_bump(client_sdr_id: int, prospect_id: int):
                 f"Could not find bump message with li_message_id {latest_convo_entries[-1].li_id}"
             )
 
-        bump_msg.message = data.get("response")
+        if data.get("response") is not None:
+            bump_msg.message = data.get("response")
         bump_msg.bump_framework_id = data.get("bump_framework_id")
         bump_msg.bump_framework_title = data.get("bump_framework_title")
         bump_msg.bump_framework_description = data.get("bump_framework_description")
@@ -2607,6 +3005,13 @@ def generate_prospect_bump(client_sdr_id: int, prospect_id: int):
         db.session.add(bump_msg)
         db.session.commit()
 
+        if data.get("response") is None:
+            send_slack_message(
+                message=f" - Deferred to the LLM batch API",
+                webhook_urls=[URL_MAP["operations-auto-bump-msg-gen"]],
+            )
+            return True
+
         send_slack_message(
             message=f" - Complete!",
             webhook_urls=[URL_MAP["operations-auto-bump-msg-gen"]],
@@ -2633,6 +3038,60 @@ def generate_prospect_bump(client_sdr_id: int, prospect_id: int):
         return False
 
 
+@llm_batch_callback("auto_bump_message")
+def save_deferred_auto_bump(
+    completion: Optional[str],
+    bump_msg_id: int,
+    prompt: str,
+    inject_calendar_times: bool = False,
+    error_message: Optional[str] = None,
+):
+    """Fills in an auto bump message once its deferred completion is back.
+
+    If the deferred request failed, the placeholder bump is deleted so the
+    next generate_message_bumps run generates it again.
+    """
+    from model_import import TextGeneration
+    from src.li_conversation.services import append_calendar_times
+
+    bump_msg: GeneratedMessageAutoBump = GeneratedMessageAutoBump.query.get(
+        bump_msg_id
+    )
+    if not bump_msg:
+        return
+
+    if completion is None:
+        db.session.delete(bump_msg)
+        db.session.commit()
+        return
+
+    db.session.add(
+        TextGeneration(
+            prompt=json.dumps([{"role": "user", "content": prompt}]),
+            completion=completion,
+            type="LI_MSG_OTHER",
+            model_provider="gpt-4o",
+            prospect_id=bump_msg.prospect_id,
+            client_sdr_id=bump_msg.client_sdr_id,
+            human_edited=False,
+            status="GENERATED",
+        )
+    )
+
+    client_sdr: ClientSDR = ClientSDR.query.get(bump_msg.client_sdr_id)
+    if inject_calendar_times and client_sdr.scheduling_link:
+        completion = append_calendar_times(completion, client_sdr)
+
+    bump_msg.message = completion
+    db.session.add(bump_msg)
+    db.session.commit()
+
+    send_slack_message(
+        message=f"- Complete! _Generated a deferred bump for prospect #{bump_msg.prospect_id}_",
+        webhook_urls=[URL_MAP["operations-auto-bump-msg-gen"]],
+    )
+
+
 def generate_followup_response(
     client_sdr_id: int,
     prospect_id: int,
@@ -2642,6 +3101,7 @@ def generate_followup_response(
     convo_history: List[LinkedInConvoMessage],
     show_slack_messages: bool = True,
     bump_framework_template_id: Optional[BumpFrameworkTemplates] = None,
+    defer_bump_msg_id: Optional[int] = None,
 ):
     try:
         # Get bump frameworks
@@ -2780,6 +3240,7 @@ def generate_followup_response(
             bump_framework_id=best_framework.get("id") if best_framework else None,
             account_research_copy=research_str,
             bump_framework_template_id=bump_framework_template_id,
+            defer_bump_msg_id=defer_bump_msg_id,
         )  # type: ignore
 
         if show_slack_messages:
@@ -0,0 +1,306 @@
+""" Batch generation: fan out per-prospect generation for many prospects inside one worker.
+
+Each prospect's pipeline (research points, then the completion) is still a
+chain of blocking LLM calls, but many prospects run side by side on an asyncio
+event loop, bounded by a concurrency limit. The shared LLM rate limiter keeps
+the combined call rate under the provider quota. Job bookkeeping is done in
+bulk: jobs are claimed with one UPDATE and their final statuses are written
+with another.
+
+A `(False, message)` result from generation is a permanent failure. An
+exception is treated as transient: the job goes back to PENDING for the next
+collection run, until it has used MESSAGE_GENERATION_MAX_ATTEMPTS attempts.
+A `(True, DEFERRED_GENERATION_MESSAGE)` result means the completion was handed
+to the LLM batch API: the job stays IN_PROGRESS and the batch callback records
+its final status.
+"""
+
+import asyncio
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from app import app, celery, db
+from src.message_generation.models import GeneratedMessageJobStatus
+
+MESSAGE_GENERATION_BATCH_SIZE = 50
+MESSAGE_GENERATION_BATCH_CONCURRENCY = 10
+MESSAGE_GENERATION_MAX_ATTEMPTS = 3
+
+# Returned by generation when the completion was deferred to the LLM batch API
+DEFERRED_GENERATION_MESSAGE = "Deferred to the LLM batch API"
+
+
+def run_in_app_context(fn: Callable, *args, **kwargs):
+    """Runs `fn` in its own app context, closing its thread-local session afterwards."""
+    with app.app_context():
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            db.session.remove()
+
+
+async def gather_with_concurrency(
+    calls: list[tuple[Callable, tuple]], concurrency: int
+) -> list:
+    """Runs blocking (fn, args) calls concurrently, at most `concurrency` at a time.
+
+    Returns:
+        list: One result per call, in order. A call that raised returns its exception.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+        async def run(fn: Callable, args: tuple):
+            async with semaphore:
+                return await loop.run_in_executor(
+                    executor, lambda: run_in_app_context(fn, *args)
+                )
+
+        return await asyncio.gather(
+            *[run(fn, args) for fn, args in calls], return_exceptions=True
+        )
+
+
+def run_concurrently(
+    calls: list[tuple[Callable, tuple]],
+    concurrency: int = MESSAGE_GENERATION_BATCH_CONCURRENCY,
+) -> list:
+    """Synchronous entrypoint for gather_with_concurrency."""
+    if not calls:
+        return []
+    return asyncio.run(gather_with_concurrency(calls, concurrency))
+
+
+def claim_generated_message_jobs(gm_job_ids: list[int]) -> dict[int, int]:
+    """Marks PENDING jobs as IN_PROGRESS and bumps their attempts, in one statement.
+
+    Returns:
+        dict[int, int]: gm_job_id -> attempts, for the jobs that were claimed. Jobs another worker already took are skipped.
+    """
+    if not gm_job_ids:
+        return {}
+
+    rows = db.session.execute(
+        text(
+            """
+            UPDATE generated_message_job_queue
+            SET
+                status = :in_progress,
+                attempts = coalesce(attempts, 0) + 1
+            WHERE id = ANY(:gm_job_ids) AND status = :pending
+            RETURNING id, attempts
+            """
+        ),
+        {
+            "gm_job_ids": gm_job_ids,
+            "in_progress": GeneratedMessageJobStatus.IN_PROGRESS.value,
+            "pending": GeneratedMessageJobStatus.PENDING.value,
+        },
+    ).fetchall()
+    db.session.commit()
+
+    return {row[0]: row[1] for row in rows}
+
+
+def release_generated_message_jobs(gm_job_ids: list[int]):
+    """Puts claimed jobs that are still IN_PROGRESS back to PENDING, so a retry can claim them again."""
+    if not gm_job_ids:
+        return
+
+    db.session.rollback()
+    db.session.execute(
+        text(
+            """
+            UPDATE generated_message_job_queue
+            SET status = :pending
+            WHERE id = ANY(:gm_job_ids) AND status = :in_progress
+            """
+        ),
+        {
+            "gm_job_ids": gm_job_ids,
+            "in_progress": GeneratedMessageJobStatus.IN_PROGRESS.value,
+            "pending": GeneratedMessageJobStatus.PENDING.value,
+        },
+    )
+    db.session.commit()
+
+
+def bulk_update_generated_message_job_statuses(
+    statuses: dict[int, tuple[GeneratedMessageJobStatus, Optional[str]]]
+):
+    """Writes the final status and error message of many jobs in one statement.
+
+    Args:
+        statuses (dict): gm_job_id -> (status, error_message)
+    """
+    if not statuses:
+        return
+
+    values = []
+    params = {}
+    for i, (gm_job_id, (status, error_message)) in enumerate(statuses.items()):
+        values.append(
+            f"(CAST(:id_{i} AS INTEGER), CAST(:status_{i} AS VARCHAR), CAST(:error_{i} AS VARCHAR))"
+        )
+        params[f"id_{i}"] = gm_job_id
+        params[f"status_{i}"] = status.value
+        params[f"error_{i}"] = error_message
+
+    db.session.execute(
+        text(
+            """
+            UPDATE generated_message_job_queue
+            SET
+                status = CAST(v.status AS generatedmessagejobstatus),
+                error_message = v.error_message
+            FROM (VALUES {values}) AS v(id, status, error_message)
+            WHERE generated_message_job_queue.id = v.id
+            """.format(
+                values=", ".join(values)
+            )
+        ),
+        params,
+    )
+    db.session.commit()
+
+
+def run_generated_message_jobs_batch(
+    jobs: list[dict],
+    generate: Callable,
+    concurrency: int = MESSAGE_GENERATION_BATCH_CONCURRENCY,
+) -> dict[int, tuple[GeneratedMessageJobStatus, Optional[str]]]:
+    """Claims the jobs, runs `generate(job)` for each concurrently, then records every outcome at once.
+
+    Args:
+        jobs (list[dict]): Jobs with at least a 'gm_job_id' key
+        generate (Callable): Takes a job and returns (success, message)
+        concurrency (int): Max prospects in flight at once
+
+    Returns:
+        dict: gm_job_id -> (status, error_message)
+    """
+    attempts = claim_generated_message_jobs([job["gm_job_id"] for job in jobs])
+    claimed_jobs = [job for job in jobs if job["gm_job_id"] in attempts]
+
+    statuses = {}
+    try:
+        results = run_concurrently(
+            [(generate, (job,)) for job in claimed_jobs], concurrency=concurrency
+        )
+
+        for job, result in zip(claimed_jobs, results):
+            gm_job_id = job["gm_job_id"]
+            if isinstance(result, BaseException):
+                error_message = "".join(
+                    traceback.format_exception(
+                        type(result), result, result.__traceback__
+                    )
+                )
+                # Transient: try again on a later run, unless out of attempts
+                if attempts[gm_job_id] < MESSAGE_GENERATION_MAX_ATTEMPTS:
+                    statuses[gm_job_id] = (GeneratedMessageJobStatus.PENDING, error_message)
+                else:
+                    statuses[gm_job_id] = (GeneratedMessageJobStatus.FAILED, error_message)
+                continue
+
+            success, message = result
+            if success and message == DEFERRED_GENERATION_MESSAGE:
+                continue  # Completed by the batch callback
+            if success:
+                statuses[gm_job_id] = (GeneratedMessageJobStatus.COMPLETED, None)
+            else:
+                statuses[gm_job_id] = (GeneratedMessageJobStatus.FAILED, message)
+
+        bulk_update_generated_message_job_statuses(statuses)
+    except BaseException:
+        # Nothing was recorded, so don't leave the claimed jobs stuck IN_PROGRESS
+        release_generated_message_jobs(list(attempts.keys()))
+        raise
+
+    return statuses
+
+
+def _generate_linkedin_job(job: dict) -> tuple[bool, str]:
+    from src.message_generation.services import research_and_generate_linkedin_outreaches
+
+    return research_and_generate_linkedin_outreaches(
+        prospect_id=job["prospect_id"],
+        outbound_campaign_id=job["outbound_campaign_id"],
+        cta_id=job.get("cta_id"),
+        gm_job_id=job["gm_job_id"],
+    )
+
+
+def _generate_email_job(job: dict) -> tuple[bool, str]:
+    from src.message_generation.services import generate_email_for_prospect
+
+    return generate_email_for_prospect(
+        prospect_id=job["prospect_id"],
+        campaign_id=job["outbound_campaign_id"],
+        gm_job_id=job["gm_job_id"],
+    )
+
+
+@celery.task(bind=True, max_retries=3)
+def batch_research_and_generate_outreaches(
+    self, jobs: list[dict], concurrency: int = MESSAGE_GENERATION_BATCH_CONCURRENCY
+):
+    """Generates LinkedIn outreaches for many GeneratedMessageJobQueue jobs concurrently.
+
+    Args:
+        jobs (list[dict]): {'prospect_id', 'outbound_campaign_id', 'cta_id', 'gm_job_id'} per job
+    """
+    try:
+        run_generated_message_jobs_batch(
+            jobs, _generate_linkedin_job, concurrency=concurrency
+        )
+    except Exception as e:
+        db.session.rollback()
+        raise self.retry(exc=e, countdown=2**self.request.retries)
+
+
+@celery.task(bind=True, max_retries=3)
+def batch_generate_prospect_emails(
+    self, jobs: list[dict], concurrency: int = MESSAGE_GENERATION_BATCH_CONCURRENCY
+):
+    """Generates emails for many GeneratedMessageJobQueue jobs concurrently.
+
+    Args:
+        jobs (list[dict]): {'prospect_id', 'outbound_campaign_id', 'gm_job_id'} per job
+    """
+    try:
+        run_generated_message_jobs_batch(
+            jobs, _generate_email_job, concurrency=concurrency
+        )
+    except Exception as e:
+        db.session.rollback()
+        raise self.retry(exc=e, countdown=2**self.request.retries)
+
+
+def batch_generate_research_points(
+    prospect_ids: list[int], concurrency: int = MESSAGE_GENERATION_BATCH_CONCURRENCY
+) -> dict[int, Optional[list]]:
+    """Generates research points for many prospects concurrently.
+
+    Returns:
+        dict: prospect_id -> research points, or None if generation failed
+    """
+    from src.research.linkedin.services import get_research_and_bullet_points_new
+
+    results = run_concurrently(
+        [
+            (get_research_and_bullet_points_new, (prospect_id, False))
+            for prospect_id in prospect_ids
+        ],
+        concurrency=concurrency,
+    )
+
+    return {
+        prospect_id: None if isinstance(result, BaseException) else result
+        for prospect_id, result in zip(prospect_ids, results)
+    }
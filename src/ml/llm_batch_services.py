@@ -0,0 +1,479 @@
+""" Deferred LLM generation through the provider batch API.
+
+Latency-insensitive work (daily campaign generation, auto bumps) doesn't need
+an answer right away. Instead of calling the chat completion endpoint one
+request at a time, callers defer the request:
+
+    defer_chat_completion(messages, model=..., callback="callback_name", callback_args={...})
+
+Deferred requests are stored as LLMBatchRequest rows. A scheduled job
+collects the pending rows into one JSONL batch file per model, uploads it and
+starts a provider batch job (at roughly half the per-token price). The same job
+polls running batches and, once they finish, downloads the output file and
+hands every completion to the request's callback, which writes it back to the
+originating record. A request that fails for good is handed to the callback
+with completion=None and an error_message, so the originating record isn't left
+waiting. Callbacks are registered by name with @llm_batch_callback, and only
+that name is stored with the request.
+
+Only the OpenAI batch API is supported. On Azure, and for models without a
+batch API, the request runs immediately and the callback is invoked inline.
+The bulk ICP AI filters aren't deferred: they rely on Perplexity's online
+search, which has no batch API.
+Set OPENAI_BATCH_API_BASE to point at a stub server in tests.
+"""
+
+import datetime
+import importlib
+import json
+import os
+from typing import Callable, Optional
+
+import requests
+from sqlalchemy import text
+
+from app import celery, db
+from src.ml.models import (
+    LLMBatchJob,
+    LLMBatchJobStatus,
+    LLMBatchRequest,
+    LLMBatchRequestStatus,
+)
+from src.ml.openai_wrappers import (
+    DEFAULT_MAX_TOKENS,
+    DEFAULT_TEMPERATURE,
+    OPENAI_CHAT_GPT_4_MODEL,
+    USE_AZURE_ENGINE,
+    wrapped_chat_gpt_completion,
+)
+
+OPENAI_BATCH_API_BASE = os.environ.get(
+    "OPENAI_BATCH_API_BASE", "https://api.openai.com/v1"
+)
+OPENAI_BATCH_ENDPOINT = "/v1/chat/completions"
+OPENAI_BATCH_COMPLETION_WINDOW = "24h"
+OPENAI_BATCH_MAX_REQUESTS = 50000  # Provider limit per batch file
+OPENAI_BATCH_HTTP_TIMEOUT_SECONDS = 60
+
+LLM_BATCH_MAX_ATTEMPTS = 3
+
+# Claimed requests not linked to a batch job after this long were orphaned by a
+# crashed submission and are requeued
+LLM_BATCH_SUBMIT_TIMEOUT = datetime.timedelta(minutes=30)
+
+# Provider batch statuses
+LLM_BATCH_FINISHED_STATUSES = ["completed", "failed", "expired", "cancelled"]
+
+# Modules that register callbacks, imported before a callback is looked up so
+# the worker fanning results out knows every callback
+LLM_BATCH_CALLBACK_MODULES = [
+    "src.message_generation.services",
+]
+
+LLM_BATCH_CALLBACKS: dict[str, Callable] = {}
+
+
+def llm_batch_callback(name: str):
+    """Registers the decorated function as the deferred completion callback `name`."""
+
+    def decorator(function: Callable) -> Callable:
+        if LLM_BATCH_CALLBACKS.get(name, function) is not function:
+            raise ValueError(f"LLM batch callback {name} is already registered")
+        LLM_BATCH_CALLBACKS[name] = function
+        return function
+
+    return decorator
+
+
+def _openai_batch_headers() -> dict:
+    return {"Authorization": f"Bearer {os.environ.get('OPENAI_KEY')}"}
+
+
+def supports_batch_api(model: str) -> bool:
+    """Whether requests for `model` can go through the provider batch API."""
+    return not USE_AZURE_ENGINE and not model.startswith("claude-")
+
+
+def resolve_llm_batch_callback(callback: str) -> Callable:
+    """Looks up a registered callback by name."""
+    if callback not in LLM_BATCH_CALLBACKS:
+        for module_name in LLM_BATCH_CALLBACK_MODULES:
+            importlib.import_module(module_name)
+
+    if callback not in LLM_BATCH_CALLBACKS:
+        raise ValueError(f"Unknown LLM batch callback: {callback}")
+    return LLM_BATCH_CALLBACKS[callback]
+
+
+def defer_chat_completion(
+    messages: list,
+    callback: str,
+    callback_args: Optional[dict] = None,
+    model: str = OPENAI_CHAT_GPT_4_MODEL,
+    max_tokens: Optional[int] = DEFAULT_MAX_TOKENS,
+    temperature: Optional[float] = DEFAULT_TEMPERATURE,
+) -> Optional[int]:
+    """Queues a chat completion for the next provider batch job.
+
+    When the batch finishes, `callback(completion=..., **callback_args)` is
+    called with the completion text. If the request fails for good, the
+    callback is called with completion=None and an error_message instead. If
+    the model can't be batched, the completion runs now and the callback is
+    invoked before returning.
+
+    Args:
+        messages (list): The chat messages
+        callback (str): Name of the registered callback that receives the completion
+        callback_args (Optional[dict]): JSON-serializable keyword arguments for the callback
+        model (str): The model name
+        max_tokens (Optional[int]): Max tokens of the completion
+        temperature (Optional[float]): Sampling temperature
+
+    Returns:
+        Optional[int]: The LLMBatchRequest ID, or None if the completion ran immediately
+    """
+    callback_args = callback_args or {}
+    callback_function = resolve_llm_batch_callback(callback)
+
+    if not supports_batch_api(model):
+        completion = wrapped_chat_gpt_completion(
+            messages, max_tokens=max_tokens, temperature=temperature, model=model
+        )
+        callback_function(completion=completion, **callback_args)
+        return None
+
+    request: LLMBatchRequest = LLMBatchRequest(
+        status=LLMBatchRequestStatus.PENDING,
+        provider="openai",
+        model=model,
+        body={
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        },
+        callback=callback,
+        callback_args=callback_args,
+        attempts=0,
+    )
+    db.session.add(request)
+    db.session.commit()
+
+    return request.id
+
+
+def build_llm_batch_file(batch_requests: list[LLMBatchRequest]) -> bytes:
+    """One JSONL line per request, keyed by the LLMBatchRequest ID."""
+    lines = [
+        json.dumps(
+            {
+                "custom_id": str(request.id),
+                "method": "POST",
+                "url": OPENAI_BATCH_ENDPOINT,
+                "body": request.body,
+            }
+        )
+        for request in batch_requests
+    ]
+    return "\n".join(lines).encode()
+
+
+def parse_llm_batch_output(content: str) -> dict[int, tuple[Optional[str], Optional[str]]]:
+    """Parses an output or error file.
+
+    Returns:
+        dict: LLMBatchRequest ID -> (completion, error_message)
+    """
+    results = {}
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        request_id = int(entry["custom_id"])
+
+        response = entry.get("response") or {}
+        if entry.get("error") or response.get("status_code") != 200:
+            results[request_id] = (
+                None,
+                json.dumps(entry.get("error") or response.get("body")),
+            )
+            continue
+
+        choices = response["body"].get("choices") or []
+        if len(choices) == 0:
+            results[request_id] = (None, "No choices returned")
+            continue
+        results[request_id] = (choices[0]["message"]["content"].strip(), None)
+
+    return results
+
+
+def create_provider_batch(model: str, batch_file: bytes, request_count: int) -> LLMBatchJob:
+    """Uploads the batch file and starts the provider batch job."""
+    file_response = requests.post(
+        f"{OPENAI_BATCH_API_BASE}/files",
+        headers=_openai_batch_headers(),
+        data={"purpose": "batch"},
+        files={"file": ("batch.jsonl", batch_file)},
+        timeout=OPENAI_BATCH_HTTP_TIMEOUT_SECONDS,
+    )
+    file_response.raise_for_status()
+    input_file_id = file_response.json()["id"]
+
+    batch_response = requests.post(
+        f"{OPENAI_BATCH_API_BASE}/batches",
+        headers=_openai_batch_headers(),
+        json={
+            "input_file_id": input_file_id,
+            "endpoint": OPENAI_BATCH_ENDPOINT,
+            "completion_window": OPENAI_BATCH_COMPLETION_WINDOW,
+        },
+        timeout=OPENAI_BATCH_HTTP_TIMEOUT_SECONDS,
+    )
+    batch_response.raise_for_status()
+    batch = batch_response.json()
+
+    return LLMBatchJob(
+        provider="openai",
+        model=model,
+        provider_batch_id=batch["id"],
+        input_file_id=input_file_id,
+        status=LLMBatchJobStatus.SUBMITTED,
+        provider_status=batch.get("status"),
+        request_count=request_count,
+    )
+
+
+def requeue_orphaned_llm_batch_requests():
+    """Requeues claimed requests whose submission never linked them to a batch job."""
+    LLMBatchRequest.query.filter(
+        LLMBatchRequest.status == LLMBatchRequestStatus.SUBMITTED,
+        LLMBatchRequest.llm_batch_job_id == None,
+        LLMBatchRequest.updated_at < datetime.datetime.now() - LLM_BATCH_SUBMIT_TIMEOUT,
+    ).update(
+        {LLMBatchRequest.status: LLMBatchRequestStatus.PENDING},
+        synchronize_session=False,
+    )
+    db.session.commit()
+
+
+def submit_pending_llm_batch_requests() -> list[int]:
+    """Collects pending requests into one provider batch per model.
+
+    Requests are claimed (marked SUBMITTED) and committed before the upload, so
+    no row locks are held while talking to the provider.
+
+    Returns:
+        list[int]: The IDs of the LLMBatchJobs that were started
+    """
+    requeue_orphaned_llm_batch_requests()
+
+    models = [
+        row[0]
+        for row in db.session.query(LLMBatchRequest.model)
+        .filter(LLMBatchRequest.status == LLMBatchRequestStatus.PENDING)
+        .distinct()
+        .all()
+    ]
+
+    batch_job_ids = []
+    for model in models:
+        # Lock the rows only long enough to claim them, so a concurrent run
+        # can't submit them twice
+        batch_requests: list[LLMBatchRequest] = (
+            LLMBatchRequest.query.filter(
+                LLMBatchRequest.status == LLMBatchRequestStatus.PENDING,
+                LLMBatchRequest.model == model,
+            )
+            .order_by(LLMBatchRequest.id)
+            .limit(OPENAI_BATCH_MAX_REQUESTS)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not batch_requests:
+            db.session.rollback()
+            continue
+
+        request_ids = [request.id for request in batch_requests]
+        batch_file = build_llm_batch_file(batch_requests)
+        for request in batch_requests:
+            request.status = LLMBatchRequestStatus.SUBMITTED
+            request.llm_batch_job_id = None
+            request.attempts = (request.attempts or 0) + 1
+        db.session.commit()
+
+        claimed = LLMBatchRequest.query.filter(
+            LLMBatchRequest.id.in_(request_ids),
+            LLMBatchRequest.status == LLMBatchRequestStatus.SUBMITTED,
+            LLMBatchRequest.llm_batch_job_id == None,
+        )
+        try:
+            batch_job = create_provider_batch(model, batch_file, len(request_ids))
+        except requests.RequestException as e:
+            print(f"Failed to submit LLM batch for {model}: {e}")
+            db.session.rollback()
+            claimed.update(
+                {
+                    LLMBatchRequest.status: LLMBatchRequestStatus.PENDING,
+                    LLMBatchRequest.attempts: LLMBatchRequest.attempts - 1,
+                },
+                synchronize_session=False,
+            )
+            db.session.commit()
+            continue
+
+        db.session.add(batch_job)
+        db.session.flush()
+        claimed.update(
+            {LLMBatchRequest.llm_batch_job_id: batch_job.id},
+            synchronize_session=False,
+        )
+        db.session.commit()
+
+        batch_job_ids.append(batch_job.id)
+
+    return batch_job_ids
+
+
+def download_llm_batch_file(file_id: Optional[str]) -> str:
+    if not file_id:
+        return ""
+
+    response = requests.get(
+        f"{OPENAI_BATCH_API_BASE}/files/{file_id}/content",
+        headers=_openai_batch_headers(),
+        timeout=OPENAI_BATCH_HTTP_TIMEOUT_SECONDS,
+    )
+    response.raise_for_status()
+    return response.text
+
+
+def fail_llm_batch_request(request: LLMBatchRequest, error_message: str):
+    """Marks a request FAILED and tells its callback, so the originating record isn't left waiting."""
+    request.status = LLMBatchRequestStatus.FAILED
+    request.error_message = error_message
+    db.session.commit()
+
+    try:
+        resolve_llm_batch_callback(request.callback)(
+            completion=None,
+            error_message=error_message,
+            **(request.callback_args or {}),
+        )
+    except Exception as e:
+        db.session.rollback()
+        print(f"Failure callback for LLM batch request {request.id} failed: {e}")
+
+
+def fan_out_llm_batch_results(
+    batch_job: LLMBatchJob, results: dict[int, tuple[Optional[str], Optional[str]]]
+):
+    """Stores the completions and hands each one to its request's callback.
+
+    Requests without a result are retried in a later batch if the batch didn't
+    complete (failed, expired or cancelled), up to LLM_BATCH_MAX_ATTEMPTS.
+    """
+    batch_requests: list[LLMBatchRequest] = LLMBatchRequest.query.filter(
+        LLMBatchRequest.llm_batch_job_id == batch_job.id,
+        LLMBatchRequest.status == LLMBatchRequestStatus.SUBMITTED,
+    ).all()
+
+    for request in batch_requests:
+        completion, error_message = results.get(request.id, (None, None))
+
+        if completion is None and error_message is None:
+            if (
+                batch_job.status != LLMBatchJobStatus.COMPLETED
+                and request.attempts < LLM_BATCH_MAX_ATTEMPTS
+            ):
+                request.status = LLMBatchRequestStatus.PENDING
+                request.llm_batch_job_id = None
+                db.session.commit()
+            else:
+                fail_llm_batch_request(
+                    request, f"No result (batch {batch_job.provider_status})"
+                )
+            continue
+
+        if completion is None:
+            fail_llm_batch_request(request, error_message)
+            continue
+
+        request.completion = completion
+        db.session.commit()
+        try:
+            resolve_llm_batch_callback(request.callback)(
+                completion=completion, **(request.callback_args or {})
+            )
+            request.status = LLMBatchRequestStatus.COMPLETED
+        except Exception as e:
+            db.session.rollback()
+            fail_llm_batch_request(request, f"Callback failed: {e}")
+            continue
+
+        db.session.commit()
+
+    db.session.commit()
+
+
+def poll_llm_batch_job(llm_batch_job_id: int) -> LLMBatchJobStatus:
+    """Checks a running batch and fans its results out once it finishes."""
+    batch_job: LLMBatchJob = LLMBatchJob.query.get(llm_batch_job_id)
+    if batch_job.status != LLMBatchJobStatus.SUBMITTED:
+        return batch_job.status
+
+    response = requests.get(
+        f"{OPENAI_BATCH_API_BASE}/batches/{batch_job.provider_batch_id}",
+        headers=_openai_batch_headers(),
+        timeout=OPENAI_BATCH_HTTP_TIMEOUT_SECONDS,
+    )
+    response.raise_for_status()
+    batch = response.json()
+
+    batch_job.provider_status = batch.get("status")
+    if batch_job.provider_status not in LLM_BATCH_FINISHED_STATUSES:
+        db.session.commit()
+        return batch_job.status
+
+    # Expired and cancelled batches can still carry partial output
+    results = parse_llm_batch_output(
+        download_llm_batch_file(batch.get("error_file_id"))
+    )
+    results.update(
+        parse_llm_batch_output(download_llm_batch_file(batch.get("output_file_id")))
+    )
+
+    batch_job.output_file_id = batch.get("output_file_id")
+    if batch_job.provider_status == "completed":
+        batch_job.status = LLMBatchJobStatus.COMPLETED
+    else:
+        batch_job.status = LLMBatchJobStatus.FAILED
+        batch_job.error_message = json.dumps(batch.get("errors"))
+    db.session.commit()
+
+    fan_out_llm_batch_results(batch_job, results)
+    return batch_job.status
+
+
+@celery.task(bind=True, max_retries=3)
+def process_llm_batch_jobs(self):
+    """Submits pending deferred requests and polls the batches already running."""
+    try:
+        submit_pending_llm_batch_requests()
+
+        batch_job_ids = [
+            row[0]
+            for row in db.session.execute(
+                text("SELECT id FROM llm_batch_job WHERE status = :submitted"),
+                {"submitted": LLMBatchJobStatus.SUBMITTED.value},
+            ).fetchall()
+        ]
+        for batch_job_id in batch_job_ids:
+            try:
+                poll_llm_batch_job(batch_job_id)
+            except requests.RequestException as e:
+                print(f"Failed to poll LLM batch job {batch_job_id}: {e}")
+                db.session.rollback()
+    except Exception as e:
+        db.session.rollback()
+        raise self.retry(exc=e, countdown=2**self.request.retries)
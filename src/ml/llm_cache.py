@@ -0,0 +1,157 @@
+""" Content-addressed cache for deterministic LLM responses.
+
+Responses are keyed by a hash of everything that determines the completion
+(provider, model, messages, tools, response_format and sampling parameters).
+Lookups go through a small in-process LRU first, then the shared Redis tier,
+so every worker benefits from a response any other worker already paid for.
+
+Caching is opt-in per call (`use_cache=True`). Setting LLM_CACHE_BYPASS=true
+turns every lookup and write off without a deploy.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import redis
+
+from src.utils.redis_client import get_redis_client
+
+LLM_CACHE_KEY_PREFIX = "llm_cache:v1:"
+LLM_CACHE_DEFAULT_TTL_SECONDS = 60 * 60 * 24 * 7  # 1 week
+LLM_CACHE_LOCAL_MAX_ENTRIES = 2048
+
+
+def is_llm_cache_bypassed() -> bool:
+    return os.environ.get("LLM_CACHE_BYPASS") == "true"
+
+
+def make_llm_cache_key(provider: str, model: Optional[str], messages: list, **params) -> str:
+    """Hash of the full request, so identical requests share an entry.
+
+    Args:
+        provider (str): 'openai', 'anthropic', 'perplexity', ...
+        model (Optional[str]): The model name
+        messages (list): The chat messages
+        **params: tools, response_format and sampling parameters (temperature, top_p, max_tokens, ...)
+
+    Returns:
+        str: The cache key
+    """
+    payload = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "messages": messages,
+            "params": params,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return LLM_CACHE_KEY_PREFIX + hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier response cache: an in-process LRU in front of Redis.
+
+    Both tiers honour the entry's TTL. The local tier is also bounded by
+    `max_local_entries` and evicts the least recently used entry first.
+    """
+
+    def __init__(
+        self,
+        max_local_entries: int = LLM_CACHE_LOCAL_MAX_ENTRIES,
+        default_ttl: int = LLM_CACHE_DEFAULT_TTL_SECONDS,
+    ):
+        self.max_local_entries = max_local_entries
+        self.default_ttl = default_ttl
+        self._local: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._local.move_to_end(key)
+                    self._stats["local_hits"] += 1
+                    return value
+                del self._local[key]
+
+        redis_client = get_redis_client()
+        if redis_client is not None:
+            try:
+                raw = redis_client.get(key)
+                if raw is not None:
+                    ttl = redis_client.ttl(key)
+                    value = json.loads(raw)
+                    self._set_local(key, value, ttl if ttl and ttl > 0 else self.default_ttl)
+                    self._count("shared_hits")
+                    return value
+            except (redis.exceptions.RedisError, ValueError) as e:
+                print(f"LLM cache read failed: {e}")
+                self._count("errors")
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Stores a JSON-serializable value in both tiers."""
+        ttl = ttl or self.default_ttl
+        self._set_local(key, value, ttl)
+        self._count("writes")
+
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            redis_client.set(key, json.dumps(value), ex=ttl)
+        except (redis.exceptions.RedisError, TypeError) as e:
+            print(f"LLM cache write failed: {e}")
+            self._count("errors")
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def get_stats(self) -> dict:
+        """Hit / miss counters for this process, plus the overall hit rate."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["local_entries"] = len(self._local)
+
+        lookups = stats["local_hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["local_hits"] + stats["shared_hits"]) / lookups if lookups else 0
+        )
+        return stats
+
+    def _set_local(self, key: str, value: Any, ttl: int):
+        with self._lock:
+            self._local[key] = (value, time.time() + ttl)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+
+llm_response_cache = LLMResponseCache()
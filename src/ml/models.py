@@ -271,3 +271,83 @@ class LLM(db.Model):
             str: The response from the LLM.
         """
         return self.response
+
+
+class LLMBatchJobStatus(enum.Enum):
+    SUBMITTED = "SUBMITTED"  # Uploaded to the provider, waiting on results
+    COMPLETED = "COMPLETED"  # Results downloaded and fanned back out
+    FAILED = "FAILED"  # Provider failed, expired or cancelled the batch
+
+
+class LLMBatchJob(db.Model):
+    __tablename__ = "llm_batch_job"
+
+    id = db.Column(db.Integer, primary_key=True)
+    provider = db.Column(db.String, nullable=False)
+    model = db.Column(db.String, nullable=False)
+
+    provider_batch_id = db.Column(db.String, nullable=False, index=True)
+    input_file_id = db.Column(db.String, nullable=True)
+    output_file_id = db.Column(db.String, nullable=True)
+
+    status = db.Column(db.Enum(LLMBatchJobStatus), nullable=False)
+    provider_status = db.Column(db.String, nullable=True)
+    request_count = db.Column(db.Integer, nullable=False, default=0)
+    error_message = db.Column(db.String, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "provider": self.provider,
+            "model": self.model,
+            "provider_batch_id": self.provider_batch_id,
+            "input_file_id": self.input_file_id,
+            "output_file_id": self.output_file_id,
+            "status": self.status.value,
+            "provider_status": self.provider_status,
+            "request_count": self.request_count,
+            "error_message": self.error_message,
+        }
+
+
+class LLMBatchRequestStatus(enum.Enum):
+    PENDING = "PENDING"  # Deferred, waiting to be submitted in the next batch
+    SUBMITTED = "SUBMITTED"  # Part of an LLMBatchJob that hasn't finished
+    COMPLETED = "COMPLETED"  # Completion received and handed to the callback
+    FAILED = "FAILED"  # The provider or the callback failed
+
+
+class LLMBatchRequest(db.Model):
+    __tablename__ = "llm_batch_request"
+
+    id = db.Column(db.Integer, primary_key=True)
+    llm_batch_job_id = db.Column(
+        db.Integer, db.ForeignKey("llm_batch_job.id"), nullable=True, index=True
+    )
+    status = db.Column(db.Enum(LLMBatchRequestStatus), nullable=False, index=True)
+
+    provider = db.Column(db.String, nullable=False)
+    model = db.Column(db.String, nullable=False)
+    body = db.Column(db.JSON, nullable=False)  # Chat completion request body
+
+    # Registered callback that receives the completion, and its keyword arguments
+    callback = db.Column(db.String, nullable=False)
+    callback_args = db.Column(db.JSON, nullable=True)
+
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    completion = db.Column(db.String, nullable=True)
+    error_message = db.Column(db.String, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "llm_batch_job_id": self.llm_batch_job_id,
+            "status": self.status.value,
+            "provider": self.provider,
+            "model": self.model,
+            "callback": self.callback,
+            "callback_args": self.callback_args,
+            "attempts": self.attempts,
+            "completion": self.completion,
+            "error_message": self.error_message,
+        }
@@ -3,12 +3,24 @@
 Eventual migration to these wrappers will aid in uniform testing and debugging.
 """
 
+import email.utils
+import json
 import random
+import threading
 import time
 import openai
 import anthropic
+import httpx
 import os
-from typing import Optional, Union
+import requests
+from typing import Callable, Optional, Union
+
+from src.ml.llm_cache import (
+    is_llm_cache_bypassed,
+    llm_response_cache,
+    make_llm_cache_key,
+)
+from src.utils.rate_limiter import TokenBucket, acquire_rate_limit
 
 if os.environ.get("AZURE_OPENAI") == "true":
     print("Using Azure-OpenAI API")
@@ -51,6 +63,185 @@ DEFAULT_N = 1
 DEFAULT_FREQUENCY_PENALTY = 0
 DEFAULT_STOP = None
 
+# Connection pool shared by every LLM call in the process
+LLM_HTTP_POOL_SIZE = 20
+
+# Exponential backoff with full jitter: sleep ~ U(0, min(cap, base * 2^attempt))
+LLM_BACKOFF_BASE_SECONDS = 0.5
+LLM_BACKOFF_MAX_SECONDS = 30
+
+# Status codes that will fail the same way if retried
+LLM_NON_RETRYABLE_STATUS_CODES = [400, 401, 403, 404, 422]
+
+# Provider quotas, shared by every worker through per-model Redis token buckets.
+# Keyed by (provider, model); (provider, None) is the default for other models.
+LLM_RATE_LIMITS = {
+    ("openai", None): {"requests_per_minute": 5000, "tokens_per_minute": 600000},
+    ("openai", OPENAI_CHAT_GPT_4_MODEL): {
+        "requests_per_minute": 10000,
+        "tokens_per_minute": 300000,
+    },
+    ("anthropic", None): {"requests_per_minute": 4000, "tokens_per_minute": 400000},
+}
+# Longest a caller will wait on the limiter before going ahead anyway
+LLM_RATE_LIMIT_MAX_WAIT_SECONDS = 60
+
+_anthropic_client: Optional[anthropic.Anthropic] = None
+_llm_client_lock = threading.Lock()
+
+
+def get_anthropic_client() -> anthropic.Anthropic:
+    """Returns the process-wide Anthropic client.
+
+    The client holds a pooled httpx connection, so calls reuse warm TLS
+    connections instead of opening a new one per request. Retries are done by
+    `call_llm_with_retries`, so the SDK's own retries are turned off.
+    """
+    global _anthropic_client
+
+    if _anthropic_client is None:
+        with _llm_client_lock:
+            if _anthropic_client is None:
+                _anthropic_client = anthropic.Anthropic(
+                    api_key=os.environ.get("ANTHROPIC_API_KEY"),
+                    max_retries=0,
+                    http_client=httpx.Client(
+                        limits=httpx.Limits(
+                            max_connections=LLM_HTTP_POOL_SIZE,
+                            max_keepalive_connections=LLM_HTTP_POOL_SIZE,
+                        ),
+                        timeout=httpx.Timeout(600, connect=10),
+                    ),
+                )
+
+    return _anthropic_client
+
+
+def _make_openai_session() -> requests.Session:
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=LLM_HTTP_POOL_SIZE, pool_maxsize=LLM_HTTP_POOL_SIZE
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# The OpenAI SDK sends every request through this session's connection pool
+openai.requestssession = _make_openai_session()
+
+
+def estimate_llm_tokens(messages: list, max_tokens: Optional[int]) -> int:
+    """Rough token count for rate limiting: ~4 characters per prompt token, plus the completion budget."""
+    prompt_tokens = len(json.dumps(messages, default=str)) // 4
+    return prompt_tokens + (max_tokens or DEFAULT_MAX_TOKENS)
+
+
+def get_llm_rate_limit(provider: str, model: Optional[str]) -> dict:
+    return LLM_RATE_LIMITS.get((provider, model)) or LLM_RATE_LIMITS[(provider, None)]
+
+
+def acquire_llm_rate_limit(provider: str, model: Optional[str], tokens: int) -> bool:
+    """Blocks until the shared request and token buckets for this provider and model have room.
+
+    Every worker draws from the same Redis buckets, so together they stay
+    under the provider quota. If Redis is unavailable, or the wait would exceed
+    LLM_RATE_LIMIT_MAX_WAIT_SECONDS, the call goes ahead and any 429 is handled
+    by the retry backoff.
+
+    Returns:
+        bool: True if the limiter granted the call, False if it was skipped
+    """
+    limit = get_llm_rate_limit(provider, model)
+    model_key = model or "default"
+    return acquire_rate_limit(
+        [
+            TokenBucket(
+                key=f"llm_rate_limit:{provider}:{model_key}:requests",
+                capacity=limit["requests_per_minute"],
+            ),
+            TokenBucket(
+                key=f"llm_rate_limit:{provider}:{model_key}:tokens",
+                capacity=limit["tokens_per_minute"],
+                cost=tokens,
+            ),
+        ],
+        max_wait_seconds=LLM_RATE_LIMIT_MAX_WAIT_SECONDS,
+    )
+
+
+def get_llm_error_status_code(exception: Exception) -> Optional[int]:
+    # anthropic.APIStatusError uses status_code, openai.error.OpenAIError uses http_status
+    return getattr(exception, "status_code", None) or getattr(
+        exception, "http_status", None
+    )
+
+
+def get_llm_retry_after(exception: Exception) -> Optional[float]:
+    """Reads the Retry-After header (seconds or HTTP date) off a provider error, if there is one."""
+    headers = None
+    response = getattr(exception, "response", None)
+    if response is not None and getattr(response, "headers", None) is not None:
+        headers = response.headers
+    elif getattr(exception, "headers", None) is not None:
+        headers = exception.headers
+    if not headers:
+        return None
+
+    retry_after = headers.get("retry-after") or headers.get("Retry-After")
+    if not retry_after:
+        return None
+
+    try:
+        return max(0.0, float(retry_after))
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def get_llm_retry_delay(exception: Exception, attempt: int) -> float:
+    """Seconds to wait before retry number `attempt`, honoring Retry-After when the provider sends it."""
+    retry_after = get_llm_retry_after(exception)
+    if retry_after is not None:
+        return min(retry_after, LLM_BACKOFF_MAX_SECONDS) + random.uniform(0, 0.25)
+
+    return random.uniform(
+        0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2**attempt)
+    )
+
+
+def call_llm_with_retries(
+    provider: str,
+    model: Optional[str],
+    tokens: int,
+    create: Callable,
+    max_attempts: int = 3,
+):
+    """Runs `create` under the shared rate limiter, retrying with exponential backoff and jitter.
+
+    Errors that won't change on retry (bad request, auth, not found) are
+    raised straight away.
+    """
+    attempts = 0
+    exception = None
+    while attempts < max_attempts:
+        acquire_llm_rate_limit(provider, model, tokens)
+        try:
+            return create()
+        except Exception as e:
+            attempts += 1
+            exception = e
+            if get_llm_error_status_code(e) in LLM_NON_RETRYABLE_STATUS_CODES:
+                break
+            if attempts < max_attempts:
+                time.sleep(get_llm_retry_delay(e, attempts))
+    raise Exception(exception)
+
 
 def wrapped_create_completion(
     model: str,
@@ -148,6 +339,8 @@ def wrapped_chat_gpt_completion(
     max_attempts: int = 3,
     tools: Optional[list] = None,
     response_format: Optional[dict] = None, #only used for chatGPT
+    use_cache: bool = False,
+    cache_ttl: Optional[int] = None,
 ) -> str:
     """
     Generates a completion using a GPT model.
@@ -164,8 +357,62 @@ def wrapped_chat_gpt_completion(
         }
         ...
     ]
+
+    Set use_cache for deterministic prompts (ideally temperature 0): identical
+    requests are then answered from the shared LLM response cache.
     """
+    cache_key = None
+    if use_cache and not is_llm_cache_bypassed():
+        cache_key = make_llm_cache_key(
+            "anthropic" if model.startswith("claude-") else "openai",
+            model,
+            messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            n=n,
+            frequency_penalty=frequency_penalty,
+            stop=stop,
+            tools=tools,
+            response_format=response_format,
+        )
+        cached = llm_response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    completion = _create_chat_completion(
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        top_p=top_p,
+        n=n,
+        frequency_penalty=frequency_penalty,
+        stop=stop,
+        model=model,
+        max_attempts=max_attempts,
+        tools=tools,
+        response_format=response_format,
+    )
+
+    if cache_key and completion:
+        llm_response_cache.set(cache_key, completion, ttl=cache_ttl)
 
+    return completion
+
+
+def _create_chat_completion(
+    messages: list,
+    max_tokens: Optional[int],
+    temperature: Optional[float],
+    top_p: Optional[float],
+    n: Optional[int],
+    frequency_penalty: Optional[float],
+    stop: Optional[Union[str, list]],
+    model: str,
+    max_attempts: int,
+    tools: Optional[list],
+    response_format: Optional[dict],
+) -> str:
     # Anthropic
     if model.startswith("claude-"):
         message = wrapped_claude_completion(
@@ -211,27 +458,20 @@ def wrapped_claude_completion(
     tools: Optional[list] = None,
     max_attempts: int = 3,
 ):
-    attempts = 0
-    exception = None
-    while attempts < max_attempts:
-        try:
-            response = anthropic.Anthropic(
-                api_key=os.environ.get("ANTHROPIC_API_KEY")
-            ).messages.create(
-                model=model,
-                max_tokens=max_tokens,
-                messages=messages,
-                temperature=temperature,
-                top_p=top_p,
-                # tools=tools,
-            )
-            return response
-        except Exception as e:
-            attempts += 1
-            # Add a random delay before the next attempt
-            exception = e
-            time.sleep(random.uniform(0.5, 1.5))
-    raise Exception(exception)
+    return call_llm_with_retries(
+        provider="anthropic",
+        model=model,
+        tokens=estimate_llm_tokens(messages, max_tokens),
+        create=lambda: get_anthropic_client().messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            messages=messages,
+            temperature=temperature,
+            top_p=top_p,
+            # tools=tools,
+        ),
+        max_attempts=max_attempts,
+    )
 
 
 def wrapped_chat_gpt_completion_with_history(
@@ -299,29 +539,25 @@ def attempt_chat_completion(
     max_attempts: int = 3,
     response_format: Optional[dict] = None,
 ):
-    attempts = 0
-    exception = None
-    while attempts < max_attempts:
-        try:
-            response = openai.ChatCompletion.create(
-                engine=AZURE_OPENAI_GPT_4_ENGINE if USE_AZURE_ENGINE else None,
-                model='gpt-4o-2024-08-06' if response_format else (None if USE_AZURE_ENGINE else model),
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                top_p=top_p,
-                n=n,
-                frequency_penalty=frequency_penalty,
-                stop=stop,
-                response_format=response_format,
-            )
-            return response
-        except Exception as e:
-            attempts += 1
-            # Add a random delay before the next attempt
-            exception = e
-            time.sleep(random.uniform(0.5, 1.5))
-    raise Exception(exception)
+    request_model = "gpt-4o-2024-08-06" if response_format else model
+    return call_llm_with_retries(
+        provider="openai",
+        model=request_model,
+        tokens=estimate_llm_tokens(messages, max_tokens),
+        create=lambda: openai.ChatCompletion.create(
+            engine=AZURE_OPENAI_GPT_4_ENGINE if USE_AZURE_ENGINE else None,
+            model=request_model if response_format else (None if USE_AZURE_ENGINE else model),
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            n=n,
+            frequency_penalty=frequency_penalty,
+            stop=stop,
+            response_format=response_format,
+        ),
+        max_attempts=max_attempts,
+    )
 
 
 def streamed_chat_completion(
@@ -334,6 +570,9 @@ def streamed_chat_completion(
     stop: Optional[Union[str, list]] = DEFAULT_STOP,
     model: str = OPENAI_CHAT_GPT_3_5_TURBO_MODEL,
 ):
+    acquire_llm_rate_limit(
+        "openai", model, estimate_llm_tokens(messages, max_tokens)
+    )
     stream_response = openai.ChatCompletion.create(
         engine=AZURE_OPENAI_GPT_4_ENGINE if USE_AZURE_ENGINE else None,
         model=None if USE_AZURE_ENGINE else model,
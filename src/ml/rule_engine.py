@@ -1,9 +1,11 @@
 from typing import Optional
-from bs4 import BeautifulSoup
 import demoji
 import emoji
+import html
+import os
 import requests
 import json
+import threading
 import yaml
 import csv
 import regex as re
@@ -30,6 +32,253 @@ company_suffix_csv_path = r"src/../datasets/company_suffixes.csv"
 
 SUBJECT_LINE_CHARACTER_LIMIT = 100
 
+# Compiled once per process, rather than on every rule call
+NON_ALPHANUMERIC_REGEX = re.compile("[^0-9a-zA-Z]+")
+MD_TITLE_REGEX = re.compile("[^a-zA-Z][mM][.]?[dD][.]?[^a-zA-Z]?")
+SYMBOL_OR_PUNCTUATION_REGEX = re.compile(r"[\p{S}\p{P}]")
+HTML_TAG_REGEX = re.compile(r"<[^>]*>")
+
+
+class MessageRuleEngine:
+    """Runs the message ruleset, with its datasets loaded once per process.
+
+    The word lists are read from the dataset files the first time they're
+    needed and cached. Every run checks the files' modification times and
+    reloads any dataset whose file changed, so edits are picked up without a
+    restart.
+    """
+
+    DATASET_PATHS = {
+        "profanity": profanity_csv_path,
+        "web_blacklist": web_blacklist_path,
+        "dr_positions": dr_positions_path,
+        "company_suffixes": company_suffix_csv_path,
+    }
+
+    def __init__(self):
+        self._datasets: dict[str, set] = {}
+        self._mtimes: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reload_if_changed(self):
+        """Reloads the datasets whose files changed since they were loaded."""
+        for name, path in self.DATASET_PATHS.items():
+            if self._mtimes.get(name) != os.path.getmtime(path):
+                self._load_dataset(name, path)
+
+    def get_dataset(self, name: str) -> set:
+        if name not in self._datasets:
+            self._load_dataset(name, self.DATASET_PATHS[name])
+        return self._datasets[name]
+
+    def _load_dataset(self, name: str, path: str):
+        with self._lock:
+            mtime = os.path.getmtime(path)
+            with open(path, newline="") as f:
+                rows = list(csv.reader(f))
+
+            if name == "dr_positions":
+                self._datasets["dr_assistant_positions"] = set(
+                    [row[1].strip() for row in rows if len(row) > 1]
+                )
+            self._datasets[name] = set([row[0] for row in rows])
+            self._mtimes[name] = mtime
+
+    def evaluate(
+        self,
+        message: GeneratedMessage,
+        prospect_name: str,
+        client_sdr_id: int,
+        blacklist_words: Optional[list] = None,
+    ) -> tuple[list, list, list]:
+        """Runs every rule against a message, without touching the database.
+
+        Args:
+            message (GeneratedMessage): The message to check
+            prospect_name (str): The prospect's full name
+            client_sdr_id (int): The SDR who owns the prospect
+            blacklist_words (Optional[list]): The SDR's blacklisted words
+
+        Returns:
+            tuple[list, list, list]: The problems, blocking_problems, and highlighted_words
+        """
+        prompt = message.prompt
+        case_preserved_completion = message.completion
+        completion = message.completion.lower()
+
+        # If the message is an email, we need to strip the HTML tags
+        if message.message_type == GeneratedMessageType.EMAIL:
+            # Add spaces between HTML tags, then remove the tags
+            completion = html.unescape(
+                HTML_TAG_REGEX.sub("", completion.replace(">", "> "))
+            )
+
+        problems = []
+        blocking_problems = []
+        highlighted_words = []
+
+        # Hallucination check for Linkedin only
+        # if message.message_type == GeneratedMessageType.LINKEDIN:
+        #     rule_no_hallucinations(
+        #         message_id=message_id,
+        #         problems=problems,
+        #         blocking_problems=blocking_problems,
+        #         highlighted_words=highlighted_words,
+        #     )
+
+        # Strict Rules
+        rule_no_profanity(
+            completion=completion,
+            problems=problems,
+            blocking_problems=blocking_problems,
+            highlighted_words=highlighted_words,
+        )
+        # rule_no_url(completion, problems, highlighted_words)
+        rule_linkedin_length(
+            message_type=message.message_type,
+            completion=completion,
+            problems=problems,
+            blocking_problems=blocking_problems,
+            highlighted_words=highlighted_words,
+        )
+        if (
+            message.message_type == GeneratedMessageType.LINKEDIN
+        ):  # Only apply this rule to LinkedIn messages
+            rule_address_doctor(
+                prompt, completion, problems, highlighted_words, prospect_name
+            )
+        rule_no_brackets(
+            completion=completion,
+            problems=problems,
+            blocking_problems=blocking_problems,
+            highlighted_words=highlighted_words,
+        )
+
+        # Warnings
+        rule_no_cookies(completion, problems, highlighted_words)
+        rule_no_symbols(completion, problems, highlighted_words, message.message_type)
+        rule_no_companies(completion, problems, highlighted_words)
+        rule_catch_strange_titles(completion, prompt, problems, highlighted_words)
+        rule_no_hard_years(completion, prompt, problems, highlighted_words)
+        # rule_catch_im_a(completion, prompt, problems, highlighted_words)
+        # rule_catch_no_i_have(completion, prompt, problems, highlighted_words)
+
+        if message.message_type != GeneratedMessageType.EMAIL:
+            rule_catch_has_6_or_more_consecutive_upper_case(
+                case_preserved_completion, prompt, problems, highlighted_words
+            )
+        # rule_no_ampersand(completion, problems, highlighted_words)
+        rule_no_fancying_a_chat(completion, problems, highlighted_words)
+
+        # if message.message_type != GeneratedMessageType.EMAIL:
+        #     rule_no_ingratiation(completion, problems, highlighted_words)
+
+        rule_no_sdr_blacklist_words(
+            completion=completion,
+            problems=problems,
+            blocking_problems=blocking_problems,
+            highlighted_words=highlighted_words,
+            client_sdr_id=client_sdr_id,
+            blacklist_words=blacklist_words,
+        )
+
+        # Only run for Email Subject Lines
+        if (
+            message.message_type == GeneratedMessageType.EMAIL
+            and message.email_type == GeneratedMessageEmailType.SUBJECT_LINE
+        ):
+            rule_subject_line_character_limit(
+                completion=completion,
+                problems=problems,
+                blocking_problems=blocking_problems,
+            )
+
+        # Only run for linkedin:
+        if message.message_type == GeneratedMessageType.LINKEDIN:
+            if " me " in completion:
+                problems.append("Contains 'me'.")
+                highlighted_words.append("me")
+
+            if "they've worked " in completion:
+                problems.append("Contains 'they've worked'.")
+                highlighted_words.append("they've worked")
+
+            if "i've spent" in completion:
+                problems.append("Contains 'i've spent'.")
+                highlighted_words.append("i've spent")
+
+            if "stealth" in completion:
+                problems.append(
+                    "Contains 'stealth'. Check if they are referring to a past job."
+                )
+                highlighted_words.append("stealth")
+
+        highlighted_words = list(filter(lambda x: x != ".", highlighted_words))
+
+        return problems, blocking_problems, highlighted_words
+
+    def run_batch(
+        self, message_ids: list[int], autocorrect: bool = True
+    ) -> dict[int, list]:
+        """Runs the ruleset on many messages, loading everything it needs in one query.
+
+        Args:
+            message_ids (list[int]): The message IDs to run the ruleset against
+            autocorrect (bool, optional): Whether to autocorrect LinkedIn messages, like run_message_rule_engine does
+
+        Returns:
+            dict[int, list]: message_id -> problems
+        """
+        if not message_ids:
+            return {}
+
+        self.reload_if_changed()
+
+        rows = (
+            db.session.query(GeneratedMessage, Prospect.full_name, ClientSDR)
+            .join(Prospect, Prospect.id == GeneratedMessage.prospect_id)
+            .outerjoin(ClientSDR, ClientSDR.id == Prospect.client_sdr_id)
+            .filter(GeneratedMessage.id.in_(message_ids))
+            .all()
+        )
+
+        results = {}
+        autocorrect_ids = []
+        for message, prospect_name, client_sdr in rows:
+            # A prospect without an SDR has no blacklist to check
+            problems, blocking_problems, highlighted_words = self.evaluate(
+                message=message,
+                prospect_name=prospect_name,
+                client_sdr_id=client_sdr.id if client_sdr else None,
+                blacklist_words=(client_sdr.blacklisted_words if client_sdr else None)
+                or [],
+            )
+            message.problems = problems
+            message.blocking_problems = blocking_problems
+            message.highlighted_words = highlighted_words
+            message.unknown_named_entities = []
+            results[message.id] = problems
+
+            if autocorrect and message.message_type == GeneratedMessageType.LINKEDIN:
+                if not is_autocorrect_eligible(message):
+                    continue
+                if len(problems) == 0:
+                    # Nothing to correct, so the ruleset result stays the same
+                    mark_autocorrected(message, message.completion)
+                else:
+                    autocorrect_ids.append(message.id)
+
+        db.session.commit()
+
+        for message_id in autocorrect_ids:
+            run_autocorrect(message_id)
+            results[message_id] = GeneratedMessage.query.get(message_id).problems
+
+        return results
+
+
+message_rule_engine = MessageRuleEngine()
+
 
 def get_adversarial_ai_approval(prompt):
     OPENAI_URL = "https://api.openai.com/v1/completions"
@@ -170,174 +419,51 @@ def run_message_rule_engine(message_id: int):
     Args:
         message_id (int): The message ID to run the ruleset against.
 
+    Raises:
+        ValueError: If the message or its prospect doesn't exist
+
     Returns:
-        bool: Whether the message passes the ruleset.
+        list: The problems found in the message.
     """
-    # Wipe problems before running the ruleset
-    wipe_problems(message_id)
+    results = message_rule_engine.run_batch([message_id])
+    if message_id not in results:
+        raise ValueError(f"Message {message_id} or its prospect does not exist")
 
-    message: GeneratedMessage = GeneratedMessage.query.get(message_id)
-    if message.message_cta:
-        cta: GeneratedMessageCTA = GeneratedMessageCTA.query.get(message.message_cta)
-    else:
-        cta = None
-    prompt = message.prompt
-    case_preserved_completion = message.completion
-    completion = message.completion.lower()
-
-    # If the message is an email, we need to strip the HTML tags
-    if message.message_type == GeneratedMessageType.EMAIL:
-        # Add spaces between HTML tags
-        completion = re.sub(r">", "> ", completion)
-
-        # Remove HTML tags
-        soup = BeautifulSoup(completion, "html.parser")
-
-        # Get the text without HTML tags
-        completion = soup.get_text()
-
-    prospect: Prospect = Prospect.query.get(message.prospect_id)
-    prospect_name = prospect.full_name
-    client_id = prospect.client_id
-    client_sdr_id = prospect.client_sdr_id
-    client: Client = Client.query.get(client_id)
-    client_name = client.company
-    client_sdr: ClientSDR = ClientSDR.query.get(client_sdr_id)
-    whitelisted_names = [client_name, client_sdr.name]
+    return results[message_id]
 
-    problems = []
-    blocking_problems = []
-    highlighted_words = []
 
-    # Hallucination check for Linkedin only
-    # if message.message_type == GeneratedMessageType.LINKEDIN:
-    #     rule_no_hallucinations(
-    #         message_id=message_id,
-    #         problems=problems,
-    #         blocking_problems=blocking_problems,
-    #         highlighted_words=highlighted_words,
-    #     )
-
-    # Strict Rules
-    rule_no_profanity(
-        completion=completion,
-        problems=problems,
-        blocking_problems=blocking_problems,
-        highlighted_words=highlighted_words,
-    )
-    # rule_no_url(completion, problems, highlighted_words)
-    rule_linkedin_length(
-        message_type=message.message_type,
-        completion=completion,
-        problems=problems,
-        blocking_problems=blocking_problems,
-        highlighted_words=highlighted_words,
-    )
-    if (
-        message.message_type == GeneratedMessageType.LINKEDIN
-    ):  # Only apply this rule to LinkedIn messages
-        rule_address_doctor(
-            prompt, completion, problems, highlighted_words, prospect_name
-        )
-    rule_no_brackets(
-        completion=completion,
-        problems=problems,
-        blocking_problems=blocking_problems,
-        highlighted_words=highlighted_words,
-    )
-
-    # Warnings
-    rule_no_cookies(completion, problems, highlighted_words)
-    rule_no_symbols(completion, problems, highlighted_words, message.message_type)
-    rule_no_companies(completion, problems, highlighted_words)
-    rule_catch_strange_titles(completion, prompt, problems, highlighted_words)
-    rule_no_hard_years(completion, prompt, problems, highlighted_words)
-    # rule_catch_im_a(completion, prompt, problems, highlighted_words)
-    # rule_catch_no_i_have(completion, prompt, problems, highlighted_words)
-
-    if message.message_type != GeneratedMessageType.EMAIL:
-        rule_catch_has_6_or_more_consecutive_upper_case(
-            case_preserved_completion, prompt, problems, highlighted_words
-        )
-    # rule_no_ampersand(completion, problems, highlighted_words)
-    rule_no_fancying_a_chat(completion, problems, highlighted_words)
-
-    # if message.message_type != GeneratedMessageType.EMAIL:
-    #     rule_no_ingratiation(completion, problems, highlighted_words)
-
-    rule_no_sdr_blacklist_words(
-        completion=completion,
-        problems=problems,
-        blocking_problems=blocking_problems,
-        highlighted_words=highlighted_words,
-        client_sdr_id=client_sdr_id,
-    )
-
-    # Only run for Email Subject Lines
+def is_autocorrect_eligible(message: GeneratedMessage) -> bool:
+    """Autocorrect only ever runs once per message"""
+    if message.autocorrect_run_count is not None and message.autocorrect_run_count > 0:
+        return False
     if (
-        message.message_type == GeneratedMessageType.EMAIL
-        and message.email_type == GeneratedMessageEmailType.SUBJECT_LINE
+        message.before_autocorrect_text
+        or message.after_autocorrect_text
+        or message.before_autocorrect_problems
     ):
-        rule_subject_line_character_limit(
-            completion=completion,
-            problems=problems,
-            blocking_problems=blocking_problems,
-        )
-
-    # Only run for linkedin:
-    if message.message_type == GeneratedMessageType.LINKEDIN:
-        if " me " in completion:
-            problems.append("Contains 'me'.")
-            highlighted_words.append("me")
+        return False
+    return True
 
-        if "they've worked " in completion:
-            problems.append("Contains 'they've worked'.")
-            highlighted_words.append("they've worked")
-
-        if "i've spent" in completion:
-            problems.append("Contains 'i've spent'.")
-            highlighted_words.append("i've spent")
-
-        if "stealth" in completion:
-            problems.append(
-                "Contains 'stealth'. Check if they are referring to a past job."
-            )
-            highlighted_words.append("stealth")
 
-    highlighted_words = list(filter(lambda x: x != ".", highlighted_words))
-
-    message: GeneratedMessage = GeneratedMessage.query.get(message_id)
-    message.problems = problems
-    message.blocking_problems = blocking_problems
-    message.highlighted_words = highlighted_words
-    db.session.add(message)
-    db.session.commit()
-
-    # only run autocorrect for Linkedin
-    if message.message_type == GeneratedMessageType.LINKEDIN:
-        run_autocorrect(message_id)
-
-    return problems
+def mark_autocorrected(message: GeneratedMessage, after_autocorrect_text: str):
+    message.autocorrect_run_count = (
+        message.autocorrect_run_count + 1 if message.autocorrect_run_count else 1
+    )
+    message.before_autocorrect_text = message.completion
+    message.before_autocorrect_problems = message.problems
+    message.after_autocorrect_text = after_autocorrect_text
+    message.completion = after_autocorrect_text
 
 
 def run_autocorrect(message_id: int):
     message: GeneratedMessage = GeneratedMessage.query.get(message_id)
-    if message.autocorrect_run_count is not None and message.autocorrect_run_count > 0:
-        return
-    if (
-        message.before_autocorrect_text
-        or message.after_autocorrect_text
-        or message.before_autocorrect_problems
-    ):
+    if not is_autocorrect_eligible(message):
         return
 
     # todo(Aakash) eventually enable this for both Linkedin and Email. For now, only run for Linkedin
     # if message.message_type != GeneratedMessageType.LINKEDIN:
     #     return
 
-    before_autocorrect_text = message.completion
-    before_autocorrect_problems = message.problems
-
     if len(message.problems) > 0:
         after_autocorrect_text = get_aree_fix_basic(message_id)
 
@@ -348,13 +474,7 @@ def run_autocorrect(message_id: int):
     else:
         after_autocorrect_text = message.completion
 
-    message.autocorrect_run_count = (
-        message.autocorrect_run_count + 1 if message.autocorrect_run_count else 1
-    )
-    message.before_autocorrect_text = before_autocorrect_text
-    message.before_autocorrect_problems = before_autocorrect_problems
-    message.after_autocorrect_text = after_autocorrect_text
-    message.completion = after_autocorrect_text
+    mark_autocorrected(message, after_autocorrect_text)
     db.session.add(message)
     db.session.commit()
 
@@ -428,24 +548,23 @@ def rule_no_sdr_blacklist_words(
     blocking_problems: list,
     highlighted_words: list,
     client_sdr_id: int,
+    blacklist_words: Optional[list] = None,
 ):
     """Rule (blocking): No SDR Blacklist Words
 
-    No SDR blacklist words allowed in the completion.
+    No SDR blacklist words allowed in the completion. Pass `blacklist_words` if
+    the SDR is already loaded, to skip the lookup.
     """
-    client_sdr: ClientSDR = ClientSDR.query.get(client_sdr_id)
-    blacklist_words = client_sdr.blacklisted_words
+    if blacklist_words is None:
+        client_sdr: ClientSDR = ClientSDR.query.get(client_sdr_id)
+        blacklist_words = client_sdr.blacklisted_words
     if not blacklist_words or len(blacklist_words) == 0:
         return
 
     # Check the message for blacklist words
     detected_blacklist_words = []
     for word in completion.split():
-        stripped_word = re.sub(
-            "[^0-9a-zA-Z]+",
-            "",
-            word,
-        ).strip()
+        stripped_word = NON_ALPHANUMERIC_REGEX.sub("", word).strip()
         if word.lower() in blacklist_words:
             detected_blacklist_words.append("'" + word + "'")
         elif stripped_word.lower() in blacklist_words:
@@ -489,58 +608,46 @@ def rule_address_doctor(
             name_section = section.lower()
 
     # Check if the title and name section contains a doctor title or 'MD'.
-    with open(dr_positions_path, newline="") as f:
-        reader = csv.reader(f)
-        dr_positions = set()
-        dr_assistant_positions = set()
-        for row in reader:
-            dr_positions.add(row[0])
-            if len(row) > 1:
-                dr_assistant_positions.add(row[1].strip())
-
-        title_splitted = title_section.split(" ")
-        name_splitted = name_section.split(" ")
-        for position, title in enumerate(title_splitted):
-            if title in dr_positions and "dr." not in completion:
-                if position + 1 < len(title_splitted):
-                    if title_splitted[position + 1] in dr_assistant_positions:
-                        continue
-                problems.append(
-                    f"The subject should be addressed as a Doctor. The subject's name is: {prospect_name}"
-                )
-                highlighted_words.extend(name_splitted)
-                return
-
-        title_search = re.search(
-            "[^a-zA-Z][mM][.]?[dD][.]?[^a-zA-Z]?",
-            title_section,
-        )
-        if title_search is not None and "dr." not in completion:
+    dr_positions = message_rule_engine.get_dataset("dr_positions")
+    dr_assistant_positions = message_rule_engine.get_dataset("dr_assistant_positions")
+
+    title_splitted = title_section.split(" ")
+    name_splitted = name_section.split(" ")
+    for position, title in enumerate(title_splitted):
+        if title in dr_positions and "dr." not in completion:
+            if position + 1 < len(title_splitted):
+                if title_splitted[position + 1] in dr_assistant_positions:
+                    continue
             problems.append(
                 f"The subject should be addressed as a Doctor. The subject's name is: {prospect_name}"
             )
             highlighted_words.extend(name_splitted)
             return
 
-        for name in name_splitted:
-            if name in dr_positions and "dr." not in completion:
-                problems.append(
-                    f"The subject should be addressed as a Doctor. The subject's name is: {prospect_name}"
-                )
-                highlighted_words.extend(name_splitted)
-                return
-
-        name_search = re.search(
-            "[^a-zA-Z][mM][.]?[dD][.]?[^a-zA-Z]?",
-            name_section,
+    title_search = MD_TITLE_REGEX.search(title_section)
+    if title_search is not None and "dr." not in completion:
+        problems.append(
+            f"The subject should be addressed as a Doctor. The subject's name is: {prospect_name}"
         )
-        if name_search is not None and "dr." not in completion:
+        highlighted_words.extend(name_splitted)
+        return
+
+    for name in name_splitted:
+        if name in dr_positions and "dr." not in completion:
             problems.append(
                 f"The subject should be addressed as a Doctor. The subject's name is: {prospect_name}"
             )
             highlighted_words.extend(name_splitted)
             return
 
+    name_search = MD_TITLE_REGEX.search(name_section)
+    if name_search is not None and "dr." not in completion:
+        problems.append(
+            f"The subject should be addressed as a Doctor. The subject's name is: {prospect_name}"
+        )
+        highlighted_words.extend(name_splitted)
+        return
+
     return
 
 
@@ -551,17 +658,11 @@ def rule_no_profanity(
 
     No profanity allowed in the completion.
     """
-    with open(profanity_csv_path, newline="") as f:
-        reader = csv.reader(f)
-        profanity = set([row[0] for row in reader])
+    profanity = message_rule_engine.get_dataset("profanity")
 
     detected_profanities = []
     for word in completion.split():
-        stripped_word = re.sub(
-            "[^0-9a-zA-Z]+",
-            "",
-            word,
-        ).strip()
+        stripped_word = NON_ALPHANUMERIC_REGEX.sub("", word).strip()
         if word in profanity:
             detected_profanities.append("'" + word + "'")
         elif stripped_word in profanity:
@@ -584,17 +685,11 @@ def rule_no_cookies(completion: str, problems: list, highlighted_words: list):
 
     No cookies, or any other web related things, allowed in the completion.
     """
-    with open(web_blacklist_path, newline="") as f:
-        reader = csv.reader(f)
-        web_blacklist = set([row[0] for row in reader])
+    web_blacklist = message_rule_engine.get_dataset("web_blacklist")
 
     detected_cookies = []
     for word in completion.split():
-        stripped_word = re.sub(
-            "[^0-9a-zA-Z]+",
-            "",
-            word,
-        ).strip()
+        stripped_word = NON_ALPHANUMERIC_REGEX.sub("", word).strip()
         if word in web_blacklist:
             detected_cookies.append("'" + word + "'")
         elif stripped_word in web_blacklist:
@@ -651,17 +746,11 @@ def rule_no_companies(completion: str, problems: list, highlighted_words: list):
 
     No company abbreviations allowed in the completion. ie 'LLC', 'Inc.'
     """
-    with open(company_suffix_csv_path, newline="") as f:
-        reader = csv.reader(f)
-        company_suffixes = set([row[0] for row in reader])
+    company_suffixes = message_rule_engine.get_dataset("company_suffixes")
 
     detected_abbreviations = []
     for word in completion.split():
-        stripped_word = re.sub(
-            "[^0-9a-zA-Z]+",
-            "",
-            word,
-        ).strip()
+        stripped_word = NON_ALPHANUMERIC_REGEX.sub("", word).strip()
         if stripped_word in company_suffixes:
             highlighted_words.append(stripped_word)
             detected_abbreviations.append(stripped_word)
@@ -747,7 +836,7 @@ def rule_catch_strange_titles(
 
     if title_section in completion.lower():
         ALLOWED_SYMBOLS = ["'"]
-        unfiltered_match = re.findall(r"[\p{S}\p{P}]", title_section)
+        unfiltered_match = SYMBOL_OR_PUNCTUATION_REGEX.findall(title_section)
         match = list(filter(lambda x: x not in ALLOWED_SYMBOLS, unfiltered_match))
         if match and len(match) > 0:
             highlighted_words.append(title_section_case_preserved)
@@ -44,10 +44,17 @@ import yaml
 from src.company.services import find_company_for_prospect
 from src.research.website.serp_helpers import search_google_news, search_google_news_raw
 from src.utils.abstract.attr_utils import deep_get
+from src.ml.llm_cache import (
+    is_llm_cache_bypassed,
+    llm_response_cache,
+    make_llm_cache_key,
+)
 
 import os
 
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY", "")
+# Perplexity answers come from live search, so don't keep them as long as plain completions
+PERPLEXITY_CACHE_TTL_SECONDS = 60 * 60 * 24
 
 
 DEFAULT_MONTHLY_ML_FETCHING_CREDITS = 5000
@@ -1246,10 +1253,17 @@ def get_perplexity_research(prospect_id: int, client_sdr_id: int) -> str:
     return response["content"]
 
 
-def get_perplexity_response(model: str, messages: list) -> dict:
+def get_perplexity_response(model: str, messages: list, use_cache: bool = False) -> dict:
     import requests
     import json
 
+    cache_key = None
+    if use_cache and not is_llm_cache_bypassed():
+        cache_key = make_llm_cache_key("perplexity", model, messages)
+        cached = llm_response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     url = "https://api.perplexity.ai/chat/completions"
     payload = {"model": model, "messages": messages, "return_citations": True, "return_images": True}
     headers = {
@@ -1267,6 +1281,9 @@ def get_perplexity_response(model: str, messages: list) -> dict:
         "images": x.get("images", [])
     }
 
+    if cache_key and result["content"]:
+        llm_response_cache.set(cache_key, result, ttl=PERPLEXITY_CACHE_TTL_SECONDS)
+
     return result
 
 
@@ -1,5 +1,8 @@
 import csv
 import re
+import threading
+from typing import Optional
+
 import nltk
 
 # nltk.download("wordnet")
@@ -9,15 +12,20 @@ spam_words_path = r"src/../datasets/spam_words.csv"
 # lemmatizer = WordNetLemmatizer()
 
 
+HTML_TAG_PATTERN = re.compile(r"<.*?>")
+NON_ALPHANUMERIC_PATTERN = re.compile(r"[^a-zA-Z0-9\s]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
 def normalize_word(word: str) -> str:
     # Convert to lower case
     word = word.lower()
 
     # replace all html tags
-    word = re.sub(r"<.*?>", " ", word)
+    word = HTML_TAG_PATTERN.sub(" ", word)
 
     # replace all non-alphanumeric characters with a space
-    word = re.sub(r"[^a-zA-Z0-9\s]", " ", word)
+    word = NON_ALPHANUMERIC_PATTERN.sub(" ", word)
 
     # try:  # Check for verb
     #     result = lemmatizer.lemmatize(word, pos="v")
@@ -37,11 +45,97 @@ def normalize_word(word: str) -> str:
     return word.strip()
 
 
-def run_algorithmic_spam_detection(text: str) -> dict:
+class SpamWordIndex:
+    """Normalized spam word list, loaded once per process on first use.
+
+    Every entry is kept in a frozenset and matched against whole normalized
+    tokens. Multi-word phrases are also kept in a word-level trie, so phrases
+    spread over several tokens can be found in one pass over the text.
+    """
+
+    def __init__(self, path: str = spam_words_path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._words: Optional[frozenset] = None
+        self._phrases: Optional[dict] = None
+
+    def load(self):
+        words = set()
+        phrases: dict = {}
+        with open(self.path, "r") as f:
+            reader = csv.reader(f)
+            for row in reader:
+                word = normalize_word(row[0])
+                words.add(word)
+
+                parts = word.split()
+                if len(parts) > 1:
+                    node = phrases
+                    for part in parts:
+                        node = node.setdefault(part, {})
+                    node[None] = " ".join(parts)  # Marks the end of a phrase
+
+        self._phrases = phrases
+        self._words = frozenset(words)
+
+    def _ensure_loaded(self):
+        if self._words is None:
+            with self._lock:
+                if self._words is None:
+                    self.load()
+
+    def find_spam_words(self, words: list[str]) -> list[str]:
+        """Returns the (normalized) words that are in the spam word list, in order."""
+        self._ensure_loaded()
+
+        return [word for word in words if len(word) > 0 and word in self._words]
+
+    def find_spam_phrases(self, words: list[str]) -> list[str]:
+        """Finds the multi-word phrases that span more than one (normalized) word.
+
+        Phrases inside a single word (e.g. 'click-here') are left to
+        find_spam_words. At each position the longest phrase wins, and its
+        words aren't matched again.
+        """
+        self._ensure_loaded()
+
+        # Split the words into parts, remembering which word each part came from
+        parts, word_indexes = [], []
+        for i, word in enumerate(words):
+            for part in word.split():
+                parts.append(part)
+                word_indexes.append(i)
+
+        detected = []
+        i = 0
+        while i < len(parts):
+            match, match_length = None, 0
+            node = self._phrases
+            for j in range(i, len(parts)):
+                node = node.get(parts[j])
+                if node is None:
+                    break
+                if None in node and word_indexes[j] != word_indexes[i]:
+                    match, match_length = node[None], j - i + 1
+
+            if match is None:
+                i += 1
+            else:
+                detected.append(match)
+                i += match_length
+
+        return detected
+
+
+spam_word_index = SpamWordIndex()
+
+
+def run_algorithmic_spam_detection(text: str, match_phrases: bool = False) -> dict:
     """Runs an algorithmic spam detection approach by using a list of spam words.
 
     Args:
         text (str): The text to be checked for spam.
+        match_phrases (bool, optional): Whether to also detect multi-word spam phrases written as separate words. Defaults to False, which keeps the single-word results.
 
     Returns:
         dict:
@@ -52,19 +146,11 @@ def run_algorithmic_spam_detection(text: str) -> dict:
             read_minutes_score (int): The score of the estimated read time of the text. Out of 100.
             total_score (int): The total score of the text. Out of 100.
     """
-    detected_spam = []
-
-    spam_words = []
-    with open(spam_words_path, "r") as f:
-        reader = csv.reader(f)
-        for row in reader:
-            spam_words.append(normalize_word(row[0]).lower())
-
-    words = re.split(r"\s+", text)
-    for word in words:
-        normalized_word = normalize_word(word).lower()
-        if len(normalized_word) > 0 and normalized_word in spam_words:
-            detected_spam.append(normalize_word(word).lower())
+    words = WHITESPACE_PATTERN.split(text)
+    normalized_words = [normalize_word(word) for word in words]
+    detected_spam = spam_word_index.find_spam_words(normalized_words)
+    if match_phrases:
+        detected_spam += spam_word_index.find_spam_phrases(normalized_words)
 
     text_length = len(words)
     read_minutes = (text_length // 130) + 1
@@ -82,3 +168,21 @@ def run_algorithmic_spam_detection(text: str) -> dict:
     }
 
     return results
+
+
+def run_algorithmic_spam_detection_batch(
+    texts: list[str], match_phrases: bool = False
+) -> list[dict]:
+    """Runs `run_algorithmic_spam_detection` on each text.
+
+    Args:
+        texts (list[str]): The texts to be checked for spam.
+        match_phrases (bool, optional): Whether to also detect multi-word spam phrases. Defaults to False.
+
+    Returns:
+        list[dict]: The results for each text, in order.
+    """
+    return [
+        run_algorithmic_spam_detection(text, match_phrases=match_phrases)
+        for text in texts
+    ]
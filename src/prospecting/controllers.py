@@ -31,8 +31,16 @@ from src.prospecting.services import (
     get_prospect_email_history,
     get_prospect_li_history,
     get_prospect_overall_history,
+    get_global_prospected_contacts_page,
     get_prospects_for_icp_table,
+    get_prospects_for_icp_table_page,
     global_prospected_contacts,
+    iter_global_prospected_contacts,
+    iter_prospects,
+    iter_prospects_for_icp_table,
+    GLOBAL_CONTACTS_FIELDS,
+    ICP_TABLE_FIELDS,
+    PROSPECT_STREAM_FIELDS,
     inbox_restructure_fetch_prospects,
     move_prospect_to_persona,
     patch_prospect,
@@ -50,6 +58,7 @@ from src.prospecting.nylas.services import (
     nylas_get_threads,
     nylas_get_messages,
 )
+from src.utils.streaming import STREAM_FORMATS, stream_rows
 from app import db
 
 from flask import Blueprint, jsonify, request, Response
@@ -877,6 +886,8 @@ def get_prospects_endpoint(client_sdr_id: int):
         - ordering (str) (optional): The ordering of the results
         - bumped (str) (optional): The bumped count of the prospect
         - show_purgatory (bool | 'ALL') (optional): Whether to show prospects in purgatory
+        - cursor (str) (optional): The `next_cursor` of the previous page, used instead of offset
+        - format (str) (optional): 'ndjson' or 'csv' to stream every matching prospect instead of a page
     """
     try:
         channel = (
@@ -963,6 +974,18 @@ def get_prospects_endpoint(client_sdr_id: int):
             )
             or None
         )
+        cursor = (
+            get_request_parameter(
+                "cursor", request, json=True, required=False, parameter_type=str
+            )
+            or None
+        )
+        stream_format = (
+            get_request_parameter(
+                "format", request, json=True, required=False, parameter_type=str
+            )
+            or None
+        )
 
     except Exception as e:
         return e.args[0], 400
@@ -974,22 +997,44 @@ def get_prospects_endpoint(client_sdr_id: int):
             if len(keys) != 2 or keys != {"field", "direction"}:
                 return jsonify({"message": "Invalid filters supplied to API"}), 400
 
+    if stream_format and stream_format not in STREAM_FORMATS:
+        return jsonify({"message": "Invalid format supplied to API"}), 400
+
+    filters = {
+        "query": query,
+        "channel": channel,
+        "status": status,
+        "persona_id": persona_id,
+        "ordering": ordering,
+        "bumped": bumped,
+        "show_purgatory": show_purgatory,
+        "prospect_id": prospect_id,
+        "icp_fit_score": icp_fit_score,
+    }
+    if stream_format:
+        try:
+            rows = iter_prospects(client_sdr_id=client_sdr_id, **filters)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+        return stream_rows(
+            rows,
+            stream_format,
+            fields=PROSPECT_STREAM_FIELDS,
+            filename="prospects.csv",
+        )
+
     start_time = time.time()
 
-    prospects_info: dict[int, list[Prospect]] = get_prospects(
-        client_sdr_id=client_sdr_id,
-        query=query,
-        channel=channel,
-        status=status,
-        persona_id=persona_id,
-        limit=limit,
-        offset=offset,
-        ordering=ordering,
-        bumped=bumped,
-        show_purgatory=show_purgatory,
-        prospect_id=prospect_id,
-        icp_fit_score=icp_fit_score,
-    )
+    try:
+        prospects_info: dict[int, list[Prospect]] = get_prospects(
+            client_sdr_id=client_sdr_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            **filters,
+        )
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
     end_time = time.time()
     elapsed_time = end_time - start_time
@@ -1010,6 +1055,7 @@ def get_prospects_endpoint(client_sdr_id: int):
                     )
                     for p in prospects
                 ],
+                "next_cursor": prospects_info.get("next_cursor"),
                 "elapsed_time": elapsed_time,
             }
         ),
@@ -1027,6 +1073,46 @@ def get_prospects_for_icp(client_sdr_id: int):
     invited_on_linkedin = get_request_parameter(
         "invited_on_linkedin", request, json=True, required=False
     )
+    icp_fit_score = get_request_parameter(
+        "icp_fit_score", request, json=True, required=False, parameter_type=int
+    )
+    limit = get_request_parameter(
+        "limit", request, json=True, required=False, parameter_type=int
+    )
+    cursor = get_request_parameter(
+        "cursor", request, json=True, required=False, parameter_type=str
+    )
+    stream_format = get_request_parameter(
+        "format", request, json=True, required=False, parameter_type=str
+    )
+
+    if stream_format:
+        if stream_format not in STREAM_FORMATS:
+            return jsonify({"message": "Invalid format supplied to API"}), 400
+        return stream_rows(
+            iter_prospects_for_icp_table(
+                client_archetype_id=client_archetype_id,
+                invited_on_linkedin=invited_on_linkedin,
+                icp_fit_score=icp_fit_score,
+            ),
+            stream_format,
+            fields=ICP_TABLE_FIELDS,
+            filename="icp_prospects.csv",
+        )
+
+    # Paginated when a page size is given, otherwise every prospect as before
+    if limit and not get_sample:
+        try:
+            page = get_prospects_for_icp_table_page(
+                client_archetype_id=client_archetype_id,
+                limit=limit,
+                cursor=cursor,
+                invited_on_linkedin=invited_on_linkedin,
+                icp_fit_score=icp_fit_score,
+            )
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+        return jsonify({"message": "Success", "data": page}), 200
 
     prospects = get_prospects_for_icp_table(
         client_sdr_id=client_sdr_id,
@@ -2026,6 +2112,45 @@ def get_global_contacts(client_sdr_id: int):
         return jsonify({"message": "Client SDR not found"}), 404
 
     client_id: int = client_sdr.client_id
+
+    limit = get_request_parameter(
+        "limit", request, json=False, required=False, parameter_type=int
+    )
+    cursor = get_request_parameter(
+        "cursor", request, json=False, required=False, parameter_type=str
+    )
+    stream_format = get_request_parameter(
+        "format", request, json=False, required=False, parameter_type=str
+    )
+
+    if stream_format:
+        if stream_format not in STREAM_FORMATS:
+            return jsonify({"message": "Invalid format supplied to API"}), 400
+        return stream_rows(
+            iter_global_prospected_contacts(client_id=client_id),
+            stream_format,
+            fields=GLOBAL_CONTACTS_FIELDS,
+            filename="global_contacts.csv",
+        )
+
+    if limit:
+        try:
+            page = get_global_prospected_contacts_page(
+                client_id=client_id, limit=limit, cursor=cursor
+            )
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+        return (
+            jsonify(
+                {
+                    "message": "Success",
+                    "data": page["contacts"],
+                    "next_cursor": page["next_cursor"],
+                }
+            ),
+            200,
+        )
+
     contacts = global_prospected_contacts(
         client_id=client_id,
     )
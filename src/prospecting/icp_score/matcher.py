@@ -0,0 +1,947 @@
+import re
+from typing import Callable, Iterable, Optional
+
+
+def count_icp_attributes_from_ruleset(icp_scoring_ruleset) -> int:
+    """
+    Count the number of ICP attributes on an already-loaded ruleset.
+
+    Mirrors count_num_icp_attributes without the ruleset query.
+    """
+    if not icp_scoring_ruleset:
+        return 0
+
+    r = icp_scoring_ruleset
+    pairs = [
+        (r.included_individual_title_keywords, r.excluded_individual_title_keywords),
+        (
+            r.included_individual_seniority_keywords,
+            r.excluded_individual_seniority_keywords,
+        ),
+        (
+            r.included_individual_industry_keywords,
+            r.excluded_individual_industry_keywords,
+        ),
+        (
+            r.individual_years_of_experience_start,
+            r.individual_years_of_experience_end,
+        ),
+        (r.included_individual_skills_keywords, r.excluded_individual_skills_keywords),
+        (
+            r.included_individual_locations_keywords,
+            r.excluded_individual_locations_keywords,
+        ),
+        (
+            r.included_individual_generalized_keywords,
+            r.excluded_individual_generalized_keywords,
+        ),
+        (r.included_company_name_keywords, r.excluded_company_name_keywords),
+        (r.included_company_locations_keywords, r.excluded_company_locations_keywords),
+        (r.company_size_start, r.company_size_end),
+        (
+            r.included_company_industries_keywords,
+            r.excluded_company_industries_keywords,
+        ),
+        (
+            r.included_company_generalized_keywords,
+            r.excluded_company_generalized_keywords,
+        ),
+        (
+            r.included_individual_education_keywords,
+            r.excluded_individual_education_keywords,
+        ),
+    ]
+    return sum(1 for included, excluded in pairs if included or excluded)
+
+
+def count_icp_attributes_split_from_ruleset(icp_scoring_ruleset):
+    """
+    Count the (individual, company) ICP attributes on an already-loaded ruleset.
+
+    Mirrors count_num_icp_attributes_archetype / count_num_icp_attributes_segment
+    without the ruleset query.
+    """
+    if not icp_scoring_ruleset:
+        return 0
+
+    r = icp_scoring_ruleset
+    individual_fields = [
+        r.included_individual_title_keywords,
+        r.excluded_individual_title_keywords,
+        r.included_individual_seniority_keywords,
+        r.excluded_individual_seniority_keywords,
+        r.included_individual_industry_keywords,
+        r.excluded_individual_industry_keywords,
+        r.individual_years_of_experience_start or r.individual_years_of_experience_end,
+        r.included_individual_skills_keywords,
+        r.excluded_individual_skills_keywords,
+        r.included_individual_locations_keywords,
+        r.excluded_individual_locations_keywords,
+        r.included_individual_generalized_keywords,
+        r.excluded_individual_generalized_keywords,
+        r.included_individual_education_keywords,
+        r.excluded_individual_education_keywords,
+    ]
+    company_fields = [
+        r.included_company_name_keywords,
+        r.excluded_company_name_keywords,
+        r.included_company_locations_keywords,
+        r.excluded_company_locations_keywords,
+        r.company_size_start or r.company_size_end,
+        r.included_company_industries_keywords,
+        r.excluded_company_industries_keywords,
+        r.included_company_generalized_keywords,
+        r.excluded_company_generalized_keywords,
+    ]
+
+    individual_count = sum(1 for field in individual_fields if field)
+    company_count = sum(1 for field in company_fields if field)
+
+    if r.individual_ai_filters:
+        individual_count += len(r.individual_ai_filters)
+    if r.company_ai_filters:
+        company_count += len(r.company_ai_filters)
+
+    return individual_count, company_count
+
+
+class KeywordFamily:
+    """
+    One compiled keyword list (e.g. excluded_individual_title_keywords).
+
+    Matching is substring-based on lowercased text, exactly like the
+    `keyword.lower() in text.lower()` checks it replaces. A single combined
+    regex answers "does anything match?"; the ordered keyword scan only runs
+    when a match exists and the caller needs to know which keyword hit.
+    """
+
+    def __init__(self, keywords: Optional[list]):
+        self.keywords = keywords
+        self.active = bool(keywords)
+        self._lowered = (
+            tuple((keyword, keyword.lower()) for keyword in keywords)
+            if keywords
+            else ()
+        )
+        self._pattern = (
+            re.compile("|".join(re.escape(lower) for _, lower in self._lowered))
+            if self._lowered
+            else None
+        )
+
+    def search(self, text_lower: str) -> bool:
+        return self._pattern is not None and self._pattern.search(text_lower) is not None
+
+    def search_any(self, texts_lower: Iterable[str]) -> bool:
+        return any(self.search(text) for text in texts_lower)
+
+    def first(self, text_lower: str) -> str:
+        for keyword, lower in self._lowered:
+            if lower in text_lower:
+                return keyword
+        return ""
+
+    def all(self, text_lower: str) -> list:
+        return [keyword for keyword, lower in self._lowered if lower in text_lower]
+
+    def last_in_any(self, texts_lower: list) -> str:
+        # Legacy reasoning for list-valued fields (skills, education) reports
+        # the last keyword that matched any entry.
+        found = ""
+        for keyword, lower in self._lowered:
+            if any(lower in text for text in texts_lower):
+                found = keyword
+        return found
+
+
+class ICPScoringMatcher:
+    """
+    A compiled ICPScoringRuleset.
+
+    Compile once per scoring job with compile_icp_scoring_ruleset and score
+    any number of EnrichedProspectCompany rows without touching the database.
+    `score` reproduces score_one_prospect and `score_segment` reproduces
+    score_one_prospect_segment, including their score and reasoning strings.
+    """
+
+    def __init__(
+        self,
+        icp_scoring_ruleset,
+        num_attributes: Optional[int] = None,
+        dealbreaker: Optional[dict] = None,
+        on_error: Optional[Callable] = None,
+    ):
+        r = icp_scoring_ruleset
+        self.ruleset = r
+        self.num_attributes = (
+            num_attributes
+            if num_attributes is not None
+            else count_icp_attributes_from_ruleset(r)
+        )
+        if dealbreaker is None:
+            dealbreaker = (
+                {value: index for index, value in enumerate(r.dealbreakers)}
+                if r.dealbreakers
+                else {}
+            )
+        self.dealbreaker = dealbreaker
+        self.on_error = on_error
+
+        self.included_title = KeywordFamily(r.included_individual_title_keywords)
+        self.excluded_title = KeywordFamily(r.excluded_individual_title_keywords)
+        self.included_seniority = KeywordFamily(r.included_individual_seniority_keywords)
+        self.excluded_seniority = KeywordFamily(r.excluded_individual_seniority_keywords)
+        self.included_industry = KeywordFamily(r.included_individual_industry_keywords)
+        self.excluded_industry = KeywordFamily(r.excluded_individual_industry_keywords)
+        self.included_skills = KeywordFamily(r.included_individual_skills_keywords)
+        self.excluded_skills = KeywordFamily(r.excluded_individual_skills_keywords)
+        self.included_locations = KeywordFamily(r.included_individual_locations_keywords)
+        self.excluded_locations = KeywordFamily(r.excluded_individual_locations_keywords)
+        self.included_education = KeywordFamily(r.included_individual_education_keywords)
+        self.excluded_education = KeywordFamily(r.excluded_individual_education_keywords)
+        self.included_generalized = KeywordFamily(
+            r.included_individual_generalized_keywords
+        )
+        self.excluded_generalized = KeywordFamily(
+            r.excluded_individual_generalized_keywords
+        )
+        self.included_company_name = KeywordFamily(r.included_company_name_keywords)
+        self.excluded_company_name = KeywordFamily(r.excluded_company_name_keywords)
+        self.included_company_locations = KeywordFamily(
+            r.included_company_locations_keywords
+        )
+        self.excluded_company_locations = KeywordFamily(
+            r.excluded_company_locations_keywords
+        )
+        self.included_company_industries = KeywordFamily(
+            r.included_company_industries_keywords
+        )
+        self.excluded_company_industries = KeywordFamily(
+            r.excluded_company_industries_keywords
+        )
+        self.included_company_generalized = KeywordFamily(
+            r.included_company_generalized_keywords
+        )
+        self.excluded_company_generalized = KeywordFamily(
+            r.excluded_company_generalized_keywords
+        )
+
+        # Segment scoring checks education by exact membership, and its
+        # "excluded" branch reads the included keyword list.
+        self._education_exact_included = (
+            [keyword.lower() for keyword in r.included_individual_education_keywords]
+            if r.included_individual_education_keywords is not None
+            else None
+        )
+
+        self.yoe_start = r.individual_years_of_experience_start
+        self.yoe_end = r.individual_years_of_experience_end
+        self.company_size_start = r.company_size_start
+        self.company_size_end = r.company_size_end
+
+        self.individual_ai_filter_keys = [
+            f["key"] for f in (r.individual_ai_filters or [])
+        ]
+        self.company_ai_filter_keys = [f["key"] for f in (r.company_ai_filters or [])]
+
+    # ------------------------------------------------------------------ #
+    # score_one_prospect
+    # ------------------------------------------------------------------ #
+    def score(self, enriched_prospect_company) -> tuple:
+        """
+        Score one prospect. Returns (enriched_prospect_company, score, reasoning).
+        """
+        epc = enriched_prospect_company
+        num_attributes = self.num_attributes
+        score = 0
+        reasoning = ""
+
+        title = epc.prospect_title.lower() if epc.prospect_title else None
+        industry = epc.prospect_industry.lower() if epc.prospect_industry else None
+
+        # Prospect Title
+        if title and self.excluded_title.search(title):
+            score -= num_attributes
+            reasoning += "(❌ prospect title: " + self.excluded_title.first(title) + ") "
+        elif title and self.included_title.search(title):
+            score += 1
+            for keyword in self.included_title.all(title):
+                reasoning += "(✅ prospect title: " + keyword + ") "
+
+        # Prospect Seniority
+        if title and self.excluded_seniority.search(title):
+            score -= num_attributes
+            reasoning += (
+                "(❌ prospect seniority: " + self.excluded_seniority.first(title) + ") "
+            )
+        elif (
+            title
+            and self.included_title.active
+            and self.included_seniority.search(title)
+            and self.included_title.search(title)
+        ):
+            score += 1
+            for keyword in self.included_seniority.all(title):
+                reasoning += "(✅ prospect seniority: " + keyword + ") "
+
+        # Prospect Industry
+        if industry and self.excluded_industry.search(industry):
+            score -= num_attributes
+            reasoning += (
+                "(❌ prospect industry: " + self.excluded_industry.first(industry) + ") "
+            )
+        elif (
+            self.included_title.active
+            and industry
+            and self.included_industry.search(industry)
+        ):
+            score += 1
+            reasoning += (
+                "(✅ prospect industry: " + self.included_industry.first(industry) + ") "
+            )
+
+        # Prospect Years of Experience
+        yoe = epc.prospect_years_of_experience
+        if (
+            yoe
+            and (self.yoe_start and yoe >= self.yoe_start)
+            and (self.yoe_end and yoe <= self.yoe_end)
+        ):
+            score += 1
+            reasoning += "(✅ prospect years of experience: " + str(yoe) + ") "
+        elif yoe and (
+            (self.yoe_start and yoe < self.yoe_start)
+            or (self.yoe_end and yoe > self.yoe_end)
+        ):
+            score -= num_attributes
+            reasoning += "(❌ prospect years of experience: " + str(yoe) + ") "
+
+        # Prospect Skills
+        skills = (
+            [skill.lower() for skill in epc.prospect_skills]
+            if epc.prospect_skills
+            and (self.excluded_skills.active or self.included_skills.active)
+            else None
+        )
+        if skills and self.excluded_skills.search_any(skills):
+            score -= num_attributes
+            reasoning += (
+                "(❌ prospect skills: " + self.excluded_skills.last_in_any(skills) + ") "
+            )
+        elif skills and self.included_skills.search_any(skills):
+            score += 1
+            reasoning += (
+                "(✅ prospect skills: " + self.included_skills.last_in_any(skills) + ") "
+            )
+
+        # Locations Keywords
+        location = epc.prospect_location.lower() if epc.prospect_location else None
+        if location and self.excluded_locations.search(location):
+            score -= num_attributes
+            reasoning += (
+                "(❌ prospect location: " + self.excluded_locations.first(location) + ") "
+            )
+        elif location and self.included_locations.search(location):
+            score += 1
+            reasoning += (
+                "(✅ prospect location: " + self.included_locations.first(location) + ") "
+            )
+
+        # Prospect Education
+        educations = []
+        if epc.prospect_education_1:
+            educations.append(epc.prospect_education_1.lower())
+        if epc.prospect_education_2:
+            educations.append(epc.prospect_education_2.lower())
+        if educations and self.excluded_education.search_any(educations):
+            score -= num_attributes
+            reasoning += (
+                "(❌ prospect education: "
+                + self.excluded_education.last_in_any(educations)
+                + ") "
+            )
+        elif educations and self.included_education.search_any(educations):
+            score += 1
+            reasoning += (
+                "(✅ prospect education: "
+                + self.included_education.last_in_any(educations)
+                + ") "
+            )
+
+        # Prospect Generalized Keywords
+        dump = epc.prospect_dump.lower() if epc.prospect_dump else None
+        if dump and self.excluded_generalized.search(dump):
+            score -= num_attributes
+            reasoning += (
+                "(❌ general prospect info: " + self.excluded_generalized.first(dump) + ") "
+            )
+        elif dump and self.included_generalized.search(dump):
+            score += 1
+            reasoning += (
+                "(✅ general prospect info: " + self.included_generalized.first(dump) + ") "
+            )
+
+        # Company Name
+        company_name = epc.company_name.lower() if epc.company_name else None
+        if company_name and self.excluded_company_name.search(company_name):
+            score -= num_attributes
+            reasoning += (
+                "(❌ company name: " + self.excluded_company_name.first(company_name) + ") "
+            )
+        elif company_name and self.included_company_name.search(company_name):
+            score += 1
+            reasoning += (
+                "(✅ company name: " + self.included_company_name.first(company_name) + ") "
+            )
+
+        # Company Location Keywords
+        company_location = (
+            epc.company_location.lower() if epc.company_location else None
+        )
+        if company_location and self.excluded_company_locations.search(company_location):
+            score -= num_attributes
+            reasoning += (
+                "(❌ company location: "
+                + self.excluded_company_locations.first(company_location)
+                + ") "
+            )
+        elif company_location and self.included_company_locations.search(
+            company_location
+        ):
+            score += 1
+            reasoning += (
+                "(✅ company location: "
+                + self.included_company_locations.first(company_location)
+                + ") "
+            )
+        elif self.included_company_locations.active:
+            score -= num_attributes
+            reasoning += "(❌ company location: No Match)"
+
+        # Company Size
+        employee_count = epc.company_employee_count
+        if employee_count is not None and (
+            (
+                self.company_size_start
+                and employee_count
+                and int(employee_count) >= self.company_size_start
+            )
+            and (self.company_size_end and int(employee_count) <= self.company_size_end)
+        ):
+            score += 1
+            reasoning += "(✅ company size: " + str(employee_count) + ") "
+        elif employee_count is not None and (
+            (
+                self.company_size_start
+                and employee_count
+                and int(employee_count) < self.company_size_start
+            )
+            or (self.company_size_end and int(employee_count) > self.company_size_end)
+        ):
+            score -= num_attributes
+            reasoning += "(❌ company size: " + str(employee_count) + ") "
+
+        # Company Industry
+        if industry and self.excluded_company_industries.search(industry):
+            score -= num_attributes
+            reasoning += (
+                "(❌ company industry: "
+                + self.excluded_company_industries.first(industry)
+                + ") "
+            )
+        elif industry and self.included_company_industries.search(industry):
+            score += 1
+            reasoning += (
+                "(✅ company industry: "
+                + self.included_company_industries.first(industry)
+                + ") "
+            )
+
+        # Company Generalized Keywords
+        company_dump = epc.company_dump.lower() if epc.company_dump else None
+        if company_dump and self.excluded_company_generalized.search(company_dump):
+            score -= num_attributes
+            reasoning += (
+                "(❌ company general info: "
+                + self.excluded_company_generalized.first(company_dump)
+                + ") "
+            )
+        elif company_dump and self.included_company_generalized.search(company_dump):
+            score += 1
+            reasoning += (
+                "(✅ company general info: "
+                + self.included_company_generalized.first(company_dump)
+                + ") "
+            )
+
+        return epc, score, reasoning
+
+    def score_batch(self, enriched_prospect_companies: Iterable) -> list:
+        """
+        Score many prospects in one pass. Returns a list of
+        (enriched_prospect_company, score, reasoning) tuples.
+
+        A prospect that raises while scoring is skipped, just like a failed
+        score_one_prospect future was.
+        """
+        results = []
+        for epc in enriched_prospect_companies:
+            try:
+                results.append(self.score(epc))
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(epc, e)
+        return results
+
+    # ------------------------------------------------------------------ #
+    # score_one_prospect_segment
+    # ------------------------------------------------------------------ #
+    def score_segment(self, enriched_prospect_company) -> tuple:
+        """
+        Score the programmatic filters for one prospect. Returns
+        (enriched_prospect_company, score, company_score, individual_reasoning,
+        company_reasoning, reasoning).
+        """
+        epc = enriched_prospect_company
+        dealbreaker = self.dealbreaker
+
+        score = 0
+        company_score = 0
+        individual_reasoning = {}
+        company_reasoning = {}
+        reasoning = ""
+
+        def entry(answer, reason):
+            return {"answer": answer, "reasoning": reason, "source": "Linkedin"}
+
+        try:
+            prospect_title = epc.prospect_title
+            title = prospect_title.lower() if prospect_title else None
+
+            # Prospect Title
+            if self.excluded_title.active and title:
+                if not self.excluded_title.search(title):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning["excluded_individual_title_keywords"] = entry(
+                        "YES", prospect_title
+                    )
+                else:
+                    score = -1
+                    individual_reasoning["excluded_individual_title_keywords"] = entry(
+                        "NO", f"{prospect_title} - dealbreaker"
+                    )
+            if self.included_title.active and title:
+                if self.included_title.search(title):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning["included_individual_title_keywords"] = entry(
+                        "YES", prospect_title
+                    )
+                    reasoning += "(✅ prospect title: " + prospect_title + ") "
+                elif "included_individual_title_keywords" in dealbreaker:
+                    score = -1
+                    individual_reasoning["included_individual_title_keywords"] = entry(
+                        "NO", f"{prospect_title} - dealbreaker"
+                    )
+                else:
+                    individual_reasoning["included_individual_title_keywords"] = entry(
+                        "NO", f"{prospect_title}"
+                    )
+
+            # Prospect Seniority
+            if self.excluded_seniority.active and title:
+                if not self.excluded_seniority.search(title):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning["excluded_individual_seniority_keywords"] = entry(
+                        "YES", prospect_title
+                    )
+                else:
+                    score = -1
+                    individual_reasoning["excluded_individual_seniority_keywords"] = entry(
+                        "NO", f"{prospect_title} - dealbreaker"
+                    )
+            if self.included_seniority.active and self.included_title.active and title:
+                if self.included_seniority.search(title) and self.included_title.search(
+                    title
+                ):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning["included_individual_seniority_keywords"] = entry(
+                        "YES", prospect_title
+                    )
+                    reasoning += "(✅ prospect seniority: " + prospect_title + ") "
+                elif "included_individual_seniority_keywords" in dealbreaker:
+                    score = -1
+                    individual_reasoning["included_individual_seniority_keywords"] = entry(
+                        "NO", f"{prospect_title} - dealbreaker"
+                    )
+                else:
+                    individual_reasoning["included_individual_seniority_keywords"] = entry(
+                        "NO", f"{prospect_title}"
+                    )
+
+            # Prospect Industry
+            prospect_industry = epc.prospect_industry
+            industry = prospect_industry.lower() if prospect_industry else None
+            if self.excluded_industry.active and industry:
+                if not self.excluded_industry.search(industry):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning["excluded_individual_industry_keywords"] = entry(
+                        "YES", prospect_industry
+                    )
+                else:
+                    score = -1
+                    individual_reasoning["excluded_individual_industry_keywords"] = entry(
+                        "NO", f"{prospect_industry} - dealbreaker"
+                    )
+            if self.included_industry.active and industry:
+                if self.included_industry.search(industry):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning["included_individual_industry_keywords"] = entry(
+                        "YES", prospect_industry
+                    )
+                    reasoning += "(✅ prospect industry: " + prospect_industry + ") "
+                elif "included_individual_industry_keywords" in dealbreaker:
+                    score = -1
+                    individual_reasoning["included_individual_industry_keywords"] = entry(
+                        "NO", f"{prospect_industry} - dealbreaker"
+                    )
+                else:
+                    individual_reasoning["included_individual_industry_keywords"] = entry(
+                        "NO", f"{prospect_industry}"
+                    )
+
+            # Prospect Skills (the excluded check is inverted in the original
+            # scorer; kept as-is so scores do not shift)
+            prospect_skills = epc.prospect_skills
+            if self.excluded_skills.active and prospect_skills:
+                skills = ", ".join(prospect_skills)
+                if self.excluded_skills.search_any(
+                    skill.lower() for skill in prospect_skills
+                ):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning["excluded_individual_skills_keywords"] = entry(
+                        "YES", skills
+                    )
+                else:
+                    score = -1
+                    individual_reasoning["excluded_individual_skills_keywords"] = entry(
+                        "NO", f"{skills} - dealbreaker"
+                    )
+            if self.included_skills.active and prospect_skills:
+                skills = ", ".join(prospect_skills)
+                if self.included_skills.search_any(
+                    skill.lower() for skill in prospect_skills
+                ):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning["included_individual_skills_keywords"] = entry(
+                        "YES", skills
+                    )
+                    reasoning += "(✅ prospect skills: " + skills + ") "
+                elif "included_individual_skills_keywords" in dealbreaker:
+                    score = -1
+                    individual_reasoning["included_individual_skills_keywords"] = entry(
+                        "NO", f"{skills} - dealbreaker"
+                    )
+                else:
+                    individual_reasoning["included_individual_skills_keywords"] = entry(
+                        "NO", f"{skills}"
+                    )
+
+            # Prospect Locations
+            location = epc.prospect_location
+            if self.excluded_locations.active and location:
+                if not self.excluded_locations.search(location.lower()):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning["excluded_individual_locations_keywords"] = entry(
+                        "YES", location
+                    )
+                    reasoning += "(✅ prospect location: " + location + ") "
+                else:
+                    score = -1
+                    individual_reasoning["excluded_individual_locations_keywords"] = entry(
+                        "NO", f"{location} - dealbreaker"
+                    )
+            if self.included_locations.active and location:
+                if self.included_locations.search(location.lower()):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning["included_individual_locations_keywords"] = entry(
+                        "YES", location
+                    )
+                    reasoning += "(✅ prospect location: " + location + ") "
+                elif "included_individual_locations_keywords" in dealbreaker:
+                    score = -1
+                    individual_reasoning["included_individual_locations_keywords"] = entry(
+                        "NO", f"{location} - dealbreaker"
+                    )
+                else:
+                    individual_reasoning["included_individual_locations_keywords"] = entry(
+                        "NO", f"{location}"
+                    )
+
+            # Prospect Education (exact membership against lowered entries)
+            educations = []
+            if epc.prospect_education_1:
+                educations.append(epc.prospect_education_1.lower())
+            if epc.prospect_education_2:
+                educations.append(epc.prospect_education_2.lower())
+            joined_educations = ", ".join(educations)
+
+            if self.excluded_education.active and educations:
+                if not any(
+                    keyword in educations for keyword in self._education_exact_included
+                ):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning["excluded_individual_education_keywords"] = entry(
+                        "YES", joined_educations
+                    )
+                    reasoning += "(✅ prospect education: " + joined_educations + ") "
+                else:
+                    score = -1
+                    individual_reasoning["excluded_individual_education_keywords"] = entry(
+                        "NO", f"{joined_educations} - dealbreaker"
+                    )
+            if self.included_education.active and educations:
+                if any(
+                    keyword in educations for keyword in self._education_exact_included
+                ):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning["included_individual_education_keywords"] = entry(
+                        "YES", joined_educations
+                    )
+                    reasoning += "(✅ prospect education: " + joined_educations + ") "
+                else:
+                    if "included_individual_education_keywords" in dealbreaker:
+                        score = -1
+                        individual_reasoning[
+                            "included_individual_education_keywords"
+                        ] = entry("NO", f"{joined_educations} - dealbreaker")
+                    else:
+                        individual_reasoning[
+                            "included_individual_education_keywords"
+                        ] = entry("NO", f"{joined_educations}")
+                    reasoning += "(❌ prospect education: " + joined_educations + ") "
+
+            # Prospect Generalized Keywords
+            dump = epc.prospect_dump.lower() if epc.prospect_dump else None
+            if self.excluded_generalized.active and dump:
+                if not self.excluded_generalized.search(dump):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning[
+                        "excluded_individual_generalized_keywords"
+                    ] = entry("YES", "✅ prospect generalized keywords")
+                    reasoning += "(✅ prospect generalized keywords) "
+                else:
+                    score = -1
+                    individual_reasoning[
+                        "excluded_individual_generalized_keywords"
+                    ] = entry("NO", "❌ prospect generalized keywords - dealbreaker")
+            if self.included_generalized.active and dump:
+                if self.included_generalized.search(dump):
+                    if score != -1:
+                        score += 1
+                    individual_reasoning[
+                        "included_individual_generalized_keywords"
+                    ] = entry("YES", "✅ prospect generalized keywords")
+                    reasoning += "(✅ prospect generalized keywords) "
+                else:
+                    if "included_individual_generalized_keywords" in dealbreaker:
+                        score = -1
+                        individual_reasoning[
+                            "included_individual_generalized_keywords"
+                        ] = entry("NO", "❌ prospect generalized keywords - dealbreaker")
+                    else:
+                        individual_reasoning[
+                            "included_individual_generalized_keywords"
+                        ] = entry("NO", "❌ prospect generalized keywords")
+                    reasoning += "(❌ prospect generalized keywords) "
+
+            # --------- COMPANY FILTERS --------- #
+            company_name = epc.company_name
+            if self.excluded_company_name.active and company_name:
+                if not self.excluded_company_name.search(company_name.lower()):
+                    if company_score != -1:
+                        company_score += 1
+                    company_reasoning["excluded_company_name_keywords"] = entry(
+                        "YES", company_name
+                    )
+                else:
+                    company_score = -1
+                    company_reasoning["excluded_company_name_keywords"] = entry(
+                        "NO", f"{company_name} - dealbreaker"
+                    )
+            if self.included_company_name.active and company_name:
+                if self.included_company_name.search(company_name.lower()):
+                    if company_score != -1:
+                        company_score += 1
+                    company_reasoning["included_company_name_keywords"] = entry(
+                        "YES", company_name
+                    )
+                    reasoning += "(✅ company name: " + company_name + ") "
+                elif "included_company_name_keywords" in dealbreaker:
+                    company_score = -1
+                    company_reasoning["included_company_name_keywords"] = entry(
+                        "NO", f"{company_name} - dealbreaker"
+                    )
+                else:
+                    company_reasoning["included_company_name_keywords"] = entry(
+                        "NO", f"{company_name}"
+                    )
+
+            company_location = epc.company_location
+            if self.excluded_company_locations.active and company_location:
+                if not self.excluded_company_locations.search(company_location.lower()):
+                    if company_score != -1:
+                        company_score += 1
+                    company_reasoning["excluded_company_locations_keywords"] = entry(
+                        "YES", company_location
+                    )
+                else:
+                    company_score = -1
+                    company_reasoning["excluded_company_locations_keywords"] = entry(
+                        "NO", f"{company_location} - dealbreaker"
+                    )
+            if self.included_company_locations.active and company_location:
+                if self.included_company_locations.search(company_location.lower()):
+                    if company_score != -1:
+                        company_score += 1
+                    company_reasoning["included_company_locations_keywords"] = entry(
+                        "YES", company_location
+                    )
+                    reasoning += "(✅ company location: " + company_location + ") "
+                elif "included_company_locations_keywords" in dealbreaker:
+                    company_score = -1
+                    company_reasoning["included_company_locations_keywords"] = entry(
+                        "NO", f"{company_location} - dealbreaker"
+                    )
+                else:
+                    company_reasoning["included_company_locations_keywords"] = entry(
+                        "NO", f"{company_location}"
+                    )
+
+            # Company Industry (scored against the prospect's industry)
+            if self.excluded_company_industries.active and industry:
+                if not self.excluded_company_industries.search(industry):
+                    if company_score != -1:
+                        company_score += 1
+                    company_reasoning["excluded_company_industries_keywords"] = entry(
+                        "YES", prospect_industry
+                    )
+                else:
+                    company_score = -1
+                    company_reasoning["excluded_company_industries_keywords"] = entry(
+                        "NO", f"{prospect_industry} - dealbreaker"
+                    )
+            if self.included_company_industries.active and industry:
+                if self.included_company_industries.search(industry):
+                    if company_score != -1:
+                        company_score += 1
+                    company_reasoning["included_company_industries_keywords"] = entry(
+                        "YES", prospect_industry
+                    )
+                    reasoning += "(✅ company industry: " + prospect_industry + ") "
+                elif "included_company_industries_keywords" in dealbreaker:
+                    company_score = -1
+                    company_reasoning["included_company_industries_keywords"] = entry(
+                        "NO", f"{prospect_industry} - dealbreaker"
+                    )
+                else:
+                    company_reasoning["included_company_industries_keywords"] = entry(
+                        "NO", f"{prospect_industry}"
+                    )
+
+            # Company Generalized Keywords
+            company_dump = epc.company_dump.lower() if epc.company_dump else None
+            if self.excluded_company_generalized.active and company_dump:
+                if not self.excluded_company_generalized.search(company_dump):
+                    if company_score != -1:
+                        company_score += 1
+                    company_reasoning["excluded_company_generalized_keywords"] = entry(
+                        "YES", "✅ company does not contain any excluded keywords"
+                    )
+                else:
+                    company_score = -1
+                    company_reasoning["excluded_company_generalized_keywords"] = entry(
+                        "NO", "❌ company contained generalized keywords - dealbreaker"
+                    )
+            if self.included_company_generalized.active and company_dump:
+                if self.included_company_generalized.search(company_dump):
+                    if company_score != -1:
+                        company_score += 1
+                    company_reasoning["included_company_generalized_keywords"] = entry(
+                        "YES",
+                        "✅ company contained generalized keywords - "
+                        + self.included_company_generalized.first(company_dump),
+                    )
+                    reasoning += "(✅ company generalized keywords) "
+                elif "included_company_generalized_keywords" in dealbreaker:
+                    company_score = -1
+                    company_reasoning["included_company_generalized_keywords"] = entry(
+                        "NO",
+                        "❌ company does not contain generalized keywords - dealbreaker",
+                    )
+                else:
+                    company_reasoning["included_company_generalized_keywords"] = entry(
+                        "NO", "❌ company does not contain generalized keywords"
+                    )
+
+            for key in self.individual_ai_filter_keys:
+                individual_reasoning[key] = entry("LOADING", "LOADING")
+            for key in self.company_ai_filter_keys:
+                company_reasoning[key] = entry("LOADING", "LOADING")
+
+            return (
+                epc,
+                score,
+                company_score,
+                individual_reasoning,
+                company_reasoning,
+                reasoning,
+            )
+        except Exception as e:
+            if self.on_error:
+                self.on_error(epc, e)
+            return epc, -1, -1, individual_reasoning, company_reasoning, reasoning
+
+    def score_segment_batch(self, enriched_prospect_companies: Iterable) -> list:
+        """
+        Score the programmatic filters for many prospects in one pass.
+        """
+        return [self.score_segment(epc) for epc in enriched_prospect_companies]
+
+
+def compile_icp_scoring_ruleset(
+    icp_scoring_ruleset,
+    num_attributes: Optional[int] = None,
+    dealbreaker: Optional[dict] = None,
+    on_error: Optional[Callable] = None,
+) -> ICPScoringMatcher:
+    """
+    Compile an ICPScoringRuleset into an ICPScoringMatcher.
+
+    Args:
+        icp_scoring_ruleset (ICPScoringRuleset): The ruleset to compile
+        num_attributes (Optional[int], optional): Precomputed attribute count used as the exclusion penalty. Defaults to counting the ruleset.
+        dealbreaker (Optional[dict], optional): Dealbreaker keys for segment scoring. Defaults to the ruleset's dealbreakers.
+        on_error (Optional[Callable], optional): Called with (enriched_prospect_company, exception) when a prospect fails to score. Defaults to None.
+
+    Returns:
+        ICPScoringMatcher: The compiled matcher
+    """
+    return ICPScoringMatcher(
+        icp_scoring_ruleset,
+        num_attributes=num_attributes,
+        dealbreaker=dealbreaker,
+        on_error=on_error,
+    )
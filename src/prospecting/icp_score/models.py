@@ -32,6 +32,12 @@ class ICPScoringJobQueue(db.Model):
 
     manual_trigger = db.Column(db.Boolean, nullable=True, default=False)
 
+    # Sharded runs: progress is tracked per shard subtask
+    shard_count = db.Column(db.Integer, nullable=True)
+    shards_completed = db.Column(db.Integer, nullable=True, default=0)
+    completed_shards = db.Column(db.ARRAY(db.Integer), nullable=True)
+    prospects_scored = db.Column(db.Integer, nullable=True, default=0)
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -44,6 +50,10 @@ class ICPScoringJobQueue(db.Model):
             "error_message": self.error_message,
             "attempts": self.attempts,
             "manual_trigger": self.manual_trigger,
+            "shard_count": self.shard_count,
+            "shards_completed": self.shards_completed,
+            "completed_shards": self.completed_shards,
+            "prospects_scored": self.prospects_scored,
         }
 
 
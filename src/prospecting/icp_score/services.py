@@ -1,6 +1,6 @@
 import datetime
 import json
-from sqlalchemy import update
+from sqlalchemy import text, update
 import yaml
 from multiprocessing import process
 from typing import Counter, Optional
@@ -17,6 +17,12 @@ from src.prospecting.icp_score.models import (
     ICPScoringJobQueueStatus,
     ICPScoringRuleset,
 )
+from src.prospecting.icp_score.matcher import (
+    ICPScoringMatcher,
+    compile_icp_scoring_ruleset,
+    count_icp_attributes_from_ruleset,
+    count_icp_attributes_split_from_ruleset,
+)
 from app import db, app, celery
 from src.research.generate_research import generate_research_points
 from src.research.models import ResearchType
@@ -35,6 +41,10 @@ import concurrent.futures
 
 from src.utils.slack import send_slack_message, URL_MAP
 
+# Jobs with more prospects than this are split into shards scored in parallel
+ICP_SCORING_SHARD_SIZE = 1000
+ICP_SCORING_STREAM_BATCH_SIZE = 500
+
 
 class EnrichedProspectCompany:
     prospect_id: int
@@ -56,6 +66,9 @@ class EnrichedProspectCompany:
     company_description: str
     company_tagline: str
     company_dump: str
+
+    # Version of the enrichment data that was read, see Prospect.icp_enrichment_updated_at
+    icp_enrichment_updated_at: Optional[datetime.datetime]
     
     def to_dict(self):
         return {
@@ -323,83 +336,7 @@ def count_num_icp_attributes_segment(client_archetype_id: int, segment_id):
         segment_id=segment_id
     ).first()
 
-    if not icp_scoring_ruleset:
-        return 0
-
-    individual_count = 0
-    company_count = 0
-
-    if icp_scoring_ruleset.included_individual_title_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_title_keywords:
-        individual_count += 1
-
-    if icp_scoring_ruleset.included_individual_seniority_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_seniority_keywords:
-        individual_count += 1
-
-    if icp_scoring_ruleset.included_individual_industry_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_industry_keywords:
-        individual_count += 1
-
-    if (icp_scoring_ruleset.individual_years_of_experience_start or
-            icp_scoring_ruleset.individual_years_of_experience_end):
-        individual_count += 1
-
-    if icp_scoring_ruleset.included_individual_skills_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_skills_keywords:
-        individual_count += 1
-
-    if icp_scoring_ruleset.included_individual_locations_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_locations_keywords:
-        individual_count += 1
-
-    if icp_scoring_ruleset.included_individual_generalized_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_generalized_keywords:
-        individual_count += 1
-
-    if icp_scoring_ruleset.included_individual_education_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_education_keywords:
-        individual_count += 1
-
-    if icp_scoring_ruleset.individual_ai_filters:
-        individual_count += len(icp_scoring_ruleset.individual_ai_filters)
-
-    # Company
-
-    if icp_scoring_ruleset.included_company_name_keywords:
-        company_count += 1
-    if icp_scoring_ruleset.excluded_company_name_keywords:
-        company_count += 1
-
-    if icp_scoring_ruleset.included_company_locations_keywords:
-        company_count += 1
-    if icp_scoring_ruleset.excluded_company_locations_keywords:
-        company_count += 1
-
-    if icp_scoring_ruleset.company_size_start or icp_scoring_ruleset.company_size_end:
-        company_count += 1
-
-    if icp_scoring_ruleset.included_company_industries_keywords:
-        company_count += 1
-    if icp_scoring_ruleset.excluded_company_industries_keywords:
-        company_count += 1
-
-    if icp_scoring_ruleset.included_company_generalized_keywords:
-        company_count += 1
-    if icp_scoring_ruleset.excluded_company_generalized_keywords:
-        company_count += 1
-
-    if icp_scoring_ruleset.company_ai_filters:
-        company_count += len(icp_scoring_ruleset.company_ai_filters)
-
-    return individual_count, company_count
+    return count_icp_attributes_split_from_ruleset(icp_scoring_ruleset)
 
 
 def count_num_icp_attributes_archetype(client_archetype_id: int):
@@ -407,83 +344,7 @@ def count_num_icp_attributes_archetype(client_archetype_id: int):
         client_archetype_id=client_archetype_id,
     ).first()
 
-    if not icp_scoring_ruleset:
-        return 0
-
-    individual_count = 0
-    company_count = 0
-
-    if icp_scoring_ruleset.included_individual_title_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_title_keywords:
-        individual_count += 1
-
-    if icp_scoring_ruleset.included_individual_seniority_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_seniority_keywords:
-        individual_count += 1
-
-    if icp_scoring_ruleset.included_individual_industry_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_industry_keywords:
-        individual_count += 1
-
-    if (icp_scoring_ruleset.individual_years_of_experience_start or
-            icp_scoring_ruleset.individual_years_of_experience_end):
-        individual_count += 1
-
-    if icp_scoring_ruleset.included_individual_skills_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_skills_keywords:
-        individual_count += 1
-
-    if icp_scoring_ruleset.included_individual_locations_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_locations_keywords:
-        individual_count += 1
-
-    if icp_scoring_ruleset.included_individual_generalized_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_generalized_keywords:
-        individual_count += 1
-
-    if icp_scoring_ruleset.included_individual_education_keywords:
-        individual_count += 1
-    if icp_scoring_ruleset.excluded_individual_education_keywords:
-        individual_count += 1
-
-    if icp_scoring_ruleset.individual_ai_filters:
-        individual_count += len(icp_scoring_ruleset.individual_ai_filters)
-
-    # Company
-
-    if icp_scoring_ruleset.included_company_name_keywords:
-        company_count += 1
-    if icp_scoring_ruleset.excluded_company_name_keywords:
-        company_count += 1
-
-    if icp_scoring_ruleset.included_company_locations_keywords:
-        company_count += 1
-    if icp_scoring_ruleset.excluded_company_locations_keywords:
-        company_count += 1
-
-    if icp_scoring_ruleset.company_size_start or icp_scoring_ruleset.company_size_end:
-        company_count += 1
-
-    if icp_scoring_ruleset.included_company_industries_keywords:
-        company_count += 1
-    if icp_scoring_ruleset.excluded_company_industries_keywords:
-        company_count += 1
-
-    if icp_scoring_ruleset.included_company_generalized_keywords:
-        company_count += 1
-    if icp_scoring_ruleset.excluded_company_generalized_keywords:
-        company_count += 1
-
-    if icp_scoring_ruleset.company_ai_filters:
-        company_count += len(icp_scoring_ruleset.company_ai_filters)
-
-    return individual_count, company_count
+    return count_icp_attributes_split_from_ruleset(icp_scoring_ruleset)
 
 
 def count_num_icp_attributes(client_archetype_id: int):
@@ -493,84 +354,18 @@ def count_num_icp_attributes(client_archetype_id: int):
     icp_scoring_ruleset = ICPScoringRuleset.query.filter_by(
         client_archetype_id=client_archetype_id
     ).first()
-    if not icp_scoring_ruleset:
-        return 0
 
-    count = 0
-    if (
-        icp_scoring_ruleset.included_individual_title_keywords
-        or icp_scoring_ruleset.excluded_individual_title_keywords
-    ):
-        count += 1
-    if (
-        icp_scoring_ruleset.included_individual_seniority_keywords
-        or icp_scoring_ruleset.excluded_individual_seniority_keywords
-    ):
-        count += 1
-    if (
-        icp_scoring_ruleset.included_individual_industry_keywords
-        or icp_scoring_ruleset.excluded_individual_industry_keywords
-    ):
-        count += 1
-    if (
-        icp_scoring_ruleset.individual_years_of_experience_start
-        or icp_scoring_ruleset.individual_years_of_experience_end
-    ):
-        count += 1
-    if (
-        icp_scoring_ruleset.included_individual_skills_keywords
-        or icp_scoring_ruleset.excluded_individual_skills_keywords
-    ):
-        count += 1
-    if (
-        icp_scoring_ruleset.included_individual_locations_keywords
-        or icp_scoring_ruleset.excluded_individual_locations_keywords
-    ):
-        count += 1
-    if (
-        icp_scoring_ruleset.included_individual_generalized_keywords
-        or icp_scoring_ruleset.excluded_individual_generalized_keywords
-    ):
-        count += 1
-    if (
-        icp_scoring_ruleset.included_company_name_keywords
-        or icp_scoring_ruleset.excluded_company_name_keywords
-    ):
-        count += 1
-    if (
-        icp_scoring_ruleset.included_company_locations_keywords
-        or icp_scoring_ruleset.excluded_company_locations_keywords
-    ):
-        count += 1
-    if icp_scoring_ruleset.company_size_start or icp_scoring_ruleset.company_size_end:
-        count += 1
-    if (
-        icp_scoring_ruleset.included_company_industries_keywords
-        or icp_scoring_ruleset.excluded_company_industries_keywords
-    ):
-        count += 1
-    if (
-        icp_scoring_ruleset.included_company_generalized_keywords
-        or icp_scoring_ruleset.excluded_company_generalized_keywords
-    ):
-        count += 1
-    if (
-        icp_scoring_ruleset.included_individual_education_keywords
-        or icp_scoring_ruleset.excluded_individual_education_keywords
-    ):
-        count += 1
-
-    return count
+    return count_icp_attributes_from_ruleset(icp_scoring_ruleset)
 
 
-def get_raw_enriched_prospect_companies_list(
+def get_raw_enriched_prospect_companies_query(
     client_archetype_id: int,
     segment_id: Optional[int] = None,
     prospect_ids: Optional[list[int]] = None,
     is_lookalike_profile_only: bool = False,
 ):
     """
-    Get the raw enriched prospect companies list.
+    Get the query behind the raw enriched prospect companies list.
     """
     if segment_id:
         entries = (
@@ -585,6 +380,7 @@ def get_raw_enriched_prospect_companies_list(
                 Prospect.linkedin_url.label("linkedin_url"),
                 Prospect.education_1.label("education_1"),
                 Prospect.education_2.label("education_2"),
+                Prospect.icp_enrichment_updated_at.label("icp_enrichment_updated_at"),
             )
             .outerjoin(ResearchPayload, Prospect.id == ResearchPayload.prospect_id)
             .filter(Prospect.segment_id == segment_id)
@@ -598,6 +394,7 @@ def get_raw_enriched_prospect_companies_list(
                 Prospect.linkedin_url,
                 Prospect.education_1,
                 Prospect.education_2,
+                Prospect.icp_enrichment_updated_at,
             )
         )
     else:
@@ -613,6 +410,7 @@ def get_raw_enriched_prospect_companies_list(
                 Prospect.linkedin_url.label("linkedin_url"),
                 Prospect.education_1.label("education_1"),
                 Prospect.education_2.label("education_2"),
+                Prospect.icp_enrichment_updated_at.label("icp_enrichment_updated_at"),
             )
             .outerjoin(ResearchPayload, Prospect.id == ResearchPayload.prospect_id)
             .filter(Prospect.archetype_id == client_archetype_id)
@@ -626,6 +424,7 @@ def get_raw_enriched_prospect_companies_list(
                 Prospect.linkedin_url,
                 Prospect.education_1,
                 Prospect.education_2,
+                Prospect.icp_enrichment_updated_at,
             )
         )
 
@@ -635,105 +434,168 @@ def get_raw_enriched_prospect_companies_list(
     if prospect_ids:
         entries = entries.filter(Prospect.id.in_(prospect_ids))
 
-    entries = entries.all()
+    return entries
 
-    processed = {}
-    for entry in entries:
-        prospect_id = entry[0]
-        processed[prospect_id] = EnrichedProspectCompany()
 
-        processed[prospect_id].prospect_id = prospect_id
+def build_enriched_prospect_company(entry) -> EnrichedProspectCompany:
+    """
+    Build an EnrichedProspectCompany from a row of the raw enriched prospect companies query.
+    """
+    prospect_id = entry[0]
+    enriched_prospect_company = EnrichedProspectCompany()
 
-        title = entry[2]
-        industry = entry[3]
-        bio = entry[4]
-        company_name = entry[5]
-        employee_count = entry[6]
-        linkedin_url = entry[7]
+    enriched_prospect_company.prospect_id = prospect_id
 
-        data = entry[1][0] if len(entry[1]) > 0 else {}
+    title = entry[2]
+    industry = entry[3]
+    bio = entry[4]
+    company_name = entry[5]
+    employee_count = entry[6]
+    linkedin_url = entry[7]
 
-        processed[prospect_id].prospect_title = title
-        processed[prospect_id].prospect_linkedin_url = linkedin_url
-        processed[prospect_id].prospect_bio = bio
-        processed[prospect_id].prospect_location = str(
-            deep_get(data, "personal.location")
-        )
-        processed[prospect_id].prospect_industry = industry
-        processed[prospect_id].prospect_skills = deep_get(data, "personal.skills")
-        processed[prospect_id].prospect_positions = deep_get(
-            data, "personal.position_groups.0.profile_positions"
-        )
-        processed[prospect_id].prospect_years_of_experience = (
-            datetime.datetime.now().year
-            - deep_get(processed[prospect_id].prospect_positions[-1], "date.start.year")
-            if processed[prospect_id].prospect_positions
-            and deep_get(
-                processed[prospect_id].prospect_positions[-1], "date.start.year"
-            )
-            else None
-        )
+    data = entry[1][0] if len(entry[1]) > 0 else {}
 
-        position_title = deep_get(
-            data, "personal.position_groups.0.profile_positions.0.title"
-        )
-        position_description = deep_get(
-            data, "personal.position_groups.0.profile_positions.0.description"
+    enriched_prospect_company.prospect_title = title
+    enriched_prospect_company.prospect_linkedin_url = linkedin_url
+    enriched_prospect_company.prospect_bio = bio
+    enriched_prospect_company.prospect_location = str(
+        deep_get(data, "personal.location")
+    )
+    enriched_prospect_company.prospect_industry = industry
+    enriched_prospect_company.prospect_skills = deep_get(data, "personal.skills")
+    enriched_prospect_company.prospect_positions = deep_get(
+        data, "personal.position_groups.0.profile_positions"
+    )
+    enriched_prospect_company.prospect_years_of_experience = (
+        datetime.datetime.now().year
+        - deep_get(enriched_prospect_company.prospect_positions[-1], "date.start.year")
+        if enriched_prospect_company.prospect_positions
+        and deep_get(
+            enriched_prospect_company.prospect_positions[-1], "date.start.year"
         )
-        personal_bio = deep_get(data, "personal.bio")
-        processed[prospect_id].prospect_dump = (
-            str(position_title)
-            + " "
-            + str(position_description)
-            + " "
-            + str(personal_bio)
+        else None
+    )
+
+    position_title = deep_get(
+        data, "personal.position_groups.0.profile_positions.0.title"
+    )
+    position_description = deep_get(
+        data, "personal.position_groups.0.profile_positions.0.description"
+    )
+    personal_bio = deep_get(data, "personal.bio")
+    enriched_prospect_company.prospect_dump = (
+        str(position_title)
+        + " "
+        + str(position_description)
+        + " "
+        + str(personal_bio)
+    )
+    enriched_prospect_company.prospect_education_1 = entry[8]
+    enriched_prospect_company.prospect_education_2 = entry[9]
+    enriched_prospect_company.icp_enrichment_updated_at = entry[10]
+
+    enriched_prospect_company.company_name = company_name
+    enriched_prospect_company.company_location = (
+        (
+            deep_get(data, "company.details.locations.headquarter.city")
+            if deep_get(data, "company.details.locations.headquarter.city")
+            else ""
         )
-        processed[prospect_id].prospect_education_1 = entry[8]
-        processed[prospect_id].prospect_education_2 = entry[9]
-
-        processed[prospect_id].company_name = company_name
-        processed[prospect_id].company_location = (
-            (
-                deep_get(data, "company.details.locations.headquarter.city")
-                if deep_get(data, "company.details.locations.headquarter.city")
-                else ""
-            )
-            + ", "
-            + (
-                deep_get(data, "company.details.locations.headquarter.geographic_area")
-                if deep_get(
-                    data, "company.details.locations.headquarter.geographic_area"
-                )
-                else ""
-            )
-            + ", "
-            + (
-                deep_get(data, "company.details.locations.headquarter.country")
-                if deep_get(data, "company.details.locations.headquarter.country")
-                else ""
+        + ", "
+        + (
+            deep_get(data, "company.details.locations.headquarter.geographic_area")
+            if deep_get(
+                data, "company.details.locations.headquarter.geographic_area"
             )
+            else ""
         )
-        if deep_get(data, "company.details.locations.headquarter.country") == "US":
-            processed[prospect_id].company_location += " United States"
-        elif deep_get(data, "company.details.locations.headquarter.country") == "CA":
-            processed[prospect_id].company_location += " Canada"
-        processed[prospect_id].company_employee_count = deep_get(
-            data, "company.details.staff.total"
-        ) or (employee_count.split("-")[0] if employee_count else None)
-        processed[prospect_id].company_description = deep_get(
-            data, "company.details.description"
-        )
-        processed[prospect_id].company_tagline = deep_get(
-            data, "company.details.tagline"
+        + ", "
+        + (
+            deep_get(data, "company.details.locations.headquarter.country")
+            if deep_get(data, "company.details.locations.headquarter.country")
+            else ""
         )
+    )
+    if deep_get(data, "company.details.locations.headquarter.country") == "US":
+        enriched_prospect_company.company_location += " United States"
+    elif deep_get(data, "company.details.locations.headquarter.country") == "CA":
+        enriched_prospect_company.company_location += " Canada"
+    enriched_prospect_company.company_employee_count = deep_get(
+        data, "company.details.staff.total"
+    ) or (employee_count.split("-")[0] if employee_count else None)
+    enriched_prospect_company.company_description = deep_get(
+        data, "company.details.description"
+    )
+    enriched_prospect_company.company_tagline = deep_get(
+        data, "company.details.tagline"
+    )
 
-        processed[prospect_id].company_dump = str(
-            deep_get(data, "company.details.description")
-        )
+    enriched_prospect_company.company_dump = str(
+        deep_get(data, "company.details.description")
+    )
+
+    return enriched_prospect_company
+
+
+def get_raw_enriched_prospect_companies_list(
+    client_archetype_id: int,
+    segment_id: Optional[int] = None,
+    prospect_ids: Optional[list[int]] = None,
+    is_lookalike_profile_only: bool = False,
+):
+    """
+    Get the raw enriched prospect companies list.
+    """
+    entries = get_raw_enriched_prospect_companies_query(
+        client_archetype_id=client_archetype_id,
+        segment_id=segment_id,
+        prospect_ids=prospect_ids,
+        is_lookalike_profile_only=is_lookalike_profile_only,
+    ).all()
+
+    processed = {}
+    for entry in entries:
+        processed[entry[0]] = build_enriched_prospect_company(entry)
 
     return processed
 
 
+def iter_raw_enriched_prospect_companies_batches(
+    client_archetype_id: int,
+    segment_id: Optional[int] = None,
+    prospect_ids: Optional[list[int]] = None,
+    is_lookalike_profile_only: bool = False,
+    batch_size: int = ICP_SCORING_STREAM_BATCH_SIZE,
+):
+    """
+    Stream the raw enriched prospect companies in lists of `batch_size`.
+
+    Rows come off a server-side cursor, so memory stays bounded by the batch
+    size and callers can score a batch while the next one is fetched. The
+    cursor lives in the current transaction: don't commit until exhausted.
+    """
+    entries = (
+        get_raw_enriched_prospect_companies_query(
+            client_archetype_id=client_archetype_id,
+            segment_id=segment_id,
+            prospect_ids=prospect_ids,
+            is_lookalike_profile_only=is_lookalike_profile_only,
+        )
+        .execution_options(stream_results=True)
+        .yield_per(batch_size)
+    )
+
+    batch = []
+    for entry in entries:
+        batch.append(build_enriched_prospect_company(entry))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
 @celery.task(bind=True, max_retries=3)
 def score_ai_filters(
         self,
@@ -801,7 +663,8 @@ def score_ai_filters(
                         ]
 
                 perplexity_response = get_perplexity_response(model="llama-3.1-sonar-large-128k-online",
-                                                              messages=messages)
+                                                              messages=messages,
+                                                              use_cache=True)
                 content = perplexity_response["content"].replace('```', '').replace('json', '').replace('\n', '').strip()
 
                 if content:
@@ -878,7 +741,8 @@ def score_ai_filters(
                             ]
 
                     perplexity_response = get_perplexity_response(model="llama-3.1-sonar-large-128k-online",
-                                                                  messages=messages)
+                                                                  messages=messages,
+                                                                  use_cache=True)
                     content = perplexity_response["content"].replace('```', '').replace('json', '').replace('\n', '').strip()
 
                     if content:
@@ -1043,6 +907,7 @@ def score_one_prospect_segment(
     dealbreaker: dict,
     queue: queue.Queue,
     update_list: Optional[list] = [],
+    matcher: Optional[ICPScoringMatcher] = None,
 ):
     """
     This will be the function to score one prospect from the market map segment
@@ -1055,1146 +920,277 @@ def score_one_prospect_segment(
     For dealbreakers, we will set the prospect's icp_fit_score to be -1,
     but we will still be grading the prospect and providing reasoning for the
     other filters criteria.
-    """
-    with app.app_context():
-        try:
-            score = 0
-            company_score = 0
-            individual_reasoning = {}
-            company_reasoning = {}
-
-            # For V1 reasoning
-            reasoning = ""
-
-            # Programmatic Filters
-            # Prospect Title - Excluded
-            if icp_scoring_ruleset.excluded_individual_title_keywords and enriched_prospect_company.prospect_title:
-                if (
-                    not any(
-                        keyword.lower() in enriched_prospect_company.prospect_title.lower()
-                        for keyword in icp_scoring_ruleset.excluded_individual_title_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-                    title = enriched_prospect_company.prospect_title
-
-                    individual_reasoning["excluded_individual_title_keywords"] = {"answer": "YES",
-                                                                                  "reasoning": title,
-                                                                                  "source": "Linkedin"}
-                else:
-                    score = -1
-                    individual_reasoning["excluded_individual_title_keywords"] = {"answer": "NO",
-                                                                                      "reasoning": f"{enriched_prospect_company.prospect_title} - dealbreaker",
-                                                                                      "source": "Linkedin"}
-            if icp_scoring_ruleset.included_individual_title_keywords and enriched_prospect_company.prospect_title:
-
-                if (
-                    any(
-                        keyword.lower() in enriched_prospect_company.prospect_title.lower()
-                        for keyword in icp_scoring_ruleset.included_individual_title_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-                    title = enriched_prospect_company.prospect_title
-
-                    individual_reasoning["included_individual_title_keywords"] = {"answer": "YES",
-                                                                                  "reasoning": title,
-                                                                                  "source": "Linkedin"}
-                    reasoning += "(✅ prospect title: " + enriched_prospect_company.prospect_title + ") "
-                else:
-                    if "included_individual_title_keywords" in dealbreaker:
-                        score = -1
-                        individual_reasoning["included_individual_title_keywords"] = {"answer": "NO",
-                                                                                      "reasoning": f"{enriched_prospect_company.prospect_title} - dealbreaker",
-                                                                                     "source": "Linkedin"}
-                    else:
-                        individual_reasoning["included_individual_title_keywords"] = {"answer": "NO",
-                                                                                      "reasoning": f"{enriched_prospect_company.prospect_title}",
-                                                                                      "source": "Linkedin"}
-
-            # Prospect Seniority - Exclude
-            if icp_scoring_ruleset.excluded_individual_seniority_keywords and enriched_prospect_company.prospect_title:
-                if (
-                    not any(
-                        keyword.lower() in enriched_prospect_company.prospect_title.lower()
-                        for keyword in icp_scoring_ruleset.excluded_individual_seniority_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-                    title = enriched_prospect_company.prospect_title
-
-                    individual_reasoning["excluded_individual_seniority_keywords"] = {"answer": "YES",
-                                                                                      "reasoning": title,
-                                                                                      "source": "Linkedin"}
-                else:
-                    score = -1
-                    individual_reasoning["excluded_individual_seniority_keywords"] = {"answer": "NO",
-                                                                                          "reasoning": f"{enriched_prospect_company.prospect_title} - dealbreaker",
-                                                                                          "source": "Linkedin"}
-            if icp_scoring_ruleset.included_individual_seniority_keywords and icp_scoring_ruleset.included_individual_title_keywords \
-                    and enriched_prospect_company.prospect_title:
-                if (
-                    any(
-                        keyword.lower() in enriched_prospect_company.prospect_title.lower()
-                        for keyword in icp_scoring_ruleset.included_individual_seniority_keywords
-                    ) and any(
-                        keyword.lower() in enriched_prospect_company.prospect_title.lower()
-                        for keyword in icp_scoring_ruleset.included_individual_title_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-                    title = enriched_prospect_company.prospect_title
-
-                    individual_reasoning["included_individual_seniority_keywords"] = {"answer": "YES",
-                                                                                      "reasoning": title,
-                                                                                      "source": "Linkedin"}
-                    reasoning += "(✅ prospect seniority: " + enriched_prospect_company.prospect_title + ") "
-                else:
-                    if "included_individual_seniority_keywords" in dealbreaker:
-                        score = -1
-                        individual_reasoning["included_individual_seniority_keywords"] = {"answer": "NO",
-                                                                                          "reasoning": f"{enriched_prospect_company.prospect_title} - dealbreaker",
-                                                                                          "source": "Linkedin"}
-                    else:
-                        individual_reasoning["included_individual_seniority_keywords"] = {"answer": "NO",
-                                                                                          "reasoning": f"{enriched_prospect_company.prospect_title}",
-                                                                                          "source": "Linkedin"}
-
-            # Prospect Industry - Exclude
-            if icp_scoring_ruleset.excluded_individual_industry_keywords and enriched_prospect_company.prospect_industry:
-                if (
-                    not any(
-                        keyword.lower() in enriched_prospect_company.prospect_industry.lower()
-                        for keyword in icp_scoring_ruleset.excluded_individual_industry_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-                    industry = enriched_prospect_company.prospect_industry
-
-                    individual_reasoning["excluded_individual_industry_keywords"] = {"answer": "YES",
-                                                                                     "reasoning": industry,
-                                                                                     "source": "Linkedin"}
-                else:
-                    score = -1
-                    individual_reasoning["excluded_individual_industry_keywords"] = {"answer": "NO",
-                                                                                         "reasoning": f"{enriched_prospect_company.prospect_industry} - dealbreaker",
-                                                                                         "source": "Linkedin"}
-                               # Prospect Industry - Include
-            if icp_scoring_ruleset.included_individual_industry_keywords and enriched_prospect_company.prospect_industry:
-                if (
-                    any(
-                        keyword.lower() in enriched_prospect_company.prospect_industry.lower()
-                        for keyword in icp_scoring_ruleset.included_individual_industry_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-                    industry = enriched_prospect_company.prospect_industry
-
-                    individual_reasoning["included_individual_industry_keywords"] = {"answer": "YES",
-                                                                                     "reasoning": industry,
-                                                                                     "source": "Linkedin"}
-                    reasoning += "(✅ prospect industry: " + enriched_prospect_company.prospect_industry + ") "
-                else:
-                    if "included_individual_industry_keywords" in dealbreaker:
-                        score = -1
-                        individual_reasoning["included_individual_industry_keywords"] = {"answer": "NO",
-                                                                                         "reasoning": f"{enriched_prospect_company.prospect_industry} - dealbreaker",
-                                                                                         "source": "Linkedin"}
-                    else:
-                        individual_reasoning["included_individual_industry_keywords"] = {"answer": "NO",
-                                                                                         "reasoning": f"{enriched_prospect_company.prospect_industry}",
-                                                                                         "source": "Linkedin"}
-            
-            # Prospect Skills - Exclude
-            if icp_scoring_ruleset.excluded_individual_skills_keywords and enriched_prospect_company.prospect_skills:
-                skills = ", ".join(enriched_prospect_company.prospect_skills)
-
-                if (
-                    any(
-                        keyword.lower() in skill.lower()
-                        for skill in enriched_prospect_company.prospect_skills
-                        for keyword in icp_scoring_ruleset.excluded_individual_skills_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-
-                    individual_reasoning["excluded_individual_skills_keywords"] = {"answer": "YES",
-                                                                                   "reasoning": skills,
-                                                                                   "source": "Linkedin"}
-                else:
-                    score = -1
-                    individual_reasoning["excluded_individual_skills_keywords"] = {"answer": "NO",
-                                                                                       "reasoning": f"{skills} - dealbreaker",
-                                                                                       "source": "Linkedin"}
-                                # Prospect Skills - Include
-            if icp_scoring_ruleset.included_individual_skills_keywords and enriched_prospect_company.prospect_skills:
-                skills = ", ".join(enriched_prospect_company.prospect_skills)
-
-                if (
-                    any(
-                        keyword.lower() in skill.lower()
-                        for skill in enriched_prospect_company.prospect_skills
-                        for keyword in icp_scoring_ruleset.included_individual_skills_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-
-                    individual_reasoning["included_individual_skills_keywords"] = {"answer": "YES",
-                                                                                   "reasoning": skills,
-                                                                                   "source": "Linkedin"}
-                    reasoning += "(✅ prospect skills: " + skills + ") "
-                else:
-                    if "included_individual_skills_keywords" in dealbreaker:
-                        score = -1
-                        individual_reasoning["included_individual_skills_keywords"] = {"answer": "NO",
-                                                                                       "reasoning": f"{skills} - dealbreaker",
-                                                                                       "source": "Linkedin"}
-                    else:
-                        individual_reasoning["included_individual_skills_keywords"] = {"answer": "NO",
-                                                                                       "reasoning": f"{skills}",
-                                                                                       "source": "Linkedin"}
-
-            # Prospect Locations - Exclude
-            if icp_scoring_ruleset.excluded_individual_locations_keywords and enriched_prospect_company.prospect_location:
-                location = enriched_prospect_company.prospect_location
-
-                if (
-                    not any(
-                        keyword.lower() in location.lower()
-                        for keyword in icp_scoring_ruleset.excluded_individual_locations_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-
-                    individual_reasoning["excluded_individual_locations_keywords"] = {"answer": "YES",
-                                                                                      "reasoning": location,
-                                                                                      "source": "Linkedin"}
-                    reasoning += "(✅ prospect location: " + location + ") "
-                else:
-                    score = -1
-                    individual_reasoning["excluded_individual_locations_keywords"] = {"answer": "NO",
-                                                                                          "reasoning": f"{location} - dealbreaker",
-                                                                                          "source": "Linkedin"}
-            # Prospect Locations - Include
-            if icp_scoring_ruleset.included_individual_locations_keywords and enriched_prospect_company.prospect_location:
-                location = enriched_prospect_company.prospect_location
-
-                if (
-                    any(
-                        keyword.lower() in location.lower()
-                        for keyword in icp_scoring_ruleset.included_individual_locations_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-
-                    individual_reasoning["included_individual_locations_keywords"] = {"answer": "YES",
-                                                                                      "reasoning": location,
-                                                                                      "source": "Linkedin"}
-                    reasoning += "(✅ prospect location: " + location + ") "
-                else:
-                    if "included_individual_locations_keywords" in dealbreaker:
-                        score = -1
-                        individual_reasoning["included_individual_locations_keywords"] = {"answer": "NO",
-                                                                                          "reasoning": f"{location} - dealbreaker",
-                                                                                          "source": "Linkedin"}
-                    else:
-                        individual_reasoning["included_individual_locations_keywords"] = {"answer": "NO",
-                                                                                          "reasoning": f"{location}",
-                                                                                          "source": "Linkedin"}
-
-            # Prospect Education - Exclude
-            educations = []
-            if enriched_prospect_company.prospect_education_1:
-                educations.append(enriched_prospect_company.prospect_education_1.lower())
-            if enriched_prospect_company.prospect_education_2:
-                educations.append(enriched_prospect_company.prospect_education_2.lower())
-
-            if icp_scoring_ruleset.excluded_individual_education_keywords and educations:
-                if (
-                    not any(
-                        keyword.lower() in educations
-                        for keyword in icp_scoring_ruleset.included_individual_education_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-
-                    individual_reasoning["excluded_individual_education_keywords"] = {"answer": "YES",
-                                                                                      "reasoning": ", ".join(educations),
-                                                                                      "source": "Linkedin"}
-                    reasoning += "(✅ prospect education: " + ", ".join(educations) + ") "
-                else:
-                    score = -1
-                    individual_reasoning["excluded_individual_education_keywords"] = {"answer": "NO",
-                                                                                          "reasoning": f"{', '.join(educations)} - dealbreaker",
-                                                                                          "source": "Linkedin"}
-                                # Prospect Education - Include
-            if icp_scoring_ruleset.included_individual_education_keywords and educations:
-                if (
-                    any(
-                        keyword.lower() in educations
-                        for keyword in icp_scoring_ruleset.included_individual_education_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-
-                    individual_reasoning["included_individual_education_keywords"] = {"answer": "YES",
-                                                                                      "reasoning": ", ".join(educations),
-                                                                                      "source": "Linkedin"}
-                    reasoning += "(✅ prospect education: " + ", ".join(educations) + ") "
-                else:
-                    if "included_individual_education_keywords" in dealbreaker:
-                        score = -1
-                        individual_reasoning["included_individual_education_keywords"] = {"answer": "NO",
-                                                                                          "reasoning": f"{', '.join(educations)} - dealbreaker",
-                                                                                          "source": "Linkedin"}
-                    else:
-                        individual_reasoning["included_individual_education_keywords"] = {"answer": "NO",
-                                                                                          "reasoning": f"{', '.join(educations)}",
-                                                                                          "source": "Linkedin"}
-                    reasoning += "(❌ prospect education: " + ", ".join(educations) + ") "
-
-            # Prospect generalized keywords -- Exclude
-            if icp_scoring_ruleset.excluded_individual_generalized_keywords and enriched_prospect_company.prospect_dump:
-                if (
-                    not any(
-                        keyword.lower() in enriched_prospect_company.prospect_dump.lower()
-                        for keyword in icp_scoring_ruleset.excluded_individual_generalized_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-
-                    individual_reasoning["excluded_individual_generalized_keywords"] = {"answer": "YES",
-                                                                                        "reasoning": "✅ prospect generalized keywords",
-                                                                                        "source": "Linkedin"}
-                    reasoning += "(✅ prospect generalized keywords) "
-                else:
-                    score = -1
-                    individual_reasoning["excluded_individual_generalized_keywords"] = {"answer": "NO",
-                                                                                            "reasoning": f"❌ prospect generalized keywords - dealbreaker",
-                                                                                            "source": "Linkedin"}
-            # Prospect generalized keywords -- Include
-            if icp_scoring_ruleset.included_individual_generalized_keywords and enriched_prospect_company.prospect_dump:
-                if (
-                    any(
-                        keyword.lower() in enriched_prospect_company.prospect_dump.lower()
-                        for keyword in icp_scoring_ruleset.included_individual_generalized_keywords
-                    )
-                ):
-                    if score != -1:
-                        score += 1
-
-                    individual_reasoning["included_individual_generalized_keywords"] = {"answer": "YES",
-                                                                                        "reasoning": "✅ prospect generalized keywords",
-                                                                                        "source": "Linkedin"}
-                    reasoning += "(✅ prospect generalized keywords) "
-                else:
-                    if "included_individual_generalized_keywords" in dealbreaker:
-                        score = -1
-                        individual_reasoning["included_individual_generalized_keywords"] = {"answer": "NO",
-                                                                                            "reasoning": f"❌ prospect generalized keywords - dealbreaker",
-                                                                                            "source": "Linkedin"}
-                    else:
-                        individual_reasoning["included_individual_generalized_keywords"] = {"answer": "NO",
-                                                                                            "reasoning": f"❌ prospect generalized keywords",
-                                                                                            "source": "Linkedin"}
-                    reasoning += "(❌ prospect generalized keywords) "
-
-            # --------- COMPANY FILTERS --------- #
-            # Company Name - Include
-            if icp_scoring_ruleset.excluded_company_name_keywords and enriched_prospect_company.company_name:
-                if (
-                    not any(
-                        keyword.lower() in enriched_prospect_company.company_name.lower()
-                        for keyword in icp_scoring_ruleset.excluded_company_name_keywords
-                    )
-                ):
-                    if company_score != -1:
-                        company_score += 1
-                    company_name = enriched_prospect_company.company_name
-
-                    company_reasoning["excluded_company_name_keywords"] = {"answer": "YES",
-                                                                           "reasoning": company_name,
-                                                                           "source": "Linkedin"}
-                else:
-                    company_score = -1
-                    company_reasoning["excluded_company_name_keywords"] = {"answer": "NO",
-                                                                               "reasoning": f"{enriched_prospect_company.company_name} - dealbreaker",
-                                                                               "source": "Linkedin"}
-                                # Company Name - Include
-            if icp_scoring_ruleset.included_company_name_keywords and enriched_prospect_company.company_name:
-                if (
-                    any(
-                        keyword.lower() in enriched_prospect_company.company_name.lower()
-                        for keyword in icp_scoring_ruleset.included_company_name_keywords
-                    )
-                ):
-                    if company_score != -1:
-                        company_score += 1
-                    company_name = enriched_prospect_company.company_name
-
-                    company_reasoning["included_company_name_keywords"] = {"answer": "YES",
-                                                                           "reasoning": company_name,
-                                                                           "source": "Linkedin"}
-                    reasoning += "(✅ company name: " + enriched_prospect_company.company_name + ") "
-                else:
-                    if "included_company_name_keywords" in dealbreaker:
-                        company_score = -1
-                        company_reasoning["included_company_name_keywords"] = {"answer": "NO",
-                                                                               "reasoning": f"{enriched_prospect_company.company_name} - dealbreaker",
-                                                                               "source": "Linkedin"}
-                    else:
-                        company_reasoning["included_company_name_keywords"] = {"answer": "NO",
-                                                                               "reasoning": f"{enriched_prospect_company.company_name}",
-                                                                               "source": "Linkedin"}
-
-            # Company Location - Exclude
-            if icp_scoring_ruleset.excluded_company_locations_keywords and enriched_prospect_company.company_location:
-                if (
-                    not any(
-                        keyword.lower() in enriched_prospect_company.company_location.lower()
-                        for keyword in icp_scoring_ruleset.excluded_company_locations_keywords
-                    )
-                ):
-                    if company_score != -1:
-                        company_score += 1
-                    company_location = enriched_prospect_company.company_location
-
-                    company_reasoning["excluded_company_locations_keywords"] = {"answer": "YES",
-                                                                                "reasoning": company_location,
-                                                                                "source": "Linkedin"}
-                else:
-                    company_score = -1
-                    company_reasoning["excluded_company_locations_keywords"] = {"answer": "NO",
-                                                                                    "reasoning": f"{enriched_prospect_company.company_location} - dealbreaker",
-                                                                                    "source": "Linkedin"}
-                               # Company Location - Include
-            if icp_scoring_ruleset.included_company_locations_keywords and enriched_prospect_company.company_location:
-                if (
-                    any(
-                        keyword.lower() in enriched_prospect_company.company_location.lower()
-                        for keyword in icp_scoring_ruleset.included_company_locations_keywords
-                    )
-                ):
-                    if company_score != -1:
-                        company_score += 1
-                    company_location = enriched_prospect_company.company_location
-
-                    company_reasoning["included_company_locations_keywords"] = {"answer": "YES",
-                                                                                "reasoning":company_location,
-                                                                                "source": "Linkedin"}
-                    reasoning += "(✅ company location: " + enriched_prospect_company.company_location + ") "
-                else:
-                    if "included_company_locations_keywords" in dealbreaker:
-                        company_score = -1
-                        company_reasoning["included_company_locations_keywords"] = {"answer": "NO",
-                                                                                    "reasoning": f"{enriched_prospect_company.company_location} - dealbreaker",
-                                                                                    "source": "Linkedin"}
-                    else:
-                        company_reasoning["included_company_locations_keywords"] = {"answer": "NO",
-                                                                                    "reasoning": f"{enriched_prospect_company.company_location}",
-                                                                                    "source": "Linkedin"}
-
-            # Company Size
-            # if enriched_prospect_company.company_employee_count is not None and (
-            #     (
-            #         (icp_scoring_ruleset.company_size_start or (icp_scoring_ruleset.company_size_start == 0 and icp_scoring_ruleset.company_size_end != 0))
-            #         and enriched_prospect_company.company_employee_count
-            #         and int(enriched_prospect_company.company_employee_count)
-            #         >= icp_scoring_ruleset.company_size_start
-            #     )
-            #     and (
-            #         icp_scoring_ruleset.company_size_end
-            #         and int(enriched_prospect_company.company_employee_count)
-            #         <= icp_scoring_ruleset.company_size_end
-            #     )
-            # ):
-            #     company_score += 1
-            #     company_reasoning["company_size"] = {"answer": "YES",
-            #                                          "reasoning": f"{enriched_prospect_company.company_employee_count}",
-            #                                          "source": "Linkedin"}
-            #     reasoning += "(✅ company size: " + str(enriched_prospect_company.company_employee_count) + ") "
-            #
-            # elif enriched_prospect_company.company_employee_count is not None and (
-            #     (
-            #         (icp_scoring_ruleset.company_size_start or (icp_scoring_ruleset.company_size_start == 0 and icp_scoring_ruleset.company_size_end != 0))
-            #         and enriched_prospect_company.company_employee_count
-            #         and int(enriched_prospect_company.company_employee_count)
-            #         < icp_scoring_ruleset.company_size_start
-            #     )
-            #     or (
-            #         icp_scoring_ruleset.company_size_end
-            #         and int(enriched_prospect_company.company_employee_count)
-            #         > icp_scoring_ruleset.company_size_end
-            #     )
-            # ):
-            #     if "company_size" in dealbreaker:
-            #         company_score = -1
-            #         company_reasoning["company_size"] = {"answer": "NO",
-            #                                              "reasoning": f"{enriched_prospect_company.company_employee_count} - dealbreaker",
-            #                                              "source": "Linkedin"}
-            #     else:
-            #         company_reasoning["company_size"] = {"answer": "NO",
-            #                                              "reasoning": f"{enriched_prospect_company.company_employee_count}",
-            #                                              "source": "Linkedin"}
-            #     reasoning += (
-            #         "(❌ company size: "
-            #         + str(enriched_prospect_company.company_employee_count)
-            #         + ") "
-            #     )
-
-            # Company Industry - Exclude
-            if icp_scoring_ruleset.excluded_company_industries_keywords and enriched_prospect_company.prospect_industry:
-                if (
-                    not any(
-                        keyword.lower() in enriched_prospect_company.prospect_industry.lower()
-                        for keyword in icp_scoring_ruleset.excluded_company_industries_keywords
-                    )
-                ):
-                    if company_score != -1:
-                        company_score += 1
-                    company_industry = enriched_prospect_company.prospect_industry
-
-                    company_reasoning["excluded_company_industries_keywords"] = {"answer": "YES",
-                                                                               "reasoning": company_industry,
-                                                                               "source": "Linkedin"}
-                else:
-                    company_score = -1
-                    company_reasoning["excluded_company_industries_keywords"] = {"answer": "NO",
-                                                                                   "reasoning": f"{enriched_prospect_company.prospect_industry} - dealbreaker",
-                                                                                   "source": "Linkedin"}
-                                # Company Industry - Include
-            if icp_scoring_ruleset.included_company_industries_keywords and enriched_prospect_company.prospect_industry:
-                if (
-                    any(
-                        keyword.lower() in enriched_prospect_company.prospect_industry.lower()
-                        for keyword in icp_scoring_ruleset.included_company_industries_keywords
-                    )
-                ):
-                    if company_score != -1:
-                        company_score += 1
-                    company_industry = enriched_prospect_company.prospect_industry
-
-                    company_reasoning["included_company_industries_keywords"] = {"answer": "YES",
-                                                                               "reasoning": company_industry,
-                                                                               "source": "Linkedin"}
-                    reasoning += "(✅ company industry: " + enriched_prospect_company.prospect_industry + ") "
-                else:
-                    if "included_company_industries_keywords" in dealbreaker:
-                        company_score = -1
-                        company_reasoning["included_company_industries_keywords"] = {"answer": "NO",
-                                                                                   "reasoning": f"{enriched_prospect_company.prospect_industry} - dealbreaker",
-                                                                                   "source": "Linkedin"}
-                    else:
-                        company_reasoning["included_company_industries_keywords"] = {"answer": "NO",
-                                                                                   "reasoning": f"{enriched_prospect_company.prospect_industry}",
-                                                                                   "source": "Linkedin"}
-
-            # Company generalized keywords -- Exclude
-            if icp_scoring_ruleset.excluded_company_generalized_keywords and enriched_prospect_company.company_dump:
-                if (
-                    not any(
-                        keyword.lower() in enriched_prospect_company.company_dump.lower()
-                        for keyword in icp_scoring_ruleset.excluded_company_generalized_keywords
-                    )
-                ):
-                    if company_score != -1:
-                        company_score += 1
-
-                    company_reasoning["excluded_company_generalized_keywords"] = {"answer": "YES",
-                                                                                  "reasoning": "✅ company does not contain any excluded keywords",
-                                                                                  "source": "Linkedin"}
-                else:
-                    company_score = -1
-                    company_reasoning["excluded_company_generalized_keywords"] = {"answer": "NO",
-                                                                                      "reasoning": f"❌ company contained generalized keywords - dealbreaker",
-                                                                                      "source": "Linkedin"}
-                                # Company generalized keywords -- Include
-            if icp_scoring_ruleset.included_company_generalized_keywords and enriched_prospect_company.company_dump:
-                if (
-                    any(
-                        keyword.lower() in enriched_prospect_company.company_dump.lower()
-                        for keyword in icp_scoring_ruleset.included_company_generalized_keywords
-                    )
-                ):
-                    if company_score != -1:
-                        company_score += 1
-
-                    valid_generalized = ""
-                    for keyword in icp_scoring_ruleset.included_company_generalized_keywords:
-                        if keyword.lower() in enriched_prospect_company.company_dump.lower():
-                            valid_generalized = keyword
-                            break
-
-                    company_reasoning["included_company_generalized_keywords"] = {"answer": "YES",
-                                                                                  "reasoning": "✅ company contained generalized keywords - " + valid_generalized,
-                                                                                  "source": "Linkedin"}
-                    reasoning += "(✅ company generalized keywords) "
-                else:
-                    if "included_company_generalized_keywords" in dealbreaker:
-                        company_score = -1
-                        company_reasoning["included_company_generalized_keywords"] = {"answer": "NO",
-                                                                                      "reasoning": f"❌ company does not contain generalized keywords - dealbreaker",
-                                                                                      "source": "Linkedin"}
-                    else:
-                        company_reasoning["included_company_generalized_keywords"] = {"answer": "NO",
-                                                                                      "reasoning": f"❌ company does not contain generalized keywords",
-                                                                                      "source": "Linkedin"}
-
-            if icp_scoring_ruleset.individual_ai_filters:
-                for f in icp_scoring_ruleset.individual_ai_filters:
-                    individual_reasoning[f["key"]] = {"answer": "LOADING", "reasoning": "LOADING", "source": "Linkedin"}
 
-            if icp_scoring_ruleset.company_ai_filters:
-                for f in icp_scoring_ruleset.company_ai_filters:
-                    company_reasoning[f["key"]] = {"answer": "LOADING", "reasoning": "LOADING", "source": "Linkedin"}
+    Scoring is delegated to an ICPScoringMatcher. Pass a precompiled `matcher`
+    when scoring many prospects; use score_prospects_segment for whole batches.
+    """
+    if not matcher:
+        matcher = compile_icp_scoring_ruleset(
+            icp_scoring_ruleset,
+            dealbreaker=dealbreaker,
+            on_error=report_icp_scoring_error,
+        )
 
-            if queue:
-                queue.put((enriched_prospect_company, score, company_score, individual_reasoning, company_reasoning, reasoning))
+    result = matcher.score_segment(enriched_prospect_company)
 
-            db.session.close()
-            
-            if update_list and len(update_list) > 0:
-                send_socket_message("update_progress", {"update": update_list})
+    if queue:
+        queue.put(result)
 
-            return enriched_prospect_company, score, company_score, individual_reasoning, company_reasoning, reasoning
+    if update_list and len(update_list) > 0:
+        send_socket_message("update_progress", {"update": update_list})
 
-        except Exception as e:
-            send_slack_message(
-                message="There is an error somewhere: " + str(e),
-                webhook_urls=[URL_MAP["eng-sandbox"]],
-            )
-            db.session.close()
-            return enriched_prospect_company, -1, -1, individual_reasoning, company_reasoning, reasoning
+    return result
 
 
 def score_one_prospect(
     enriched_prospect_company: EnrichedProspectCompany,
     icp_scoring_ruleset: ICPScoringRuleset,
     queue: queue.Queue,
+    matcher: Optional[ICPScoringMatcher] = None,
 ):
     """
     Score one prospect based on the ICP scoring ruleset.
+
+    Scoring is delegated to an ICPScoringMatcher. Pass a precompiled `matcher`
+    when scoring many prospects; use ICPScoringMatcher.score_batch for whole batches.
     """
     print("Scoring prospect: " + str(enriched_prospect_company.prospect_id))
-    with app.app_context():
-        num_attributes = count_num_icp_attributes(
-            icp_scoring_ruleset.client_archetype_id
+    if not matcher:
+        matcher = compile_icp_scoring_ruleset(icp_scoring_ruleset)
+
+    result = matcher.score(enriched_prospect_company)
+
+    if queue:
+        queue.put(result)
+
+    return result
+
+
+def score_prospects_segment(
+    matcher: ICPScoringMatcher,
+    enriched_prospect_companies: list[EnrichedProspectCompany],
+    progress_batch_size: int = 10,
+) -> list:
+    """
+    Score the programmatic filters for a batch of prospects with one compiled matcher.
+
+    Progress is broadcast over the socket every `progress_batch_size` prospects.
+
+    Returns:
+        list: (enriched_prospect_company, score, company_score, individual_reasoning, company_reasoning, reasoning) tuples
+    """
+    results = []
+    for i in range(0, len(enriched_prospect_companies), progress_batch_size):
+        chunk = enriched_prospect_companies[i : i + progress_batch_size]
+        results.extend(matcher.score_segment_batch(chunk))
+        send_socket_message(
+            "update_progress", {"update": [epc.prospect_id for epc in chunk]}
         )
-        score = 0
-        reasoning = ""
-
-        # Prospect Title
-        if (
-            icp_scoring_ruleset.excluded_individual_title_keywords
-            and enriched_prospect_company.prospect_title
-            and any(
-                keyword.lower() in enriched_prospect_company.prospect_title.lower()
-                for keyword in icp_scoring_ruleset.excluded_individual_title_keywords
-            )
-        ):
-            score -= num_attributes
-            # find the invalid title
-            invalid_title = ""
-            for keyword in icp_scoring_ruleset.excluded_individual_title_keywords:
-                if keyword.lower() in enriched_prospect_company.prospect_title.lower():
-                    invalid_title = keyword
-                    break
-            reasoning += "(❌ prospect title: " + invalid_title + ") "
-        elif (
-            icp_scoring_ruleset.included_individual_title_keywords
-            and enriched_prospect_company.prospect_title
-            and any(
-                keyword.lower() in enriched_prospect_company.prospect_title.lower()
-                for keyword in icp_scoring_ruleset.included_individual_title_keywords
-            )
-        ):
-            score += 1
-            valid_title = ""
-            for keyword in icp_scoring_ruleset.included_individual_title_keywords:
-                if keyword.lower() in enriched_prospect_company.prospect_title.lower():
-                    valid_title = keyword
-                    reasoning += "(✅ prospect title: " + valid_title + ") "
-
-        # Prospect Seniority
-        if (
-            icp_scoring_ruleset.excluded_individual_seniority_keywords
-            and enriched_prospect_company.prospect_title
-            and any(
-                keyword.lower() in enriched_prospect_company.prospect_title.lower()
-                for keyword in icp_scoring_ruleset.excluded_individual_seniority_keywords
-            )
-        ):
-            score -= num_attributes
-            # find the invalid title
-            invalid_title = ""
-            for keyword in icp_scoring_ruleset.excluded_individual_seniority_keywords:
-                if keyword.lower() in enriched_prospect_company.prospect_title.lower():
-                    invalid_title = keyword
-                    break
-            reasoning += "(❌ prospect seniority: " + invalid_title + ") "
-        elif (
-            icp_scoring_ruleset.included_individual_seniority_keywords
-            and enriched_prospect_company.prospect_title
-            and icp_scoring_ruleset.included_individual_title_keywords
-            and any(
-                keyword.lower() in enriched_prospect_company.prospect_title.lower()
-                for keyword in icp_scoring_ruleset.included_individual_seniority_keywords
-            )
-            and any(
-                keyword.lower() in enriched_prospect_company.prospect_title.lower()
-                for keyword in icp_scoring_ruleset.included_individual_title_keywords
-            )
-        ):
-            score += 1
-            valid_title = ""
-            for keyword in icp_scoring_ruleset.included_individual_seniority_keywords:
-                if keyword.lower() in enriched_prospect_company.prospect_title.lower():
-                    valid_title = keyword
-                    reasoning += "(✅ prospect seniority: " + valid_title + ") "
-
-        # Prospect Industry
-        if (
-            icp_scoring_ruleset.excluded_individual_industry_keywords
-            and enriched_prospect_company.prospect_industry
-            and any(
-                keyword.lower() in enriched_prospect_company.prospect_industry.lower()
-                for keyword in icp_scoring_ruleset.excluded_individual_industry_keywords
-            )
-        ):
-            score -= num_attributes
-            invalid_industry = ""
-            for keyword in icp_scoring_ruleset.excluded_individual_industry_keywords:
-                if (
-                    keyword.lower()
-                    in enriched_prospect_company.prospect_industry.lower()
-                ):
-                    invalid_industry = keyword
-                    break
-            reasoning += "(❌ prospect industry: " + invalid_industry + ") "
-        elif (
-            icp_scoring_ruleset.included_individual_industry_keywords
-            and icp_scoring_ruleset.included_individual_title_keywords
-            and enriched_prospect_company.prospect_industry
-            and any(
-                keyword.lower() in enriched_prospect_company.prospect_industry.lower()
-                for keyword in icp_scoring_ruleset.included_individual_industry_keywords
-            )
-        ):
-            score += 1
-            valid_industry = ""
-            for keyword in icp_scoring_ruleset.included_individual_industry_keywords:
-                if (
-                    keyword.lower()
-                    in enriched_prospect_company.prospect_industry.lower()
-                ):
-                    valid_industry = keyword
-                    break
-            reasoning += "(✅ prospect industry: " + valid_industry + ") "
-
-        # Prospect Years of Experience
-        if (
-            enriched_prospect_company.prospect_years_of_experience
-            and (
-                icp_scoring_ruleset.individual_years_of_experience_start
-                and enriched_prospect_company.prospect_years_of_experience
-                and enriched_prospect_company.prospect_years_of_experience
-                >= icp_scoring_ruleset.individual_years_of_experience_start
-            )
-            and (
-                icp_scoring_ruleset.individual_years_of_experience_end
-                and icp_scoring_ruleset.individual_years_of_experience_end
-                and enriched_prospect_company.prospect_years_of_experience
-                <= icp_scoring_ruleset.individual_years_of_experience_end
-            )
-        ):
-            score += 1
-            reasoning += (
-                "(✅ prospect years of experience: "
-                + str(enriched_prospect_company.prospect_years_of_experience)
-                + ") "
-            )
-        elif enriched_prospect_company.prospect_years_of_experience and (
-            (
-                icp_scoring_ruleset.individual_years_of_experience_start
-                and enriched_prospect_company.prospect_years_of_experience
-                and enriched_prospect_company.prospect_years_of_experience
-                < icp_scoring_ruleset.individual_years_of_experience_start
-            )
-            or (
-                icp_scoring_ruleset.individual_years_of_experience_end
-                and icp_scoring_ruleset.individual_years_of_experience_end
-                and enriched_prospect_company.prospect_years_of_experience
-                > icp_scoring_ruleset.individual_years_of_experience_end
-            )
-        ):
-            score -= num_attributes
-            reasoning += (
-                "(❌ prospect years of experience: "
-                + str(enriched_prospect_company.prospect_years_of_experience)
-                + ") "
-            )
 
-        # Prospect Skillz
-        if (
-            icp_scoring_ruleset.excluded_individual_skills_keywords
-            and enriched_prospect_company.prospect_skills
-            and any(
-                keyword.lower() in skill.lower()
-                for skill in enriched_prospect_company.prospect_skills
-                for keyword in icp_scoring_ruleset.excluded_individual_skills_keywords
-            )
-        ):
-            score -= num_attributes
-            invalid_skill = ""
-            for keyword in icp_scoring_ruleset.excluded_individual_skills_keywords:
-                for skill in enriched_prospect_company.prospect_skills:
-                    if keyword.lower() in skill.lower():
-                        invalid_skill = keyword
-                        break
-            reasoning += "(❌ prospect skills: " + invalid_skill + ") "
-        elif (
-            icp_scoring_ruleset.included_individual_skills_keywords
-            and enriched_prospect_company.prospect_skills
-            and any(
-                keyword.lower() in skill.lower()
-                for skill in enriched_prospect_company.prospect_skills
-                for keyword in icp_scoring_ruleset.included_individual_skills_keywords
-            )
-        ):
-            score += 1
-            valid_skill = ""
-            for keyword in icp_scoring_ruleset.included_individual_skills_keywords:
-                for skill in enriched_prospect_company.prospect_skills:
-                    if keyword.lower() in skill.lower():
-                        valid_skill = keyword
-                        break
-            reasoning += "(✅ prospect skills: " + valid_skill + ") "
-
-        # Locations Keywords
-        if (
-            icp_scoring_ruleset.excluded_individual_locations_keywords
-            and enriched_prospect_company.prospect_location
-            and any(
-                keyword.lower() in enriched_prospect_company.prospect_location.lower()
-                for keyword in icp_scoring_ruleset.excluded_individual_locations_keywords
-            )
-        ):
-            score -= num_attributes
-            invalid_location = ""
-            for keyword in icp_scoring_ruleset.excluded_individual_locations_keywords:
-                if (
-                    keyword.lower()
-                    in enriched_prospect_company.prospect_location.lower()
-                ):
-                    invalid_location = keyword
-                    break
-            reasoning += "(❌ prospect location: " + invalid_location + ") "
-        elif (
-            icp_scoring_ruleset.included_individual_locations_keywords
-            and enriched_prospect_company.prospect_location
-            and any(
-                keyword.lower() in enriched_prospect_company.prospect_location.lower()
-                for keyword in icp_scoring_ruleset.included_individual_locations_keywords
-            )
-        ):
-            score += 1
-            valid_location = ""
-            for keyword in icp_scoring_ruleset.included_individual_locations_keywords:
-                if (
-                    keyword.lower()
-                    in enriched_prospect_company.prospect_location.lower()
-                ):
-                    valid_location = keyword
-                    break
-            reasoning += "(✅ prospect location: " + valid_location + ") "
-
-        # Prospect Education
-        educations = []
-        if enriched_prospect_company.prospect_education_1:
-            educations.append(enriched_prospect_company.prospect_education_1)
-        if enriched_prospect_company.prospect_education_2:
-            educations.append(enriched_prospect_company.prospect_education_2)
-        if (
-            icp_scoring_ruleset.excluded_individual_education_keywords
-            and educations
-            and any(
-                keyword.lower() in education.lower()
-                for education in educations
-                for keyword in icp_scoring_ruleset.excluded_individual_education_keywords
-            )
-        ):
-            score -= num_attributes
-            invalid_education = ""
-            for keyword in icp_scoring_ruleset.excluded_individual_education_keywords:
-                for education in educations:
-                    if keyword.lower() in education.lower():
-                        invalid_education = keyword
-                        break
-            reasoning += "(❌ prospect education: " + invalid_education + ") "
-        elif (
-            icp_scoring_ruleset.included_individual_education_keywords
-            and educations
-            and any(
-                keyword.lower() in education.lower()
-                for education in educations
-                for keyword in icp_scoring_ruleset.included_individual_education_keywords
-            )
-        ):
-            score += 1
-            valid_education = ""
-            for keyword in icp_scoring_ruleset.included_individual_education_keywords:
-                for education in educations:
-                    if keyword.lower() in education.lower():
-                        valid_education = keyword
-                        break
-            reasoning += "(✅ prospect education: " + valid_education + ") "
-
-        # Prospect Generalized Keywords
-        if (
-            icp_scoring_ruleset.excluded_individual_generalized_keywords
-            and enriched_prospect_company.prospect_dump
-            and any(
-                keyword.lower() in enriched_prospect_company.prospect_dump.lower()
-                for keyword in icp_scoring_ruleset.excluded_individual_generalized_keywords
-            )
-        ):
-            score -= num_attributes
-            invalid_generalized = ""
-            for keyword in icp_scoring_ruleset.excluded_individual_generalized_keywords:
-                if keyword.lower() in enriched_prospect_company.prospect_dump.lower():
-                    invalid_generalized = keyword
-                    break
-            reasoning += "(❌ general prospect info: " + invalid_generalized + ") "
-        elif (
-            icp_scoring_ruleset.included_individual_generalized_keywords
-            and enriched_prospect_company.prospect_dump
-            and any(
-                keyword.lower() in enriched_prospect_company.prospect_dump.lower()
-                for keyword in icp_scoring_ruleset.included_individual_generalized_keywords
-            )
-        ):
-            score += 1
-            valid_generalized = ""
-            for keyword in icp_scoring_ruleset.included_individual_generalized_keywords:
-                if keyword.lower() in enriched_prospect_company.prospect_dump.lower():
-                    valid_generalized = keyword
-                    break
-            reasoning += "(✅ general prospect info: " + valid_generalized + ") "
-
-        # Company Name
-        if (
-            icp_scoring_ruleset.excluded_company_name_keywords
-            and enriched_prospect_company.company_name
-            and any(
-                keyword.lower() in enriched_prospect_company.company_name.lower()
-                for keyword in icp_scoring_ruleset.excluded_company_name_keywords
-            )
-        ):
-            score -= num_attributes
-            invalid_company_name = ""
-            for keyword in icp_scoring_ruleset.excluded_company_name_keywords:
-                if keyword.lower() in enriched_prospect_company.company_name.lower():
-                    invalid_company_name = keyword
-                    break
-            reasoning += "(❌ company name: " + invalid_company_name + ") "
-        elif (
-            icp_scoring_ruleset.included_company_name_keywords
-            and enriched_prospect_company.company_name
-            and any(
-                keyword.lower() in enriched_prospect_company.company_name.lower()
-                for keyword in icp_scoring_ruleset.included_company_name_keywords
-            )
-        ):
-            score += 1
-            valid_company_name = ""
-            for keyword in icp_scoring_ruleset.included_company_name_keywords:
-                if keyword.lower() in enriched_prospect_company.company_name.lower():
-                    valid_company_name = keyword
-                    break
-            reasoning += "(✅ company name: " + valid_company_name + ") "
-
-        # Company Location Keywords
-        if (
-            icp_scoring_ruleset.excluded_company_locations_keywords
-            and enriched_prospect_company.company_location
-            and any(
-                keyword.lower() in enriched_prospect_company.company_location.lower()
-                for keyword in icp_scoring_ruleset.excluded_company_locations_keywords
-            )
-        ):
-            score -= num_attributes
-            invalid_company_location = ""
-            for keyword in icp_scoring_ruleset.excluded_company_locations_keywords:
-                if (
-                    keyword.lower()
-                    in enriched_prospect_company.company_location.lower()
-                ):
-                    invalid_company_location = keyword
-                    break
-            reasoning += "(❌ company location: " + invalid_company_location + ") "
-        elif (
-            icp_scoring_ruleset.included_company_locations_keywords
-            and enriched_prospect_company.company_location
-            and any(
-                keyword.lower() in enriched_prospect_company.company_location.lower()
-                for keyword in icp_scoring_ruleset.included_company_locations_keywords
-            )
-        ):
-            score += 1
-            valid_company_location = ""
-            for keyword in icp_scoring_ruleset.included_company_locations_keywords:
-                if (
-                    keyword.lower()
-                    in enriched_prospect_company.company_location.lower()
-                ):
-                    valid_company_location = keyword
-                    break
-            reasoning += "(✅ company location: " + valid_company_location + ") "
-        elif icp_scoring_ruleset.included_company_locations_keywords:
-            score -= num_attributes
-            reasoning += "(❌ company location: No Match)"
-
-        # Company Size
-        if enriched_prospect_company.company_employee_count is not None and (
-            (
-                icp_scoring_ruleset.company_size_start
-                and enriched_prospect_company.company_employee_count
-                and int(enriched_prospect_company.company_employee_count)
-                >= icp_scoring_ruleset.company_size_start
-            )
-            and (
-                icp_scoring_ruleset.company_size_end
-                and int(enriched_prospect_company.company_employee_count)
-                <= icp_scoring_ruleset.company_size_end
-            )
-        ):
-            score += 1
-            size = ""
-            if icp_scoring_ruleset.company_size_start:
-                size += str(icp_scoring_ruleset.company_size_start)
-            size += "-"
-            if icp_scoring_ruleset.company_size_end:
-                size += str(icp_scoring_ruleset.company_size_end)
-            reasoning += (
-                "(✅ company size: "
-                + str(enriched_prospect_company.company_employee_count)
-                + ") "
-            )
-        elif enriched_prospect_company.company_employee_count is not None and (
-            (
-                icp_scoring_ruleset.company_size_start
-                and enriched_prospect_company.company_employee_count
-                and int(enriched_prospect_company.company_employee_count)
-                < icp_scoring_ruleset.company_size_start
-            )
-            or (
-                icp_scoring_ruleset.company_size_end
-                and int(enriched_prospect_company.company_employee_count)
-                > icp_scoring_ruleset.company_size_end
-            )
-        ):
-            score -= num_attributes
-            size = ""
-            if icp_scoring_ruleset.company_size_start:
-                size += str(icp_scoring_ruleset.company_size_start)
-            size += "-"
-            if icp_scoring_ruleset.company_size_end:
-                size += str(icp_scoring_ruleset.company_size_end)
-            reasoning += (
-                "(❌ company size: "
-                + str(enriched_prospect_company.company_employee_count)
-                + ") "
-            )
+    return results
 
-        # Company Industry
-        if (
-            icp_scoring_ruleset.excluded_company_industries_keywords
-            and enriched_prospect_company.prospect_industry
-            and any(
-                keyword.lower() in enriched_prospect_company.prospect_industry.lower()
-                for keyword in icp_scoring_ruleset.excluded_company_industries_keywords
+
+def report_icp_scoring_error(
+    enriched_prospect_company: EnrichedProspectCompany, e: Exception
+):
+    send_slack_message(
+        message="There is an error somewhere: " + str(e),
+        webhook_urls=[URL_MAP["eng-sandbox"]],
+    )
+
+
+def bucket_icp_score(score: int, count: int) -> int:
+    """
+    Distribute a raw filter score into 0 (very low) - 4 (very high).
+
+    -1 (dealbreaker) will always be very low (0); the rest is bucketed by
+    percentage: 25% is low, 50% is medium, 75% is high, 100% is very high.
+    """
+    if score == -1 or count == 0:
+        return 0
+
+    percentage = score / count * 100
+    if 0 <= percentage <= 25:
+        return 1
+    elif 25 < percentage <= 50:
+        return 2
+    elif 50 < percentage <= 75:
+        return 3
+    elif 75 < percentage <= 100:
+        return 4
+    return -1
+
+
+def build_icp_score_mapping(
+    results: list,
+    individual_count: int,
+    company_count: int,
+):
+    """
+    Turn score_one_prospect_segment results into the values written to each prospect.
+
+    Returns:
+        tuple: (updated_mapping, individual_score_dict, company_score_dict)
+    """
+    updated_mapping = {}
+    individual_score_dict = {}
+    company_score_dict = {}
+
+    for (
+        enriched_company,
+        score,
+        company_score,
+        individual_reasoning,
+        company_reasoning,
+        reasoning,
+    ) in results:
+        prospect_id = enriched_company.prospect_id
+
+        individual_score_dict[prospect_id] = score
+        company_score_dict[prospect_id] = company_score
+
+        if company_score == -1 or score == -1:
+            combined_score = 0
+        else:
+            combined_score = bucket_icp_score(
+                score + company_score, individual_count + company_count
             )
-        ):
-            score -= num_attributes
-            invalid_industry = ""
-            for keyword in icp_scoring_ruleset.excluded_company_industries_keywords:
-                if (
-                    keyword.lower()
-                    in enriched_prospect_company.prospect_industry.lower()
-                ):
-                    invalid_industry = keyword
-                    break
-            reasoning += "(❌ company industry: " + invalid_industry + ") "
-        elif (
-            icp_scoring_ruleset.included_company_industries_keywords
-            and enriched_prospect_company.prospect_industry
-            and any(
-                keyword.lower() in enriched_prospect_company.prospect_industry.lower()
-                for keyword in icp_scoring_ruleset.included_company_industries_keywords
+
+        updated_mapping[prospect_id] = {
+            "combined_score": combined_score,
+            "individual_score": bucket_icp_score(score, individual_count),
+            "company_score": bucket_icp_score(company_score, company_count),
+            "reasoning": reasoning if reasoning else "",
+            "individual_reasoning": individual_reasoning,
+            "company_reasoning": company_reasoning,
+        }
+
+    return updated_mapping, individual_score_dict, company_score_dict
+
+
+def bulk_update_prospect_icp_scores(updated_mapping: dict, batch_size: int = 1000):
+    """
+    Write scored prospects back with one UPDATE ... FROM (VALUES ...) per batch.
+
+    Does not commit; the caller owns the transaction.
+    """
+    items = list(updated_mapping.items())
+    for i in range(0, len(items), batch_size):
+        batch = items[i : i + batch_size]
+
+        values = []
+        params = {}
+        for j, (prospect_id, updated_data) in enumerate(batch):
+            values.append(
+                f"(CAST(:id_{j} AS INTEGER), CAST(:combined_{j} AS INTEGER), "
+                f"CAST(:individual_{j} AS INTEGER), CAST(:company_{j} AS INTEGER), "
+                f"CAST(:reason_{j} AS VARCHAR), CAST(:individual_reason_{j} AS JSON), "
+                f"CAST(:company_reason_{j} AS JSON))"
             )
-        ):
-            score += 1
-            valid_industry = ""
-            for keyword in icp_scoring_ruleset.included_company_industries_keywords:
-                if (
-                    keyword.lower()
-                    in enriched_prospect_company.prospect_industry.lower()
-                ):
-                    valid_industry = keyword
-                    break
-            reasoning += "(✅ company industry: " + valid_industry + ") "
-
-        # Company Generalized Keywords
-        if (
-            icp_scoring_ruleset.excluded_company_generalized_keywords
-            and enriched_prospect_company.company_dump
-            and any(
-                keyword.lower() in enriched_prospect_company.company_dump.lower()
-                for keyword in icp_scoring_ruleset.excluded_company_generalized_keywords
+            params[f"id_{j}"] = prospect_id
+            params[f"combined_{j}"] = updated_data["combined_score"]
+            params[f"individual_{j}"] = updated_data["individual_score"]
+            params[f"company_{j}"] = updated_data["company_score"]
+            params[f"reason_{j}"] = updated_data["reasoning"]
+            params[f"individual_reason_{j}"] = json.dumps(
+                updated_data["individual_reasoning"]
             )
-        ):
-            score -= num_attributes
-            invalid_generalized = ""
-            for keyword in icp_scoring_ruleset.excluded_company_generalized_keywords:
-                if keyword.lower() in enriched_prospect_company.company_dump.lower():
-                    invalid_generalized = keyword
-                    break
-            reasoning += "(❌ company general info: " + invalid_generalized + ") "
-        elif (
-            icp_scoring_ruleset.included_company_generalized_keywords
-            and enriched_prospect_company.company_dump
-            and any(
-                keyword.lower() in enriched_prospect_company.company_dump.lower()
-                for keyword in icp_scoring_ruleset.included_company_generalized_keywords
+            params[f"company_reason_{j}"] = json.dumps(
+                updated_data["company_reasoning"]
             )
-        ):
-            score += 1
-            valid_generalized = ""
-            for keyword in icp_scoring_ruleset.included_company_generalized_keywords:
-                if keyword.lower() in enriched_prospect_company.company_dump.lower():
-                    valid_generalized = keyword
-                    break
-            reasoning += "(✅ company general info: " + valid_generalized + ") "
 
-        if queue:
-            queue.put((enriched_prospect_company, score, reasoning))
+        db.session.execute(
+            text(
+                """
+                UPDATE prospect
+                SET
+                    icp_fit_score = v.icp_fit_score,
+                    icp_prospect_fit_score = v.icp_prospect_fit_score,
+                    icp_company_fit_score = v.icp_company_fit_score,
+                    icp_fit_reason = v.icp_fit_reason,
+                    icp_fit_reason_v2 = v.icp_fit_reason_v2,
+                    icp_company_fit_reason = v.icp_company_fit_reason
+                FROM (VALUES {values}) AS v(
+                    id,
+                    icp_fit_score,
+                    icp_prospect_fit_score,
+                    icp_company_fit_score,
+                    icp_fit_reason,
+                    icp_fit_reason_v2,
+                    icp_company_fit_reason
+                )
+                WHERE prospect.id = v.id
+                """.format(
+                    values=", ".join(values)
+                )
+            ),
+            params,
+        )
 
-        db.session.close()
 
-        return (enriched_prospect_company, score, reasoning)
+def create_icp_ai_filter_research_point_types(
+    icp_scoring_ruleset: ICPScoringRuleset,
+    client_archetype_id: int,
+    segment_id: Optional[int] = None,
+):
+    """
+    Create research point types for the AI filters that are marked as personalizers.
+    """
+    client_archetype: ClientArchetype = ClientArchetype.query.get(client_archetype_id)
+
+    ai_filters = {}
+
+    icp_scoring_ruleset_to_dict = icp_scoring_ruleset.to_dict()
+
+    if icp_scoring_ruleset_to_dict.get("individual_ai_filters"):
+        for individual_ai_filter in icp_scoring_ruleset_to_dict["individual_ai_filters"]:
+            if individual_ai_filter["key"] in icp_scoring_ruleset_to_dict["individual_personalizers"]:
+                ai_filters[individual_ai_filter["key"]] = individual_ai_filter["prompt"]
+    if icp_scoring_ruleset_to_dict.get("company_ai_filters"):
+        for company_ai_filter in icp_scoring_ruleset_to_dict["company_ai_filters"]:
+            if company_ai_filter["key"] in icp_scoring_ruleset_to_dict["company_personalizers"]:
+                ai_filters[company_ai_filter["key"]] = company_ai_filter["prompt"]
+
+    # Cannot create research payload here, because we have to answer the ai questions
+    # For now, even though we are in a segment, we are making it archetype only
+    for ai_filter in ai_filters:
+        create_research_point_type(
+            name=ai_filter,
+            description=ai_filters[ai_filter],
+            client_sdr_id=client_archetype.client_sdr_id,
+            function_name="get_ai_research",
+            archetype_id=client_archetype_id,
+            category="ARCHETYPE",
+            segment_id=segment_id,
+        )
+
+
+def dispatch_icp_ai_filter_scoring(
+    prospect_enriched_list: list[dict],
+    icp_scoring_ruleset: ICPScoringRuleset,
+    dealbreaker: dict,
+    individual_score_dict: dict,
+    company_score_dict: dict,
+):
+    """
+    Queue score_ai_filters for every 5 prospects, grouped by company name so
+    prospects at the same company share one task (and its cached answers).
+    """
+    if not (icp_scoring_ruleset.individual_ai_filters or icp_scoring_ruleset.company_ai_filters):
+        return
+
+    prospect_enriched_list = sorted(
+        prospect_enriched_list, key=lambda x: x.get("company_name") or ""
+    )
+    icp_scoring_ruleset_dict = icp_scoring_ruleset.to_dict()
+    for i in range(0, len(prospect_enriched_list), 5):
+        chunk = prospect_enriched_list[i : i + 5]
+        score_ai_filters.apply_async(
+            args=[chunk, icp_scoring_ruleset_dict, dealbreaker, individual_score_dict, company_score_dict, True],
+            priority=1,
+            queue="icp_scoring",
+            routing_key="icp_scoring",
+        )
 
 
 def apply_icp_scoring_ruleset_filters_task(
@@ -2460,7 +1456,15 @@ def apply_segment_icp_scoring_ruleset_filters_task(
 
     # If there is already an ICPScoringJobQueue object, trigger the job
     if icp_scoring_job_queue_id:
-        if prospect_ids and len(prospect_ids) <= 60:
+        if prospect_ids and len(prospect_ids) > ICP_SCORING_SHARD_SIZE:
+            start_sharded_icp_scoring_job(
+                icp_scoring_job_id=icp_scoring_job_queue_id,
+                client_archetype_id=client_archetype_id,
+                segment_id=segment_id,
+                prospect_ids=prospect_ids,
+                score_ai=score_ai,
+            )
+        elif prospect_ids and len(prospect_ids) <= 60:
             apply_segment_icp_scoring_ruleset_filters(
                 icp_scoring_job_id=icp_scoring_job_queue_id,
                 client_archetype_id=client_archetype_id,
@@ -2492,7 +1496,15 @@ def apply_segment_icp_scoring_ruleset_filters_task(
     db.session.add(icp_scoring_job)
     db.session.commit()
 
-    if prospect_ids and len(prospect_ids) <= 60:
+    if prospect_ids and len(prospect_ids) > ICP_SCORING_SHARD_SIZE:
+        start_sharded_icp_scoring_job(
+            icp_scoring_job_id=icp_scoring_job.id,
+            client_archetype_id=client_archetype_id,
+            segment_id=segment_id,
+            prospect_ids=prospect_ids,
+            score_ai=score_ai,
+        )
+    elif prospect_ids and len(prospect_ids) <= 60:
         apply_segment_icp_scoring_ruleset_filters(
             icp_scoring_job_id=icp_scoring_job.id,
             client_archetype_id=client_archetype_id,
@@ -2537,7 +1549,14 @@ def apply_archetype_icp_scoring_ruleset_filters_task(
 
     # If there is already an ICPScoringJobQueue object, trigger the job
     if icp_scoring_job_queue_id:
-        if prospect_ids and len(prospect_ids) <= 60:
+        if prospect_ids and len(prospect_ids) > ICP_SCORING_SHARD_SIZE:
+            start_sharded_icp_scoring_job(
+                icp_scoring_job_id=icp_scoring_job_queue_id,
+                client_archetype_id=client_archetype_id,
+                prospect_ids=prospect_ids,
+                score_ai=score_ai,
+            )
+        elif prospect_ids and len(prospect_ids) <= 60:
             apply_archetype_icp_scoring_ruleset_filters(
                 icp_scoring_job_id=icp_scoring_job_queue_id,
                 client_archetype_id=client_archetype_id,
@@ -2568,7 +1587,14 @@ def apply_archetype_icp_scoring_ruleset_filters_task(
     db.session.add(icp_scoring_job)
     db.session.commit()
 
-    if prospect_ids and len(prospect_ids) <= 60:
+    if prospect_ids and len(prospect_ids) > ICP_SCORING_SHARD_SIZE:
+        start_sharded_icp_scoring_job(
+            icp_scoring_job_id=icp_scoring_job.id,
+            client_archetype_id=client_archetype_id,
+            prospect_ids=prospect_ids,
+            score_ai=score_ai,
+        )
+    elif prospect_ids and len(prospect_ids) <= 60:
         apply_archetype_icp_scoring_ruleset_filters(
             icp_scoring_job_id=icp_scoring_job.id,
             client_archetype_id=client_archetype_id,
@@ -2626,17 +1652,6 @@ def apply_archetype_icp_scoring_ruleset_filters(
             prospect_ids = [prospect.id for prospect in prospects]
             icp_scoring_job.prospect_ids = prospect_ids
 
-        # Step 1: Get the raw prospect list with data enriched
-        print("Pulling raw enriched prospect companies list...")
-        raw_enriched_prospect_companies_list = get_raw_enriched_prospect_companies_list(
-            client_archetype_id=client_archetype_id,
-            prospect_ids=prospect_ids,
-        )
-        print(
-            "Pulled raw enriched prospect companies list with length: "
-            + str(len(raw_enriched_prospect_companies_list))
-        )
-
         icp_scoring_ruleset: ICPScoringRuleset = ICPScoringRuleset.query.filter_by(
             client_archetype_id=client_archetype_id,
         ).first()
@@ -2649,224 +1664,55 @@ def apply_archetype_icp_scoring_ruleset_filters(
         else:
             dealbreaker = {}
 
-        # Step 2: Score all the prospects
-        print("Scoring prospects...")
-        score_map = {}
-        entries = raw_enriched_prospect_companies_list.items()
-        raw_data = []
+        matcher = compile_icp_scoring_ruleset(
+            icp_scoring_ruleset,
+            dealbreaker=dealbreaker,
+            on_error=report_icp_scoring_error,
+        )
 
-        results_queue = queue.Queue()
-        max_threads = 5
+        # The AI filters need every prospect's enriched data; only hold on to it if they will run
+        keep_enriched_list = score_ai and bool(
+            icp_scoring_ruleset.individual_ai_filters
+            or icp_scoring_ruleset.company_ai_filters
+        )
 
+        # Step 1 - 3: Stream the enriched prospects, scoring and writing each batch as it arrives
+        print("Scoring prospects...")
         prospect_enriched_list = []
-
-        length = len(entries)
-        count = 0
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_threads) as executor:
-            futures = []
-            update_list = []
-            for (
-                    prospect_id,
-                    enriched_prospect_company,
-            ) in tqdm(entries):
-                prospect_enriched_list.append(enriched_prospect_company.to_dict())
-                
-                if len(update_list) <= 8 and count != length - 1:
-                    update_list.append(enriched_prospect_company.prospect_id)
-
-                    futures.append(
-                        executor.submit(
-                            score_one_prospect_segment,
-                            enriched_prospect_company=enriched_prospect_company,
-                            icp_scoring_ruleset=icp_scoring_ruleset,
-                            dealbreaker=dealbreaker,
-                            queue=results_queue,
-                        )
-                    )
-                else:
-                    update_list.append(enriched_prospect_company.prospect_id)
-                    futures.append(
-                        executor.submit(
-                            score_one_prospect_segment,
-                            enriched_prospect_company=enriched_prospect_company,
-                            icp_scoring_ruleset=icp_scoring_ruleset,
-                            dealbreaker=dealbreaker,
-                            queue=results_queue,
-                            update_list=update_list
-                        )
-                    )
-
-                    update_list = []
-
-                count += 1
-
-            concurrent.futures.wait(futures)
-
-        # for (
-        #     prospect_id,
-        #     enriched_prospect_company,
-        # ) in tqdm(entries):
-        #     prospect_enriched_list.append(enriched_prospect_company.to_dict())
-        #
-        #     score_one_prospect_segment(
-        #         enriched_prospect_company=enriched_prospect_company,
-        #         icp_scoring_ruleset=icp_scoring_ruleset,
-        #         dealbreaker=dealbreaker,
-        #         queue=results_queue,
-        #     )
-
         individual_score_dict = {}
         company_score_dict = {}
+        for enriched_prospect_companies in iter_raw_enriched_prospect_companies_batches(
+            client_archetype_id=client_archetype_id,
+            prospect_ids=prospect_ids,
+        ):
+            results = score_prospects_segment(matcher, enriched_prospect_companies)
 
-        while not results_queue.empty():
-            result = results_queue.get()
-            enriched_company: EnrichedProspectCompany = result[0]
-            score = result[1]
-            company_score = result[2]
-            individual_reasoning = result[3]
-            company_reasoning = result[4]
-            reasoning = result[5]
-
-            prospect_id = enriched_company.prospect_id
-
-            raw_data.append(
-                {
-                    "prospect_id": prospect_id,
-                    "score": score,
-                    "company_score": company_score,
-                    "reasoning": reasoning,
-                    "individual_reasoning": individual_reasoning,
-                    "company_reasoning": company_reasoning,
-                }
+            updated_mapping, batch_individual_scores, batch_company_scores = build_icp_score_mapping(
+                results=results,
+                individual_count=individual_count,
+                company_count=company_count,
             )
+            bulk_update_prospect_icp_scores(updated_mapping)
+
+            individual_score_dict.update(batch_individual_scores)
+            company_score_dict.update(batch_company_scores)
+            if keep_enriched_list:
+                prospect_enriched_list.extend(
+                    enriched_prospect_company.to_dict()
+                    for enriched_prospect_company in enriched_prospect_companies
+                )
 
-            individual_score_dict[prospect_id] = score
-            company_score_dict[prospect_id] = company_score
-
-        # Distribution
-        # -1 will always be very low (0).
-        # distribute the rest of the score to be between 1-4
-        # We can do it based on percentage:
-        # 25% is low, 50% is medium, 75% is high, 100% is very high
-        updated_mapping = {}
-
-        for entry in raw_data:
-            prospect_id = entry["prospect_id"]
-
-            score = entry["score"]
-            company_score = entry["company_score"]
-
-            updated_individual_score = -1
-            updated_company_score = -1
-
-            updated_combined_score = -1
-
-            if score == -1 or individual_count == 0:
-                updated_individual_score = 0
-            else:
-                percentage = score / individual_count * 100
-
-                if 0 <= percentage <= 25:
-                    updated_individual_score = 1
-                elif 25 < percentage <= 50:
-                    updated_individual_score = 2
-                elif 50 < percentage <= 75:
-                    updated_individual_score = 3
-                elif 75 < percentage <= 100:
-                    updated_individual_score = 4
-
-            if company_score == -1 or company_count == 0:
-                updated_company_score = 0
-            else:
-                percentage = company_score / company_count * 100
-
-                if 0 <= percentage <= 25:
-                    updated_company_score = 1
-                elif 25 < percentage <= 50:
-                    updated_company_score = 2
-                elif 50 < percentage <= 75:
-                    updated_company_score = 3
-                elif 75 < percentage <= 100:
-                    updated_company_score = 4
-
-            if company_score == -1 or score == -1 or (individual_count + company_count == 0):
-                updated_combined_score = 0
-            else:
-                percentage = (score + company_score) / (individual_count + company_count) * 100
-
-                if 0 <= percentage <= 25:
-                    updated_combined_score = 1
-                elif 25 < percentage <= 50:
-                    updated_combined_score = 2
-                elif 50 < percentage <=75:
-                    updated_combined_score = 3
-                elif 75 < percentage <= 100:
-                    updated_combined_score = 4
-
-            updated_mapping[prospect_id] = {
-                "combined_score": updated_combined_score,
-                "individual_score": updated_individual_score,
-                "company_score": updated_company_score,
-                "reasoning": entry["reasoning"] if entry["reasoning"] else "",
-                "individual_reasoning": entry["individual_reasoning"],
-                "company_reasoning": entry["company_reasoning"],
-            }
-
-        # Step 4: Batch Update all the prospects
-        for prospect_id, updated_data in updated_mapping.items():
-            combined_score = updated_data["combined_score"]
-            individual_score = updated_data["individual_score"]
-            company_score = updated_data["company_score"]
-            reasoning = updated_data["reasoning"]
-            individual_reasoning = updated_data["individual_reasoning"]
-            company_reasoning = updated_data["company_reasoning"]
-
-            prospect: Prospect = Prospect.query.get(prospect_id)
-            if prospect:
-                prospect.icp_fit_score = combined_score
-                prospect.icp_prospect_fit_score = individual_score
-                prospect.icp_company_fit_score = company_score
-                prospect.icp_fit_reason = reasoning
-                prospect.icp_fit_reason_v2 = individual_reasoning
-                prospect.icp_company_fit_reason = company_reasoning
-
+        # Step 4: Commit once the cursor is exhausted
         db.session.commit()
 
         print("Done!")
 
         send_socket_message('update_prospect_list', {'update': True})
 
-        client_archetype: ClientArchetype = ClientArchetype.query.get(client_archetype_id)
-
-        ai_filters = {}
-
-        icp_scoring_ruleset_to_dict = icp_scoring_ruleset.to_dict()
-
-        if icp_scoring_ruleset_to_dict.get("individual_ai_filters"):
-            for individual_ai_filter in icp_scoring_ruleset_to_dict["individual_ai_filters"]:
-                if individual_ai_filter["key"] in icp_scoring_ruleset_to_dict["individual_personalizers"]:
-                    ai_filters[individual_ai_filter["key"]] = individual_ai_filter["prompt"]
-        if icp_scoring_ruleset_to_dict.get("company_ai_filters"):
-            for company_ai_filter in icp_scoring_ruleset_to_dict["company_ai_filters"]:
-                if company_ai_filter["key"] in icp_scoring_ruleset_to_dict["company_personalizers"]:
-                   ai_filters[company_ai_filter["key"]] = company_ai_filter["prompt"] 
-
-        ### Create research point types for ai_filters
-        
-        # Cannot create research payload here, because we have to answer the ai questions
-        # Creating research point type
-
-        # For now, even though we are in a segment, we are making it archetype only
-        for ai_filter in ai_filters:
-            create_research_point_type(
-                name=ai_filter,
-                description= ai_filters[ai_filter],
-                client_sdr_id=client_archetype.client_sdr_id,
-                function_name="get_ai_research",
-                archetype_id=client_archetype_id,
-                category="ARCHETYPE",
-            )
+        create_icp_ai_filter_research_point_types(
+            icp_scoring_ruleset=icp_scoring_ruleset,
+            client_archetype_id=client_archetype_id,
+        )
 
         
         # score_one_prospect_segment only scores the programmatic filters
@@ -2985,18 +1831,6 @@ def apply_segment_icp_scoring_ruleset_filters(
             prospect_ids = [prospect.id for prospect in prospects]
             icp_scoring_job.prospect_ids = prospect_ids
 
-        # Step 1: Get the raw prospect list with data enriched
-        print("Pulling raw enriched prospect companies list...")
-        raw_enriched_prospect_companies_list = get_raw_enriched_prospect_companies_list(
-            client_archetype_id=client_archetype_id,
-            segment_id=segment_id,
-            prospect_ids=prospect_ids,
-        )
-        print(
-            "Pulled raw enriched prospect companies list with length: "
-            + str(len(raw_enriched_prospect_companies_list))
-        )
-
         icp_scoring_ruleset: ICPScoringRuleset = ICPScoringRuleset.query.filter_by(
             client_archetype_id=client_archetype_id,
             segment_id=segment_id,
@@ -3010,224 +1844,56 @@ def apply_segment_icp_scoring_ruleset_filters(
         else:
             dealbreaker = {}
 
-        # Step 2: Score all the prospects
-        print("Scoring prospects...")
-        entries = raw_enriched_prospect_companies_list.items()
-        raw_data = []
+        matcher = compile_icp_scoring_ruleset(
+            icp_scoring_ruleset,
+            dealbreaker=dealbreaker,
+            on_error=report_icp_scoring_error,
+        )
 
-        results_queue = queue.Queue()
-        max_threads = 5
+        # The AI filters need every prospect's enriched data; only hold on to it if they will run
+        keep_enriched_list = score_ai and bool(
+            icp_scoring_ruleset.individual_ai_filters
+            or icp_scoring_ruleset.company_ai_filters
+        )
 
+        # Step 1 - 3: Stream the enriched prospects, scoring and writing each batch as it arrives
+        print("Scoring prospects...")
         prospect_enriched_list = []
-        count = 0
-        length = len(entries)
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_threads) as executor:
-            futures = []
-            update_list = []
-            for (
-                prospect_id,
-                enriched_prospect_company,
-            ) in tqdm(entries):
-                prospect_enriched_list.append(enriched_prospect_company.to_dict())
-
-                if len(update_list) <= 8 and count != length - 1:
-                    update_list.append(enriched_prospect_company.prospect_id)
-
-                    futures.append(
-                        executor.submit(
-                            score_one_prospect_segment,
-                            enriched_prospect_company=enriched_prospect_company,
-                            icp_scoring_ruleset=icp_scoring_ruleset,
-                            dealbreaker=dealbreaker,
-                            queue=results_queue,
-                        )
-                    )
-                else:
-                    update_list.append(enriched_prospect_company.prospect_id)
-                    futures.append(
-                        executor.submit(
-                            score_one_prospect_segment,
-                            enriched_prospect_company=enriched_prospect_company,
-                            icp_scoring_ruleset=icp_scoring_ruleset,
-                            dealbreaker=dealbreaker,
-                            queue=results_queue,
-                            update_list=update_list
-                        )
-                    )
-
-                    update_list = []
-            
-                count += 1
-
-            concurrent.futures.wait(futures)
-
-        # for (
-        #     prospect_id,
-        #     enriched_prospect_company,
-        # ) in tqdm(entries):
-        #     prospect_enriched_list.append(enriched_prospect_company.to_dict())
-        #
-        #     score_one_prospect_segment(
-        #         enriched_prospect_company=enriched_prospect_company,
-        #         icp_scoring_ruleset=icp_scoring_ruleset,
-        #         dealbreaker=dealbreaker,
-        #         queue=results_queue,
-        #     )
-
         individual_score_dict = {}
         company_score_dict = {}
+        for enriched_prospect_companies in iter_raw_enriched_prospect_companies_batches(
+            client_archetype_id=client_archetype_id,
+            segment_id=segment_id,
+            prospect_ids=prospect_ids,
+        ):
+            results = score_prospects_segment(matcher, enriched_prospect_companies)
 
-        while not results_queue.empty():
-            result = results_queue.get()
-            enriched_company: EnrichedProspectCompany = result[0]
-            score = result[1]
-            company_score = result[2]
-            individual_reasoning = result[3]
-            company_reasoning = result[4]
-            reasoning = result[5]
-
-            prospect_id = enriched_company.prospect_id
-
-            raw_data.append(
-                {
-                    "prospect_id": prospect_id,
-                    "score": score,
-                    "company_score": company_score,
-                    "reasoning": reasoning,
-                    "individual_reasoning": individual_reasoning,
-                    "company_reasoning": company_reasoning,
-                }
+            updated_mapping, batch_individual_scores, batch_company_scores = build_icp_score_mapping(
+                results=results,
+                individual_count=individual_count,
+                company_count=company_count,
             )
+            bulk_update_prospect_icp_scores(updated_mapping)
+
+            individual_score_dict.update(batch_individual_scores)
+            company_score_dict.update(batch_company_scores)
+            if keep_enriched_list:
+                prospect_enriched_list.extend(
+                    enriched_prospect_company.to_dict()
+                    for enriched_prospect_company in enriched_prospect_companies
+                )
 
-            individual_score_dict[prospect_id] = score
-            company_score_dict[prospect_id] = company_score
-
-        # Distribution
-        # -1 will always be very low (0).
-        # distribute the rest of the score to be between 1-4
-        # We can do it based on percentage:
-        # 25% is low, 50% is medium, 75% is high, 100% is very high
-        updated_mapping = {}
-        
-        for entry in raw_data:
-            prospect_id = entry["prospect_id"]
-
-            score = entry["score"]
-            company_score = entry["company_score"]
-
-            updated_individual_score = -1
-            updated_company_score = -1
-
-            updated_combined_score = -1
-
-            if score == -1 or individual_count == 0:
-                updated_individual_score = 0
-            else:
-                percentage = score / individual_count * 100
-
-                if 0 <= percentage <= 25:
-                    updated_individual_score = 1
-                elif 25 < percentage <= 50:
-                    updated_individual_score = 2
-                elif 50 < percentage <= 75:
-                    updated_individual_score = 3
-                elif 75 < percentage <= 100:
-                    updated_individual_score = 4
-
-            if company_score == -1 or company_count == 0:
-                updated_company_score = 0
-            else:
-                percentage = company_score / company_count * 100
-
-                if 0 <= percentage <= 25:
-                    updated_company_score = 1
-                elif 25 < percentage <= 50:
-                    updated_company_score = 2
-                elif 50 < percentage <= 75:
-                    updated_company_score = 3
-                elif 75 < percentage <= 100:
-                    updated_company_score = 4
-
-            if company_score == -1 or score == -1 or (individual_count + company_count == 0):
-                updated_combined_score = 0
-            else:
-                percentage = (score + company_score) / (individual_count + company_count) * 100
-
-                if 0 <= percentage <= 25:
-                    updated_combined_score = 1
-                elif 25 < percentage <= 50:
-                    updated_combined_score = 2
-                elif 50 < percentage <=75:
-                    updated_combined_score = 3
-                elif 75 < percentage <= 100:
-                    updated_combined_score = 4
-
-            updated_mapping[prospect_id] = {
-                "combined_score": updated_combined_score,
-                "individual_score": updated_individual_score,
-                "company_score": updated_company_score,
-                "reasoning": entry["reasoning"] if entry["reasoning"] else "",
-                "individual_reasoning": entry["individual_reasoning"],
-                "company_reasoning": entry["company_reasoning"],
-            }
-
-        # Step 4: Batch Update all the prospects
-        for prospect_id, updated_data in updated_mapping.items():
-            combined_score = updated_data["combined_score"]
-            individual_score = updated_data["individual_score"]
-            company_score = updated_data["company_score"]
-            reasoning = updated_data["reasoning"]
-            individual_reasoning = updated_data["individual_reasoning"]
-            company_reasoning = updated_data["company_reasoning"]
-
-            prospect: Prospect = Prospect.query.get(prospect_id)
-            if prospect:
-                prospect.icp_fit_score = combined_score
-                prospect.icp_prospect_fit_score = individual_score
-                prospect.icp_company_fit_score = company_score
-                prospect.icp_fit_reason = reasoning
-                prospect.icp_fit_reason_v2 = individual_reasoning
-                prospect.icp_company_fit_reason = company_reasoning
-        
+        # Step 4: Commit once the cursor is exhausted
         db.session.commit()
 
         print("Done!")
         send_socket_message('update_prospect_list', {'update': True})
 
-        client_archetype: ClientArchetype = ClientArchetype.query.get(client_archetype_id)
-
-        # We want to remove ai research point types that are not present anymore
-
-        ai_filters = {}
-
-        icp_scoring_ruleset_to_dict = icp_scoring_ruleset.to_dict()
-
-        if icp_scoring_ruleset_to_dict.get("individual_ai_filters"):
-            for individual_ai_filter in icp_scoring_ruleset_to_dict["individual_ai_filters"]:
-                if individual_ai_filter["key"] in icp_scoring_ruleset_to_dict["individual_personalizers"]:
-                    ai_filters[individual_ai_filter["key"]] = individual_ai_filter["prompt"]
-        if icp_scoring_ruleset_to_dict.get("company_ai_filters"):
-            for company_ai_filter in icp_scoring_ruleset_to_dict["company_ai_filters"]:
-                if company_ai_filter["key"] in icp_scoring_ruleset_to_dict["company_personalizers"]:
-                   ai_filters[company_ai_filter["key"]] = company_ai_filter["prompt"] 
-
-        ### Create research point types for ai_filters
-        
-        # Cannot create research payload here, because we have to answer the ai questions
-        # Creating research point type
-
-        # For now, even though we are in a segment, we are making it archetype only
-        for ai_filter in ai_filters:
-            create_research_point_type(
-                name=ai_filter,
-                description= ai_filters[ai_filter],
-                client_sdr_id=client_archetype.client_sdr_id,
-                function_name="get_ai_research",
-                archetype_id=client_archetype_id,
-                category="ARCHETYPE",
-                segment_id=segment_id
-            )
+        create_icp_ai_filter_research_point_types(
+            icp_scoring_ruleset=icp_scoring_ruleset,
+            client_archetype_id=client_archetype_id,
+            segment_id=segment_id,
+        )
 
         # score_one_prospect_segment only scores the programmatic filters
         # we will do the ai filters in a celery task.
@@ -3303,6 +1969,289 @@ def apply_segment_icp_scoring_ruleset_filters(
         raise self.retry(exc=e)
 
 
+def start_sharded_icp_scoring_job(
+    icp_scoring_job_id: int,
+    client_archetype_id: int,
+    segment_id: Optional[int] = None,
+    prospect_ids: Optional[list[int]] = None,
+    score_ai: Optional[bool] = True,
+    shard_size: int = ICP_SCORING_SHARD_SIZE,
+) -> int:
+    """Splits an ICPScoringJobQueue into shards and queues one score_icp_scoring_shard subtask per shard
+
+    Shards are scored in parallel across icp_scoring workers. Each shard writes its own
+    results and records its index in the job's completed_shards, once per attempt, so
+    redelivered shards aren't counted twice; the shard that completes the job runs
+    finalize_sharded_icp_scoring_job. A shard that fails for good marks the job FAILED,
+    and the job can then be started again.
+
+    Args:
+        icp_scoring_job_id (int): ID of the ICPScoringJobQueue object
+        client_archetype_id (int): ID of the ClientArchetype object
+        segment_id (Optional[int], optional): ID of the Segment object. Defaults to None.
+        prospect_ids (Optional[list[int]], optional): List of prospect IDs to score. Defaults to the job's prospect IDs.
+        score_ai (Optional[bool], optional): Whether to queue AI filter scoring. Defaults to True.
+        shard_size (int, optional): Prospects per shard. Defaults to ICP_SCORING_SHARD_SIZE.
+
+    Returns:
+        int: Number of shards queued
+    """
+    icp_scoring_job: ICPScoringJobQueue = ICPScoringJobQueue.query.get(
+        icp_scoring_job_id
+    )
+    if icp_scoring_job.run_status not in [
+        ICPScoringJobQueueStatus.PENDING,
+        ICPScoringJobQueueStatus.FAILED,
+    ]:
+        return 0
+
+    prospect_ids = prospect_ids or icp_scoring_job.prospect_ids
+    if not prospect_ids:
+        query = db.session.query(Prospect.id)
+        if segment_id:
+            query = query.filter(Prospect.segment_id == segment_id)
+        else:
+            query = query.filter(Prospect.archetype_id == client_archetype_id)
+        prospect_ids = [row.id for row in query.all()]
+        icp_scoring_job.prospect_ids = prospect_ids
+
+    # Keep prospects at the same company in the same shard so AI filter answers
+    # can be shared between them
+    ordered_ids = [
+        row.id
+        for row in db.session.query(Prospect.id)
+        .filter(Prospect.id.in_(prospect_ids))
+        .order_by(Prospect.company, Prospect.id)
+        .all()
+    ]
+    shards = [
+        ordered_ids[i : i + shard_size] for i in range(0, len(ordered_ids), shard_size)
+    ]
+
+    icp_scoring_job.run_status = ICPScoringJobQueueStatus.IN_PROGRESS
+    icp_scoring_job.attempts = (
+        icp_scoring_job.attempts + 1 if icp_scoring_job.attempts else 1
+    )
+    icp_scoring_job.shard_count = len(shards)
+    icp_scoring_job.shards_completed = 0
+    icp_scoring_job.completed_shards = []
+    icp_scoring_job.prospects_scored = 0
+    icp_scoring_job.error_message = None
+    db.session.commit()
+
+    if not shards:
+        finalize_sharded_icp_scoring_job(
+            icp_scoring_job_id=icp_scoring_job_id,
+            client_archetype_id=client_archetype_id,
+            segment_id=segment_id,
+        )
+        return 0
+
+    attempt = icp_scoring_job.attempts
+    for shard_index, shard in enumerate(shards):
+        score_icp_scoring_shard.apply_async(
+            args=[
+                icp_scoring_job_id,
+                client_archetype_id,
+                segment_id,
+                shard,
+                shard_index,
+                attempt,
+                score_ai,
+            ],
+            queue="icp_scoring",
+            routing_key="icp_scoring",
+        )
+
+    return len(shards)
+
+
+@celery.task(bind=True, max_retries=3)
+def score_icp_scoring_shard(
+    self,
+    icp_scoring_job_id: int,
+    client_archetype_id: int,
+    segment_id: Optional[int],
+    prospect_ids: list[int],
+    shard_index: int,
+    attempt: int,
+    score_ai: Optional[bool] = True,
+):
+    """
+    Score one shard of a sharded ICP scoring job and record its progress.
+
+    Progress only counts for the job attempt the shard was queued for, and only
+    once per shard, so redelivered or stale shards can't finalize the job early.
+    """
+    try:
+        if segment_id:
+            icp_scoring_ruleset: ICPScoringRuleset = ICPScoringRuleset.query.filter_by(
+                client_archetype_id=client_archetype_id,
+                segment_id=segment_id,
+            ).first()
+        else:
+            icp_scoring_ruleset: ICPScoringRuleset = ICPScoringRuleset.query.filter_by(
+                client_archetype_id=client_archetype_id,
+            ).first()
+
+        if not icp_scoring_ruleset:
+            mark_sharded_icp_scoring_job_failed(
+                icp_scoring_job_id, attempt, "ICP scoring ruleset not found"
+            )
+            return False
+
+        individual_count, company_count = count_icp_attributes_split_from_ruleset(
+            icp_scoring_ruleset
+        )
+        matcher = compile_icp_scoring_ruleset(
+            icp_scoring_ruleset, on_error=report_icp_scoring_error
+        )
+
+        raw_enriched_prospect_companies_list = get_raw_enriched_prospect_companies_list(
+            client_archetype_id=client_archetype_id,
+            segment_id=segment_id,
+            prospect_ids=prospect_ids,
+        )
+        enriched_prospect_companies = list(raw_enriched_prospect_companies_list.values())
+        results = matcher.score_segment_batch(enriched_prospect_companies)
+
+        updated_mapping, individual_score_dict, company_score_dict = build_icp_score_mapping(
+            results=results,
+            individual_count=individual_count,
+            company_count=company_count,
+        )
+        bulk_update_prospect_icp_scores(updated_mapping)
+
+        # Record progress in the same transaction as the scores
+        progress = db.session.execute(
+            text(
+                """
+                UPDATE icp_scoring_job_queue
+                SET
+                    shards_completed = coalesce(shards_completed, 0) + 1,
+                    completed_shards = array_append(
+                        coalesce(completed_shards, cast('{}' as integer[])),
+                        cast(:shard_index as integer)
+                    ),
+                    prospects_scored = coalesce(prospects_scored, 0) + :prospects_scored
+                WHERE id = :icp_scoring_job_id
+                    AND run_status = 'IN_PROGRESS'
+                    AND attempts = :attempt
+                    AND NOT (
+                        cast(:shard_index as integer)
+                        = ANY(coalesce(completed_shards, cast('{}' as integer[])))
+                    )
+                RETURNING shards_completed, shard_count
+                """
+            ),
+            {
+                "prospects_scored": len(updated_mapping),
+                "icp_scoring_job_id": icp_scoring_job_id,
+                "shard_index": shard_index,
+                "attempt": attempt,
+            },
+        ).first()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+
+        if self.request.retries >= self.max_retries:
+            mark_sharded_icp_scoring_job_failed(icp_scoring_job_id, attempt, str(e))
+        else:
+            icp_scoring_job: ICPScoringJobQueue = ICPScoringJobQueue.query.get(
+                icp_scoring_job_id
+            )
+            icp_scoring_job.error_message = str(e)
+            db.session.commit()
+
+        raise self.retry(exc=e, countdown=2**self.request.retries)
+
+    send_socket_message(
+        "update_progress",
+        {"update": [epc.prospect_id for epc in enriched_prospect_companies]},
+    )
+
+    if score_ai:
+        dispatch_icp_ai_filter_scoring(
+            prospect_enriched_list=[epc.to_dict() for epc in enriched_prospect_companies],
+            icp_scoring_ruleset=icp_scoring_ruleset,
+            dealbreaker=matcher.dealbreaker,
+            individual_score_dict=individual_score_dict,
+            company_score_dict=company_score_dict,
+        )
+
+    if progress and progress.shards_completed >= progress.shard_count:
+        finalize_sharded_icp_scoring_job(
+            icp_scoring_job_id=icp_scoring_job_id,
+            client_archetype_id=client_archetype_id,
+            segment_id=segment_id,
+        )
+
+    return True
+
+
+def mark_sharded_icp_scoring_job_failed(
+    icp_scoring_job_id: int, attempt: int, error_message: str
+):
+    """
+    Marks an attempt of a sharded ICP scoring job as FAILED, so it can be started again.
+    """
+    db.session.execute(
+        text(
+            """
+            UPDATE icp_scoring_job_queue
+            SET run_status = 'FAILED', error_message = :error_message
+            WHERE id = :icp_scoring_job_id
+                AND run_status = 'IN_PROGRESS'
+                AND attempts = :attempt
+            """
+        ),
+        {
+            "icp_scoring_job_id": icp_scoring_job_id,
+            "attempt": attempt,
+            "error_message": error_message,
+        },
+    )
+    db.session.commit()
+
+
+def finalize_sharded_icp_scoring_job(
+    icp_scoring_job_id: int,
+    client_archetype_id: int,
+    segment_id: Optional[int] = None,
+):
+    """
+    Runs once every shard of a sharded ICP scoring job has been scored.
+    """
+    if segment_id:
+        icp_scoring_ruleset: ICPScoringRuleset = ICPScoringRuleset.query.filter_by(
+            client_archetype_id=client_archetype_id,
+            segment_id=segment_id,
+        ).first()
+    else:
+        icp_scoring_ruleset: ICPScoringRuleset = ICPScoringRuleset.query.filter_by(
+            client_archetype_id=client_archetype_id,
+        ).first()
+
+    send_socket_message("update_prospect_list", {"update": True})
+
+    if icp_scoring_ruleset:
+        create_icp_ai_filter_research_point_types(
+            icp_scoring_ruleset=icp_scoring_ruleset,
+            client_archetype_id=client_archetype_id,
+            segment_id=segment_id,
+        )
+
+    icp_scoring_job: ICPScoringJobQueue = ICPScoringJobQueue.query.get(
+        icp_scoring_job_id
+    )
+    icp_scoring_job.run_status = ICPScoringJobQueueStatus.COMPLETED
+    icp_scoring_job.error_message = None
+    db.session.commit()
+
+    return True
+
+
 @celery.task(bind=True, max_retries=3)
 def apply_icp_scoring_ruleset_filters(
     self,
@@ -3338,66 +2287,44 @@ def apply_icp_scoring_ruleset_filters(
             prospect_ids = [prospect.id for prospect in prospects]
             icp_scoring_job.prospect_ids = prospect_ids
 
-        # Step 1: Get the raw prospect list with data enriched
-        print("Pulling raw enriched prospect companies list...")
-        raw_enriched_prospect_companies_list = get_raw_enriched_prospect_companies_list(
-            client_archetype_id=client_archetype_id,
-            prospect_ids=prospect_ids,
-        )
-        print(
-            "Pulled raw enriched prospect companies list with length: "
-            + str(len(raw_enriched_prospect_companies_list))
-        )
-
         icp_scoring_ruleset: ICPScoringRuleset = ICPScoringRuleset.query.filter_by(
             client_archetype_id=client_archetype_id
         ).first()
 
-        # Step 2: Score all the prospects
+        # Step 1 - 2: Stream the enriched prospects and score each batch as it arrives
         print("Scoring prospects...")
         score_map = {}
-        entries = raw_enriched_prospect_companies_list.items()
         raw_data = []
 
-        results_queue = queue.Queue()
-        max_threads = 5
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_threads) as executor:
-            futures = []
-            for (
-                prospect_id,
-                enriched_prospect_company,
-            ) in tqdm(entries):
-                futures.append(
-                    executor.submit(
-                        score_one_prospect,
-                        enriched_prospect_company=enriched_prospect_company,
-                        icp_scoring_ruleset=icp_scoring_ruleset,
-                        queue=results_queue,
-                    )
-                )
-
-            concurrent.futures.wait(futures)
-
-        while not results_queue.empty():
-            result = results_queue.get()
-            enriched_company: EnrichedProspectCompany = result[0]
-            score = result[1]
-            reasoning = result[2]
-
-            prospect_id = enriched_company.prospect_id
-
-            if score not in score_map:
-                score_map[score] = 0
-            score_map[score] += 1
+        matcher = compile_icp_scoring_ruleset(
+            icp_scoring_ruleset, num_attributes=num_attributes
+        )
 
-            raw_data.append(
-                {
-                    "prospect_id": prospect_id,
-                    "score": score,
-                    "reasoning": reasoning,
-                }
+        for enriched_prospect_companies in tqdm(
+            iter_raw_enriched_prospect_companies_batches(
+                client_archetype_id=client_archetype_id,
+                prospect_ids=prospect_ids,
             )
+        ):
+            for result in matcher.score_batch(enriched_prospect_companies):
+                enriched_company: EnrichedProspectCompany = result[0]
+                score = result[1]
+                reasoning = result[2]
+
+                prospect_id = enriched_company.prospect_id
+
+                if score not in score_map:
+                    score_map[score] = 0
+                score_map[score] += 1
+
+                raw_data.append(
+                    {
+                        "prospect_id": prospect_id,
+                        "score": score,
+                        "reasoning": reasoning,
+                        "icp_enrichment_updated_at": enriched_company.icp_enrichment_updated_at,
+                    }
+                )
 
         # Determine the labels (VERY HIGH -> VERY LOW)
         sorted_keys = sorted(score_map.keys())
@@ -3437,15 +2364,26 @@ def apply_icp_scoring_ruleset_filters(
                 reasoning = "🟨 Nothing detected in prospect's profile that matches the ICP scoring ruleset."
             label = label_map[score]
 
+            # Stamped with the version of the enrichment data that was scored,
+            # so data changed since it was read leaves the prospect stale. Sent
+            # to update_prospects as JSON, hence the string
+            icp_enrichment_updated_at = entry["icp_enrichment_updated_at"]
             update_mappings.append(
                 {
                     "id": prospect_id,
                     "icp_fit_score": label,
                     "icp_fit_reason": reasoning,
                     "icp_fit_last_hash": icp_scoring_ruleset.hash,
+                    "icp_fit_enrichment_updated_at": (
+                        icp_enrichment_updated_at.isoformat()
+                        if icp_enrichment_updated_at
+                        else None
+                    ),
                 }
             )
 
+        # The hashes are written together with the scores, so a lost write
+        # leaves the prospects stale and they get rescored
         print("Updating prospects...")
         for batch in tqdm(
             [update_mappings[i : i + 50] for i in range(0, len(update_mappings), 50)]
@@ -4037,30 +2975,74 @@ def get_ruleset_hash(archetype_id: int):
     ).hexdigest()
 
 
+def get_stale_icp_prospect_ids(
+    client_archetype_id: int,
+    ruleset_hash: Optional[str],
+    force_full_rescore: bool = False,
+) -> list[int]:
+    """
+    Get the ids of prospects in an archetype whose ICP score is out of date.
+
+    A prospect is stale when it was scored against a different ruleset hash or
+    when its enrichment data changed since it was read for scoring. Both are
+    stored on the prospect, so the lookup stays on the archetype index.
+    """
+    if force_full_rescore:
+        rows = db.session.execute(
+            text("SELECT id FROM prospect WHERE archetype_id = :archetype_id"),
+            {"archetype_id": client_archetype_id},
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    rows = db.session.execute(
+        text(
+            """
+            SELECT id
+            FROM prospect
+            WHERE archetype_id = :archetype_id
+                AND (
+                    icp_fit_last_hash IS DISTINCT FROM :ruleset_hash
+                    OR icp_enrichment_updated_at IS DISTINCT FROM icp_fit_enrichment_updated_at
+                )
+            """
+        ),
+        {"archetype_id": client_archetype_id, "ruleset_hash": ruleset_hash},
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
 @celery.task(bind=True, max_retries=3)
-def auto_run_icp_scoring():
-    archetypes: list[ClientArchetype] = ClientArchetype.query.filter(
-        ClientArchetype.is_unassigned_contact_archetype == False,
-        ClientArchetype.active == True,
-    ).all()
+def auto_run_icp_scoring(self, force_full_rescore: bool = False):
+    """
+    Rescore prospects in active archetypes whose ICP score is stale.
 
-    for archetype in archetypes:
-        icp_scoring_ruleset: ICPScoringRuleset = ICPScoringRuleset.query.filter_by(
-            client_archetype_id=archetype.id
-        ).first()
+    Args:
+        force_full_rescore (bool): Rescore every prospect, regardless of hashes.
+    """
+    archetypes = (
+        db.session.query(ClientArchetype.id, ICPScoringRuleset.hash)
+        .join(
+            ICPScoringRuleset,
+            ICPScoringRuleset.client_archetype_id == ClientArchetype.id,
+        )
+        .filter(
+            ICPScoringRuleset.segment_id == None,
+            ClientArchetype.is_unassigned_contact_archetype == False,
+            ClientArchetype.active == True,
+        )
+        .all()
+    )
 
-        prospects: list[Prospect] = Prospect.query.filter_by(
-            archetype_id=archetype.id
-        ).all()
-        rescore_prospect_ids = [
-            prospect.id
-            for prospect in prospects
-            if prospect.icp_fit_last_hash != icp_scoring_ruleset.hash
-        ]
+    for archetype_id, ruleset_hash in archetypes:
+        rescore_prospect_ids = get_stale_icp_prospect_ids(
+            client_archetype_id=archetype_id,
+            ruleset_hash=ruleset_hash,
+            force_full_rescore=force_full_rescore,
+        )
 
         if len(rescore_prospect_ids) > 0:
-            success = apply_icp_scoring_ruleset_filters_task(
-                client_archetype_id=archetype.id,
+            apply_icp_scoring_ruleset_filters_task(
+                client_archetype_id=archetype_id,
                 prospect_ids=rescore_prospect_ids,
             )
 
@@ -1,7 +1,9 @@
 import merge
 from src.individual.models import Individual
 from app import db
+from sqlalchemy import event, inspect
 from sqlalchemy.dialects.postgresql import JSONB
+import datetime
 import enum
 from typing import Optional
 from src.email_outbound.email_store.models import EmailStore
@@ -497,6 +499,10 @@ class Prospect(db.Model):
     # account_research_description = db.Column(db.String, nullable=True)
 
     icp_fit_last_hash = db.Column(db.String, nullable=True)
+    # When the data the ICP ruleset scores against last changed, and the value of
+    # it the current ICP score was computed from. The score is stale if they differ.
+    icp_enrichment_updated_at = db.Column(db.DateTime, nullable=True)
+    icp_fit_enrichment_updated_at = db.Column(db.DateTime, nullable=True)
 
     img_url = db.Column(db.String, nullable=True)
     img_expire = db.Column(db.Numeric(20, 0), server_default="0", nullable=False)
@@ -545,7 +551,14 @@ class Prospect(db.Model):
     reveal_phone_number = db.Column(db.Boolean, nullable=True)
     phone_number = db.Column(db.String, nullable=True)
 
-    __table_args__ = (db.Index("idx_li_urn_id", "li_urn_id"),)
+    __table_args__ = (
+        db.Index("idx_li_urn_id", "li_urn_id"),
+        db.Index(
+            "idx_prospect_archetype_icp_fit_last_hash",
+            "archetype_id",
+            "icp_fit_last_hash",
+        ),
+    )
 
     def regenerate_uuid(self) -> str:
         uuid_str = generate_uuid(base=str(self.id), salt=self.full_name)
@@ -576,6 +589,8 @@ class Prospect(db.Model):
             "icp_prospect_fit_score": self.icp_prospect_fit_score,
             "icp_fit_score": self.icp_fit_score,
             "icp_fit_last_hash": self.icp_fit_last_hash,
+            "icp_enrichment_updated_at": self.icp_enrichment_updated_at,
+            "icp_fit_enrichment_updated_at": self.icp_fit_enrichment_updated_at,
             "icp_fit_reason": self.icp_fit_reason,
             "icp_fit_reason_v2": self.icp_fit_reason_v2,
             "icp_company_fit_score": self.icp_company_fit_score,
@@ -908,6 +923,30 @@ class Prospect(db.Model):
         }
 
 
+# Prospect fields the ICP ruleset scores against. Research payloads count too,
+# see src/research/models.py
+ICP_ENRICHMENT_FIELDS = [
+    "title",
+    "industry",
+    "linkedin_bio",
+    "company",
+    "employee_count",
+    "education_1",
+    "education_2",
+]
+
+
+@event.listens_for(Prospect, "before_insert")
+@event.listens_for(Prospect, "before_update")
+def stamp_icp_enrichment_updated_at(mapper, connection, target: Prospect):
+    """Marks the prospect's ICP score stale when the fields it scores against change."""
+    state = inspect(target)
+    if any(
+        state.attrs[field].history.has_changes() for field in ICP_ENRICHMENT_FIELDS
+    ):
+        target.icp_enrichment_updated_at = datetime.datetime.now()
+
+
 class ProspectEvent(db.Model):
     __tablename__ = "prospect_event"
 
@@ -952,6 +991,10 @@ class ProspectStatusRecords(db.Model):
     automated = db.Column(db.Boolean, nullable=True)
     additional_context = db.Column(db.String, nullable=True)
 
+    __table_args__ = (
+        db.Index("ix_prospect_status_records_created_at", "created_at"),
+    )
+
 
 class ProspectNote(db.Model):
     __tablename__ = "prospect_note"
@@ -4,7 +4,8 @@ from typing import List, Optional, Union
 from regex import P
 from src.client.sdr.services_client_sdr import load_sla_schedules
 from src.company.models import Company
-from sqlalchemy import nullslast
+from sqlalchemy import case, func, nullslast, text
+from sqlalchemy.orm import Query
 from src.contacts.models import SavedApolloQuery
 from src.daily_notifications.services import get_engagement_feed_items_for_prospect
 from src.email_outbound.email_store.hunter import find_hunter_email_from_prospect_id
@@ -73,6 +74,13 @@ from src.slack.slack_notification_center import (
 from src.utils.abstract.attr_utils import deep_get
 from src.utils.email.html_cleaning import clean_html
 from src.utils.random_string import generate_random_alphanumeric
+from src.utils.keyset import (
+    decode_cursor,
+    get_next_cursor,
+    keyset_filter,
+    order_by_sort_keys,
+)
+from src.utils.keyword_search import count_rows, keyword_filters
 from src.utils.slack import (
     URL_MAP,
     CHANNEL_NAME_MAP,
@@ -113,15 +121,20 @@ def search_prospects(
     Returns:
         list[Prospect]: List of prospects
     """
-    lowered_query = query.lower()
+    # An ILIKE per column, each of which can use its trigram index
     prospects = (
         Prospect.query.filter(
             Prospect.client_id == client_id,
             Prospect.client_sdr_id == client_sdr_id,
-            Prospect.full_name.ilike(f"%{lowered_query}%")
-            | Prospect.company.ilike(f"%{lowered_query}%")
-            | Prospect.email.ilike(f"%{lowered_query}%")
-            | Prospect.linkedin_url.ilike(f"%{lowered_query}%"),
+            *keyword_filters(
+                columns=[
+                    Prospect.full_name,
+                    Prospect.company,
+                    Prospect.email,
+                    Prospect.linkedin_url,
+                ],
+                included_keywords=[query],
+            ),
         )
         .limit(limit)
         .offset(offset)
@@ -130,49 +143,50 @@ def search_prospects(
     return prospects
 
 
-def get_prospects(
+PROSPECT_ORDERING_COLUMNS = {
+    "full_name": Prospect.full_name,
+    "company": Prospect.company,
+    "status": Prospect.status,
+    "last_updated": Prospect.updated_at,
+    "icp_fit_score": Prospect.icp_fit_score,
+    "email": Prospect.email,
+    "archetype_id": Prospect.archetype_id,
+    "segment_id": Prospect.segment_id,
+}
+PROSPECT_STREAM_BATCH_SIZE = 1000
+PROSPECT_STREAM_FIELDS = [
+    "id",
+    "full_name",
+    "first_name",
+    "last_name",
+    "title",
+    "company",
+    "email",
+    "linkedin_url",
+    "status",
+    "overall_status",
+    "icp_fit_score",
+    "archetype_id",
+    "segment_id",
+    "updated_at",
+]
+
+
+def get_prospects_query(
     client_sdr_id: int,
     query: str = "",
     channel: str = ProspectChannels.LINKEDIN.value,
     status: list[str] = None,
     persona_id: int = None,
-    limit: int = 50,
-    offset: int = 0,
     ordering: list[dict[str, int]] = [],
     bumped: str = "all",
-    show_purgatory: Union[bool, str] = False,
     prospect_id: int = None,
     icp_fit_score: int = None,
-) -> dict[int, list[Prospect]]:
-    """Gets prospects belonging to the SDR, with optional query and ordering.
-
-    Authorization required.
+) -> tuple[Query, list[tuple]]:
+    """Builds the query for `get_prospects`, without ordering or pagination
 
-    Args:
-        client_sdr_id (int): ID of the SDR, supplied by the require_user decorator
-        query (str, optional): Query. Defaults to "".
-        channel (str, optional): Channel to filter by. Defaults to ProspectChannels.SELLSCALE.value.
-        status (list[str], optional): List of statuses to filter by. Defaults to None.
-        persona_id (int, optional): Persona ID to filter by. Defaults to -1.
-        limit (int, optional): Number of records to return. Defaults to 50.
-        offset (int, optional): The offset to start returning from. Defaults to 0.
-        ordering (list, optional): Ordering to apply. See below. Defaults to [].
-        bumped (str, optional): Filter by bumped status. Defaults to 'all'.
-        show_purgatory (bool, optional): Whether to show purgatory prospects. Defaults to False.
-        prospect_id (int, optional): Filter by prospect ID. Defaults to None.
-        icp_fit_score (int, optional): Filter by ICP fit score. Defaults to None.
-
-    Ordering logic is as follows
-        The ordering list should have the following tuples:
-            - full_name: 1 or -1, indicating ascending or descending order
-            - company: 1 or -1, indicating ascending or descending order
-            - status: 1 or -1, indicating ascending or descending order
-            - last_updated: 1 or -1, indicating ascending or descending order
-            - icp_fit_score: 1 or -1, indicating ascending or descending order
-            - email: 1 or -1, indicating ascending or descending order
-            - archetype_id: 1 or -1, indicating ascending or descending order
-            - segment_id: 1 or -1, indicating ascending or descending order
-        The query will be ordered by these fields in the order provided
+    Returns:
+        tuple[Query, list[tuple]]: The query, and its sort keys (see src/utils/keyset.py)
     """
     # Make sure that the provided status is in the channel's status enum
     if status:
@@ -185,55 +199,18 @@ def get_prospects(
                     f"Invalid status '{s}' provided for channel '{channel}'"
                 )
 
-    # Construct ordering array
-    ordering_arr = []
+    # Construct the sort keys, ending with the ID so that the order is total
+    sort_keys = []
     for order in ordering:
-        order_name = order.get("field")
+        column = PROSPECT_ORDERING_COLUMNS.get(order.get("field"))
         order_direction = order.get("direction")
-        if order_name == "full_name":
-            if order_direction == 1:
-                ordering_arr.append(Prospect.full_name.asc())
-            elif order_direction == -1:
-                ordering_arr.append(Prospect.full_name.desc())
-        elif order_name == "company":
-            if order_direction == 1:
-                ordering_arr.append(Prospect.company.asc())
-            elif order_direction == -1:
-                ordering_arr.append(Prospect.company.desc())
-        elif order_name == "status":
-            if order_direction == 1:
-                ordering_arr.append(Prospect.status.asc())
-            elif order_direction == -1:
-                ordering_arr.append(Prospect.status.desc())
-        elif order_name == "last_updated":
-            if order_direction == 1:
-                ordering_arr.append(Prospect.updated_at.asc())
-            elif order_direction == -1:
-                ordering_arr.append(Prospect.updated_at.desc())
-        elif order_name == "icp_fit_score":
-            if order_direction == 1:
-                ordering_arr.append(nullslast(Prospect.icp_fit_score.asc()))
-            elif order_direction == -1:
-                ordering_arr.append(nullslast(Prospect.icp_fit_score.desc()))
-        elif order_name == "email":
-            if order_direction == 1:
-                ordering_arr.append(Prospect.email.asc())
-            elif order_direction == -1:
-                ordering_arr.append(Prospect.email.desc())
-        elif order_name == "archetype_id":
-            if order_direction == 1:
-                ordering_arr.append(Prospect.archetype_id.asc())
-            elif order_direction == -1:
-                ordering_arr.append(Prospect.archetype_id.desc())
-        elif order_name == "segment_id":
-            if order_direction == 1:
-                ordering_arr.append(Prospect.segment_id.asc())
-            elif order_direction == -1:
-                ordering_arr.append(Prospect.segment_id.desc())
-
-    # Pad ordering array with None values, set to number of ordering options: 4
-    while len(ordering_arr) < 4:
-        ordering_arr.insert(0, None)
+        if column is None or order_direction not in [1, -1]:
+            continue
+        descending = order_direction == -1
+        # ICP fit score puts unscored prospects last both ways
+        nulls_last = True if column is Prospect.icp_fit_score else not descending
+        sort_keys.append((column, descending, nulls_last))
+    sort_keys.append((Prospect.id, False, True))
 
     # Set status filter.
     filtered_status = status
@@ -265,19 +242,17 @@ def get_prospects(
         )
 
     # Apply filters
-    prospects = (
-        prospects.filter(filtered_channel.in_(filtered_status))
-        .filter(
-            Prospect.client_sdr_id == client_sdr_id,
-            Prospect.full_name.ilike(f"%{query}%")
-            | Prospect.company.ilike(f"%{query}%")
-            | Prospect.email.ilike(f"%{query}%")
-            | Prospect.linkedin_url.ilike(f"%{query}%"),
-        )
-        .order_by(ordering_arr[0])
-        .order_by(ordering_arr[1])
-        .order_by(ordering_arr[2])
-        .order_by(ordering_arr[3])
+    prospects = prospects.filter(filtered_channel.in_(filtered_status)).filter(
+        Prospect.client_sdr_id == client_sdr_id,
+        *keyword_filters(
+            columns=[
+                Prospect.full_name,
+                Prospect.company,
+                Prospect.email,
+                Prospect.linkedin_url,
+            ],
+            included_keywords=[query],
+        ),
     )
     if persona_id and persona_id != -1:
         prospects = prospects.filter(Prospect.archetype_id == persona_id)
@@ -288,10 +263,127 @@ def get_prospects(
     if icp_fit_score:
         prospects = prospects.filter(Prospect.icp_fit_score == icp_fit_score)
 
-    total_count = prospects.count()
-    prospects = prospects.limit(limit).offset(offset).all()
+    return prospects, sort_keys
+
+
+def get_prospects(
+    client_sdr_id: int,
+    query: str = "",
+    channel: str = ProspectChannels.LINKEDIN.value,
+    status: list[str] = None,
+    persona_id: int = None,
+    limit: int = 50,
+    offset: int = 0,
+    ordering: list[dict[str, int]] = [],
+    bumped: str = "all",
+    show_purgatory: Union[bool, str] = False,
+    prospect_id: int = None,
+    icp_fit_score: int = None,
+    cursor: Optional[str] = None,
+) -> dict:
+    """Gets prospects belonging to the SDR, with optional query and ordering.
+
+    Authorization required.
+
+    Args:
+        client_sdr_id (int): ID of the SDR, supplied by the require_user decorator
+        query (str, optional): Query. Defaults to "".
+        channel (str, optional): Channel to filter by. Defaults to ProspectChannels.SELLSCALE.value.
+        status (list[str], optional): List of statuses to filter by. Defaults to None.
+        persona_id (int, optional): Persona ID to filter by. Defaults to -1.
+        limit (int, optional): Number of records to return. Defaults to 50.
+        offset (int, optional): The offset to start returning from. Ignored if a cursor is given. Defaults to 0.
+        ordering (list, optional): Ordering to apply. See below. Defaults to [].
+        bumped (str, optional): Filter by bumped status. Defaults to 'all'.
+        show_purgatory (bool, optional): Whether to show purgatory prospects. Defaults to False.
+        prospect_id (int, optional): Filter by prospect ID. Defaults to None.
+        icp_fit_score (int, optional): Filter by ICP fit score. Defaults to None.
+        cursor (Optional[str], optional): The `next_cursor` of the previous page. Defaults to None.
+
+    Ordering logic is as follows
+        The ordering list should have the following tuples:
+            - full_name: 1 or -1, indicating ascending or descending order
+            - company: 1 or -1, indicating ascending or descending order
+            - status: 1 or -1, indicating ascending or descending order
+            - last_updated: 1 or -1, indicating ascending or descending order
+            - icp_fit_score: 1 or -1, indicating ascending or descending order
+            - email: 1 or -1, indicating ascending or descending order
+            - archetype_id: 1 or -1, indicating ascending or descending order
+            - segment_id: 1 or -1, indicating ascending or descending order
+        The query will be ordered by these fields in the order provided, then by ID
+
+    Returns:
+        dict: The total count, the page of prospects, and the cursor of the next page (None on the last page)
+    """
+    prospects, sort_keys = get_prospects_query(
+        client_sdr_id=client_sdr_id,
+        query=query,
+        channel=channel,
+        status=status,
+        persona_id=persona_id,
+        ordering=ordering,
+        bumped=bumped,
+        prospect_id=prospect_id,
+        icp_fit_score=icp_fit_score,
+    )
+
+    total_count = count_rows(prospects)
+
+    page = prospects.order_by(*order_by_sort_keys(sort_keys))
+    if cursor:
+        page = page.filter(
+            keyset_filter(sort_keys, decode_cursor(cursor, len(sort_keys)))
+        )
+    else:
+        page = page.offset(offset)
+    prospects = page.limit(limit).all()
+
+    next_cursor = get_next_cursor(
+        prospects,
+        lambda prospect: [getattr(prospect, column.key) for column, _, _ in sort_keys],
+        limit,
+    )
+
+    return {
+        "total_count": total_count,
+        "prospects": prospects,
+        "next_cursor": next_cursor,
+    }
+
+
+def iter_prospects(
+    client_sdr_id: int,
+    ordering: list[dict[str, int]] = [],
+    show_purgatory: Union[bool, str] = False,
+    **filters,
+):
+    """Every prospect that `get_prospects` would page through, as an iterator of PROSPECT_STREAM_FIELDS dicts.
+
+    The query is built (and its filters validated) before returning, so errors
+    surface before a streamed response starts. Rows are read from a
+    server-side cursor, so memory stays flat for any number of prospects.
+
+    Args:
+        client_sdr_id (int): ID of the SDR
+        ordering (list, optional): See `get_prospects`. Defaults to [].
+        show_purgatory (bool, optional): Accepted for parity with `get_prospects`, which also ignores it. Defaults to False.
+        **filters: The filters of `get_prospects_query`
 
-    return {"total_count": total_count, "prospects": prospects}
+    Raises:
+        ValueError: If a status doesn't belong to the channel
+    """
+    prospects, sort_keys = get_prospects_query(
+        client_sdr_id=client_sdr_id, ordering=ordering, **filters
+    )
+    rows = (
+        prospects.with_entities(
+            *[getattr(Prospect, field) for field in PROSPECT_STREAM_FIELDS]
+        )
+        .order_by(*order_by_sort_keys(sort_keys))
+        .execution_options(stream_results=True)
+        .yield_per(PROSPECT_STREAM_BATCH_SIZE)
+    )
+    return (dict(zip(PROSPECT_STREAM_FIELDS, row)) for row in rows)
 
 
 def get_prospect_duplicate_details(
@@ -327,6 +419,95 @@ def get_prospect_duplicate_details(
         }
 
 
+ICP_TABLE_STREAM_BATCH_SIZE = 1000
+ICP_TABLE_FIELDS = [
+    "full_name",
+    "title",
+    "company",
+    "linkedin_url",
+    "icp_fit_score",
+    "icp_fit_reason",
+    "industry",
+    "id",
+    "status",
+    "has_been_sent_outreach",
+    "email",
+    "valid_primary_email",
+    "icp_fit_last_hash",
+]
+
+
+def get_prospects_for_icp_table_query(
+    client_archetype_id: int,
+    invited_on_linkedin: Optional[bool] = False,
+    icp_fit_score: Optional[int] = None,
+) -> tuple[Query, list[tuple]]:
+    """Builds the query for the ICP table of an archetype, without ordering
+
+    Returns:
+        tuple[Query, list[tuple]]: The query, and its sort keys (see src/utils/keyset.py):
+            highest ICP fit score first, then the longest reason, then by name
+    """
+    query = (
+        db.session.query(
+            Prospect.full_name,
+            Prospect.title,
+            Prospect.company,
+            Prospect.linkedin_url,
+            Prospect.icp_fit_score,
+            Prospect.icp_fit_reason,
+            Prospect.industry,
+            Prospect.id,
+            Prospect.overall_status.label("status"),
+            case(
+                [(ProspectStatusRecords.id != None, True)], else_=False
+            ).label("has_been_sent_outreach"),
+            Prospect.email,
+            Prospect.valid_primary_email,
+            Prospect.icp_fit_last_hash,
+        )
+        .join(ClientSDR, ClientSDR.id == Prospect.client_sdr_id)
+        .outerjoin(
+            ProspectStatusRecords,
+            and_(
+                ProspectStatusRecords.prospect_id == Prospect.id,
+                ProspectStatusRecords.to_status == ProspectStatus.SENT_OUTREACH,
+            ),
+        )
+        .filter(Prospect.archetype_id == client_archetype_id)
+    )
+    if invited_on_linkedin:
+        query = query.filter(
+            Prospect.overall_status == ProspectOverallStatus.SENT_OUTREACH
+        )
+    if icp_fit_score is not None:
+        query = query.filter(Prospect.icp_fit_score == icp_fit_score)
+
+    sort_keys = [
+        (Prospect.icp_fit_score, True, False),
+        (func.length(Prospect.icp_fit_reason), True, False),
+        (Prospect.full_name, False, True),
+        (Prospect.id, False, True),
+    ]
+    return query, sort_keys
+
+
+def get_icp_table_row_sort_values(row) -> list:
+    return [
+        row.icp_fit_score,
+        len(row.icp_fit_reason) if row.icp_fit_reason is not None else None,
+        row.full_name,
+        row.id,
+    ]
+
+
+def icp_table_row_to_dict(row) -> dict:
+    prospect = dict(zip(ICP_TABLE_FIELDS, row))
+    if prospect["status"] is not None:
+        prospect["status"] = prospect["status"].value
+    return prospect
+
+
 def get_prospects_for_icp_table(
     client_sdr_id: int,
     client_archetype_id: int,
@@ -344,71 +525,80 @@ def get_prospects_for_icp_table(
     Returns:
         list[Prospect]: List of prospects
     """
-    result = db.session.execute(
-        """
-            select
-                prospect.full_name,
-                prospect.title,
-                prospect.company,
-                prospect.linkedin_url,
-                prospect.icp_fit_score,
-                prospect.icp_fit_reason,
-                prospect.industry,
-                prospect.id,
-                prospect.overall_status status,
-                case
-                    when prospect_status_records.id is not null then TRUE
-                    else FALSE
-                end has_been_sent_outreach,
-                prospect.email,
-                prospect.valid_primary_email,
-                prospect.icp_fit_last_hash
-            from prospect
-                join client_sdr on client_sdr.id = prospect.client_sdr_id
-                left join prospect_status_records on prospect_status_records.prospect_id = prospect.id
-                    and prospect_status_records.to_status = 'SENT_OUTREACH'
-            where prospect.archetype_id = {client_archetype_id}
-            order by
-                {order_by}
-                1 asc
-        """.format(
-            client_archetype_id=client_archetype_id,
-            client_sdr_id=client_sdr_id,
-            order_by=(
-                "icp_fit_score desc, length(icp_fit_reason) desc,"
-                if not get_sample
-                else ""
-            ),
+    if not get_sample:
+        return list(
+            iter_prospects_for_icp_table(
+                client_archetype_id=client_archetype_id,
+                invited_on_linkedin=invited_on_linkedin,
+            )
         )
-    ).fetchall()
-
-    prospects = []
-    if get_sample:
-        result = result[:50]
 
+    # The sample is the first 50 prospects by name, before the invited filter
+    query, _ = get_prospects_for_icp_table_query(client_archetype_id)
+    prospects = [
+        icp_table_row_to_dict(row)
+        for row in query.order_by(Prospect.full_name.asc()).limit(50).all()
+    ]
     if invited_on_linkedin:
-        result = [r for r in result if str(r[8]) == "SENT_OUTREACH"]
+        prospects = [p for p in prospects if p["status"] == "SENT_OUTREACH"]
 
-    for r in result:
-        prospects.append(
-            {
-                "full_name": r[0],
-                "title": r[1],
-                "company": r[2],
-                "linkedin_url": r[3],
-                "icp_fit_score": r[4],
-                "icp_fit_reason": r[5],
-                "industry": r[6],
-                "id": r[7],
-                "status": r[8],
-                "has_been_sent_outreach": r[9],
-                "email": r[10],
-                "valid_primary_email": r[11],
-                "icp_fit_last_hash": r[12],
-            }
+    return prospects
+
+
+def get_prospects_for_icp_table_page(
+    client_archetype_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    invited_on_linkedin: Optional[bool] = False,
+    icp_fit_score: Optional[int] = None,
+) -> dict:
+    """Gets a page of the ICP table, with keyset pagination
+
+    Args:
+        client_archetype_id (int): ID of the Client Archetype
+        limit (int): The page size
+        cursor (Optional[str], optional): The `next_cursor` of the previous page. Defaults to None.
+        invited_on_linkedin (Optional[bool], optional): Whether to get prospects that can be withdrawn. Defaults to False.
+        icp_fit_score (Optional[int], optional): Only get prospects with this ICP fit score. Defaults to None.
+
+    Returns:
+        dict: The prospects, and the cursor of the next page (None on the last page)
+    """
+    query, sort_keys = get_prospects_for_icp_table_query(
+        client_archetype_id=client_archetype_id,
+        invited_on_linkedin=invited_on_linkedin,
+        icp_fit_score=icp_fit_score,
+    )
+    if cursor:
+        query = query.filter(
+            keyset_filter(sort_keys, decode_cursor(cursor, len(sort_keys)))
         )
+    rows = query.order_by(*order_by_sort_keys(sort_keys)).limit(limit).all()
 
-    return prospects
+    return {
+        "prospects": [icp_table_row_to_dict(row) for row in rows],
+        "next_cursor": get_next_cursor(rows, get_icp_table_row_sort_values, limit),
+    }
+
+
+def iter_prospects_for_icp_table(
+    client_archetype_id: int,
+    invited_on_linkedin: Optional[bool] = False,
+    icp_fit_score: Optional[int] = None,
+):
+    """Yields the whole ICP table of an archetype from a server-side cursor, as ICP_TABLE_FIELDS dicts"""
+    query, sort_keys = get_prospects_for_icp_table_query(
+        client_archetype_id=client_archetype_id,
+        invited_on_linkedin=invited_on_linkedin,
+        icp_fit_score=icp_fit_score,
+    )
+    rows = (
+        query.order_by(*order_by_sort_keys(sort_keys))
+        .execution_options(stream_results=True)
+        .yield_per(ICP_TABLE_STREAM_BATCH_SIZE)
+    )
+    for row in rows:
+        yield icp_table_row_to_dict(row)
 
 
 def patch_prospect(
@@ -3654,7 +3844,9 @@ def extract_colloquialized_prospect_title(self, prospect_id: int):
         )
 
         completion = wrapped_chat_gpt_completion(
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+            use_cache=True,
         )
 
         if (
@@ -3717,7 +3909,9 @@ def extract_colloquialized_company_name(self, prospect_id: int):
         )
 
         completion = wrapped_chat_gpt_completion(
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+            use_cache=True,
         )
 
         print("Completion: {}".format(completion))
@@ -3753,9 +3947,41 @@ def extract_colloquialized_company_name(self, prospect_id: int):
             db.session.commit()
 
 
-def global_prospected_contacts(client_id: int):
-    """
-    Returns a list of all prospects that have been prospected but not yet approved for outreach for a given client.
+GLOBAL_CONTACTS_STREAM_BATCH_SIZE = 1000
+GLOBAL_CONTACTS_FIELDS = [
+    "prospect_id",
+    "prospect_name",
+    "prospect_title",
+    "prospect_company",
+    "prospect_industry",
+    "prospect_linkedin_url",
+    "outreach_status",
+    "persona",
+    "user_name",
+    "date_uploaded",
+    "overall_status",
+    "linkedin_bio",
+    "education_1",
+    "education_2",
+    "employee_count_comp",
+]
+
+
+def query_global_prospected_contacts(
+    client_id: int,
+    limit: Optional[int] = None,
+    after: Optional[list] = None,
+    stream: bool = False,
+):
+    """Runs the global contacts query. Rows end with their sort key: (size_missing, size_rank, prospect_id).
+
+    Contacts are ordered by company size, smallest first and unknown sizes last, then by ID.
+
+    Args:
+        client_id (int): ID of the client
+        limit (Optional[int], optional): The page size. Defaults to None (all contacts).
+        after (Optional[list], optional): The sort key of the last contact of the previous page. Defaults to None.
+        stream (bool, optional): Whether to read the rows from a server-side cursor. Defaults to False.
     """
     query = """
         with d as (
@@ -3799,51 +4025,108 @@ def global_prospected_contacts(client_id: int):
             from prospect
                 join client_archetype on client_archetype.id = prospect.archetype_id
                 join client_sdr on client_sdr.id = prospect.client_sdr_id
-            where prospect.client_id = {client_id}
+            where prospect.client_id = :client_id
                 and prospect.overall_status = 'PROSPECTED'
                 and prospect.approved_prospect_email_id is null
                 and prospect.approved_outreach_message_id is null
+        ),
+        ranked as (
+            select
+                d.*,
+                case when employee_count_comp = 'No Size' then 1 else 0 end size_missing,
+                coalesce(
+                    case
+                        when employee_count_comp = '0-1' then 0
+                        when employee_count_comp = '2-10' then 1
+                        when employee_count_comp = '11-50' then 2
+                        when employee_count_comp = '51-200' then 3
+                        when employee_count_comp = '201-500' then 4
+                        when employee_count_comp = '501-1000' then 5
+                        when employee_count_comp = '1001-5000' then 6
+                        when employee_count_comp = '5001-10000' then 7
+                        when employee_count_comp = '10001+' then 8
+                    end,
+                    9
+                ) size_rank
+            from d
         )
-        select *
-        from d
-        order by
-            case when employee_count_comp = 'No Size' then 1 else 0 end,
-            case
-                when employee_count_comp = '0-1' then 0
-                when employee_count_comp = '2-10' then 1
-                when employee_count_comp = '11-50' then 2
-                when employee_count_comp = '51-200' then 3
-                when employee_count_comp = '201-500' then 4
-                when employee_count_comp = '501-1000' then 5
-                when employee_count_comp = '1001-5000' then 6
-                when employee_count_comp = '5001-10000' then 7
-                when employee_count_comp = '10001+' then 8
-            end;
+        select
+            {fields},
+            size_missing,
+            size_rank
+        from ranked
+        {after_filter}
+        order by size_missing, size_rank, prospect_id
+        {limit}
     """.format(
-        client_id=client_id
+        fields=", ".join(f'"{field}"' for field in GLOBAL_CONTACTS_FIELDS),
+        after_filter=(
+            "where (size_missing, size_rank, prospect_id) > (:size_missing, :size_rank, :prospect_id)"
+            if after
+            else ""
+        ),
+        limit="limit :limit" if limit is not None else "",
     )
 
-    results = db.session.execute(query).fetchall()
-
-    entries = {
-        0: "prospect_id",
-        1: "prospect_name",
-        2: "prospect_title",
-        3: "prospect_company",
-        4: "prospect_industry",
-        5: "prospect_linkedin_url",
-        6: "outreach_status",
-        7: "persona",
-        8: "user_name",
-        9: "date_uploaded",
-        10: "overall_status",
-        11: "linkedin_bio",
-        12: "education_1",
-        13: "education_2",
-        14: "employee_count_comp",
+    params = {"client_id": client_id, "limit": limit}
+    if after:
+        params.update(
+            {"size_missing": after[0], "size_rank": after[1], "prospect_id": after[2]}
+        )
+
+    statement = text(query)
+    if stream:
+        statement = statement.execution_options(stream_results=True)
+    return db.session.execute(statement, params)
+
+
+def global_contact_row_to_dict(row) -> dict:
+    return dict(zip(GLOBAL_CONTACTS_FIELDS, row))
+
+
+def global_prospected_contacts(client_id: int):
+    """
+    Returns a list of all prospects that have been prospected but not yet approved for outreach for a given client.
+    """
+    return [
+        global_contact_row_to_dict(row)
+        for row in query_global_prospected_contacts(client_id).fetchall()
+    ]
+
+
+def get_global_prospected_contacts_page(
+    client_id: int, limit: int, cursor: Optional[str] = None
+) -> dict:
+    """Gets a page of `global_prospected_contacts`, with keyset pagination
+
+    Args:
+        client_id (int): ID of the client
+        limit (int): The page size
+        cursor (Optional[str], optional): The `next_cursor` of the previous page. Defaults to None.
+
+    Returns:
+        dict: The contacts, and the cursor of the next page (None on the last page)
+    """
+    rows = query_global_prospected_contacts(
+        client_id=client_id,
+        limit=limit,
+        after=decode_cursor(cursor, 3) if cursor else None,
+    ).fetchall()
+
+    return {
+        "contacts": [global_contact_row_to_dict(row) for row in rows],
+        "next_cursor": get_next_cursor(
+            rows, lambda row: [row.size_missing, row.size_rank, row.prospect_id], limit
+        ),
     }
 
-    return [dict(zip(entries.values(), result)) for result in results]
+
+def iter_global_prospected_contacts(client_id: int):
+    """Yields every `global_prospected_contacts` contact from a server-side cursor"""
+    result = query_global_prospected_contacts(client_id=client_id, stream=True)
+    for rows in result.partitions(GLOBAL_CONTACTS_STREAM_BATCH_SIZE):
+        for row in rows:
+            yield global_contact_row_to_dict(row)
 
 
 def move_prospect_to_persona(
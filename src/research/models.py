@@ -1,6 +1,7 @@
 from typing import Optional
 
 from app import db
+from sqlalchemy import event, text
 from sqlalchemy.dialects.postgresql import JSONB
 
 import enum
@@ -77,6 +78,22 @@ class ResearchPayload(db.Model):
         return rp
 
 
+@event.listens_for(ResearchPayload, "after_insert")
+@event.listens_for(ResearchPayload, "after_update")
+@event.listens_for(ResearchPayload, "after_delete")
+def stamp_prospect_icp_enrichment_updated_at(mapper, connection, target: ResearchPayload):
+    """The ICP ruleset scores against research payloads, so a change makes the prospect's ICP score stale."""
+    if target.prospect_id is None:
+        return
+
+    connection.execute(
+        text(
+            "UPDATE prospect SET icp_enrichment_updated_at = NOW() WHERE id = :prospect_id"
+        ),
+        {"prospect_id": target.prospect_id},
+    )
+
+
 class ResearchPointType(db.Model):
     __tablename__ = "research_point_type"
 
@@ -299,6 +316,7 @@ class WebsiteMetadataCache(db.Model):
     id = db.Column(db.Integer, primary_key=True)
 
     website_url = db.Column(db.String, nullable=False)
+    normalized_url = db.Column(db.String, nullable=False, unique=True, index=True)
     description = db.Column(db.String, nullable=False)
     summary = db.Column(db.String, nullable=False)
     products = db.Column(db.ARRAY(db.String), nullable=False)
@@ -1,6 +1,14 @@
 """
 Generates a summary of the metadata for a website and returns it as a string.
 Uses a caching mechanism to avoid making the same request multiple times.
+
+Website details are cached in two tiers, keyed by the normalized URL (see
+`normalize_website_url`): an in-process LRU in front of the
+`website_metadata_cache` table. Entries older than
+WEBSITE_METADATA_CACHE_TTL are refreshed on the next lookup. Concurrent
+lookups of the same uncached URL are single-flighted, within a process with a
+lock and across workers with a Redis lock, so only one of them fetches the
+page and calls the LLM.
 """
 
 import requests
@@ -9,10 +17,20 @@ import yaml
 import sys
 import openai
 import os
+import threading
+import time
+from collections import OrderedDict
 from ctypes import Union
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import redis
+from sqlalchemy.dialects.postgresql import insert
+
 from src.ml.openai_wrappers import OPENAI_CHAT_GPT_4_MODEL, wrapped_chat_gpt_completion
 from src.research.models import WebsiteMetadataCache
+from src.utils.redis_client import get_redis_client
 from app import db
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
@@ -68,9 +86,83 @@ JSON OUTPUT:""".format(
     return completion
 
 
+WEBSITE_FETCH_TIMEOUT_SECONDS = 15
+WEBSITE_METADATA_CACHE_TTL = timedelta(days=30)
+WEBSITE_METADATA_LOCAL_TTL_SECONDS = 60 * 60
+WEBSITE_METADATA_LOCAL_MAX_ENTRIES = 1024
+WEBSITE_METADATA_LOCK_PREFIX = "website_metadata:lock:"
+WEBSITE_METADATA_LOCK_SECONDS = 120
+WEBSITE_METADATA_WAIT_SECONDS = 60
+
+TRACKING_QUERY_PARAMS = {
+    "gclid",
+    "fbclid",
+    "msclkid",
+    "mc_cid",
+    "mc_eid",
+    "ref",
+    "source",
+    "_hsenc",
+    "_hsmi",
+}
+TRACKING_QUERY_PREFIXES = ("utm_",)
+
+WEBSITE_METADATA_FIELDS = {
+    "description": "",
+    "summary": "",
+    "products": [],
+    "industries": [],
+    "target_profiles": [],
+    "company_type": "",
+    "location": "",
+    "highlights": [],
+    "linkedin_url": "",
+    "twitter_url": "",
+    "crunchbase_url": "",
+    "instagram_url": "",
+    "email": "",
+    "address": "",
+    "company_name": "",
+    "mission": "",
+    "value_proposition": "",
+}
+
+
+def normalize_website_url(url: str) -> str:
+    """Normalizes a website URL into its cache key.
+
+    The scheme, 'www.', default ports, fragments, trailing slashes and
+    tracking params are dropped, the host is lowercased and the remaining
+    query params are sorted.
+    ex. 'HTTPS://www.Acme.com/about/?utm_source=li&b=2&a=1' -> 'acme.com/about?a=1&b=2'
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = "http://" + url
+
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[len("www.") :]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/")
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key.lower() not in TRACKING_QUERY_PARAMS
+            and not key.lower().startswith(TRACKING_QUERY_PREFIXES)
+        )
+    )
+
+    return host + path + (f"?{query}" if query else "")
+
+
 def get_website_details(url: str) -> dict:
     # Get raw HTML content
-    response = requests.get(url)
+    response = requests.get(url, timeout=WEBSITE_FETCH_TIMEOUT_SECONDS)
     if response.status_code != 200:
         raise ValueError(
             f"Failed to fetch content from {url}. Status Code: {response.status_code}"
@@ -79,7 +171,7 @@ def get_website_details(url: str) -> dict:
     html_content = response.text
 
     # Parse the HTML content using BeautifulSoup
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = BeautifulSoup(html_content, "lxml")
     # get text
     clean_text = " ".join([text for text in soup.stripped_strings])
     # add all URLs found on website to text too
@@ -118,58 +210,186 @@ def get_website_details(url: str) -> dict:
     return convert_to_json
 
 
-def get_website_details_from_cache(url: str) -> Optional[str]:
-    # Check if we have a cached version of the website details
-    cached_website_details = WebsiteMetadataCache.query.filter_by(
-        website_url=url
-    ).first()
-    if cached_website_details:
-        return cached_website_details.to_dict()
+class WebsiteMetadataStore:
+    """Two-tier website details cache: an in-process LRU in front of the
+    `website_metadata_cache` table, with single-flight fetches on a miss.
+    """
+
+    def __init__(
+        self,
+        ttl: timedelta = WEBSITE_METADATA_CACHE_TTL,
+        local_ttl_seconds: int = WEBSITE_METADATA_LOCAL_TTL_SECONDS,
+        max_local_entries: int = WEBSITE_METADATA_LOCAL_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.local_ttl_seconds = local_ttl_seconds
+        self.max_local_entries = max_local_entries
+        self._local: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
 
-    return None
+    def get(self, url: str) -> Optional[dict]:
+        """Returns the cached details, or None if they're missing or older than the TTL"""
+        key = normalize_website_url(url)
+        now = time.time()
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                details, expires_at = entry
+                if expires_at > now:
+                    self._local.move_to_end(key)
+                    return details
+                del self._local[key]
+
+        cached: WebsiteMetadataCache = (
+            WebsiteMetadataCache.query.filter_by(normalized_url=key)
+            .populate_existing()
+            .first()
+        )
+        if cached is None or cached.updated_at < datetime.now() - self.ttl:
+            return None
+
+        details = cached.to_dict()
+        self._set_local(key, details)
+        return details
+
+    def set(self, url: str, website_details: dict):
+        """Writes the details to both tiers, replacing any existing entry for the URL"""
+        key = normalize_website_url(url)
+        values = {
+            field: website_details.get(field) or default
+            for field, default in WEBSITE_METADATA_FIELDS.items()
+        }
+        now = datetime.now()
+
+        db.session.execute(
+            insert(WebsiteMetadataCache)
+            .values(
+                website_url=url,
+                normalized_url=key,
+                created_at=now,
+                updated_at=now,
+                **values,
+            )
+            .on_conflict_do_update(
+                index_elements=["normalized_url"],
+                set_=dict(website_url=url, updated_at=now, **values),
+            )
+        )
+        db.session.commit()
+
+        self._set_local(key, {"website_url": url, **values})
+
+    def get_or_fetch(
+        self, url: str, fetch: Callable[[str], dict] = None
+    ) -> Optional[dict]:
+        """Returns the cached details, fetching and caching them on a miss.
+
+        Only one caller per URL fetches at a time. Callers in other workers wait
+        (up to WEBSITE_METADATA_WAIT_SECONDS) for the fetching worker's result
+        instead of fetching it again.
+        """
+        fetch = fetch or get_website_details
+
+        details = self.get(url)
+        if details:
+            return details
+
+        key = normalize_website_url(url)
+        key_lock = self._get_key_lock(key)
+        try:
+            with key_lock:
+                return self._fetch_once(url, key, fetch)
+        finally:
+            with self._lock:
+                if not key_lock.locked():
+                    self._key_locks.pop(key, None)
+
+    def _fetch_once(
+        self, url: str, key: str, fetch: Callable[[str], dict]
+    ) -> Optional[dict]:
+        # Another thread may have fetched it while we waited for the lock
+        details = self.get(url)
+        if details:
+            return details
+
+        redis_client = get_redis_client()
+        lock_key = WEBSITE_METADATA_LOCK_PREFIX + key
+        locked = False
+        if redis_client is not None:
+            try:
+                locked = bool(
+                    redis_client.set(
+                        lock_key, 1, nx=True, ex=WEBSITE_METADATA_LOCK_SECONDS
+                    )
+                )
+                if not locked:
+                    details = self._wait_for_fetch(url, redis_client, lock_key)
+                    if details:
+                        return details
+            except redis.exceptions.RedisError as e:
+                print(f"Website metadata lock failed: {e}")
+
+        try:
+            details = fetch(url)
+            if details:
+                self.set(url, details)
+            return details
+        finally:
+            if locked:
+                try:
+                    redis_client.delete(lock_key)
+                except redis.exceptions.RedisError as e:
+                    print(f"Website metadata unlock failed: {e}")
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def _wait_for_fetch(
+        self, url: str, redis_client: redis.Redis, lock_key: str
+    ) -> Optional[dict]:
+        deadline = time.time() + WEBSITE_METADATA_WAIT_SECONDS
+        while time.time() < deadline:
+            time.sleep(1)
+            details = self.get(url)
+            if details:
+                return details
+            if not redis_client.exists(lock_key):
+                # The fetch finished without a result (or its worker died)
+                return None
+        return None
+
+    def _get_key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _set_local(self, key: str, details: dict):
+        with self._lock:
+            self._local[key] = (details, time.time() + self.local_ttl_seconds)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+
+website_metadata_store = WebsiteMetadataStore()
+
+
+def get_website_details_from_cache(url: str) -> Optional[dict]:
+    # Check if we have a (fresh) cached version of the website details
+    return website_metadata_store.get(url)
 
 
 def cache_website_details(url: str, website_details: dict):
     # Cache the website details
-    website_metadata_cache = WebsiteMetadataCache(
-        website_url=url,
-        description=website_details.get("description", ""),
-        summary=website_details.get("summary", ""),
-        products=website_details.get("products", []),
-        industries=website_details.get("industries", []),
-        target_profiles=website_details.get("target_profiles", []),
-        company_type=website_details.get("company_type", ""),
-        location=website_details.get("location", ""),
-        highlights=website_details.get("highlights", []),
-        linkedin_url=website_details.get("linkedin_url", ""),
-        twitter_url=website_details.get("twitter_url", ""),
-        crunchbase_url=website_details.get("crunchbase_url", ""),
-        instagram_url=website_details.get("instagram_url", ""),
-        email=website_details.get("email", ""),
-        address=website_details.get("address", ""),
-        company_name=website_details.get("company_name", ""),
-        mission=website_details.get("mission", ""),
-        value_proposition=website_details.get("value_proposition", ""),
-    )
-    db.session.add(website_metadata_cache)
-    db.session.commit()
+    website_metadata_store.set(url, website_details)
 
 
 def process_cache_and_print_website(url: str):
-    # Check if we have a cached version of the website details
-    cached_website_details = get_website_details_from_cache(url)
-    if cached_website_details:
-        print(f"Found cached website details for {url}.")
-        print(cached_website_details)
-        return cached_website_details
-
-    # If we don't have a cached version, fetch the website details
-    website_details: dict = get_website_details(url)
+    # Serve the website details from the cache, fetching them on a miss
+    website_details = website_metadata_store.get_or_fetch(url)
     if not website_details:
         print(f"Failed to fetch website details for {url}.")
         return
 
-    # Cache the website details
-    cache_website_details(url, website_details)
-
     return website_details
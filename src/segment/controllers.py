@@ -15,6 +15,7 @@ from src.segment.services import (
     add_prospects_to_segment,
     add_unused_prospects_in_segment_to_campaign,
     connect_saved_apollo_query_to_segment,
+    count_prospects_by_segment_filters,
     create_n_sub_batches_for_segment,
     create_new_segment,
     delete_segment,
@@ -699,8 +700,9 @@ def find_prospects_by_segment_filters_endpoint(client_sdr_id: int):
         "excluded_industry_keywords", request, json=True
     )
 
-    prospects: list[dict] = find_prospects_by_segment_filters(
-        client_sdr_id=client_sdr_id,
+    count_only = get_request_parameter("count_only", request, json=True)
+
+    filters = dict(
         segment_ids=segment_ids,
         included_title_keywords=included_title_keywords,
         excluded_title_keywords=excluded_title_keywords,
@@ -723,6 +725,17 @@ def find_prospects_by_segment_filters_endpoint(client_sdr_id: int):
         excluded_industry_keywords=excluded_industry_keywords,
     )
 
+    # Previews only need the number of matches
+    if count_only:
+        num_prospects = count_prospects_by_segment_filters(
+            client_sdr_id=client_sdr_id, **filters
+        )
+        return jsonify({"prospects": [], "num_prospects": num_prospects}), 200
+
+    prospects: list[dict] = find_prospects_by_segment_filters(
+        client_sdr_id=client_sdr_id, **filters
+    )
+
     return jsonify({"prospects": prospects, "num_prospects": len(prospects)}), 200
 
 
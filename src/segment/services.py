@@ -5,7 +5,7 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from regex import E
 from app import db, celery
-from sqlalchemy.orm import attributes
+from sqlalchemy.orm import Query, attributes
 from src.client.models import ClientArchetype, ClientSDR
 from src.contacts.models import SavedApolloQuery
 from src.ml.services import get_text_generation
@@ -19,6 +19,7 @@ from src.prospecting.models import (
 from src.research.models import ResearchPointType
 from src.segment.models import Segment
 from src.segment.models import SegmentTags
+from src.utils.keyword_search import count_rows, keyword_filters
 from sqlalchemy import case
 from sqlalchemy.orm.attributes import flag_modified
 
@@ -485,7 +486,7 @@ def add_prospects_to_segment(prospect_ids: list[int], new_segment_id: int):
     return True, "Prospects added to segment"
 
 
-def find_prospects_by_segment_filters(
+def get_segment_filters_query(
     client_sdr_id: int,
     segment_ids: list[int] = [],
     included_title_keywords: list[str] = [],
@@ -507,7 +508,8 @@ def find_prospects_by_segment_filters(
     archetype_ids: list[int] = [],
     included_industry_keywords: list[str] = [],
     excluded_industry_keywords: list[str] = [],
-) -> list[dict]:
+) -> Query:
+    """Builds the query for the SDR's prospects that match the segment filters. See `find_prospects_by_segment_filters`."""
     # join prospect with segment and get segment_title
     # keep 'Uncategorized' if no segment present
 
@@ -539,141 +541,115 @@ def find_prospects_by_segment_filters(
     if archetype_ids:
         base_query = base_query.filter(Prospect.archetype_id.in_(archetype_ids))
 
-    if included_title_keywords:
-        or_addition = []
-        for keyword in included_title_keywords:
-            or_addition.append(Prospect.title.ilike(f"%{keyword}%"))
-        if len(or_addition) > 1:
-            base_query = base_query.filter(or_(*or_addition))
-        else:
-            base_query = base_query.filter(or_addition[0])
-
-    if excluded_title_keywords:
-        and_addition = []
-        for keyword in excluded_title_keywords:
-            and_addition.append(~Prospect.title.ilike(f"%{keyword}%"))
-        if len(and_addition) > 1:
-            base_query = base_query.filter(and_(*and_addition))
-        else:
-            base_query = base_query.filter(and_addition[0])
-
-    if included_seniority_keywords:
-        or_addition = []
-        for keyword in included_seniority_keywords:
-            or_addition.append(Prospect.title.ilike(f"%{keyword}%"))
-        if len(or_addition) > 1:
-            base_query = base_query.filter(or_(*or_addition))
-        else:
-            base_query = base_query.filter(or_addition[0])
-
-    if excluded_seniority_keywords:
-        and_addition = []
-        for keyword in excluded_seniority_keywords:
-            and_addition.append(~Prospect.title.ilike(f"%{keyword}%"))
-        if len(and_addition) > 1:
-            base_query = base_query.filter(and_(*and_addition))
-        else:
-            base_query = base_query.filter(and_addition[0])
-
-    if included_company_keywords:
-        or_addition = []
-        for keyword in included_company_keywords:
-            or_addition.append(Prospect.company.ilike(f"%{keyword}%"))
-        if len(or_addition) > 1:
-            base_query = base_query.filter(or_(*or_addition))
-        else:
-            base_query = base_query.filter(or_addition[0])
-
-    if excluded_company_keywords:
-        and_addition = []
-        for keyword in excluded_company_keywords:
-            and_addition.append(~Prospect.company.ilike(f"%{keyword}%"))
-        if len(and_addition) > 1:
-            base_query = base_query.filter(and_(*and_addition))
-        else:
-            base_query = base_query.filter(and_addition[0])
-
-    if included_education_keywords:
-        and_addition = []
-        for keyword in included_education_keywords:
-            and_addition.append(
-                or_(
-                    Prospect.education_1.ilike(f"%{keyword}%"),
-                    Prospect.education_2.ilike(f"%{keyword}%"),
-                )
-            )
-        if len(and_addition) > 1:
-            base_query = base_query.filter(and_(*and_addition))
-        else:
-            base_query = base_query.filter(and_addition[0])
-
-    if excluded_education_keywords:
-        and_addition = []
-        for keyword in excluded_education_keywords:
-            and_addition.append(
-                and_(
-                    ~Prospect.education_1.ilike(f"%{keyword}%"),
-                    ~Prospect.education_2.ilike(f"%{keyword}%"),
-                )
+    # Each keyword is an ILIKE that can use the trigram index on its column
+    keyword_searches = [
+        ([Prospect.title], included_title_keywords, excluded_title_keywords, False),
+        (
+            [Prospect.title],
+            included_seniority_keywords,
+            excluded_seniority_keywords,
+            False,
+        ),
+        (
+            [Prospect.company],
+            included_company_keywords,
+            excluded_company_keywords,
+            False,
+        ),
+        (
+            [Prospect.education_1, Prospect.education_2],
+            included_education_keywords,
+            excluded_education_keywords,
+            True,
+        ),
+        ([Prospect.linkedin_bio], included_bio_keywords, excluded_bio_keywords, False),
+        (
+            [Prospect.industry],
+            included_industry_keywords,
+            excluded_industry_keywords,
+            False,
+        ),
+        (
+            [Prospect.prospect_location],
+            included_location_keywords,
+            excluded_location_keywords,
+            False,
+        ),
+    ]
+    for columns, included, excluded, match_all_included in keyword_searches:
+        base_query = base_query.filter(
+            *keyword_filters(
+                columns=columns,
+                included_keywords=included,
+                excluded_keywords=excluded,
+                match_all_included=match_all_included,
             )
-        if len(and_addition) > 1:
-            base_query = base_query.filter(and_(*and_addition))
-        else:
-            base_query = base_query.filter(and_addition[0])
-
-    if included_bio_keywords:
-        or_addition = []
-        for keyword in included_bio_keywords:
-            or_addition.append(Prospect.linkedin_bio.ilike(f"%{keyword}%"))
-        if len(or_addition) > 1:
-            base_query = base_query.filter(or_(*or_addition))
-        else:
-            base_query = base_query.filter(or_addition[0])
-
-    if excluded_bio_keywords:
-        and_addition = []
-        for keyword in excluded_bio_keywords:
-            and_addition.append(~Prospect.linkedin_bio.ilike(f"%{keyword}%"))
-        if len(and_addition) > 1:
-            base_query = base_query.filter(and_(*and_addition))
-        else:
-            base_query = base_query.filter(and_addition[0])
-
-    if included_industry_keywords:
-        or_addition = []
-        for keyword in included_industry_keywords:
-            or_addition.append(Prospect.industry.ilike(f"%{keyword}%"))
-        if len(or_addition) > 1:
-            base_query = base_query.filter(or_(*or_addition))
-        else:
-            base_query = base_query.filter(or_addition[0])
-
-    if excluded_industry_keywords:
-        and_addition = []
-        for keyword in excluded_industry_keywords:
-            and_addition.append(~Prospect.industry.ilike(f"%{keyword}%"))
-        if len(and_addition) > 1:
-            base_query = base_query.filter(and_(*and_addition))
-        else:
-            base_query = base_query.filter(and_addition[0])
-
-    if included_location_keywords:
-        or_addition = []
-        for keyword in included_location_keywords:
-            or_addition.append(Prospect.prospect_location.ilike(f"%{keyword}%"))
-        if len(or_addition) > 1:
-            base_query = base_query.filter(or_(*or_addition))
-        else:
-            base_query = base_query.filter(or_addition[0])
-
-    if excluded_location_keywords:
-        and_addition = []
-        for keyword in excluded_location_keywords:
-            and_addition.append(~Prospect.prospect_location.ilike(f"%{keyword}%"))
-        if len(and_addition) > 1:
-            base_query = base_query.filter(and_(*and_addition))
-        else:
-            base_query = base_query.filter(and_addition[0])
+        )
+
+    return base_query
+
+
+def count_prospects_by_segment_filters(client_sdr_id: int, **filters) -> int:
+    """Counts the SDR's prospects that match the segment filters, without loading them
+
+    Args:
+        client_sdr_id (int): ID of the SDR
+        **filters: The filters of `find_prospects_by_segment_filters`
+
+    Returns:
+        int: The number of matching prospects
+    """
+    return count_rows(
+        get_segment_filters_query(client_sdr_id=client_sdr_id, **filters)
+    )
+
+
+def find_prospects_by_segment_filters(
+    client_sdr_id: int,
+    segment_ids: list[int] = [],
+    included_title_keywords: list[str] = [],
+    excluded_title_keywords: list[str] = [],
+    included_seniority_keywords: list[str] = [],
+    excluded_seniority_keywords: list[str] = [],
+    included_company_keywords: list[str] = [],
+    excluded_company_keywords: list[str] = [],
+    included_education_keywords: list[str] = [],
+    excluded_education_keywords: list[str] = [],
+    included_bio_keywords: list[str] = [],
+    excluded_bio_keywords: list[str] = [],
+    included_location_keywords: list[str] = [],
+    excluded_location_keywords: list[str] = [],
+    included_skills_keywords: list[str] = [],
+    excluded_skills_keywords: list[str] = [],
+    years_of_experience_start: int = None,
+    years_of_experience_end: int = None,
+    archetype_ids: list[int] = [],
+    included_industry_keywords: list[str] = [],
+    excluded_industry_keywords: list[str] = [],
+) -> list[dict]:
+    base_query = get_segment_filters_query(
+        client_sdr_id=client_sdr_id,
+        segment_ids=segment_ids,
+        included_title_keywords=included_title_keywords,
+        excluded_title_keywords=excluded_title_keywords,
+        included_seniority_keywords=included_seniority_keywords,
+        excluded_seniority_keywords=excluded_seniority_keywords,
+        included_company_keywords=included_company_keywords,
+        excluded_company_keywords=excluded_company_keywords,
+        included_education_keywords=included_education_keywords,
+        excluded_education_keywords=excluded_education_keywords,
+        included_bio_keywords=included_bio_keywords,
+        excluded_bio_keywords=excluded_bio_keywords,
+        included_location_keywords=included_location_keywords,
+        excluded_location_keywords=excluded_location_keywords,
+        included_skills_keywords=included_skills_keywords,
+        excluded_skills_keywords=excluded_skills_keywords,
+        years_of_experience_start=years_of_experience_start,
+        years_of_experience_end=years_of_experience_end,
+        archetype_ids=archetype_ids,
+        included_industry_keywords=included_industry_keywords,
+        excluded_industry_keywords=excluded_industry_keywords,
+    )
 
     prospects = base_query.all()
 
@@ -973,7 +973,9 @@ def categorize_via_gpt(prospect_id: int, track_event_id: int, client_id: int) ->
             }
         ],
         max_tokens=30,
-        model='gpt-4o'
+        model='gpt-4o',
+        temperature=0,
+        use_cache=True,
     )
 
     print('gpt response: ', gpt_response)
@@ -1242,7 +1244,9 @@ def categorize_via_gpt_direct(prospect_name: str, prospect_company: str, prospec
             }
         ],
         max_tokens=30,
-        model='gpt-4o'
+        model='gpt-4o',
+        temperature=0,
+        use_cache=True,
     )
 
     print('gpt response: ', gpt_response)
@@ -0,0 +1,228 @@
+""" Concurrent DNSBL (DNS blacklist / whitelist) lookups for domains.
+
+Every (domain, list) pair is one DNS A query, so a domain costs ~60 queries.
+They're resolved on a shared thread pool with a per-query timeout, and
+results are cached per (domain, list) for DNSBL_CACHE_TTL_SECONDS. Checking
+many domains takes roughly as long as the slowest query, not the sum of them.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import dns.exception
+import dns.resolver
+
+DNSBL_QUERY_TIMEOUT_SECONDS = 3
+DNSBL_MAX_WORKERS = 32
+DNSBL_CACHE_TTL_SECONDS = 60 * 60
+DNSBL_CACHE_MAX_ENTRIES = 50000
+
+# Result key -> (list type, list zones)
+DNSBL_LISTS = {
+    "blacklists": (
+        "blacklist",
+        [
+            "0spamurl.fusionzero.com",
+            "uribl.abuse.ro",
+            "bsb.spamlookup.net",
+            "black.dnsbl.brukalai.lt",
+            "light.dnsbl.brukalai.lt",
+            "bl.fmb.la",
+            "communicado.fmb.la",
+            "nsbl.fmb.la",
+            "short.fmb.la",
+            "black.junkemailfilter.com",
+            "nuribl.mailcleaner.net",
+            "uribl.mailcleaner.net",
+            "dbl.nordspam.com",
+            "ubl.nszones.com",
+            "uribl.pofon.foobar.hu",
+            "rhsbl.rbl.polspam.pl",
+            "rhsbl-h.rbl.polspam.pl",
+            "mailsl.dnsbl.rjek.com",
+            "urlsl.dnsbl.rjek.com",
+            "uribl.rspamd.com",
+            "rhsbl.rymsho.ru",
+            "public.sarbl.org",
+            "rhsbl.scientificspam.net",
+            "nomail.rhsbl.sorbs.net",
+            "badconf.rhsbl.sorbs.net",
+            "rhsbl.sorbs.net",
+            "fresh.spameatingmonkey.net",
+            "fresh10.spameatingmonkey.net",
+            "fresh15.spameatingmonkey.net",
+            "fresh30.spameatingmonkey.net",
+            "freshzero.spameatingmonkey.net",
+            "uribl.spameatingmonkey.net",
+            "urired.spameatingmonkey.net",
+            "dbl.spamhaus.org",
+            "dnsbl.spfbl.net",
+            "dbl.suomispam.net",
+            "multi.surbl.org",
+            "uribl.swinog.ch",
+            "dob.sibl.support-intelligence.net",
+            "black.uribl.com",
+            "grey.uribl.com",
+            "multi.uribl.com",
+            "red.uribl.com",
+            "uri.blacklist.woody.ch",
+            "rhsbl.zapbl.net",
+            "d.bl.zenrbl.pl",
+        ],
+    ),
+    "combinedlists": (
+        "combinedlist",
+        [
+            "sa.fmb.la",
+            "hostkarma.junkemailfilter.com",
+            "nobl.junkemailfilter.com",
+            "reputation-domain.rbl.scrolloutf1.com",
+            "reputation-ns.rbl.scrolloutf1.com",
+            "score.spfbl.net",
+        ],
+    ),
+    "whitelists": (
+        "whitelist",
+        [
+            "white.dnsbl.brukalai.lt",  # Brukalai.lt DNSBL white
+            "dwl.dnswl.org",  # DNSWL.org Domain Whitelist
+            "iddb.isipp.com",  # ISIPP Accreditation Database (IDDB)
+            "_vouch.dwl.spamhaus.org",  # Spamhaus DWL Domain Whitelist
+            "dnswl.spfbl.net",  # SPFBL.net Whitelist
+            "white.uribl.com",  # URIBL white
+        ],
+    ),
+    "informationallists": (
+        "informationallist",
+        [
+            "abuse.spfbl.net",
+        ],
+    ),
+}
+
+# Statuses that are worth caching. Timeouts and errors are retried on the next check.
+DNSBL_CACHEABLE_STATUSES = ["listed", "not_listed", "no_answer"]
+
+
+class DNSBLChecker:
+    """Resolves (domain, list) pairs concurrently, with a TTL cache of the results."""
+
+    def __init__(
+        self,
+        timeout: float = DNSBL_QUERY_TIMEOUT_SECONDS,
+        max_workers: int = DNSBL_MAX_WORKERS,
+        cache_ttl: int = DNSBL_CACHE_TTL_SECONDS,
+        max_cache_entries: int = DNSBL_CACHE_MAX_ENTRIES,
+    ):
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.cache_ttl = cache_ttl
+        self.max_cache_entries = max_cache_entries
+        self._resolver = None
+        self._cache: dict[tuple, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def resolver(self) -> dns.resolver.Resolver:
+        # Created on first use, since it reads the system resolver configuration
+        if self._resolver is None:
+            resolver = dns.resolver.Resolver()
+            resolver.timeout = self.timeout
+            resolver.lifetime = self.timeout
+            self._resolver = resolver
+        return self._resolver
+
+    def lookup(self, domain: str, list_zone: str) -> str:
+        """Looks up a domain on one list.
+
+        Returns:
+            str: 'listed', 'not_listed', 'no_answer', 'timeout' or 'error'
+        """
+        key = (domain, list_zone)
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+
+        query = ".".join(reversed(str(domain).split("."))) + "." + list_zone
+        try:
+            answers = self.resolver.resolve(query, "A")
+            status = (
+                "listed"
+                if any(getattr(rdata, "address", None) for rdata in answers)
+                else "no_answer"
+            )
+        except dns.resolver.NXDOMAIN:
+            status = "not_listed"
+        except dns.resolver.NoAnswer:
+            status = "no_answer"
+        except dns.resolver.Timeout:
+            status = "timeout"
+        except dns.exception.DNSException as e:
+            print(f"DNSBL: Error querying {list_zone} for {domain}: {e}")
+            status = "error"
+
+        if status in DNSBL_CACHEABLE_STATUSES:
+            with self._lock:
+                if len(self._cache) >= self.max_cache_entries:
+                    self._evict_expired(now)
+                if len(self._cache) < self.max_cache_entries:
+                    self._cache[key] = (status, now + self.cache_ttl)
+
+        return status
+
+    def check_domains(self, domains: list[str]) -> dict[str, dict]:
+        """Checks every domain against every list, concurrently.
+
+        Args:
+            domains (list[str]): The domains to check
+
+        Returns:
+            dict[str, dict]: domain -> results, in the shape returned by `domain_blacklist_check`
+        """
+        domains = list(dict.fromkeys(domains))
+        pairs = [
+            (domain, results_key, list_type, list_zone)
+            for domain in domains
+            for results_key, (list_type, list_zones) in DNSBL_LISTS.items()
+            for list_zone in list_zones
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            statuses = list(
+                executor.map(lambda pair: self.lookup(pair[0], pair[3]), pairs)
+            )
+
+        results = {
+            domain: {results_key: [] for results_key in DNSBL_LISTS} for domain in domains
+        }
+        for (domain, results_key, list_type, list_zone), status in zip(pairs, statuses):
+            results[domain][results_key].append(
+                {
+                    "domain": domain,
+                    "list_type": list_type,
+                    "list_name": list_zone,
+                    "status": status,
+                }
+            )
+
+        return results
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _evict_expired(self, now: float):
+        for key, (_, expires_at) in list(self._cache.items()):
+            if expires_at <= now:
+                del self._cache[key]
+
+
+dnsbl_checker = DNSBLChecker()
+
+
+def check_domains(domains: list[str]) -> dict[str, dict]:
+    """Checks the domains against the DNS black-, white- and informational lists. See `DNSBLChecker.check_domains`."""
+    return dnsbl_checker.check_domains(domains)
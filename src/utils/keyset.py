@@ -0,0 +1,100 @@
+""" Keyset (cursor) pagination.
+
+Instead of `OFFSET n`, which makes Postgres walk and discard every earlier row,
+the next page starts right after the last row of the previous one. The filter
+is `(sort key, id) > (last sort key, last id)` in the listing's sort order.
+The position is handed to clients as an opaque cursor string, so every page
+costs the same no matter how deep it is.
+
+A sort key is `(column, descending, nulls_last)`, in the order of the listing's
+ORDER BY. It must end with a unique column, usually the id. Postgres sorts NULLs
+last in ascending and first in descending order unless told otherwise.
+"""
+
+import base64
+import datetime
+import enum
+import json
+from typing import Any, Optional
+
+from sqlalchemy import and_, false, nullsfirst, nullslast, or_
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """Encodes the sort key values of the last row of a page as an opaque cursor"""
+
+    def default(value):
+        if isinstance(value, enum.Enum):
+            return value.name
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            return value.isoformat()
+        return str(value)
+
+    payload = json.dumps(values, default=default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, num_values: int) -> list[Any]:
+    """Decodes a cursor from `encode_cursor`
+
+    Raises:
+        ValueError: If the cursor is malformed or doesn't match the sort keys
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != num_values:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def order_by_sort_keys(sort_keys: list[tuple]) -> list:
+    """The ORDER BY clauses matching the sort keys"""
+    clauses = []
+    for column, descending, nulls_last in sort_keys:
+        clause = column.desc() if descending else column.asc()
+        clauses.append(nullslast(clause) if nulls_last else nullsfirst(clause))
+    return clauses
+
+
+def keyset_filter(sort_keys: list[tuple], values: list[Any]):
+    """The filter for the rows that come after `values` in the sort order of `sort_keys`
+
+    Args:
+        sort_keys (list[tuple]): (column, descending, nulls_last) per sort key
+        values (list[Any]): The sort key values of the last row of the previous page
+
+    Returns:
+        The filter clause
+    """
+    conditions = []
+    equal_so_far = []
+    for (column, descending, nulls_last), value in zip(sort_keys, values):
+        if value is None:
+            # NULLs are all tied, so only non-NULLs can come after, and only if NULLs sort first
+            after = column.isnot(None) if not nulls_last else false()
+            equal = column.is_(None)
+        else:
+            after = column < value if descending else column > value
+            if nulls_last:
+                after = or_(after, column.is_(None))
+            equal = column == value
+
+        conditions.append(and_(*equal_so_far, after))
+        equal_so_far.append(equal)
+
+    return or_(*conditions)
+
+
+def get_next_cursor(rows: list, get_values, limit: Optional[int]) -> Optional[str]:
+    """The cursor for the page after `rows`, or None if this was the last page
+
+    Args:
+        rows (list): The rows of this page
+        get_values (callable): Returns the sort key values of a row
+        limit (Optional[int]): The page size
+    """
+    if not rows or limit is None or len(rows) < limit:
+        return None
+    return encode_cursor(get_values(rows[-1]))
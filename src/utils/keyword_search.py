@@ -0,0 +1,92 @@
+""" Builds keyword filters that can use the pg_trgm GIN indexes on text columns.
+
+`column ILIKE '%keyword%'` can be answered from a `gin_trgm_ops` index when the
+keyword has at least 3 characters, so every keyword becomes one ILIKE per
+column. OR-ed keywords become a BitmapOr of index scans instead of a
+sequential scan. Keywords are stripped and de-duplicated, and LIKE wildcards in
+them are escaped, so "100%" only matches the literal text.
+
+The indexed columns are listed in the `added_trigram_search_indexes` migration.
+"""
+
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, func, not_, or_
+from sqlalchemy.orm import Query
+
+LIKE_ESCAPE_CHARACTER = "\\"
+
+
+def escape_like(keyword: str) -> str:
+    """Escapes LIKE wildcards, ex. '50%_off' -> '50\\%\\_off'"""
+    return (
+        keyword.replace(LIKE_ESCAPE_CHARACTER, LIKE_ESCAPE_CHARACTER * 2)
+        .replace("%", LIKE_ESCAPE_CHARACTER + "%")
+        .replace("_", LIKE_ESCAPE_CHARACTER + "_")
+    )
+
+
+def clean_keywords(keywords: Optional[Iterable[str]]) -> list[str]:
+    """Strips keywords and drops empty and duplicate (case-insensitive) ones, keeping their order"""
+    cleaned = {}
+    for keyword in keywords or []:
+        keyword = (keyword or "").strip()
+        if keyword:
+            cleaned.setdefault(keyword.lower(), keyword)
+    return list(cleaned.values())
+
+
+def contains_keyword(column, keyword: str):
+    """`column ILIKE '%keyword%'`, with the keyword's wildcards escaped"""
+    return column.ilike(f"%{escape_like(keyword)}%", escape=LIKE_ESCAPE_CHARACTER)
+
+
+def keyword_filters(
+    columns: list,
+    included_keywords: Optional[list[str]] = None,
+    excluded_keywords: Optional[list[str]] = None,
+    match_all_included: bool = False,
+) -> list:
+    """Turns included and excluded keyword lists into filters for `Query.filter`.
+
+    Args:
+        columns (list): The columns to search. A keyword matches if any of them contains it.
+        included_keywords (Optional[list[str]], optional): Rows must match at least one of these. Defaults to None.
+        excluded_keywords (Optional[list[str]], optional): Rows must match none of these. Defaults to None.
+        match_all_included (bool, optional): Rows must match every included keyword instead. Defaults to False.
+
+    Returns:
+        list: The filters, empty if there are no keywords
+    """
+    filters = []
+
+    included_keywords = clean_keywords(included_keywords)
+    if included_keywords:
+        matches = [
+            or_(*[contains_keyword(column, keyword) for column in columns])
+            for keyword in included_keywords
+        ]
+        filters.append(and_(*matches) if match_all_included else or_(*matches))
+
+    for keyword in clean_keywords(excluded_keywords):
+        filters.extend(not_(contains_keyword(column, keyword)) for column in columns)
+
+    return filters
+
+
+def count_rows(query: Query, distinct_column=None) -> int:
+    """Counts the rows of a query in the database, without loading them
+
+    Args:
+        query (Query): The query to count
+        distinct_column (optional): Count distinct values of this column instead, ex. when joins duplicate rows
+
+    Returns:
+        int: The number of rows
+    """
+    count = (
+        func.count(distinct_column.distinct())
+        if distinct_column is not None
+        else func.count()
+    )
+    return query.order_by(None).with_entities(count).scalar() or 0
@@ -0,0 +1,149 @@
+""" Registry of named, parameterized SQL queries, used by analytics and reporting.
+
+Queries are registered once at import time as `text()` clauses with bound
+parameters, instead of being assembled with `str.format` on every call. The
+statement text is the same on every call, so the database sees one statement
+per query (and pg_stat_statements groups it as one), and user-supplied values
+never end up in the SQL.
+
+Every execution is timed. Per-query call counts and durations are kept for
+this process, see `query_registry.get_stats()`. Queries slower than
+`SLOW_QUERY_THRESHOLD_SECONDS` are logged with their name.
+
+    CAMPAIGN_QUERY = query_registry.register(
+        "campaign_analytics.summary",
+        "select ... where client_archetype.client_id = :client_id",
+        row_type=CampaignSummaryRow,
+    )
+    rows = CAMPAIGN_QUERY.all(client_id=client_id)
+
+`row_type` is typically a NamedTuple with the query's columns, in order, so
+rows keep working with both `row.num_sent` and `row[5]`.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+
+from app import db
+
+SLOW_QUERY_THRESHOLD_SECONDS = 1.0
+
+T = TypeVar("T")
+
+
+class RegisteredQuery(Generic[T]):
+    """A named SQL query with bound parameters
+
+    Args:
+        name (str): Unique name of the query, used in stats and logs
+        sql (str): The SQL, with `:name` parameters
+        row_type (Optional[Callable[..., T]], optional): Builds a typed row from the columns, as keyword arguments. Defaults to None (SQLAlchemy rows).
+        registry (Optional[QueryRegistry], optional): Where to record timings. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sql: str,
+        row_type: Optional[Callable[..., T]] = None,
+        registry: Optional["QueryRegistry"] = None,
+    ):
+        self.name = name
+        self.statement: TextClause = text(sql)
+        self.row_type = row_type
+        self.registry = registry
+
+    def execute(self, **params):
+        """Executes the query in the current session, timed"""
+        start = time.perf_counter()
+        try:
+            return db.session.execute(self.statement, params)
+        finally:
+            if self.registry is not None:
+                self.registry.record(self.name, time.perf_counter() - start)
+
+    def all(self, **params) -> list[T]:
+        """All rows, as `row_type` if set"""
+        return [self._to_row(row) for row in self.execute(**params).fetchall()]
+
+    def first(self, **params) -> Optional[T]:
+        """The first row, as `row_type` if set, or None"""
+        row = self.execute(**params).fetchone()
+        return self._to_row(row) if row is not None else None
+
+    def scalar(self, **params) -> Any:
+        """The first column of the first row"""
+        return self.execute(**params).scalar()
+
+    def dicts(self, **params) -> list[dict]:
+        """All rows, as dicts of column -> value"""
+        return [dict(row._mapping) for row in self.execute(**params).fetchall()]
+
+    def _to_row(self, row):
+        if self.row_type is None:
+            return row
+        return self.row_type(**row._mapping)
+
+
+class QueryRegistry:
+    """Named queries, and how long their executions took in this process"""
+
+    def __init__(self, slow_query_threshold: float = SLOW_QUERY_THRESHOLD_SECONDS):
+        self.slow_query_threshold = slow_query_threshold
+        self._queries: dict[str, RegisteredQuery] = {}
+        self._lock = threading.Lock()
+        # name -> [calls, total seconds, max seconds]
+        self._stats: dict[str, list] = {}
+
+    def register(
+        self, name: str, sql: str, row_type: Optional[Callable[..., T]] = None
+    ) -> RegisteredQuery[T]:
+        """Registers a query
+
+        Raises:
+            ValueError: If a query with this name is already registered
+        """
+        if name in self._queries:
+            raise ValueError(f"Query '{name}' is already registered")
+        query = RegisteredQuery(name, sql, row_type=row_type, registry=self)
+        self._queries[name] = query
+        return query
+
+    def get(self, name: str) -> RegisteredQuery:
+        return self._queries[name]
+
+    def record(self, name: str, duration: float):
+        """Records the duration of an execution of a query"""
+        with self._lock:
+            stats = self._stats.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+        if duration >= self.slow_query_threshold:
+            print(f"Slow query '{name}' took {round(duration * 1000)}ms")
+
+    def get_stats(self) -> list[dict]:
+        """Calls and durations per query, most total time first"""
+        with self._lock:
+            stats = [
+                {
+                    "name": name,
+                    "calls": calls,
+                    "total_ms": round(total * 1000, 1),
+                    "mean_ms": round(total * 1000 / calls, 1),
+                    "max_ms": round(max_duration * 1000, 1),
+                }
+                for name, (calls, total, max_duration) in self._stats.items()
+            ]
+        return sorted(stats, key=lambda s: s["total_ms"], reverse=True)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+
+query_registry = QueryRegistry()
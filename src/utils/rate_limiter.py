@@ -0,0 +1,128 @@
+""" Shared Redis token bucket rate limiter.
+
+Every worker draws from the same Redis buckets, so together they stay under a
+vendor's quota. A call can draw from several buckets at once (e.g. one for
+requests and one for tokens): it either takes from all of them or waits.
+
+If Redis is unavailable, or the wait would run past `max_wait_seconds`,
+callers either go ahead right away or, with `local_fallback`, space their
+calls out per process at the first bucket's rate.
+"""
+
+import random
+import threading
+import time
+from typing import NamedTuple
+
+import redis
+
+from src.utils.redis_client import get_redis_client
+
+
+class TokenBucket(NamedTuple):
+    key: str  # Redis key of the bucket
+    capacity: float  # Most the bucket holds, and what it refills per minute
+    cost: float = 1  # How much one call takes
+
+
+# Refills every bucket for the elapsed time, then either takes each bucket's
+# cost, or takes nothing and returns how many ms until it could.
+# ARGV holds (capacity, refill rate per ms, cost) per key.
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 3 - 2])
+    local rate = tonumber(ARGV[i * 3 - 1])
+    local cost = math.min(tonumber(ARGV[i * 3]), capacity)
+
+    local state = redis.call('HMGET', key, 'level', 'ts')
+    local level = tonumber(state[1])
+    local ts = tonumber(state[2])
+    if level == nil or ts == nil then
+        level = capacity
+    else
+        level = math.min(capacity, level + math.max(0, now - ts) * rate)
+    end
+
+    if level < cost then
+        wait = math.max(wait, (cost - level) / rate)
+    end
+    levels[i] = level - cost
+end
+
+if wait > 0 then
+    return math.ceil(wait)
+end
+
+for i, key in ipairs(KEYS) do
+    redis.call('HSET', key, 'level', levels[i], 'ts', now)
+    redis.call('PEXPIRE', key, 120000)
+end
+return 0
+"""
+
+_token_bucket_script = None
+_local_lock = threading.Lock()
+_local_next_call: dict[str, float] = {}
+
+
+def acquire_rate_limit(
+    buckets: list[TokenBucket],
+    max_wait_seconds: float,
+    local_fallback: bool = False,
+) -> bool:
+    """Blocks until every bucket has room for one call, then takes from all of them.
+
+    Args:
+        buckets (list[TokenBucket]): The buckets the call draws from. Capacities are per minute.
+        max_wait_seconds (float): Longest to wait on the shared buckets
+        local_fallback (bool, optional): Whether to space calls out per process when the shared buckets can't be used. Defaults to False.
+
+    Returns:
+        bool: True if the shared buckets granted the call, False if it went ahead without them
+    """
+    global _token_bucket_script
+
+    redis_client = get_redis_client()
+    if redis_client is not None:
+        keys = [bucket.key for bucket in buckets]
+        args = []
+        for bucket in buckets:
+            args.extend([bucket.capacity, bucket.capacity / 60000, bucket.cost])
+
+        deadline = time.monotonic() + max_wait_seconds
+        try:
+            if _token_bucket_script is None:
+                _token_bucket_script = redis_client.register_script(
+                    TOKEN_BUCKET_SCRIPT
+                )
+
+            while True:
+                wait_ms = int(
+                    _token_bucket_script(keys=keys, args=args, client=redis_client)
+                )
+                if wait_ms <= 0:
+                    return True
+
+                wait_seconds = wait_ms / 1000 + random.uniform(0, 0.05)
+                if time.monotonic() + wait_seconds > deadline:
+                    print(f"Rate limiter wait exceeded for {keys[0]}")
+                    break
+                time.sleep(wait_seconds)
+        except redis.exceptions.RedisError as e:
+            print(f"Rate limiter unavailable: {e}")
+
+    if local_fallback:
+        # Space this process's calls out at the first bucket's rate
+        key, interval = buckets[0].key, 60 / buckets[0].capacity
+        with _local_lock:
+            now = time.monotonic()
+            next_call = max(now, _local_next_call.get(key, now))
+            _local_next_call[key] = next_call + interval
+        time.sleep(max(0, next_call - now))
+
+    return False
@@ -0,0 +1,35 @@
+import os
+import threading
+from typing import Optional
+
+import redis
+
+_redis_client: Optional[redis.Redis] = None
+_redis_client_lock = threading.Lock()
+
+
+def get_redis_client() -> Optional[redis.Redis]:
+    """Returns a process-wide Redis client for the Celery Redis instance.
+
+    The client keeps its own connection pool, so it is safe to share between
+    threads. Returns None if no Redis URL is configured (e.g. in tests), in
+    which case callers should fall back to running without Redis.
+    """
+    global _redis_client
+
+    if _redis_client is not None:
+        return _redis_client
+
+    redis_url = os.environ.get("CELERY_REDIS_URL")
+    if not redis_url:
+        return None
+
+    with _redis_client_lock:
+        if _redis_client is None:
+            _redis_client = redis.Redis.from_url(
+                redis_url,
+                socket_timeout=2,
+                socket_connect_timeout=2,
+            )
+
+    return _redis_client
@@ -27,6 +27,13 @@ def scrape_all_inboxes_job():
     if is_scheduling_instance():
         scrape_all_inboxes.delay()
 
+def flush_slack_outbox_job():
+    from src.utils.slack_outbox import flush_slack_outbox
+
+    if is_scheduling_instance():
+        flush_slack_outbox.delay()
+
+
 def fill_in_daily_notifications():
     from src.daily_notifications.services import fill_in_daily_notifications
 
@@ -328,6 +335,20 @@ def run_analytics_backfill_jobs():
         backfill_linkedin_initial_message_template_library_stats.delay()
 
 
+def run_refresh_campaign_analytics_rollups():
+    from src.analytics.services_campaign_rollups import (
+        refresh_campaign_analytics_rollups,
+    )
+
+    if is_scheduling_instance():
+        refresh_campaign_analytics_rollups.apply_async(
+            args=[],
+            queue="analytics",
+            routing_key="analytics",
+            priority=1,
+        )
+
+
 def run_daily_collect_and_generate_campaigns_for_sdr():
     from src.campaigns.autopilot.services import (
         daily_collect_and_generate_campaigns_for_sdr,
@@ -523,6 +544,13 @@ def run_reconnect_disconnected_linkedins():
     if is_scheduling_instance():
         reconnect_disconnected_linkedins.delay()
 
+def run_llm_batch_jobs():
+    from src.ml.llm_batch_services import process_llm_batch_jobs
+
+    if is_scheduling_instance():
+        process_llm_batch_jobs.delay()
+
+
 daily_trigger = CronTrigger(hour=9, timezone=timezone("America/Los_Angeles"))
 daily_2am_trigger = CronTrigger(hour=2, timezone=timezone("America/Los_Angeles"))
 daily_5pm_trigger = CronTrigger(hour=17, timezone=timezone("America/Los_Angeles"))
@@ -552,6 +580,7 @@ scheduler.add_job(
     seconds=30,
 )
 scheduler.add_job(func=process_queue, trigger="interval", seconds=30)
+scheduler.add_job(func=flush_slack_outbox_job, trigger="interval", seconds=10)
 scheduler.add_job(
     func=run_find_and_run_queued_question_enrichment_row_job,
     trigger="interval",
@@ -564,6 +593,7 @@ scheduler.add_job(func=scrape_all_inboxes_job, trigger="interval", minutes=15)
 scheduler.add_job(func=scrape_li_convos, trigger="interval", minutes=1)
 scheduler.add_job(run_sales_navigator_launches, trigger="interval", minutes=1)
 scheduler.add_job(run_auto_resolve_linkedin_tasks, trigger="interval", minutes=1)
+scheduler.add_job(run_refresh_campaign_analytics_rollups, trigger="interval", minutes=1)
 scheduler.add_job(func=generate_message_bumps, trigger="interval", minutes=10)
 # scheduler.add_job(func=generate_email_bumps, trigger="interval", minutes=2)
 scheduler.add_job(func=scrape_li_inboxes, trigger="interval", minutes=5)
@@ -576,6 +606,7 @@ scheduler.add_job(
     run_reconnect_disconnected_linkedins, trigger="interval", minutes=10
 )
 scheduler.add_job(auto_upload_from_apollo_job, trigger="interval", minutes=30)
+scheduler.add_job(func=run_llm_batch_jobs, trigger="interval", minutes=10)
 
 scheduler.add_job(func=auto_send_bumps, trigger="interval", minutes=15)
 
@@ -72,10 +72,24 @@ CHANNEL_NAME_MAP = {
 
 
 def send_slack_message(message: str, webhook_urls: list, blocks: any = []):
+    """Queues a message for the given webhooks, without waiting on Slack.
+
+    The Slack outbox (src/utils/slack_outbox.py) delivers it in the background.
+    Falls back to sending inline if the outbox is unavailable.
+    """
     if not is_production():
         print(message)
         return False
 
+    from src.utils.slack_outbox import enqueue_slack_message
+
+    if enqueue_slack_message(message=message, webhook_urls=webhook_urls, blocks=blocks):
+        return True
+
+    return send_slack_message_now(message=message, webhook_urls=webhook_urls, blocks=blocks)
+
+
+def send_slack_message_now(message: str, webhook_urls: list, blocks: any = []):
     for url in webhook_urls:
         if url is None:
             continue
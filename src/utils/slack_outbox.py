@@ -0,0 +1,370 @@
+""" Outbox for Slack webhook messages.
+
+send_slack_message only pushes the message onto a Redis list, so callers (web
+requests, scrapers, LinkedIn calls) never wait on Slack. A scheduled flush
+task drains the outbox:
+
+- text-only messages for the same webhook are coalesced into one post
+- posts to a webhook are spaced out to stay under Slack's ~1 message / second
+  webhook limit, and a 429 pushes the webhook's messages back until Retry-After
+- failed posts are retried with exponential backoff, then dropped
+- `Client.last_slack_msg_date` is updated in one statement per flush
+- a flush stops posting after SLACK_OUTBOX_FLUSH_MAX_SECONDS, well inside its
+  lock's TTL, and only releases the lock if it still holds it
+- entries are moved (LMOVE) onto a per-flush processing list while they're
+  sent, and only dropped from it once the batch is sent and its retries are
+  pushed back. Processing lists left by a crashed flush are put back on the
+  outbox by the next flush, so messages are delivered at least once.
+
+If Redis is unavailable, messages are sent inline as before.
+"""
+
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+import redis
+from slack_sdk.webhook import WebhookClient
+from sqlalchemy import text
+
+from app import celery, db
+from src.utils.redis_client import get_redis_client
+
+SLACK_OUTBOX_KEY = "slack_outbox"
+SLACK_OUTBOX_FLUSH_LOCK_KEY = "slack_outbox:flush_lock"
+SLACK_OUTBOX_PROCESSING_KEY = "slack_outbox:processing:{token}"
+SLACK_OUTBOX_PROCESSING_TOKENS_KEY = "slack_outbox:processing_tokens"
+SLACK_OUTBOX_FLUSH_LOCK_SECONDS = 300
+# Leaves room for an in-flight post (WebhookClient times out after 30s)
+SLACK_OUTBOX_FLUSH_MAX_SECONDS = 240
+SLACK_OUTBOX_FLUSH_BATCH_SIZE = 500
+SLACK_OUTBOX_MAX_ATTEMPTS = 5
+SLACK_OUTBOX_SENDER_THREADS = 8
+
+SLACK_WEBHOOK_MIN_INTERVAL_SECONDS = 1.0
+SLACK_COALESCED_TEXT_LIMIT = 3500  # Slack truncates longer webhook text
+
+# Deletes the flush lock only if it still holds this flush's token
+SLACK_OUTBOX_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_release_lock_script = None
+
+
+def enqueue_slack_message(message: str, webhook_urls: list, blocks: list = []) -> bool:
+    """Adds a message to the outbox, one entry per webhook.
+
+    Returns:
+        bool: Whether it was enqueued. False means Redis is unavailable.
+    """
+    now = time.time()
+    entries = [
+        json.dumps(
+            {
+                "webhook_url": url,
+                "message": message,
+                "blocks": blocks or [],
+                "attempts": 0,
+                "not_before": now,
+            }
+        )
+        for url in webhook_urls
+        if url
+    ]
+    if not entries:
+        return True
+
+    try:
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return False
+        redis_client.rpush(SLACK_OUTBOX_KEY, *entries)
+    except (redis.exceptions.RedisError, ValueError) as e:
+        print(f"Failed to enqueue Slack message: {e}")
+        return False
+
+    return True
+
+
+def move_slack_outbox_entries(
+    redis_client: redis.Redis, processing_key: str, count: int
+) -> list[str]:
+    """Moves up to `count` entries from the outbox onto the processing list.
+
+    Returns:
+        list[str]: The raw entries on the processing list
+    """
+    pipeline = redis_client.pipeline()
+    for _ in range(count):
+        pipeline.lmove(SLACK_OUTBOX_KEY, processing_key, "LEFT", "RIGHT")
+    pipeline.execute()
+    return redis_client.lrange(processing_key, 0, -1)
+
+
+def requeue_abandoned_slack_outbox_entries(redis_client: redis.Redis, token: str):
+    """Puts the entries of flushes that died mid-batch back on the outbox.
+
+    Only called while holding the flush lock, so no other flush is running.
+    """
+    for abandoned_token in redis_client.smembers(SLACK_OUTBOX_PROCESSING_TOKENS_KEY):
+        if isinstance(abandoned_token, bytes):
+            abandoned_token = abandoned_token.decode()
+        if abandoned_token == token:
+            continue
+
+        processing_key = SLACK_OUTBOX_PROCESSING_KEY.format(token=abandoned_token)
+        while redis_client.lmove(processing_key, SLACK_OUTBOX_KEY, "LEFT", "RIGHT"):
+            pass
+        redis_client.srem(SLACK_OUTBOX_PROCESSING_TOKENS_KEY, abandoned_token)
+
+
+def coalesce_slack_messages(entries: list[dict]) -> list[tuple[list[dict], str, list]]:
+    """Groups a webhook's entries into posts.
+
+    Consecutive text-only messages are joined (up to Slack's text limit).
+    Messages with blocks are posted on their own.
+
+    Returns:
+        list[tuple]: (entries, text, blocks) per post
+    """
+    posts = []
+    pending_entries = []
+    pending_text = ""
+
+    for entry in entries:
+        if entry["blocks"]:
+            if pending_entries:
+                posts.append((pending_entries, pending_text, []))
+                pending_entries, pending_text = [], ""
+            posts.append(([entry], entry["message"], entry["blocks"]))
+            continue
+
+        joined = (
+            pending_text + "\n\n" + entry["message"] if pending_text else entry["message"]
+        )
+        if pending_entries and len(joined) > SLACK_COALESCED_TEXT_LIMIT:
+            posts.append((pending_entries, pending_text, []))
+            pending_entries, joined = [], entry["message"]
+        pending_entries.append(entry)
+        pending_text = joined
+
+    if pending_entries:
+        posts.append((pending_entries, pending_text, []))
+
+    return posts
+
+
+def get_slack_retry_after(response) -> Optional[float]:
+    headers = {key.lower(): value for key, value in (response.headers or {}).items()}
+    retry_after = headers.get("retry-after")
+    if isinstance(retry_after, list):
+        retry_after = retry_after[0] if retry_after else None
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except ValueError:
+        return None
+
+
+def send_to_slack_webhook(
+    webhook_url: str, entries: list[dict], deadline: Optional[float] = None
+) -> tuple[bool, list[dict]]:
+    """Posts a webhook's entries in order, rate limited.
+
+    Posts that would start after `deadline` (a time.monotonic() value) are
+    returned for a later flush, without counting an attempt.
+
+    Returns:
+        tuple[bool, list[dict]]: Whether anything was delivered, and the entries to retry later
+    """
+    delivered = False
+    retry_entries = []
+    webhook = WebhookClient(webhook_url)
+
+    posts = coalesce_slack_messages(entries)
+    for i, (post_entries, message, blocks) in enumerate(posts):
+        if i > 0:
+            if (
+                deadline is not None
+                and time.monotonic() + SLACK_WEBHOOK_MIN_INTERVAL_SECONDS > deadline
+            ):
+                retry_entries.extend(e for post in posts[i:] for e in post[0])
+                break
+            time.sleep(SLACK_WEBHOOK_MIN_INTERVAL_SECONDS)
+
+        try:
+            response = webhook.send(text=message, blocks=blocks)
+            status_code = response.status_code
+        except Exception as e:
+            print(f"Slack webhook send failed: {e}")
+            response, status_code = None, None
+
+        if status_code == 200:
+            delivered = True
+            continue
+
+        if status_code == 429:
+            # Hold this and the rest of the webhook's messages until Slack allows more
+            retry_after = get_slack_retry_after(response) or 30
+            for entry in [e for post in posts[i:] for e in post[0]]:
+                entry["not_before"] = time.time() + retry_after
+                retry_entries.append(entry)
+            break
+
+        # 4xx other than 429 won't succeed on retry (e.g. a revoked webhook)
+        if status_code is not None and 400 <= status_code < 500:
+            print(f"Dropping Slack message, webhook returned {status_code}")
+            continue
+
+        for entry in post_entries:
+            entry["attempts"] += 1
+            if entry["attempts"] >= SLACK_OUTBOX_MAX_ATTEMPTS:
+                print("Dropping Slack message after too many attempts")
+                continue
+            entry["not_before"] = time.time() + 2 ** entry["attempts"]
+            retry_entries.append(entry)
+
+    return delivered, retry_entries
+
+
+def update_last_slack_msg_dates(webhook_urls: list[str]):
+    """Stamps last_slack_msg_date on every client notified through these webhooks, in one statement"""
+    patterns = [f"%{url}%" for url in webhook_urls if url and len(url) >= 10]
+    if not patterns:
+        return
+
+    db.session.execute(
+        text(
+            """
+            UPDATE client
+            SET last_slack_msg_date = :now
+            WHERE pipeline_notifications_webhook_url LIKE ANY(:patterns)
+            """
+        ),
+        {"now": datetime.now(), "patterns": patterns},
+    )
+    db.session.commit()
+
+
+def flush_slack_outbox_once(
+    redis_client: redis.Redis,
+    processing_key: str,
+    batch_size: int = SLACK_OUTBOX_FLUSH_BATCH_SIZE,
+    deadline: Optional[float] = None,
+) -> int:
+    """Sends one batch of outbox entries through the processing list.
+
+    Returns:
+        int: The number of entries taken off the outbox
+    """
+    raw_entries = move_slack_outbox_entries(redis_client, processing_key, batch_size)
+    if not raw_entries:
+        return 0
+    entries = [json.loads(raw) for raw in raw_entries]
+
+    now = time.time()
+    entries_by_webhook: dict[str, list[dict]] = {}
+    deferred_entries = []
+    for entry in entries:
+        if entry["not_before"] > now:
+            deferred_entries.append(entry)
+        else:
+            entries_by_webhook.setdefault(entry["webhook_url"], []).append(entry)
+
+    # Webhooks are rate limited independently, so they're sent in parallel
+    with ThreadPoolExecutor(max_workers=SLACK_OUTBOX_SENDER_THREADS) as executor:
+        results = list(
+            executor.map(
+                lambda item: (
+                    item[0],
+                    send_to_slack_webhook(item[0], item[1], deadline=deadline),
+                ),
+                entries_by_webhook.items(),
+            )
+        )
+
+    delivered_webhooks = []
+    for webhook_url, (delivered, retry_entries) in results:
+        if delivered:
+            delivered_webhooks.append(webhook_url)
+        deferred_entries.extend(retry_entries)
+
+    # Push the retries back and drop the batch in one transaction
+    pipeline = redis_client.pipeline()
+    if deferred_entries:
+        pipeline.rpush(
+            SLACK_OUTBOX_KEY, *[json.dumps(entry) for entry in deferred_entries]
+        )
+    pipeline.delete(processing_key)
+    pipeline.execute()
+
+    update_last_slack_msg_dates(delivered_webhooks)
+
+    return len(entries)
+
+
+def release_slack_outbox_flush_lock(redis_client: redis.Redis, token: str) -> bool:
+    """Releases the flush lock, unless it expired and another flush now holds it."""
+    global _release_lock_script
+
+    if _release_lock_script is None:
+        _release_lock_script = redis_client.register_script(
+            SLACK_OUTBOX_RELEASE_LOCK_SCRIPT
+        )
+    return bool(
+        _release_lock_script(
+            keys=[SLACK_OUTBOX_FLUSH_LOCK_KEY], args=[token], client=redis_client
+        )
+    )
+
+
+@celery.task(bind=True, max_retries=3)
+def flush_slack_outbox(self):
+    """Drains the Slack outbox. Only one flush runs at a time."""
+    redis_client = get_redis_client()
+    if redis_client is None:
+        return
+
+    try:
+        token = uuid.uuid4().hex
+        if not redis_client.set(
+            SLACK_OUTBOX_FLUSH_LOCK_KEY,
+            token,
+            nx=True,
+            ex=SLACK_OUTBOX_FLUSH_LOCK_SECONDS,
+        ):
+            return
+
+        try:
+            deadline = time.monotonic() + SLACK_OUTBOX_FLUSH_MAX_SECONDS
+
+            requeue_abandoned_slack_outbox_entries(redis_client, token)
+            processing_key = SLACK_OUTBOX_PROCESSING_KEY.format(token=token)
+            redis_client.sadd(SLACK_OUTBOX_PROCESSING_TOKENS_KEY, token)
+
+            # Entries pushed back for a retry are only looked at once per flush
+            remaining = redis_client.llen(SLACK_OUTBOX_KEY)
+            while remaining > 0 and time.monotonic() < deadline:
+                taken = flush_slack_outbox_once(
+                    redis_client,
+                    processing_key,
+                    batch_size=min(remaining, SLACK_OUTBOX_FLUSH_BATCH_SIZE),
+                    deadline=deadline,
+                )
+                if taken == 0:
+                    break
+                remaining -= taken
+
+            # Nothing left in flight (an exception above leaves it for the next flush)
+            redis_client.srem(SLACK_OUTBOX_PROCESSING_TOKENS_KEY, token)
+        finally:
+            release_slack_outbox_flush_lock(redis_client, token)
+    except Exception as e:
+        db.session.rollback()
+        raise self.retry(exc=e, countdown=2**self.request.retries)
@@ -0,0 +1,78 @@
+""" Streaming NDJSON and CSV responses for large listings.
+
+Rows are serialized and sent as they are fetched, so with a server-side cursor
+the memory use stays flat and the first bytes go out as soon as the first rows
+arrive. The generators run with the request context kept alive, so they can
+keep using the database session.
+"""
+
+import csv
+import datetime
+import enum
+import json
+from io import StringIO
+from typing import Iterable, Optional
+
+from flask import Response, stream_with_context
+
+STREAM_FORMATS = ["ndjson", "csv"]
+STREAM_CSV_FLUSH_ROWS = 500
+
+
+def serialize_value(value):
+    """JSON/CSV friendly version of a value from a row"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def stream_ndjson(rows: Iterable[dict]) -> Response:
+    """Streams rows as newline-delimited JSON, one object per line"""
+
+    def generate():
+        for row in rows:
+            yield json.dumps(row, default=serialize_value) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def stream_csv(
+    rows: Iterable[dict], fields: list[str], filename: Optional[str] = None
+) -> Response:
+    """Streams rows as CSV with a header of `fields`. Missing fields are left empty."""
+
+    def generate():
+        buffer = StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        for index, row in enumerate(rows, start=1):
+            writer.writerow({key: serialize_value(value) for key, value in row.items()})
+            if index % STREAM_CSV_FLUSH_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    headers = {}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return Response(
+        stream_with_context(generate()), mimetype="text/csv", headers=headers
+    )
+
+
+def stream_rows(
+    rows: Iterable[dict],
+    stream_format: str,
+    fields: list[str],
+    filename: Optional[str] = None,
+) -> Response:
+    """Streams rows in one of STREAM_FORMATS"""
+    if stream_format == "csv":
+        return stream_csv(rows, fields=fields, filename=filename)
+    return stream_ndjson(rows)
@@ -0,0 +1,213 @@
+""" Request instrumentation and retry policy for the Voyager LinkedIn client.
+
+Every Voyager request records its latency and status code per endpoint and
+SDR. Counters are kept in-process (see `voyager_metrics.get_stats()`) and,
+when Redis is configured, aggregated across workers under `voyager_metrics:*`.
+
+Raw payloads are no longer posted to Slack. A sample of responses (every
+error, plus VOYAGER_PAYLOAD_SAMPLE_RATE of successes) is kept in an in-memory
+ring buffer, and appended to VOYAGER_PAYLOAD_CAPTURE_FILE if it's set.
+"""
+
+import bisect
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import redis
+
+from src.utils.redis_client import get_redis_client
+
+VOYAGER_LATENCY_BUCKETS_SECONDS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+VOYAGER_METRICS_REDIS_PREFIX = "voyager_metrics"
+VOYAGER_METRICS_REDIS_TTL_SECONDS = 60 * 60 * 24 * 7  # 1 week
+
+VOYAGER_PAYLOAD_SAMPLE_RATE = float(os.environ.get("VOYAGER_PAYLOAD_SAMPLE_RATE", 0.01))
+VOYAGER_PAYLOAD_CAPTURE_FILE = os.environ.get("VOYAGER_PAYLOAD_CAPTURE_FILE")
+VOYAGER_PAYLOAD_BUFFER_SIZE = 200
+VOYAGER_PAYLOAD_MAX_BODY_CHARS = 2000
+
+# Path segments after these are IDs (e.g. public profile IDs, which may have no digits)
+VOYAGER_ID_COLLECTIONS = ["profiles", "conversations", "companies", "invitations"]
+
+
+def get_voyager_endpoint(uri: str) -> str:
+    """The URI's path with query params and IDs removed, e.g. /messaging/conversations/{id}/events
+
+    IDs are collapsed so metrics group by endpoint rather than by profile or conversation.
+    """
+    segments = uri.split("?")[0].split("/")
+    for i, segment in enumerate(segments):
+        if (
+            any(c.isdigit() for c in segment)
+            or ":" in segment
+            or (i > 0 and segments[i - 1] in VOYAGER_ID_COLLECTIONS)
+        ):
+            segments[i] = "{id}"
+    return "/".join(segments)
+
+
+class VoyagerRetryPolicy:
+    """Bounded retries with exponential backoff and jitter for Voyager requests.
+
+    Args:
+        max_attempts (int): Total attempts per request, including the first
+        retry_status_codes (tuple): Status codes that are retried
+        backoff_base_seconds (float): Delay before the first retry, doubled for every retry after
+        backoff_max_seconds (float): Upper bound on a single delay
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        retry_status_codes: tuple = (400, 429, 500, 502, 503, 504),
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 10.0,
+    ):
+        self.max_attempts = max_attempts
+        self.retry_status_codes = retry_status_codes
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+
+    def should_retry(self, status_code: int, attempt: int) -> bool:
+        return attempt < self.max_attempts and status_code in self.retry_status_codes
+
+    def get_delay(self, attempt: int) -> float:
+        """Full-jitter backoff before retry number `attempt` (1-indexed)"""
+        ceiling = min(
+            self.backoff_max_seconds, self.backoff_base_seconds * (2 ** (attempt - 1))
+        )
+        return random.uniform(0, ceiling)
+
+
+DEFAULT_VOYAGER_RETRY_POLICY = VoyagerRetryPolicy()
+
+
+class VoyagerMetrics:
+    """Latency histograms and status-code counters per (endpoint, client_sdr_id)."""
+
+    def __init__(self, buckets: list = VOYAGER_LATENCY_BUCKETS_SECONDS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._metrics: dict[tuple, dict] = {}
+
+    def record(
+        self,
+        method: str,
+        endpoint: str,
+        client_sdr_id: Optional[int],
+        status_code: Optional[int],
+        latency_seconds: float,
+    ):
+        bucket = self._get_bucket_label(latency_seconds)
+        status = str(status_code) if status_code is not None else "error"
+
+        with self._lock:
+            metrics = self._metrics.setdefault(
+                (method, endpoint, client_sdr_id),
+                {"count": 0, "total_latency": 0.0, "latency_buckets": {}, "status_codes": {}},
+            )
+            metrics["count"] += 1
+            metrics["total_latency"] += latency_seconds
+            metrics["latency_buckets"][bucket] = metrics["latency_buckets"].get(bucket, 0) + 1
+            metrics["status_codes"][status] = metrics["status_codes"].get(status, 0) + 1
+
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            key = f"{VOYAGER_METRICS_REDIS_PREFIX}:{method}:{endpoint}"
+            pipeline = redis_client.pipeline(transaction=False)
+            pipeline.hincrby(key, f"sdr:{client_sdr_id}:status:{status}", 1)
+            pipeline.hincrby(key, f"sdr:{client_sdr_id}:latency:{bucket}", 1)
+            pipeline.expire(key, VOYAGER_METRICS_REDIS_TTL_SECONDS)
+            pipeline.execute()
+        except redis.exceptions.RedisError as e:
+            print(f"Failed to record Voyager metrics: {e}")
+
+    def get_stats(self) -> list[dict]:
+        with self._lock:
+            return [
+                {
+                    "method": method,
+                    "endpoint": endpoint,
+                    "client_sdr_id": client_sdr_id,
+                    "count": metrics["count"],
+                    "avg_latency": metrics["total_latency"] / metrics["count"],
+                    "latency_buckets": dict(metrics["latency_buckets"]),
+                    "status_codes": dict(metrics["status_codes"]),
+                }
+                for (method, endpoint, client_sdr_id), metrics in self._metrics.items()
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+    def _get_bucket_label(self, latency_seconds: float) -> str:
+        index = bisect.bisect_left(self.buckets, latency_seconds)
+        return f"le_{self.buckets[index]}" if index < len(self.buckets) else "le_inf"
+
+
+class VoyagerPayloadSampler:
+    """Keeps a sample of raw Voyager responses for debugging.
+
+    Errors are always captured. Successful responses are captured with
+    probability `sample_rate`.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = VOYAGER_PAYLOAD_SAMPLE_RATE,
+        max_entries: int = VOYAGER_PAYLOAD_BUFFER_SIZE,
+        capture_file: Optional[str] = VOYAGER_PAYLOAD_CAPTURE_FILE,
+    ):
+        self.sample_rate = sample_rate
+        self.capture_file = capture_file
+        self._buffer: deque = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    def maybe_capture(
+        self,
+        method: str,
+        uri: str,
+        client_sdr_id: Optional[int],
+        status_code: Optional[int],
+        body: Optional[str],
+        error: Optional[str] = None,
+    ) -> bool:
+        is_error = status_code is None or status_code >= 400
+        if not is_error and random.random() >= self.sample_rate:
+            return False
+
+        entry = {
+            "time": time.time(),
+            "method": method,
+            "uri": uri,
+            "client_sdr_id": client_sdr_id,
+            "status_code": status_code,
+            "body": (body or "")[:VOYAGER_PAYLOAD_MAX_BODY_CHARS],
+            "error": error,
+        }
+        with self._lock:
+            self._buffer.append(entry)
+            if self.capture_file:
+                try:
+                    with open(self.capture_file, "a") as f:
+                        f.write(json.dumps(entry) + "\n")
+                except OSError as e:
+                    print(f"Failed to write Voyager payload sample: {e}")
+
+        return True
+
+    def get_samples(self) -> list[dict]:
+        with self._lock:
+            return list(self._buffer)
+
+
+voyager_metrics = VoyagerMetrics()
+voyager_payload_sampler = VoyagerPayloadSampler()
@@ -32,6 +32,14 @@ from requests import TooManyRedirects
 
 from src.client.models import ClientSDR
 from src.voyager.client import Client
+from src.voyager.instrumentation import (
+    DEFAULT_VOYAGER_RETRY_POLICY,
+    VoyagerRetryPolicy,
+    get_voyager_endpoint,
+    voyager_metrics,
+    voyager_payload_sampler,
+)
+from src.voyager.session_pool import linkedin_session_pool
 from src.voyager.utils.helpers import (
     append_update_post_field_to_posts_list,
     get_id_from_urn,
@@ -89,14 +97,16 @@ class LinkedIn(object):
         proxies={},
         cookies=None,
         user_agent=None,
+        retry_policy: Optional[VoyagerRetryPolicy] = None,
+        use_session_pool=True,
     ):
-        """Constructor method"""
-        self.client = Client(
-            refresh_cookies=refresh_cookies,
-            debug=debug,
-            proxies=proxies,
-        )
+        """Constructor method
+
+        By default the authenticated client is taken from (and shared through) the
+        worker's LinkedIn session pool. Pass use_session_pool=False for a private client.
+        """
         self.request_count = 0  # number of requests made to linkedin
+        self.retry_policy = retry_policy or DEFAULT_VOYAGER_RETRY_POLICY
 
         logging.basicConfig(level=logging.DEBUG if debug else logging.INFO)
         self.logger = logger
@@ -104,6 +114,23 @@ class LinkedIn(object):
         self.client_sdr: ClientSDR = ClientSDR.query.get(client_sdr_id)
         self.client_sdr_id = client_sdr_id
 
+        if (
+            authenticate
+            and use_session_pool
+            and self.client_sdr
+            and not (cookies and user_agent)
+            and not refresh_cookies
+            and not proxies
+        ):
+            self.client = linkedin_session_pool.get_client(self.client_sdr)
+            return
+
+        self.client = Client(
+            refresh_cookies=refresh_cookies,
+            debug=debug,
+            proxies=proxies,
+        )
+
         if authenticate:
             if cookies and user_agent:
                 # If the cookies are expired, the API won't work anymore since
@@ -115,98 +142,83 @@ class LinkedIn(object):
 
     def _fetch(self, uri, evade=default_evade, base_request=False, **kwargs):
         """GET request to Linkedin API"""
-        self.request_count += 1
-        evade(self.request_count)
+        return self._request("GET", uri, evade=evade, base_request=base_request, **kwargs)
 
-        url = f"{self.client.API_BASE_URL if not base_request else self.client.LINKEDIN_BASE_URL}{uri}"
+    def _post(self, uri, evade=default_evade, base_request=False, **kwargs):
+        """POST request to Linkedin API"""
+        return self._request("POST", uri, evade=evade, base_request=base_request, **kwargs)
 
-        try:
-            res = self.client.session.get(url, **kwargs)
+    def _request(self, method, uri, evade=default_evade, base_request=False, **kwargs):
+        """Sends a request to the Linkedin API, retrying under the client's retry policy
 
-            send_slack_message(
-                message=f"<{self.client_sdr_id}> Get response: {str(res)}\n\n {res.raw}\n\n {res.reason}\n\n {res.__dict__}\n\n {res.text}",
-                webhook_urls=[URL_MAP["operations-li-invalid-cookie"]],
-            )
+        Every attempt is recorded in the Voyager metrics, and a sample of the
+        responses is kept by the payload sampler (see src/voyager/instrumentation.py).
+        """
+        url = f"{self.client.API_BASE_URL if not base_request else self.client.LINKEDIN_BASE_URL}{uri}"
+        endpoint = get_voyager_endpoint(uri)
 
-            if res.status_code == 401:
-                raise Exception("Invalid cookies")
+        attempt = 0
+        while True:
+            attempt += 1
+            self.request_count += 1
+            evade(self.request_count)
 
-            # Attempt request again if we're being rate limited
-            if res.status_code == 400 and self.request_count < 20:
-                return self._fetch(uri=uri, base_request=base_request, **kwargs)
+            start_time = time()
+            try:
+                res = self.client.session.request(method, url, **kwargs)
+            except Exception as e:
+                voyager_metrics.record(
+                    method, endpoint, self.client_sdr_id, None, time() - start_time
+                )
+                voyager_payload_sampler.maybe_capture(
+                    method, uri, self.client_sdr_id, None, None, error=str(e)
+                )
+                return self._handle_request_failure(method, e)
 
-            return res
-        except Exception as e:
-            send_slack_message(
-                message=f"<{self.client_sdr_id}> Error on fetch, {str(e)}",
-                webhook_urls=[URL_MAP["operations-li-invalid-cookie"]],
+            voyager_metrics.record(
+                method, endpoint, self.client_sdr_id, res.status_code, time() - start_time
             )
-
-            sdr: ClientSDR = ClientSDR.query.get(self.client_sdr.id)
-            if sdr:
-                if sdr.li_at_token != "INVALID" and not sdr.last_li_at_token:
-                    send_slack_message(
-                        message=f"SDR {sdr.name} (#{sdr.id})'s LinkedIn cookie is now invalid! It needs to be resynced.",
-                        webhook_urls=[URL_MAP["operations-li-invalid-cookie"]],
-                    )
-                    send_linkedin_disconnected_email(
-                        client_sdr_id=sdr.id,
-                    )
-                    send_linkedin_disconnected_slack_message(
-                        client_sdr_id=sdr.id,
-                    )
-
-                sdr.li_at_token = "INVALID"
-                db.session.add(sdr)
-                db.session.commit()
-            return None
-
-    def _post(self, uri, evade=default_evade, base_request=False, **kwargs):
-        """POST request to Linkedin API"""
-        self.request_count += 1
-        evade(self.request_count)
-
-        url = f"{self.client.API_BASE_URL if not base_request else self.client.LINKEDIN_BASE_URL}{uri}"
-        try:
-            res = self.client.session.post(url, **kwargs)
-
-            send_slack_message(
-                message=f"<{self.client_sdr_id}> Post response: {str(res)}\n\n {res.raw}\n\n {res.reason}\n\n {res.__dict__}\n\n {res.text}",
-                webhook_urls=[URL_MAP["operations-li-invalid-cookie"]],
+            voyager_payload_sampler.maybe_capture(
+                method, uri, self.client_sdr_id, res.status_code, res.text
             )
 
             if res.status_code == 401:
-                raise Exception("Invalid cookies")
+                return self._handle_request_failure(method, Exception("Invalid cookies"))
 
             # Attempt request again if we're being rate limited
-            if res.status_code == 400 and self.request_count < 20:
-                return self._post(uri=uri, base_request=base_request, **kwargs)
+            if self.retry_policy.should_retry(res.status_code, attempt):
+                sleep(self.retry_policy.get_delay(attempt))
+                continue
 
             return res
-        except Exception as e:
-            send_slack_message(
-                message=f"<{self.client_sdr_id}> Error on post, {str(e)}",
-                webhook_urls=[URL_MAP["operations-li-invalid-cookie"]],
-            )
 
-            sdr: ClientSDR = ClientSDR.query.get(self.client_sdr_id)
-            if sdr:
-                if sdr.li_at_token != "INVALID" and not sdr.last_li_at_token:
-                    send_slack_message(
-                        message=f"SDR {sdr.name} (#{sdr.id})'s LinkedIn cookie is now invalid! It needs to be resynced.",
-                        webhook_urls=[URL_MAP["operations-li-invalid-cookie"]],
-                    )
-                    send_linkedin_disconnected_email(
-                        client_sdr_id=sdr.id,
-                    )
-                    send_linkedin_disconnected_slack_message(
-                        client_sdr_id=sdr.id,
-                    )
+    def _handle_request_failure(self, method, e: Exception):
+        """Marks the SDR's LinkedIn cookie as invalid after a failed request"""
+        linkedin_session_pool.invalidate(self.client_sdr_id)
 
-                sdr.li_at_token = "INVALID"
-                db.session.add(sdr)
-                db.session.commit()
-            return None
+        send_slack_message(
+            message=f"<{self.client_sdr_id}> Error on {'fetch' if method == 'GET' else 'post'}, {str(e)}",
+            webhook_urls=[URL_MAP["operations-li-invalid-cookie"]],
+        )
+
+        sdr: ClientSDR = ClientSDR.query.get(self.client_sdr_id)
+        if sdr:
+            if sdr.li_at_token != "INVALID" and not sdr.last_li_at_token:
+                send_slack_message(
+                    message=f"SDR {sdr.name} (#{sdr.id})'s LinkedIn cookie is now invalid! It needs to be resynced.",
+                    webhook_urls=[URL_MAP["operations-li-invalid-cookie"]],
+                )
+                send_linkedin_disconnected_email(
+                    client_sdr_id=sdr.id,
+                )
+                send_linkedin_disconnected_slack_message(
+                    client_sdr_id=sdr.id,
+                )
+
+            sdr.li_at_token = "INVALID"
+            db.session.add(sdr)
+            db.session.commit()
+        return None
 
     def is_valid(self):
         """Checks if the client SDR is valid"""
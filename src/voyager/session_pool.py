@@ -0,0 +1,105 @@
+""" Per-worker pool of authenticated Voyager clients, keyed by SDR.
+
+Authenticating a `Client` fetches fresh LinkedIn session cookies and the app
+instance metadata, and every `Client` has its own `requests` session. Pooling
+the authenticated clients lets repeated `LinkedIn(client_sdr_id)` calls in the
+same worker reuse the cookie jar and the session's open TCP/TLS connections.
+
+A pooled client is only reused while the SDR's `li_at_token` and user agent
+are unchanged. Clients idle for longer than `max_idle_seconds` are evicted.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from src.client.models import ClientSDR
+from src.voyager.client import Client
+
+LINKEDIN_SESSION_POOL_MAX_IDLE_SECONDS = 15 * 60
+LINKEDIN_SESSION_POOL_MAX_SIZE = 100
+
+
+class LinkedInSessionPool:
+    """LRU pool of authenticated Voyager clients.
+
+    Args:
+        max_idle_seconds (int): Evict clients that haven't been used for this long
+        max_size (int): Evict the least recently used client beyond this many
+    """
+
+    def __init__(
+        self,
+        max_idle_seconds: int = LINKEDIN_SESSION_POOL_MAX_IDLE_SECONDS,
+        max_size: int = LINKEDIN_SESSION_POOL_MAX_SIZE,
+    ):
+        self.max_idle_seconds = max_idle_seconds
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        # client_sdr_id -> (cookie version, client, last used)
+        self._clients: OrderedDict[int, tuple[tuple, Client, float]] = OrderedDict()
+
+    @staticmethod
+    def get_cookie_version(client_sdr: ClientSDR) -> Optional[tuple]:
+        """The SDR's cookie version, or None if it can't be pooled (no valid li_at token)"""
+        if not client_sdr.li_at_token or client_sdr.li_at_token == "INVALID":
+            return None
+        return (client_sdr.li_at_token, client_sdr.user_agent)
+
+    def get_client(self, client_sdr: ClientSDR) -> Client:
+        """Gets an authenticated client for the SDR, authenticating a new one if needed"""
+        version = self.get_cookie_version(client_sdr)
+        if version is None:
+            # Authentication may recover the token from li_cookies, so it isn't pooled yet
+            client = Client()
+            client.authenticate(client_sdr)
+            return client
+
+        now = time.time()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(client_sdr.id)
+            if entry is not None and entry[0] == version:
+                self._clients[client_sdr.id] = (version, entry[1], now)
+                self._clients.move_to_end(client_sdr.id)
+                return entry[1]
+
+        client = Client()
+        client.authenticate(client_sdr)
+
+        with self._lock:
+            self._clients[client_sdr.id] = (version, client, time.time())
+            self._clients.move_to_end(client_sdr.id)
+            while len(self._clients) > self.max_size:
+                _, (_, evicted, _) = self._clients.popitem(last=False)
+                evicted.session.close()
+
+        return client
+
+    def invalidate(self, client_sdr_id: int):
+        """Drops the SDR's pooled client, e.g. after LinkedIn rejects its cookies"""
+        with self._lock:
+            entry = self._clients.pop(client_sdr_id, None)
+        if entry is not None:
+            entry[1].session.close()
+
+    def clear(self):
+        with self._lock:
+            entries = list(self._clients.values())
+            self._clients.clear()
+        for _, client, _ in entries:
+            client.session.close()
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    def _evict_idle(self, now: float):
+        for client_sdr_id, (_, client, last_used) in list(self._clients.items()):
+            if now - last_used > self.max_idle_seconds:
+                del self._clients[client_sdr_id]
+                client.session.close()
+
+
+linkedin_session_pool = LinkedInSessionPool()
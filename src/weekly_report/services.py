@@ -1,8 +1,10 @@
 import datetime
-from app import db
+from typing import NamedTuple, Optional
+
 from src.automation.resend import send_email
 from src.client.models import ClientArchetype, ClientSDR, Client
 from src.onboarding.services import is_onboarding_complete
+from src.utils.query_registry import query_registry
 from src.weekly_report.email_template import (
     generate_weekly_update_email,
 )
@@ -11,9 +13,16 @@ from src.weekly_report.models import *
 from tests.research import linkedin
 
 
-def generate_weekly_report_data_payload(client_sdr_id: int) -> WeeklyReportData:
-    # Raw Data Computation
-    warmup_query = """
+class WarmupRow(NamedTuple):
+    linkedin_warming: Optional[int]
+    email_warming: Optional[int]
+    linkedin_warming_next_week: Optional[int]
+    email_warming_next_week: Optional[int]
+
+
+WARMUP_QUERY = query_registry.register(
+    "weekly_report.warmup",
+    """
         select 
             max(sla_schedule.linkedin_volume) filter (where NOW() < sla_schedule.end_date) linkedin_warming,
             max(sla_schedule.email_volume) filter (where NOW() < sla_schedule.end_date) email_warming,
@@ -21,159 +30,198 @@ def generate_weekly_report_data_payload(client_sdr_id: int) -> WeeklyReportData:
             max(sla_schedule.email_volume) filter (where NOW() < sla_schedule.end_date + '7 days'::INTERVAL) email_warming_next_week
         from client_sdr
             join sla_schedule on sla_schedule.client_sdr_id = client_sdr.id
-        where client_sdr.id = {client_sdr_id}
-    """.format(
-        client_sdr_id=client_sdr_id
-    )
-    warmup_data = db.engine.execute(warmup_query).fetchone()
+        where client_sdr.id = :client_sdr_id
+    """,
+    row_type=WarmupRow,
+)
 
-    client_sdr: ClientSDR = ClientSDR.query.get(client_sdr_id)
 
-    linkedin_token_valid = (
-        client_sdr.li_at_token and client_sdr.li_at_token != "INVALID"
-    )
+class PipelineRow(NamedTuple):
+    num_sent_all_time: int
+    num_opened_all_time: int
+    num_replied_all_time: int
+    num_positive_reply_all_time: int
+    num_demos_all_time: int
+    num_sent_last_week: int
+    num_opened_last_week: int
+    num_replied_last_week: int
+    num_positive_reply_last_week: int
+    num_demos_last_week: int
 
-    client_id = client_sdr.client_id
-    cumulative_and_last_week_pipeline_query = """
-    select 
-        count(distinct prospect.id) filter (where prospect_status_records.to_status = 'SENT_OUTREACH' or prospect_email_status_records.to_status = 'SENT_OUTREACH') num_sent_all_time,
-        count(distinct prospect.id) filter (where prospect_status_records.to_status = 'ACCEPTED' or prospect_email_status_records.to_status = 'EMAIL_OPENED') num_opened_all_time,
-        count(distinct prospect.id) filter (where prospect_status_records.to_status = 'ACTIVE_CONVO' or cast(prospect_email_status_records.to_status as varchar) ilike '%ACTIVE_CONVO_%') num_replied_all_time,
-        count(distinct prospect.id) filter (where prospect_status_records.to_status in ('ACTIVE_CONVO_SCHEDULING', 'ACTIVE_CONVO_QUESTION', 'ACTIVE_CONVO_NEXT_STEPS') or prospect_email_status_records.to_status = 'DEMO_SET') num_positive_reply_all_time,
-            count(distinct prospect.id) filter (where prospect_status_records.to_status = 'DEMO_SET' or prospect_email_status_records.to_status = 'DEMO_SET') num_demos_all_time,
-        
-        count(distinct prospect.id) filter (where (prospect_status_records.to_status = 'SENT_OUTREACH' and prospect_status_records.created_at > NOW() - '7 days'::INTERVAL) or (prospect_email_status_records.to_status = 'SENT_OUTREACH' and prospect_email_status_records.created_at > NOW() - '7 days'::INTERVAL)) num_sent_last_week,
-        count(distinct prospect.id) filter (where (prospect_status_records.to_status = 'ACCEPTED' and prospect_status_records.created_at > NOW() - '7 days'::INTERVAL) or (prospect_email_status_records.to_status = 'EMAIL_OPENED' and prospect_email_status_records.created_at > NOW() - '7 days'::INTERVAL)) num_opened_last_week,
-            count(distinct prospect.id) filter (where (prospect_status_records.to_status = 'ACTIVE_CONVO' and prospect_status_records.created_at > NOW() - '7 days'::INTERVAL) or (prospect_email_status_records.to_status = 'ACTIVE_CONVO' and prospect_email_status_records.created_at > NOW() - '7 days'::INTERVAL)) num_replied_last_week,
-            count(distinct prospect.id) filter (where (prospect_status_records.to_status in ('ACTIVE_CONVO_SCHEDULING', 'ACTIVE_CONVO_QUESTION', 'ACTIVE_CONVO_NEXT_STEPS') and prospect_status_records.created_at > NOW() - '7 days'::INTERVAL) or (prospect_email_status_records.to_status = 'DEMO_SET' and prospect_email_status_records.created_at > NOW() - '7 days'::INTERVAL)) num_positive_reply_last_week,
-            count(distinct prospect.id) filter (where (prospect_status_records.to_status = 'DEMO_SET' and prospect_status_records.created_at > NOW() - '7 days'::INTERVAL) or (prospect_email_status_records.to_status = 'DEMO_SET' and prospect_email_status_records.created_at > NOW() - '7 days'::INTERVAL)) num_demos_last_week
-    from prospect
-        join client_sdr on client_sdr.id = prospect.client_sdr_id
-        join prospect_status_records on prospect_status_records.prospect_id = prospect.id
-        left join prospect_email on prospect_email.prospect_id = prospect.id
-        left join prospect_email_status_records on prospect_email_status_records.prospect_email_id = prospect_email.id
-    where 
-        client_sdr.client_id = {client_id}
-    """.format(
-        client_id=client_id
-    )
-    cumulative_and_last_week_pipeline_data = db.engine.execute(
-        cumulative_and_last_week_pipeline_query
-    ).fetchone()
-
-    active_campaigns_query = """
-    select 
-        client_archetype.emoji,
-        client_archetype.archetype "name",
-        client_archetype.id,
-        case 
-            when client_archetype.linkedin_active then 'LINKEDIN'
-            when client_archetype.email_active then 'EMAIL'
-            else 'LINKEDIN'
-        end channel,
-        round(
-            cast(count(distinct prospect.id) filter (where prospect.approved_outreach_message_id is not null or prospect.approved_prospect_email_id is not null) as float) / count(distinct prospect.id) * 1000
-        ) / 10 completion_percent,
-        count(distinct prospect.id) filter (where prospect.overall_status = 'PROSPECTED') prospects_left,
-        count(distinct prospect.id) filter (where prospect_status_records.to_status = 'SENT_OUTREACH' or prospect_email_status_records.to_status = 'SENT_OUTREACH') num_sent_all_time,
-        count(distinct prospect.id) filter (where prospect_status_records.to_status = 'ACCEPTED' or prospect_email_status_records.to_status = 'EMAIL_OPENED') num_opened_all_time,
-        count(distinct prospect.id) filter (where prospect_status_records.to_status = 'ACTIVE_CONVO' or cast(prospect_email_status_records.to_status as varchar) ilike '%ACTIVE_CONVO_%') num_replied_all_time,
-        count(distinct prospect.id) filter (where prospect_status_records.to_status in ('ACTIVE_CONVO_SCHEDULING', 'ACTIVE_CONVO_QUESTION', 'ACTIVE_CONVO_NEXT_STEPS') or prospect_email_status_records.to_status = 'DEMO_SET') num_positive_reply_all_time,
-        count(distinct prospect.id) filter (where prospect_status_records.to_status = 'DEMO_SET' or prospect_email_status_records.to_status = 'DEMO_SET') num_demo_all_time
-            
-    from client_archetype
-        join prospect on prospect.archetype_id = client_archetype.id
-        left join prospect_status_records on prospect_status_records.prospect_id = prospect.id
-        left join prospect_email on prospect_email.prospect_id = prospect.approved_prospect_email_id
-        left join prospect_email_status_records on prospect_email_status_records.prospect_email_id = prospect_email.id
-    where client_archetype.active and client_archetype.client_sdr_id = {client_sdr_id}
-    group by 1,2,3,4;
-    """.format(
-        client_sdr_id=client_sdr_id
-    )
-    active_campaigns_data = db.engine.execute(active_campaigns_query).fetchall()
-
-    demo_responses_query = """
-    select 
-        prospect.full_name,
-        prospect.company,
-        client_sdr.name user_name,
-        max(prospect.li_last_message_from_prospect)
-    from prospect
-        join prospect_status_records on prospect_status_records.prospect_id = prospect.id
-        join client_sdr on client_sdr.id = prospect.client_sdr_id
-    where prospect_status_records.to_status in ('DEMO_SET')
-        and prospect_status_records.created_at > NOW() - '7 days'::INTERVAL
-        and prospect.client_sdr_id = {client_sdr_id}
-    group by 1,2,3;
-    """.format(
-        client_sdr_id=client_sdr_id
-    )
-    demo_responses_data = db.engine.execute(demo_responses_query).fetchall()
-
-    prospect_responses_query = """
-    select 
-        prospect.full_name,
-        prospect.company,
-        client_sdr.name user_name,
-        max(prospect.li_last_message_from_prospect)
-    from prospect
-        join prospect_status_records on prospect_status_records.prospect_id = prospect.id
-        join client_sdr on client_sdr.id = prospect.client_sdr_id
-    where prospect_status_records.to_status in ('ACTIVE_CONVO_SCHEDULING', 'ACTIVE_CONVO_QUESTION')
-        and prospect_status_records.created_at > NOW() - '7 days'::INTERVAL
-        and prospect.client_sdr_id = {client_sdr_id}
-    group by 1,2,3;
-    """.format(
-        client_sdr_id=client_sdr_id
-    )
-    prospect_responses_data = db.engine.execute(prospect_responses_query).fetchall()
 
-    next_week_sample_prospects_query = """
+# Funnel counts come from the campaign analytics rollups, see services_campaign_rollups
+PIPELINE_QUERY = query_registry.register(
+    "weekly_report.pipeline",
+    """
+        select 
+            cast(coalesce(sum(num_sent), 0) as integer) num_sent_all_time,
+            cast(coalesce(sum(num_opens), 0) as integer) num_opened_all_time,
+            cast(coalesce(sum(num_replies), 0) as integer) num_replied_all_time,
+            cast(coalesce(sum(num_positive_replies), 0) as integer) num_positive_reply_all_time,
+            cast(coalesce(sum(num_demos), 0) as integer) num_demos_all_time,
+
+            cast(coalesce(sum(num_sent) filter (where date > cast(NOW() - '7 days'::INTERVAL as date)), 0) as integer) num_sent_last_week,
+            cast(coalesce(sum(num_opens) filter (where date > cast(NOW() - '7 days'::INTERVAL as date)), 0) as integer) num_opened_last_week,
+            cast(coalesce(sum(num_replies) filter (where date > cast(NOW() - '7 days'::INTERVAL as date)), 0) as integer) num_replied_last_week,
+            cast(coalesce(sum(num_positive_replies) filter (where date > cast(NOW() - '7 days'::INTERVAL as date)), 0) as integer) num_positive_reply_last_week,
+            cast(coalesce(sum(num_demos) filter (where date > cast(NOW() - '7 days'::INTERVAL as date)), 0) as integer) num_demos_last_week
+        from campaign_analytics_rollup
+        where campaign_analytics_rollup.client_id = :client_id
+    """,
+    row_type=PipelineRow,
+)
+
+
+class ActiveCampaignRow(NamedTuple):
+    emoji: str
+    name: str
+    id: int
+    channel: str
+    completion_percent: float
+    prospects_left: int
+    num_sent_all_time: int
+    num_opened_all_time: int
+    num_replied_all_time: int
+    num_positive_reply_all_time: int
+    num_demo_all_time: int
+
+
+ACTIVE_CAMPAIGNS_QUERY = query_registry.register(
+    "weekly_report.active_campaigns",
+    """
+        with campaigns as (
+            select 
+                client_archetype.emoji,
+                client_archetype.archetype "name",
+                client_archetype.id,
+                case 
+                    when client_archetype.linkedin_active then 'LINKEDIN'
+                    when client_archetype.email_active then 'EMAIL'
+                    else 'LINKEDIN'
+                end channel,
+                round(
+                    cast(count(prospect.id) filter (where prospect.approved_outreach_message_id is not null or prospect.approved_prospect_email_id is not null) as float) / count(prospect.id) * 1000
+                ) / 10 completion_percent,
+                count(prospect.id) filter (where prospect.overall_status = 'PROSPECTED') prospects_left
+            from client_archetype
+                join prospect on prospect.archetype_id = client_archetype.id
+            where client_archetype.active and client_archetype.client_sdr_id = :client_sdr_id
+            group by 1,2,3,4
+        ),
+        rollup as (
+            select 
+                campaign_analytics_rollup.client_archetype_id,
+                cast(sum(campaign_analytics_rollup.num_sent) as integer) num_sent,
+                cast(sum(campaign_analytics_rollup.num_opens) as integer) num_opens,
+                cast(sum(campaign_analytics_rollup.num_replies) as integer) num_replies,
+                cast(sum(campaign_analytics_rollup.num_positive_replies) as integer) num_positive_replies,
+                cast(sum(campaign_analytics_rollup.num_demos) as integer) num_demos
+            from campaign_analytics_rollup
+            where campaign_analytics_rollup.client_archetype_id in (select id from campaigns)
+            group by 1
+        )
+        select 
+            campaigns.*,
+            coalesce(rollup.num_sent, 0) num_sent_all_time,
+            coalesce(rollup.num_opens, 0) num_opened_all_time,
+            coalesce(rollup.num_replies, 0) num_replied_all_time,
+            coalesce(rollup.num_positive_replies, 0) num_positive_reply_all_time,
+            coalesce(rollup.num_demos, 0) num_demo_all_time
+        from campaigns
+            left join rollup on rollup.client_archetype_id = campaigns.id;
+    """,
+    row_type=ActiveCampaignRow,
+)
+
+
+class ProspectResponseRow(NamedTuple):
+    full_name: str
+    company: str
+    user_name: str
+    last_message: Optional[str]
+
+
+PROSPECT_RESPONSES_QUERY = query_registry.register(
+    "weekly_report.prospect_responses",
+    """
         select 
             prospect.full_name,
-            case 
-                when prospect.icp_fit_score = 0 then '<span style="color: red;">🟥 Very Low</span>'
-                when prospect.icp_fit_score = 1 then '<span style="color: orange;">🟧 Low</span>'
-                when prospect.icp_fit_score = 2 then '<span style="color: yellow;">🟨 Medium</span>'
-                when prospect.icp_fit_score = 3 then '<span style="color: blue;">🟦 High</span>'
-                when prospect.icp_fit_score = 4 then '<span style="color: green;">🟩 Very High</span>'
-                else '<span style="color: green;">🟪 No Score</span>'
-            end icp_fit_score_label,
-            prospect.title,
-            prospect.company
+            prospect.company,
+            client_sdr.name user_name,
+            max(prospect.li_last_message_from_prospect) last_message
         from prospect
-            join client_archetype on prospect.archetype_id = client_archetype.id
-        where prospect.archetype_id = {archetype_id}
-            and client_archetype.active
-            and prospect.status = 'PROSPECTED'
-        order by icp_fit_score > 0 desc, icp_fit_score desc
-        limit 3;
+            join prospect_status_records on prospect_status_records.prospect_id = prospect.id
+            join client_sdr on client_sdr.id = prospect.client_sdr_id
+        where cast(prospect_status_records.to_status as varchar) = any(:statuses)
+            and prospect_status_records.created_at > NOW() - '7 days'::INTERVAL
+            and prospect.client_sdr_id = :client_sdr_id
+        group by 1,2,3;
+    """,
+    row_type=ProspectResponseRow,
+)
+
+
+class SampleProspectRow(NamedTuple):
+    archetype_id: int
+    full_name: str
+    icp_fit_score_label: str
+    title: str
+    company: str
+
+
+# The 3 best fit prospects left in each campaign
+NEXT_WEEK_SAMPLE_PROSPECTS_QUERY = query_registry.register(
+    "weekly_report.next_week_sample_prospects",
     """
-    next_week_sample_prospects_data = [
-        {
-            "sample_prospects": db.engine.execute(
-                next_week_sample_prospects_query.format(archetype_id=archetype.id)
-            ).fetchall(),
-            "campaign_id": archetype.id,
-            "campaign_emoji": archetype.emoji,
-            "campaign_name": archetype.name,
-            "prospects_left": archetype.prospects_left,
-        }
-        for archetype in active_campaigns_data
-    ]
+        select 
+            archetype_id,
+            full_name,
+            icp_fit_score_label,
+            title,
+            company
+        from (
+            select 
+                prospect.archetype_id,
+                prospect.full_name,
+                case 
+                    when prospect.icp_fit_score = 0 then '<span style="color: red;">🟥 Very Low</span>'
+                    when prospect.icp_fit_score = 1 then '<span style="color: orange;">🟧 Low</span>'
+                    when prospect.icp_fit_score = 2 then '<span style="color: yellow;">🟨 Medium</span>'
+                    when prospect.icp_fit_score = 3 then '<span style="color: blue;">🟦 High</span>'
+                    when prospect.icp_fit_score = 4 then '<span style="color: green;">🟩 Very High</span>'
+                    else '<span style="color: green;">🟪 No Score</span>'
+                end icp_fit_score_label,
+                prospect.title,
+                prospect.company,
+                row_number() over (
+                    partition by prospect.archetype_id
+                    order by prospect.icp_fit_score > 0 desc, prospect.icp_fit_score desc
+                ) rank
+            from prospect
+                join client_archetype on prospect.archetype_id = client_archetype.id
+            where prospect.archetype_id = any(:archetype_ids)
+                and client_archetype.active
+                and prospect.status = 'PROSPECTED'
+        ) ranked
+        where rank <= 3
+        order by archetype_id, rank;
+    """,
+    row_type=SampleProspectRow,
+)
 
-    prospects_removed_query = """
+PROSPECTS_ADDED_QUERY = query_registry.register(
+    "weekly_report.prospects_added",
+    """
         select count(distinct prospect.id)
         from prospect
-        where prospect.client_sdr_id = {client_sdr_id}
+        where prospect.client_sdr_id = :client_sdr_id
             and prospect.created_at > NOW() - '7 days'::INTERVAL
-    """.format(
-        client_sdr_id=client_sdr_id
-    )
-    num_prospects_added_data = db.engine.execute(prospects_removed_query).fetchone()
+    """,
+)
 
-    email_str_query = """
+ACTIVE_EMAILS_QUERY = query_registry.register(
+    "weekly_report.active_emails",
+    """
         select 
             string_agg(
                 concat(
@@ -184,12 +232,70 @@ def generate_weekly_report_data_payload(client_sdr_id: int) -> WeeklyReportData:
                 ', '
             ) email_str
         from warmup_snapshot
-        where warmup_snapshot.client_sdr_id = {client_sdr_id}
+        where warmup_snapshot.client_sdr_id = :client_sdr_id
             and channel_type = 'EMAIL';
-    """.format(
-        client_sdr_id=client_sdr_id
+    """,
+)
+
+ACTIVE_SDRS_QUERY = query_registry.register(
+    "weekly_report.active_sdrs",
+    """
+        select 
+            client_sdr.id
+        from client_sdr
+            join client on client.id = client_sdr.client_id
+        where 
+            client_sdr.active and client.active and client.id <> 1;
+    """,
+)
+
+
+def generate_weekly_report_data_payload(client_sdr_id: int) -> WeeklyReportData:
+    # Raw Data Computation
+    warmup_data = WARMUP_QUERY.first(client_sdr_id=client_sdr_id)
+
+    client_sdr: ClientSDR = ClientSDR.query.get(client_sdr_id)
+
+    linkedin_token_valid = (
+        client_sdr.li_at_token and client_sdr.li_at_token != "INVALID"
     )
-    email_str = db.engine.execute(email_str_query).fetchone().email_str
+
+    client_id = client_sdr.client_id
+    cumulative_and_last_week_pipeline_data = PIPELINE_QUERY.first(client_id=client_id)
+
+    active_campaigns_data = ACTIVE_CAMPAIGNS_QUERY.all(client_sdr_id=client_sdr_id)
+
+    demo_responses_data = PROSPECT_RESPONSES_QUERY.all(
+        client_sdr_id=client_sdr_id, statuses=["DEMO_SET"]
+    )
+
+    prospect_responses_data = PROSPECT_RESPONSES_QUERY.all(
+        client_sdr_id=client_sdr_id,
+        statuses=["ACTIVE_CONVO_SCHEDULING", "ACTIVE_CONVO_QUESTION"],
+    )
+
+    sample_prospects_by_archetype: dict[int, list[SampleProspectRow]] = {}
+    if active_campaigns_data:
+        for sample_prospect in NEXT_WEEK_SAMPLE_PROSPECTS_QUERY.all(
+            archetype_ids=[archetype.id for archetype in active_campaigns_data]
+        ):
+            sample_prospects_by_archetype.setdefault(
+                sample_prospect.archetype_id, []
+            ).append(sample_prospect)
+    next_week_sample_prospects_data = [
+        {
+            "sample_prospects": sample_prospects_by_archetype.get(archetype.id, []),
+            "campaign_id": archetype.id,
+            "campaign_emoji": archetype.emoji,
+            "campaign_name": archetype.name,
+            "prospects_left": archetype.prospects_left,
+        }
+        for archetype in active_campaigns_data
+    ]
+
+    num_prospects_added = PROSPECTS_ADDED_QUERY.scalar(client_sdr_id=client_sdr_id)
+
+    email_str = ACTIVE_EMAILS_QUERY.scalar(client_sdr_id=client_sdr_id)
 
     # Create Structured Data
     warmup_payload = WeeklyReportWarmupPayload(
@@ -233,20 +339,20 @@ def generate_weekly_report_data_payload(client_sdr_id: int) -> WeeklyReportData:
             prospect_name=prospect.full_name,
             prospect_company=prospect.company,
             user_name=prospect.user_name,
-            message=prospect.max,
+            message=prospect.last_message,
         )
         for prospect in demo_responses_data
-        if len(prospect.max) > 5
+        if len(prospect.last_message or "") > 5
     ]
     prospect_responses = [
         ProspectResponse(
             prospect_name=prospect.full_name,
             prospect_company=prospect.company,
             user_name=prospect.user_name,
-            message=prospect.max,
+            message=prospect.last_message,
         )
         for prospect in prospect_responses_data
-        if len(prospect.max) > 5
+        if len(prospect.last_message or "") > 5
     ]
     next_week_sample_prospects = [
         NextWeekSampleProspects(
@@ -266,8 +372,6 @@ def generate_weekly_report_data_payload(client_sdr_id: int) -> WeeklyReportData:
         )
         for entry in next_week_sample_prospects_data
     ]
-    num_prospects_added = num_prospects_added_data.count
-
     client_sdr: ClientSDR = ClientSDR.query.get(client_sdr_id)
     user_name = client_sdr.name
     client: Client = Client.query.get(client_sdr.client_id)
@@ -299,16 +403,7 @@ def generate_weekly_report_data_payload(client_sdr_id: int) -> WeeklyReportData:
 
 
 def get_active_sdr_id() -> list[int]:
-    query = """
-    select 
-        client_sdr.id
-    from client_sdr
-        join client on client.id = client_sdr.client_id
-    where 
-        client_sdr.active and client.active and client.id <> 1;
-    """
-
-    return [row.id for row in db.engine.execute(query).fetchall()]
+    return [row.id for row in ACTIVE_SDRS_QUERY.all()]
 
 
 def send_email_with_data(
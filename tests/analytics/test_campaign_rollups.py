@@ -0,0 +1,139 @@
+import datetime
+
+from app import db
+from tests.test_utils.decorators import use_app_context
+from tests.test_utils.test_utils import (
+    test_app,
+    basic_client,
+    basic_client_sdr,
+    basic_prospect,
+    basic_prospect_email,
+    basic_archetype,
+)
+from model_import import (
+    CampaignAnalyticsRollup,
+    ProspectEmailOutreachStatus,
+    ProspectEmailStatusRecords,
+    ProspectStatus,
+    ProspectStatusRecords,
+)
+from src.analytics.services import get_all_campaign_analytics_for_client
+from src.analytics.services_campaign_rollups import (
+    rebuild_campaign_analytics_rollups,
+    refresh_campaign_analytics_rollups_batch,
+)
+
+
+def add_status_record(prospect_id: int, to_status: ProspectStatus):
+    db.session.add(
+        ProspectStatusRecords(
+            prospect_id=prospect_id,
+            from_status=ProspectStatus.PROSPECTED,
+            to_status=to_status,
+        )
+    )
+    db.session.commit()
+
+
+def refresh_batch(batch_size: int = 1000) -> int:
+    return refresh_campaign_analytics_rollups_batch(
+        batch_size=batch_size, safety_lag=datetime.timedelta(0)
+    )
+
+
+def get_rollup_totals(client_archetype_id: int) -> dict:
+    rollups = CampaignAnalyticsRollup.query.filter_by(
+        client_archetype_id=client_archetype_id
+    ).all()
+    return {
+        "num_sent": sum(r.num_sent for r in rollups),
+        "num_opens": sum(r.num_opens for r in rollups),
+        "num_replies": sum(r.num_replies for r in rollups),
+        "num_positive_replies": sum(r.num_positive_replies for r in rollups),
+        "num_demos": sum(r.num_demos for r in rollups),
+    }
+
+
+@use_app_context
+def test_refresh_campaign_analytics_rollups():
+    client = basic_client()
+    client_sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, client_sdr)
+    prospect = basic_prospect(client, archetype, client_sdr)
+    prospect_2 = basic_prospect(client, archetype, client_sdr)
+    prospect_2_email = basic_prospect_email(prospect_2)
+
+    add_status_record(prospect.id, ProspectStatus.SENT_OUTREACH)
+    add_status_record(prospect.id, ProspectStatus.ACCEPTED)
+    add_status_record(prospect_2.id, ProspectStatus.SENT_OUTREACH)
+    db.session.add(
+        ProspectEmailStatusRecords(
+            prospect_email_id=prospect_2_email.id,
+            from_status=ProspectEmailOutreachStatus.SENT_OUTREACH,
+            to_status=ProspectEmailOutreachStatus.EMAIL_OPENED,
+        )
+    )
+    db.session.commit()
+
+    # Records younger than the safety lag are left for a later refresh
+    assert refresh_campaign_analytics_rollups_batch() == 0
+    # Both tables are processed up to a common horizon, in batches
+    assert refresh_batch(batch_size=2) == 2
+    assert refresh_batch() == 2
+    assert get_rollup_totals(archetype.id) == {
+        "num_sent": 2,
+        "num_opens": 2,
+        "num_replies": 0,
+        "num_positive_replies": 0,
+        "num_demos": 0,
+    }
+    assert refresh_batch() == 0
+
+    # Reaching a stage again doesn't count the prospect twice
+    add_status_record(prospect.id, ProspectStatus.SENT_OUTREACH)
+    add_status_record(prospect_2.id, ProspectStatus.ACTIVE_CONVO)
+    add_status_record(prospect_2.id, ProspectStatus.DEMO_SET)
+    assert refresh_batch() == 3
+    assert get_rollup_totals(archetype.id) == {
+        "num_sent": 2,
+        "num_opens": 2,
+        "num_replies": 1,
+        "num_positive_replies": 0,
+        "num_demos": 1,
+    }
+
+    # The demo was already counted on LinkedIn, so the email one doesn't count it again
+    db.session.add(
+        ProspectEmailStatusRecords(
+            prospect_email_id=prospect_2_email.id,
+            from_status=ProspectEmailOutreachStatus.EMAIL_OPENED,
+            to_status=ProspectEmailOutreachStatus.DEMO_SET,
+        )
+    )
+    db.session.commit()
+    assert refresh_batch() == 1
+    totals = {
+        "num_sent": 2,
+        "num_opens": 2,
+        "num_replies": 1,
+        "num_positive_replies": 1,
+        "num_demos": 1,
+    }
+    assert get_rollup_totals(archetype.id) == totals
+
+    analytics = get_all_campaign_analytics_for_client(client_id=client.id)
+    assert len(analytics) == 1
+    assert analytics[0]["num_sent"] == 2
+    assert analytics[0]["num_opens"] == 2
+    assert analytics[0]["num_demos"] == 1
+
+    # Blank date params are treated as no bounds
+    assert (
+        get_all_campaign_analytics_for_client(
+            client_id=client.id, start_date="", end_date=""
+        )
+        == analytics
+    )
+
+    rebuild_campaign_analytics_rollups(client.id)
+    assert get_rollup_totals(archetype.id) == totals
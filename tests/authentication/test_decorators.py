@@ -5,6 +5,8 @@ from tests.test_utils.test_utils import (
     test_app,
     get_login_token)
 from tests.test_utils.decorators import use_app_context
+from src.authentication.token_cache import auth_token_cache
+from src.client.services import reset_client_sdr_sight_auth_token
 
 import json
 
@@ -54,3 +56,28 @@ def test_get_client_sdr_id():
     assert response.json == client_sdr.name
 
 
+
+
+@use_app_context
+def test_require_user_token_rotation():
+    client = basic_client()
+    client_sdr = basic_client_sdr(client)
+
+    def get_name(token: str):
+        return app.test_client().get(
+            "auth/get_client_sdr_name",
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": "Bearer {}".format(token),
+            },
+        )
+
+    assert get_name(get_login_token()).status_code == 200
+    assert auth_token_cache.get_client_sdr_id(get_login_token()) == client_sdr.id
+
+    # The old token stops working as soon as it is rotated
+    new_token = reset_client_sdr_sight_auth_token(client_sdr.id)["token"]
+    assert get_name(get_login_token()).status_code == 401
+    response = get_name(new_token)
+    assert response.status_code == 200
+    assert response.json == client_sdr.name
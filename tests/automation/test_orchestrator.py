@@ -0,0 +1,180 @@
+import mock
+from datetime import datetime, timedelta
+
+from app import db
+from tests.test_utils.decorators import use_app_context
+from tests.test_utils.test_utils import test_app
+from src.automation.models import ProcessQueue, ProcessQueueStatus
+from src.automation.orchestrator import (
+    PROCESS_TYPE_MAP,
+    claim_processes,
+    dispatch_processes,
+    process_queue,
+)
+
+
+def basic_process(
+    type: str = "process_queue_test",
+    execution_date: datetime = None,
+    status: ProcessQueueStatus = ProcessQueueStatus.QUEUED,
+    executed_at: datetime = None,
+) -> ProcessQueue:
+    process = ProcessQueue(
+        type=type,
+        meta_data={"args": {"count": 1, "time": "now"}},
+        execution_date=execution_date or datetime.utcnow() - timedelta(minutes=1),
+        executed_at=executed_at,
+        status=status,
+    )
+    db.session.add(process)
+    db.session.commit()
+    return process
+
+
+@use_app_context
+def test_claim_processes():
+    now = datetime.utcnow()
+    ready_id = basic_process().id
+    retry_id = basic_process(status=ProcessQueueStatus.RETRY).id
+    stuck_id = basic_process(
+        status=ProcessQueueStatus.IN_PROGRESS, executed_at=now - timedelta(hours=2)
+    ).id
+    future_id = basic_process(execution_date=now + timedelta(hours=1)).id
+    running_id = basic_process(
+        status=ProcessQueueStatus.IN_PROGRESS, executed_at=now - timedelta(minutes=5)
+    ).id
+
+    claimed = claim_processes(now)
+    assert sorted([process_id for process_id, _, _ in claimed]) == sorted(
+        [ready_id, retry_id, stuck_id]
+    )
+    for process_id in [ready_id, retry_id, stuck_id]:
+        process: ProcessQueue = ProcessQueue.query.get(process_id)
+        assert process.status == ProcessQueueStatus.IN_PROGRESS
+        assert process.executed_at == now
+    assert ProcessQueue.query.get(future_id).status == ProcessQueueStatus.QUEUED
+    assert ProcessQueue.query.get(running_id).executed_at == now - timedelta(minutes=5)
+
+    # Already claimed, so a second (overlapping) tick claims nothing
+    assert claim_processes(now) == []
+
+
+@use_app_context
+def test_claim_processes_respects_max_in_flight():
+    now = datetime.utcnow()
+    basic_process(
+        status=ProcessQueueStatus.IN_PROGRESS, executed_at=now - timedelta(minutes=5)
+    )
+    for _ in range(4):
+        basic_process()
+
+    with mock.patch.dict(
+        PROCESS_TYPE_MAP,
+        {"process_queue_test": {**PROCESS_TYPE_MAP["process_queue_test"], "max_in_flight": 3}},
+    ):
+        assert len(claim_processes(now)) == 2
+        assert claim_processes(now) == []
+
+
+@use_app_context
+@mock.patch("src.automation.orchestrator.handle_process")
+def test_dispatch_processes(handle_process_mock):
+    dispatched_id = basic_process(status=ProcessQueueStatus.IN_PROGRESS).id
+    failed_publish_id = basic_process(status=ProcessQueueStatus.IN_PROGRESS).id
+    unknown_id = basic_process(
+        type="not_a_process_type", status=ProcessQueueStatus.IN_PROGRESS
+    ).id
+
+    def handle(process_id, type, meta_data, producer):
+        if process_id == failed_publish_id:
+            raise Exception("Broker unavailable")
+        return type in PROCESS_TYPE_MAP
+
+    handle_process_mock.side_effect = handle
+
+    processes = [
+        (dispatched_id, "process_queue_test", None),
+        (failed_publish_id, "process_queue_test", None),
+        (unknown_id, "not_a_process_type", None),
+    ]
+    with mock.patch("src.automation.orchestrator.celery.producer_or_acquire"):
+        assert dispatch_processes(processes) == [dispatched_id]
+
+    assert ProcessQueue.query.get(dispatched_id).status == ProcessQueueStatus.IN_PROGRESS
+    assert ProcessQueue.query.get(failed_publish_id).status == ProcessQueueStatus.RETRY
+    assert ProcessQueue.query.get(unknown_id).status == ProcessQueueStatus.FAILED
+
+
+@use_app_context
+@mock.patch("src.automation.orchestrator.dispatch_processes")
+def test_process_queue_drains_in_batches(dispatch_processes_mock):
+    dispatch_processes_mock.side_effect = lambda processes: [p[0] for p in processes]
+    for _ in range(5):
+        basic_process()
+
+    result = process_queue(batch_size=2)
+    assert result["dispatched"] == 5
+    assert result["lag_seconds"] > 0
+    assert [len(call.args[0]) for call in dispatch_processes_mock.call_args_list] == [
+        2,
+        2,
+        1,
+    ]
+
+
+@use_app_context
+def test_claim_processes_capped_type_does_not_crowd_out_others():
+    now = datetime.utcnow()
+    capped_ids = [
+        basic_process(execution_date=now - timedelta(minutes=10)).id for _ in range(3)
+    ]
+    other_id = basic_process(type="other_test").id
+
+    with mock.patch.dict(
+        PROCESS_TYPE_MAP,
+        {
+            "process_queue_test": {**PROCESS_TYPE_MAP["process_queue_test"], "max_in_flight": 1},
+            "other_test": PROCESS_TYPE_MAP["process_queue_test"],
+        },
+    ):
+        claimed = claim_processes(now, limit=2)
+
+    assert sorted([process_id for process_id, _, _ in claimed]) == sorted(
+        [capped_ids[0], other_id]
+    )
+
+
+@use_app_context
+@mock.patch("src.automation.orchestrator.handle_process")
+def test_process_queue_tries_each_process_once(handle_process_mock):
+    process_ids = [basic_process().id for _ in range(5)]
+
+    def handle(process_id, type, meta_data, producer):
+        if process_id == process_ids[0]:
+            raise Exception("Broker unavailable")
+        return True
+
+    handle_process_mock.side_effect = handle
+
+    with mock.patch("src.automation.orchestrator.celery.producer_or_acquire"):
+        result = process_queue(batch_size=2)
+
+    assert result["dispatched"] == 4
+    assert sorted(call.args[0] for call in handle_process_mock.call_args_list) == sorted(
+        process_ids
+    )
+    assert ProcessQueue.query.get(process_ids[0]).status == ProcessQueueStatus.RETRY
+
+
+@use_app_context
+@mock.patch("src.automation.orchestrator.handle_process")
+def test_process_queue_stops_when_nothing_dispatches(handle_process_mock):
+    for _ in range(5):
+        basic_process()
+    handle_process_mock.side_effect = Exception("Broker unavailable")
+
+    with mock.patch("src.automation.orchestrator.celery.producer_or_acquire"):
+        result = process_queue(batch_size=2)
+
+    assert result["dispatched"] == 0
+    assert handle_process_mock.call_count == 2
@@ -15,7 +15,12 @@ from src.daily_notifications.services import (
     get_engagement_feed_items_for_sdr,
 )
 from src.li_conversation.models import LinkedinConversationEntry
-from src.daily_notifications.models import DailyNotification, EngagementFeedItem
+from src.daily_notifications.models import (
+    DailyNotification,
+    EngagementFeedItem,
+    NotificationStatus,
+    NotificationType,
+)
 from datetime import datetime, timedelta
 from model_import import ProspectStatus
 from freezegun import freeze_time
@@ -29,6 +34,61 @@ def test_fill_in_daily_notifications():
     assert len(DailyNotification.query.all()) == 1
 
 
+@use_app_context
+def test_fill_in_daily_notifications_upsert():
+    client = basic_client()
+    archetype = basic_archetype(client)
+    client_sdr = basic_client_sdr(client)
+    unread_prospect = basic_prospect(
+        client,
+        archetype,
+        client_sdr,
+        full_name="Unread Prospect",
+        li_conversation_thread_id="https://www.linkedin.com/messaging/thread/1",
+        status=ProspectStatus.ACTIVE_CONVO,
+    )
+    scheduling_prospect = basic_prospect(
+        client,
+        archetype,
+        client_sdr,
+        li_conversation_thread_id="https://www.linkedin.com/messaging/thread/2",
+        status=ProspectStatus.SCHEDULING,
+    )
+    add_linkedin_conversation_entry(
+        1, "Person 1", "Last", "1st", "Hello", unread_prospect.li_conversation_thread_id
+    )
+    with freeze_time(datetime.now() - timedelta(days=5)):
+        add_linkedin_conversation_entry(
+            1,
+            "Person 2",
+            "Last",
+            "You",
+            "Hello",
+            scheduling_prospect.li_conversation_thread_id,
+        )
+
+    fill_in_daily_notifications()
+
+    notifications = {n.prospect_id: n for n in DailyNotification.query.all()}
+    assert len(notifications) == 2
+    unread = notifications[unread_prospect.id]
+    assert unread.type == NotificationType.UNREAD_MESSAGE
+    assert unread.status == NotificationStatus.PENDING
+    assert unread.title == "Unread message from Unread Prospect"
+    assert notifications[scheduling_prospect.id].type == NotificationType.SCHEDULING
+
+    # Pending notifications are left alone, completed ones are reopened
+    unread.title = "Edited title"
+    notifications[scheduling_prospect.id].status = NotificationStatus.COMPLETE
+    db.session.commit()
+
+    fill_in_daily_notifications()
+
+    notifications = {n.prospect_id: n for n in DailyNotification.query.all()}
+    assert notifications[unread_prospect.id].title == "Edited title"
+    assert notifications[scheduling_prospect.id].status == NotificationStatus.PENDING
+
+
 @use_app_context
 def test_clear_daily_notifications():
     """Clears all daily notifications that are more than 7 days old."""
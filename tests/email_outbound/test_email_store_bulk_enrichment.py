@@ -0,0 +1,119 @@
+from app import db
+from tests.test_utils.decorators import use_app_context
+from tests.test_utils.test_utils import (
+    test_app,
+    basic_client,
+    basic_client_sdr,
+    basic_archetype,
+    basic_prospect,
+)
+from src.client.models import ClientSDR
+from src.email_outbound.email_store.bulk_enrichment import (
+    enrich_emails_for_archetype,
+    get_company_domain,
+)
+from src.email_outbound.email_store.models import EmailStore
+from src.email_outbound.email_store.services import find_email_from_vendors
+from src.prospecting.models import Prospect
+import mock
+
+
+def test_get_company_domain():
+    assert get_company_domain("https://www.Acme.com/about") == "acme.com"
+    assert get_company_domain("acme.com") == "acme.com"
+    assert get_company_domain("https://www.linkedin.com/company/acme") is None
+    assert get_company_domain(None) is None
+
+
+@mock.patch(
+    "src.email_outbound.email_store.rate_limiter.acquire_email_finder_rate_limit",
+    return_value=True,
+)
+@mock.patch(
+    "src.email_outbound.email_store.hunter.get_email_from_hunter",
+    return_value=(True, {"email": "jane@acme.com"}),
+)
+@mock.patch(
+    "src.email_outbound.email_store.findymail.FindyMail.find_from_name_and_company",
+    return_value={"contact": None},
+)
+@mock.patch(
+    "src.email_outbound.email_store.datagma.DataGMA.find_from_name_and_company",
+    side_effect=Exception("DataGMA is down"),
+)
+def test_find_email_from_vendors(
+    datagma_mock, findymail_mock, hunter_mock, rate_limit_mock
+):
+    email, verified = find_email_from_vendors(
+        name="Jane Doe",
+        first_name="Jane",
+        last_name="Doe",
+        company="Acme",
+        company_url="https://acme.com",
+    )
+    assert email == "jane@acme.com"
+    assert not verified
+    assert [call.args[0] for call in rate_limit_mock.call_args_list] == [
+        "datagma",
+        "findymail",
+        "hunter",
+    ]
+
+
+@use_app_context
+@mock.patch(
+    "src.email_classifier.services.verify_email",
+    side_effect=lambda email: (True, email, 0.9),
+)
+@mock.patch(
+    "src.email_outbound.email_store.bulk_enrichment.find_email_from_vendors",
+    side_effect=lambda name, **kwargs: (
+        (None, False) if name == "No Match" else (f"{name.split()[0].lower()}@acme.com", False)
+    ),
+)
+def test_enrich_emails_for_archetype(find_email_mock, verify_email_mock):
+    client = basic_client()
+    client_sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, client_sdr)
+
+    def prospect(full_name: str, company_url: str = "https://acme.com") -> int:
+        p = basic_prospect(client, archetype, client_sdr, email=None, full_name=full_name, company="Acme")
+        p.first_name, p.last_name = full_name.split()
+        p.company_url = company_url
+        db.session.commit()
+        return p.id
+
+    # Uploaded twice, so one lookup
+    jane_ids = [prospect("Jane Doe"), prospect("Jane Doe", "http://www.acme.com/")]
+    john_id = prospect("John Smith")
+    no_match_id = prospect("No Match")
+    stored_id = prospect("Stored Person")
+
+    db.session.add(
+        EmailStore(
+            email="stored@acme.com",
+            first_name="Stored",
+            last_name="Person",
+            company_name="acme",
+            hunter_score=80,
+        )
+    )
+    db.session.commit()
+
+    totals = enrich_emails_for_archetype(archetype.id)
+    assert totals == {"prospects": 5, "from_store": 1, "from_vendors": 3, "lookups": 3}
+    assert find_email_mock.call_count == 3
+
+    for jane_id in jane_ids:
+        jane: Prospect = Prospect.query.get(jane_id)
+        assert jane.email == "jane@acme.com"
+        assert jane.valid_primary_email
+        assert EmailStore.query.get(jane.email_store_id).email == "jane@acme.com"
+    assert Prospect.query.get(john_id).email == "john@acme.com"
+    assert Prospect.query.get(no_match_id).email is None
+    stored: Prospect = Prospect.query.get(stored_id)
+    assert stored.email == "stored@acme.com"
+    assert stored.email_score == 0.8
+
+    # Only vendor lookups use credits
+    assert ClientSDR.query.get(client_sdr.id).email_fetching_credits == 2000 - 3
@@ -5,7 +5,7 @@ import mock
 import pytz
 from app import db, app
 from src.email_scheduling.models import EmailMessagingSchedule, EmailMessagingStatus, EmailMessagingType
-from src.email_scheduling.services import DEFAULT_SENDING_DELAY_INTERVAL, create_email_messaging_schedule_entry, generate_email_messaging_schedule_entry, get_initial_email_send_date, modify_email_messaging_schedule_entry, populate_email_messaging_schedule_entries, verify_followup_send_date
+from src.email_scheduling.services import DEFAULT_SENDING_DELAY_INTERVAL, bulk_populate_email_messaging_schedule_entries, create_email_messaging_schedule_entry, generate_email_messaging_schedule_entry, get_initial_email_send_date, modify_email_messaging_schedule_entry, populate_email_messaging_schedule_entries, verify_followup_send_date
 from src.message_generation.models import GeneratedMessage
 from src.prospecting.models import ProspectOverallStatus
 from tests.test_utils.test_utils import (
@@ -230,6 +230,92 @@ def test_populate_email_messaging_schedule_entries():
         assert EmailMessagingSchedule.query.get(ids[3]).date_scheduled.date() == next_monday.date()
 
 
+@use_app_context
+def test_bulk_populate_email_messaging_schedule_entries():
+    client = basic_client()
+    client_sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, client_sdr)
+    email_body_template = basic_email_sequence_step(
+        client_sdr=client_sdr,
+        client_archetype=archetype,
+        sequence_delay_days=3
+    )
+    email_subject_line_template = basic_email_subject_line_template(
+        client_sdr, archetype)
+    email_bank = basic_sdr_email_bank(client_sdr)
+    schedule = basic_sdr_email_send_schedule(client_sdr, email_bank)
+    bump_accepted = basic_email_sequence_step(
+        client_sdr=client_sdr,
+        client_archetype=archetype,
+        overall_status=ProspectOverallStatus.ACCEPTED,
+        default=True,
+        sequence_delay_days=1
+    )
+    bump_1 = basic_email_sequence_step(
+        client_sdr=client_sdr,
+        client_archetype=archetype,
+        overall_status=ProspectOverallStatus.BUMPED,
+        bumped_count=1,
+        default=True,
+    )
+
+    entries = []
+    for _ in range(3):
+        prospect = basic_prospect(client, archetype)
+        prospect_email = basic_prospect_email(prospect)
+        entries.append({
+            "prospect_email_id": prospect_email.id,
+            "subject_line_id": basic_generated_message(prospect).id,
+            "body_id": basic_generated_message(prospect).id,
+            "initial_email_subject_line_template_id": email_subject_line_template.id,
+            "initial_email_body_template_id": email_body_template.id,
+        })
+
+    pst = pytz.timezone('America/Los_Angeles')
+    last_sunday = pst.localize(datetime(2023, 10, 15, 9, 0))
+
+    with freeze_time(last_sunday):
+        email_ids = bulk_populate_email_messaging_schedule_entries(
+            client_sdr_id=client_sdr.id,
+            entries=entries,
+        )
+    assert EmailMessagingSchedule.query.count() == 9
+    assert list(email_ids.keys()) == [entry["prospect_email_id"] for entry in entries]
+
+    # The default SLA spaces initial emails 8 hours apart, within the 9am - 5pm window
+    initial_dates = []
+    for entry in entries:
+        ids = email_ids[entry["prospect_email_id"]]
+        assert len(ids) == 3
+        initial: EmailMessagingSchedule = EmailMessagingSchedule.query.get(ids[0])
+        assert initial.email_type == EmailMessagingType.INITIAL_EMAIL
+        assert initial.send_status == EmailMessagingStatus.SCHEDULED
+        assert initial.body_id == entry["body_id"]
+        initial_dates.append(initial.date_scheduled)
+        followups = [EmailMessagingSchedule.query.get(id) for id in ids[1:]]
+        assert [f.email_body_template_id for f in followups] == [bump_accepted.id, bump_1.id]
+        assert all(f.send_status == EmailMessagingStatus.NEEDS_GENERATION for f in followups)
+    assert initial_dates == [
+        datetime(2023, 10, 16, 16, 0),  # Monday 9am PDT
+        datetime(2023, 10, 17, 0, 0),  # Monday 5pm PDT
+        datetime(2023, 10, 17, 16, 0),  # Tuesday 9am PDT
+    ]
+
+    # Already scheduled prospect emails are skipped, and re-uploaded if they never reached Smartlead
+    with mock.patch(
+        "src.email_scheduling.services.prospect_exists_in_smartlead",
+        side_effect=[True, False, False],
+    ), mock.patch(
+        "src.email_scheduling.services.upload_prospect_to_campaign.delay"
+    ) as upload_mock:
+        assert bulk_populate_email_messaging_schedule_entries(
+            client_sdr_id=client_sdr.id,
+            entries=entries,
+        ) == {}
+    assert EmailMessagingSchedule.query.count() == 9
+    assert upload_mock.call_count == 2
+
+
 @use_app_context
 def test_get_next_available_send_date():
     client = basic_client()
@@ -17,6 +17,8 @@ from src.li_conversation.services import (
     create_linkedin_conversation_entry,
     update_li_conversation_extractor_phantom,
     get_li_conversation_entries,
+    full_name_matches,
+    scrape_conversations_inbox_for_sdr_helper,
 )
 from datetime import datetime
 from app import app
@@ -164,3 +166,82 @@ def test_generate_chat_gpt_response_to_conversation_thread_helper(mock_chat_gpt_
     mocked_arguments = mock_chat_gpt_completion.call_args[0]
     assert 'Naturally integrate pieces' not in mocked_arguments[0][0].get('content')
     assert response == "This is a test response"
+
+
+def basic_voyager_conversation(
+    convo_urn_id: str,
+    last_msg_urn_id: str,
+    profile_urn_id: str,
+    public_id: str = "",
+    first_name: str = "Testing",
+    last_name: str = "Testasara",
+):
+    return {
+        "dashEntityUrn": f"urn:li:fsd_conversation:{convo_urn_id}",
+        "events": [{"dashEntityUrn": f"urn:li:fsd_message:{last_msg_urn_id}"}],
+        "participants": [
+            {
+                "com.linkedin.voyager.messaging.MessagingMember": {
+                    "miniProfile": {
+                        "entityUrn": f"urn:li:fs_miniProfile:{profile_urn_id}",
+                        "publicIdentifier": public_id,
+                        "firstName": first_name,
+                        "lastName": last_name,
+                    }
+                }
+            }
+        ],
+    }
+
+
+def test_full_name_matches():
+    assert full_name_matches("Testing Testasara", "Testing", "Testasara")
+    assert full_name_matches("Dr. Testing J. Testasara", "Testing", "Testasara")
+    assert not full_name_matches("Testasara Testing", "Testing", "Testasara")
+    assert not full_name_matches(None, "Testing", "Testasara")
+
+
+@use_app_context
+@mock.patch("src.li_conversation.services.send_slack_message")
+@mock.patch("src.li_conversation.services.LinkedIn")
+def test_scrape_conversations_inbox_for_sdr_helper(linkedin_mock, send_slack_message_mock):
+    from model_import import LinkedinConversationScrapeQueue
+
+    client = basic_client()
+    client_sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, client_sdr)
+    by_urn = basic_prospect(client, archetype, client_sdr, full_name="By Urn")
+    by_urn.li_urn_id = "urn-1"
+    by_url = basic_prospect(client, archetype, client_sdr, full_name="By Url")
+    by_url.linkedin_url = "linkedin.com/in/by-url"
+    by_name = basic_prospect(client, archetype, client_sdr, full_name="By N. Name")
+    already_scraped = basic_prospect(client, archetype, client_sdr, full_name="Scraped")
+    already_scraped.li_urn_id = "urn-4"
+    db.session.commit()
+
+    entry = basic_linkedin_conversation_entry()
+    entry.urn_id = "msg-4"
+    db.session.commit()
+
+    linkedin_mock.return_value.get_conversations.return_value = [
+        basic_voyager_conversation("convo-1", "msg-1", "urn-1"),
+        basic_voyager_conversation("convo-2", "msg-2", "urn-2", public_id="by-url"),
+        basic_voyager_conversation("convo-3", "msg-3", "urn-3", first_name="By", last_name="Name"),
+        basic_voyager_conversation("convo-4", "msg-4", "urn-4"),
+        basic_voyager_conversation("convo-5", "msg-5", "urn-5", first_name="No", last_name="Match"),
+    ]
+
+    assert scrape_conversations_inbox_for_sdr_helper(client_sdr.id) == 3
+
+    scrapes = LinkedinConversationScrapeQueue.query.all()
+    assert sorted((s.conversation_urn_id, s.prospect_id) for s in scrapes) == [
+        ("convo-1", by_urn.id),
+        ("convo-2", by_url.id),
+        ("convo-3", by_name.id),
+    ]
+    assert by_url.li_urn_id == "urn-2"
+    assert by_name.li_urn_id == "urn-3"
+    assert send_slack_message_mock.call_count == 1
+
+    # Already queued, so a second sweep queues nothing
+    assert scrape_conversations_inbox_for_sdr_helper(client_sdr.id) == 0
@@ -0,0 +1,304 @@
+from app import db
+from model_import import (
+    GeneratedMessage,
+    GeneratedMessageAutoBump,
+    GeneratedMessageJobQueue,
+    GeneratedMessageType,
+)
+from src.message_generation.models import GeneratedMessageJobStatus
+from src.message_generation.services import (
+    save_deferred_auto_bump,
+    save_deferred_email_body,
+    save_deferred_email_subject_line,
+    save_deferred_linkedin_template_outreach,
+)
+from src.message_generation.services_batch_generation import (
+    DEFERRED_GENERATION_MESSAGE,
+    run_concurrently,
+    run_generated_message_jobs_batch,
+)
+from tests.test_utils.decorators import use_app_context
+import mock
+from tests.test_utils.test_utils import (
+    test_app,
+    basic_client,
+    basic_client_sdr,
+    basic_archetype,
+    basic_prospect,
+    basic_outbound_campaign,
+    basic_generated_message_job_queue,
+    basic_email_subject_line_template,
+    basic_generated_message_autobump,
+)
+
+
+def test_run_concurrently():
+    def double(x):
+        if x == 3:
+            raise ValueError("bad input")
+        return x * 2
+
+    results = run_concurrently([(double, (i,)) for i in range(5)], concurrency=2)
+    assert results[:3] == [0, 2, 4]
+    assert isinstance(results[3], ValueError)
+    assert results[4] == 8
+
+    assert run_concurrently([]) == []
+
+
+@use_app_context
+def test_run_generated_message_jobs_batch():
+    client = basic_client()
+    sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, sdr)
+    prospects = [basic_prospect(client, archetype, sdr) for _ in range(5)]
+    campaign = basic_outbound_campaign(
+        [p.id for p in prospects], GeneratedMessageType.LINKEDIN, archetype, sdr
+    )
+    succeeded, failed, errored, exhausted, taken = [
+        basic_generated_message_job_queue(
+            p, campaign, GeneratedMessageJobStatus.PENDING, error_message=None
+        )
+        for p in prospects
+    ]
+    exhausted.attempts = 2
+    taken.status = GeneratedMessageJobStatus.IN_PROGRESS
+    db.session.commit()
+    job_ids = [succeeded.id, failed.id, errored.id, exhausted.id, taken.id]
+
+    def generate(job: dict):
+        if job["gm_job_id"] == failed.id:
+            return (False, "Prospect does not exist")
+        if job["gm_job_id"] in [errored.id, exhausted.id]:
+            raise Exception("LLM unavailable")
+        return (True, "Success")
+
+    statuses = run_generated_message_jobs_batch(
+        [{"gm_job_id": job_id} for job_id in job_ids], generate
+    )
+    # Jobs that were not PENDING are left to whoever claimed them
+    assert taken.id not in statuses
+
+    db.session.expire_all()
+    jobs = {job_id: GeneratedMessageJobQueue.query.get(job_id) for job_id in job_ids}
+    assert jobs[succeeded.id].status == GeneratedMessageJobStatus.COMPLETED
+    assert jobs[succeeded.id].attempts == 1
+    assert jobs[failed.id].status == GeneratedMessageJobStatus.FAILED
+    assert jobs[failed.id].error_message == "Prospect does not exist"
+    # Exceptions are retried on a later run, until the attempts run out
+    assert jobs[errored.id].status == GeneratedMessageJobStatus.PENDING
+    assert jobs[errored.id].attempts == 1
+    assert "LLM unavailable" in jobs[errored.id].error_message
+    assert jobs[exhausted.id].status == GeneratedMessageJobStatus.FAILED
+    assert jobs[exhausted.id].attempts == 3
+    assert jobs[taken.id].status == GeneratedMessageJobStatus.IN_PROGRESS
+    assert jobs[taken.id].attempts == 0
+
+
+@use_app_context
+@mock.patch(
+    "src.message_generation.services_batch_generation.bulk_update_generated_message_job_statuses",
+    side_effect=Exception("Database unavailable"),
+)
+def test_run_generated_message_jobs_batch_releases_claimed_jobs(bulk_update_mock):
+    client = basic_client()
+    sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, sdr)
+    prospect = basic_prospect(client, archetype, sdr)
+    campaign = basic_outbound_campaign(
+        [prospect.id], GeneratedMessageType.LINKEDIN, archetype, sdr
+    )
+    job = basic_generated_message_job_queue(
+        prospect, campaign, GeneratedMessageJobStatus.PENDING, error_message=None
+    )
+    job_id = job.id
+
+    try:
+        run_generated_message_jobs_batch(
+            [{"gm_job_id": job_id}], lambda job: (True, "Success")
+        )
+        assert False
+    except Exception as e:
+        assert str(e) == "Database unavailable"
+
+    # Back to PENDING, so the task's retry can claim it again
+    db.session.expire_all()
+    job = GeneratedMessageJobQueue.query.get(job_id)
+    assert job.status == GeneratedMessageJobStatus.PENDING
+    assert job.attempts == 1
+
+
+@use_app_context
+@mock.patch("src.message_generation.services.approve_message")
+def test_deferred_generation_completes_job_from_batch_callback(approve_message_mock):
+    client = basic_client()
+    sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, sdr)
+    prospects = [basic_prospect(client, archetype, sdr) for _ in range(2)]
+    campaign = basic_outbound_campaign(
+        [p.id for p in prospects], GeneratedMessageType.LINKEDIN, archetype, sdr
+    )
+    answered, unanswered = [
+        basic_generated_message_job_queue(
+            p, campaign, GeneratedMessageJobStatus.PENDING, error_message=None
+        )
+        for p in prospects
+    ]
+    answered_id, unanswered_id = answered.id, unanswered.id
+    campaign_id = campaign.id
+
+    statuses = run_generated_message_jobs_batch(
+        [{"gm_job_id": answered_id}, {"gm_job_id": unanswered_id}],
+        lambda job: (True, DEFERRED_GENERATION_MESSAGE),
+    )
+    assert statuses == {}
+
+    # Waiting on the batch result
+    db.session.expire_all()
+    assert (
+        GeneratedMessageJobQueue.query.get(answered_id).status
+        == GeneratedMessageJobStatus.IN_PROGRESS
+    )
+
+    callback_args = {
+        "outbound_campaign_id": campaign_id,
+        "template_id": None,
+        "prompt": "Write a message",
+    }
+    save_deferred_linkedin_template_outreach(
+        completion="Hi there!",
+        prospect_id=prospects[0].id,
+        gm_job_id=answered_id,
+        **callback_args,
+    )
+    save_deferred_linkedin_template_outreach(
+        completion=None,
+        prospect_id=prospects[1].id,
+        gm_job_id=unanswered_id,
+        error_message="No result (batch expired)",
+        **callback_args,
+    )
+
+    db.session.expire_all()
+    assert approve_message_mock.call_count == 1
+    assert (
+        GeneratedMessageJobQueue.query.get(answered_id).status
+        == GeneratedMessageJobStatus.COMPLETED
+    )
+    unanswered = GeneratedMessageJobQueue.query.get(unanswered_id)
+    assert unanswered.status == GeneratedMessageJobStatus.FAILED
+    assert unanswered.error_message == "No result (batch expired)"
+
+
+@use_app_context
+@mock.patch("src.message_generation.services.mark_prospect_email_approved")
+@mock.patch("src.message_generation.services.defer_chat_completion")
+@mock.patch(
+    "src.message_generation.email.services.ai_subject_line_prompt",
+    return_value="Write a subject line",
+)
+def test_deferred_email_generation_completes_job_from_batch_callbacks(
+    ai_subject_line_prompt_mock, defer_chat_completion_mock, approve_mock
+):
+    client = basic_client()
+    sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, sdr)
+    prospects = [basic_prospect(client, archetype, sdr) for _ in range(2)]
+    campaign = basic_outbound_campaign(
+        [p.id for p in prospects], GeneratedMessageType.EMAIL, archetype, sdr
+    )
+    strict_job, ai_job = [
+        basic_generated_message_job_queue(
+            p, campaign, GeneratedMessageJobStatus.IN_PROGRESS, error_message=None
+        )
+        for p in prospects
+    ]
+    strict_job_id, ai_job_id = strict_job.id, ai_job.id
+    strict_template = basic_email_subject_line_template(sdr, archetype, "Quick question")
+    ai_template = basic_email_subject_line_template(sdr, archetype, "About [[company]]")
+
+    # A strict subject line template is used as is
+    save_deferred_email_body(
+        completion="Hi there!",
+        prospect_id=prospects[0].id,
+        campaign_id=campaign.id,
+        prompt="Write an email",
+        template_id=None,
+        subjectline_template_id=strict_template.id,
+        gm_job_id=strict_job_id,
+    )
+    assert defer_chat_completion_mock.call_count == 0
+    assert approve_mock.call_count == 1
+    assert (
+        GeneratedMessageJobQueue.query.get(strict_job_id).status
+        == GeneratedMessageJobStatus.COMPLETED
+    )
+
+    # Otherwise the subject line is deferred too
+    save_deferred_email_body(
+        completion="Hello!",
+        prospect_id=prospects[1].id,
+        campaign_id=campaign.id,
+        prompt="Write an email",
+        template_id=None,
+        subjectline_template_id=ai_template.id,
+        gm_job_id=ai_job_id,
+    )
+    assert defer_chat_completion_mock.call_count == 1
+    callback_args = defer_chat_completion_mock.call_args.kwargs["callback_args"]
+    assert defer_chat_completion_mock.call_args.kwargs["callback"] == "email_subject_line"
+    assert callback_args["email_body"] == "Hello!"
+    assert (
+        GeneratedMessageJobQueue.query.get(ai_job_id).status
+        == GeneratedMessageJobStatus.IN_PROGRESS
+    )
+
+    save_deferred_email_subject_line(completion='"About Acme"', **callback_args)
+    assert approve_mock.call_count == 2
+    assert (
+        GeneratedMessageJobQueue.query.get(ai_job_id).status
+        == GeneratedMessageJobStatus.COMPLETED
+    )
+    completions = [
+        message.completion
+        for message in GeneratedMessage.query.filter(
+            GeneratedMessage.prospect_id == prospects[1].id
+        ).all()
+    ]
+    assert sorted(completions) == ["About Acme", "Hello!"]
+
+    save_deferred_email_subject_line(
+        completion=None, error_message="No result (batch expired)", **callback_args
+    )
+    assert (
+        GeneratedMessageJobQueue.query.get(ai_job_id).status
+        == GeneratedMessageJobStatus.FAILED
+    )
+
+
+@use_app_context
+def test_save_deferred_auto_bump():
+    client = basic_client()
+    sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, sdr)
+    prospects = [basic_prospect(client, archetype, sdr) for _ in range(2)]
+    answered, unanswered = [
+        basic_generated_message_autobump(p, sdr, message=".") for p in prospects
+    ]
+    answered_id, unanswered_id = answered.id, unanswered.id
+
+    with mock.patch("src.message_generation.services.send_slack_message"):
+        save_deferred_auto_bump(
+            completion="Following up!", bump_msg_id=answered_id, prompt="Write a bump"
+        )
+        save_deferred_auto_bump(
+            completion=None,
+            bump_msg_id=unanswered_id,
+            prompt="Write a bump",
+            error_message="No result (batch expired)",
+        )
+
+    db.session.expire_all()
+    assert GeneratedMessageAutoBump.query.get(answered_id).message == "Following up!"
+    # Deleted, so the next run generates it again
+    assert GeneratedMessageAutoBump.query.get(unanswered_id) is None
@@ -0,0 +1,220 @@
+import json
+import mock
+import pytest
+import requests
+from typing import Optional
+
+from app import db
+from tests.test_utils.decorators import use_app_context
+from tests.test_utils.test_utils import test_app
+from src.ml.models import (
+    LLMBatchJob,
+    LLMBatchJobStatus,
+    LLMBatchRequest,
+    LLMBatchRequestStatus,
+)
+from src.ml.llm_batch_services import (
+    defer_chat_completion,
+    llm_batch_callback,
+    parse_llm_batch_output,
+    poll_llm_batch_job,
+    submit_pending_llm_batch_requests,
+)
+
+RECEIVED_COMPLETIONS = []
+
+
+@llm_batch_callback("tests.record_completion")
+def record_completion(completion: Optional[str], key: str, error_message: str = None):
+    RECEIVED_COMPLETIONS.append((key, completion))
+
+
+class StubBatchProvider:
+    """Stands in for the provider's /files and /batches endpoints."""
+
+    def __init__(self):
+        self.files = {}
+        self.batches = {}
+
+    def post(self, url, **kwargs):
+        if url.endswith("/files"):
+            file_id = f"file-{len(self.files)}"
+            self.files[file_id] = kwargs["files"]["file"][1].decode()
+            return self._response({"id": file_id})
+
+        batch_id = f"batch-{len(self.batches)}"
+        self.batches[batch_id] = {
+            "id": batch_id,
+            "status": "validating",
+            "input_file_id": kwargs["json"]["input_file_id"],
+        }
+        return self._response(self.batches[batch_id])
+
+    def get(self, url, **kwargs):
+        if url.endswith("/content"):
+            return self._response(text=self.files[url.split("/")[-2]])
+        return self._response(self.batches[url.split("/")[-1]])
+
+    def finish(self, batch_id: str, status: str, answer_custom_ids: list[str]):
+        """Answers the given requests of a batch and sets its final status."""
+        lines = []
+        for line in self.files[self.batches[batch_id]["input_file_id"]].splitlines():
+            entry = json.loads(line)
+            if entry["custom_id"] not in answer_custom_ids:
+                continue
+            content = entry["body"]["messages"][0]["content"]
+            lines.append(
+                json.dumps(
+                    {
+                        "custom_id": entry["custom_id"],
+                        "response": {
+                            "status_code": 200,
+                            "body": {"choices": [{"message": {"content": f"re: {content}"}}]},
+                        },
+                        "error": None,
+                    }
+                )
+            )
+        output_file_id = f"file-{len(self.files)}"
+        self.files[output_file_id] = "\n".join(lines)
+        self.batches[batch_id]["status"] = status
+        self.batches[batch_id]["output_file_id"] = output_file_id
+
+    @staticmethod
+    def _response(json_body=None, text=""):
+        response = mock.MagicMock()
+        response.json.return_value = json_body
+        response.text = text
+        return response
+
+
+def test_parse_llm_batch_output():
+    content = "\n".join(
+        [
+            json.dumps(
+                {
+                    "custom_id": "1",
+                    "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {"content": " Hi! "}}]},
+                    },
+                }
+            ),
+            json.dumps(
+                {
+                    "custom_id": "2",
+                    "response": {"status_code": 400, "body": {"error": "bad"}},
+                }
+            ),
+        ]
+    )
+    results = parse_llm_batch_output(content)
+    assert results[1] == ("Hi!", None)
+    assert results[2][0] is None
+    assert "bad" in results[2][1]
+
+
+@use_app_context
+def test_deferred_chat_completions_round_trip():
+    RECEIVED_COMPLETIONS.clear()
+    provider = StubBatchProvider()
+    callback = "tests.record_completion"
+
+    request_ids = [
+        defer_chat_completion(
+            [{"role": "user", "content": key}],
+            callback=callback,
+            callback_args={"key": key},
+            model="gpt-4",
+        )
+        for key in ["a", "b"]
+    ]
+    assert all(request_ids)
+
+    with mock.patch(
+        "src.ml.llm_batch_services.requests.post", side_effect=provider.post
+    ), mock.patch("src.ml.llm_batch_services.requests.get", side_effect=provider.get):
+        batch_job_ids = submit_pending_llm_batch_requests()
+        assert len(batch_job_ids) == 1
+        batch_job: LLMBatchJob = LLMBatchJob.query.get(batch_job_ids[0])
+        assert batch_job.request_count == 2
+        assert len(provider.files["file-0"].splitlines()) == 2
+        for request_id in request_ids:
+            request: LLMBatchRequest = LLMBatchRequest.query.get(request_id)
+            assert request.status == LLMBatchRequestStatus.SUBMITTED
+            assert request.llm_batch_job_id == batch_job.id
+
+        # Still running
+        assert poll_llm_batch_job(batch_job.id) == LLMBatchJobStatus.SUBMITTED
+        assert RECEIVED_COMPLETIONS == []
+
+        provider.finish("batch-0", "completed", [str(request_ids[0])])
+        assert poll_llm_batch_job(batch_job.id) == LLMBatchJobStatus.COMPLETED
+
+    # The unanswered request is failed and its callback told so
+    assert RECEIVED_COMPLETIONS == [("a", "re: a"), ("b", None)]
+    request_a: LLMBatchRequest = LLMBatchRequest.query.get(request_ids[0])
+    assert request_a.status == LLMBatchRequestStatus.COMPLETED
+    assert request_a.completion == "re: a"
+    request_b: LLMBatchRequest = LLMBatchRequest.query.get(request_ids[1])
+    assert request_b.status == LLMBatchRequestStatus.FAILED
+
+
+@use_app_context
+def test_expired_llm_batch_requeues_unanswered_requests():
+    RECEIVED_COMPLETIONS.clear()
+    provider = StubBatchProvider()
+
+    request_id = defer_chat_completion(
+        [{"role": "user", "content": "a"}],
+        callback="tests.record_completion",
+        callback_args={"key": "a"},
+        model="gpt-4",
+    )
+
+    with mock.patch(
+        "src.ml.llm_batch_services.requests.post", side_effect=provider.post
+    ), mock.patch("src.ml.llm_batch_services.requests.get", side_effect=provider.get):
+        batch_job_id = submit_pending_llm_batch_requests()[0]
+        provider.finish("batch-0", "expired", [])
+        assert poll_llm_batch_job(batch_job_id) == LLMBatchJobStatus.FAILED
+
+    request: LLMBatchRequest = LLMBatchRequest.query.get(request_id)
+    assert request.status == LLMBatchRequestStatus.PENDING
+    assert request.llm_batch_job_id is None
+    assert request.attempts == 1
+    assert RECEIVED_COMPLETIONS == []
+
+
+@use_app_context
+def test_failed_llm_batch_upload_releases_claimed_requests():
+    request_id = defer_chat_completion(
+        [{"role": "user", "content": "a"}],
+        callback="tests.record_completion",
+        callback_args={"key": "a"},
+        model="gpt-4",
+    )
+
+    with mock.patch(
+        "src.ml.llm_batch_services.requests.post",
+        side_effect=requests.ConnectionError("Provider unavailable"),
+    ):
+        assert submit_pending_llm_batch_requests() == []
+
+    request: LLMBatchRequest = LLMBatchRequest.query.get(request_id)
+    assert request.status == LLMBatchRequestStatus.PENDING
+    assert request.llm_batch_job_id is None
+    assert request.attempts == 0
+
+
+@use_app_context
+def test_defer_chat_completion_rejects_unknown_callback():
+    with pytest.raises(ValueError):
+        defer_chat_completion(
+            [{"role": "user", "content": "a"}],
+            callback="tests.ml.test_llm_batch_services:record_completion",
+            callback_args={"key": "a"},
+            model="gpt-4",
+        )
+
+    assert LLMBatchRequest.query.count() == 0
@@ -0,0 +1,61 @@
+import mock
+
+from src.ml.llm_cache import LLMResponseCache, make_llm_cache_key
+from src.ml.openai_wrappers import llm_response_cache, wrapped_chat_gpt_completion
+
+
+def test_make_llm_cache_key():
+    messages = [{"role": "user", "content": "Colloquialize: ACME INC"}]
+    key = make_llm_cache_key("openai", "gpt-4", messages, temperature=0, max_tokens=16)
+    assert key == make_llm_cache_key(
+        "openai", "gpt-4", messages, max_tokens=16, temperature=0
+    )
+    assert key != make_llm_cache_key(
+        "openai", "gpt-4", messages, temperature=0.5, max_tokens=16
+    )
+    assert key != make_llm_cache_key(
+        "openai", "gpt-3.5-turbo", messages, temperature=0, max_tokens=16
+    )
+
+
+@mock.patch("src.ml.llm_cache.get_redis_client", return_value=None)
+def test_llm_response_cache_lru_and_ttl(redis_mock):
+    cache = LLMResponseCache(max_local_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+
+    # "b" is now least recently used
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+    with mock.patch("src.ml.llm_cache.time.time", return_value=10**12):
+        assert cache.get("a") is None
+
+    stats = cache.get_stats()
+    assert stats["local_hits"] == 3
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+
+
+@mock.patch("src.ml.llm_cache.get_redis_client", return_value=None)
+@mock.patch("src.ml.openai_wrappers._create_chat_completion", return_value="Acme")
+def test_wrapped_chat_gpt_completion_cache(completion_mock, redis_mock):
+    llm_response_cache.clear_local()
+    messages = [{"role": "user", "content": "Colloquialize: ACME INC"}]
+
+    for _ in range(3):
+        assert (
+            wrapped_chat_gpt_completion(messages, temperature=0, use_cache=True)
+            == "Acme"
+        )
+    assert completion_mock.call_count == 1
+
+    # Not opted in, or bypassed: always calls through
+    wrapped_chat_gpt_completion(messages, temperature=0)
+    assert completion_mock.call_count == 2
+    with mock.patch.dict("os.environ", {"LLM_CACHE_BYPASS": "true"}):
+        wrapped_chat_gpt_completion(messages, temperature=0, use_cache=True)
+    assert completion_mock.call_count == 3
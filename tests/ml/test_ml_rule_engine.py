@@ -1,13 +1,19 @@
+import os
+import tempfile
+
 from app import db, app
 from tests.test_utils.test_utils import (
     test_app,
     basic_client,
+    basic_client_sdr,
     basic_archetype,
     basic_generated_message,
     basic_prospect,
 )
 from tests.test_utils.decorators import use_app_context
 from src.ml.rule_engine import (
+    MessageRuleEngine,
+    message_rule_engine,
     rule_no_brackets,
     run_message_rule_engine,
     wipe_problems,
@@ -33,6 +39,67 @@ def test_run_message_rule_engine():
     pass
 
 
+@use_app_context
+def test_message_rule_engine_run_batch():
+    client = basic_client()
+    client_sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, client_sdr)
+    prospect = basic_prospect(client, archetype, client_sdr)
+    clean_message = basic_generated_message(prospect)
+    bracket_message = basic_generated_message(prospect)
+    bracket_message.completion = "Hi [first name], this is a test"
+    bracket_message.problems = ["stale problem"]
+    db.session.commit()
+    clean_message_id = clean_message.id
+    bracket_message_id = bracket_message.id
+
+    results = message_rule_engine.run_batch(
+        [clean_message_id, bracket_message_id], autocorrect=False
+    )
+    assert results[clean_message_id] == []
+    assert results[bracket_message_id] == ["Contains brackets."]
+
+    bracket_message: GeneratedMessage = GeneratedMessage.query.get(bracket_message_id)
+    assert bracket_message.problems == ["Contains brackets."]
+    assert bracket_message.blocking_problems == ["Contains brackets."]
+    assert GeneratedMessage.query.get(clean_message_id).problems == []
+
+    # Messages of prospects without an SDR are still checked
+    unassigned_prospect = basic_prospect(client, archetype)
+    unassigned_message = basic_generated_message(unassigned_prospect)
+    unassigned_message.completion = "Hi [first name], this is a test"
+    db.session.commit()
+    assert run_message_rule_engine(unassigned_message.id) == ["Contains brackets."]
+
+    # A missing message raises, as it always has
+    try:
+        run_message_rule_engine(-1)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_message_rule_engine_reloads_changed_datasets():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "profanity.csv")
+        with open(path, "w") as f:
+            f.write("darn\n")
+
+        engine = MessageRuleEngine()
+        engine.DATASET_PATHS = {"profanity": path}
+        assert engine.get_dataset("profanity") == {"darn"}
+
+        # Unchanged files aren't re-read
+        engine.reload_if_changed()
+        assert engine.get_dataset("profanity") == {"darn"}
+
+        with open(path, "w") as f:
+            f.write("heck\n")
+        os.utime(path, (0, os.path.getmtime(path) + 10))
+        engine.reload_if_changed()
+        assert engine.get_dataset("profanity") == {"heck"}
+
+
 @use_app_context
 def test_wipe_problems():
     client = basic_client()
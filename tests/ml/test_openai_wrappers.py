@@ -51,3 +51,46 @@ def test_wrapped_create_completion(openai_mock):
         'frequency_penalty': DEFAULT_FREQUENCY_PENALTY,
         'stop': DEFAULT_STOP
     }
+
+
+class FakeProviderError(Exception):
+    def __init__(self, status_code=None, headers=None):
+        super().__init__("provider error")
+        self.status_code = status_code
+        self.headers = headers
+
+
+def test_get_llm_retry_after():
+    assert get_llm_retry_after(FakeProviderError(429, {"retry-after": "7"})) == 7.0
+    assert get_llm_retry_after(FakeProviderError(429, {})) is None
+    assert get_llm_retry_after(Exception("no headers")) is None
+
+    delay = get_llm_retry_delay(FakeProviderError(429, {"retry-after": "2"}), 1)
+    assert 2 <= delay <= 2.25
+
+    for attempt in range(1, 10):
+        delay = get_llm_retry_delay(Exception("boom"), attempt)
+        assert 0 <= delay <= LLM_BACKOFF_MAX_SECONDS
+
+
+@mock.patch("src.ml.openai_wrappers.time.sleep")
+@mock.patch("src.utils.rate_limiter.get_redis_client", return_value=None)
+def test_call_llm_with_retries(redis_mock, sleep_mock):
+    create = mock.Mock(side_effect=[FakeProviderError(429), "response"])
+    response = call_llm_with_retries(
+        provider="openai", model="gpt-4", tokens=10, create=create
+    )
+    assert response == "response"
+    assert create.call_count == 2
+    assert sleep_mock.call_count == 1
+
+    # Errors that can't succeed on retry are raised straight away
+    create = mock.Mock(side_effect=FakeProviderError(401))
+    try:
+        call_llm_with_retries(
+            provider="openai", model="gpt-4", tokens=10, create=create
+        )
+        assert False
+    except Exception as e:
+        assert "provider error" in str(e)
+    assert create.call_count == 1
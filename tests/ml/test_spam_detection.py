@@ -1,5 +1,9 @@
 from tests.test_utils.decorators import use_app_context
-from src.ml.spam_detection import run_algorithmic_spam_detection
+from src.ml.spam_detection import (
+    SpamWordIndex,
+    run_algorithmic_spam_detection,
+    run_algorithmic_spam_detection_batch,
+)
 from tests.test_utils.test_utils import test_app
 from app import app
 
@@ -20,3 +24,56 @@ Just click this link to get started.
     assert results.get("spam_word_score") == 75
     assert results.get("read_minutes_score") == 100
     assert results.get("total_score") == 87.5
+
+
+def test_spam_word_index(tmp_path):
+    spam_words_file = tmp_path / "spam_words.csv"
+    spam_words_file.write_text("Click\nClick here\nPassword\nBulk email\n")
+    index = SpamWordIndex(path=str(spam_words_file))
+
+    assert index.find_spam_words(["click", "here", "click", ""]) == ["click", "click"]
+    assert index.find_spam_words(["click here", "bulk", "email"]) == ["click here"]
+    assert index.find_spam_words(["income password"]) == []
+    assert index.find_spam_words([]) == []
+
+
+def test_spam_word_index_phrases(tmp_path):
+    spam_words_file = tmp_path / "spam_words.csv"
+    spam_words_file.write_text("Click\nClick here\nClick here to remove\nBulk email\n")
+    index = SpamWordIndex(path=str(spam_words_file))
+
+    # The longest phrase wins
+    assert index.find_spam_phrases(["click", "here", "to", "remove", "me"]) == [
+        "click here to remove"
+    ]
+    assert index.find_spam_phrases(["click", "here", "for", "bulk", "email"]) == [
+        "click here",
+        "bulk email",
+    ]
+    # Phrases within one word are already matched by find_spam_words
+    assert index.find_spam_phrases(["click here", "for", "bulk email"]) == []
+    assert index.find_spam_phrases(["click here", "to", "remove"]) == [
+        "click here to remove"
+    ]
+    assert index.find_spam_phrases(["click", "bulk"]) == []
+    assert index.find_spam_phrases([]) == []
+
+
+@use_app_context
+def test_run_algorithmic_spam_detection_batch():
+    texts = ["Click-here to remove yourself", "income!password'", "Hello there", ""]
+    results = run_algorithmic_spam_detection_batch(texts)
+    assert results == [run_algorithmic_spam_detection(text) for text in texts]
+    assert results[1].get("spam_words") == []
+    assert results[2].get("spam_words") == []
+
+
+@use_app_context
+def test_run_algorithmic_spam_detection_match_phrases():
+    text = "Click here to remove yourself"
+    assert run_algorithmic_spam_detection(text).get("spam_words") == ["click"]
+
+    results = run_algorithmic_spam_detection(text, match_phrases=True)
+    assert results.get("spam_words") == ["click", "click here to remove"]
+    assert results.get("spam_word_score") == 50
+    assert run_algorithmic_spam_detection_batch([text], match_phrases=True) == [results]
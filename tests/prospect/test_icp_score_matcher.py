@@ -0,0 +1,150 @@
+from app import db
+from tests.test_utils.decorators import use_app_context
+from tests.test_utils.test_utils import (
+    test_app,
+    basic_client,
+    basic_client_sdr,
+    basic_archetype,
+)
+from src.prospecting.icp_score.models import ICPScoringRuleset
+from src.prospecting.icp_score.matcher import compile_icp_scoring_ruleset
+from src.prospecting.icp_score.services import (
+    EnrichedProspectCompany,
+    count_num_icp_attributes,
+    count_num_icp_attributes_archetype,
+    score_one_prospect,
+    score_one_prospect_segment,
+)
+
+
+def basic_enriched_prospect_company(
+    prospect_id: int = 1,
+    title: str = "VP of Sales",
+    industry: str = "Computer Software",
+    company_name: str = "Acme Corp",
+    company_location: str = "San Francisco, CA, US United States",
+    employee_count=50,
+) -> EnrichedProspectCompany:
+    epc = EnrichedProspectCompany()
+    epc.prospect_id = prospect_id
+    epc.prospect_title = title
+    epc.prospect_linkedin_url = None
+    epc.prospect_bio = None
+    epc.prospect_location = "New York"
+    epc.prospect_industry = industry
+    epc.prospect_skills = ["Sales", "Negotiation"]
+    epc.prospect_positions = None
+    epc.prospect_years_of_experience = 5
+    epc.prospect_dump = "Leads sales for a software company"
+    epc.prospect_education_1 = "MIT"
+    epc.prospect_education_2 = None
+    epc.company_name = company_name
+    epc.company_location = company_location
+    epc.company_employee_count = employee_count
+    epc.company_description = None
+    epc.company_tagline = None
+    epc.company_dump = "We build software"
+    return epc
+
+
+def basic_icp_scoring_ruleset(archetype_id: int) -> ICPScoringRuleset:
+    ruleset = ICPScoringRuleset(
+        client_archetype_id=archetype_id,
+        included_individual_title_keywords=["VP", "Sales", "Director"],
+        excluded_individual_title_keywords=["Intern"],
+        included_individual_skills_keywords=["negotiation"],
+        included_company_locations_keywords=["United States"],
+        company_size_start=10,
+        company_size_end=100,
+        excluded_company_name_keywords=["Staffing"],
+        dealbreakers=["included_individual_title_keywords"],
+    )
+    db.session.add(ruleset)
+    db.session.commit()
+    return ruleset
+
+
+@use_app_context
+def test_matcher_counts_match_queries():
+    client = basic_client()
+    sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, sdr)
+    ruleset = basic_icp_scoring_ruleset(archetype.id)
+
+    matcher = compile_icp_scoring_ruleset(ruleset)
+    assert matcher.num_attributes == count_num_icp_attributes(archetype.id)
+    assert count_num_icp_attributes_archetype(archetype.id) == (3, 3)
+
+
+@use_app_context
+def test_matcher_score_matches_score_one_prospect():
+    client = basic_client()
+    sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, sdr)
+    ruleset = basic_icp_scoring_ruleset(archetype.id)
+    matcher = compile_icp_scoring_ruleset(ruleset)
+
+    prospects = [
+        basic_enriched_prospect_company(1),
+        basic_enriched_prospect_company(2, title="Sales Intern"),
+        basic_enriched_prospect_company(3, company_name="Acme Staffing"),
+        basic_enriched_prospect_company(4, employee_count=5000),
+        basic_enriched_prospect_company(5, company_location=None),
+    ]
+
+    results = matcher.score_batch(prospects)
+    assert len(results) == len(prospects)
+    for prospect, result in zip(prospects, results):
+        assert result == score_one_prospect(prospect, ruleset, None)
+
+    _, score, reasoning = results[0]
+    assert score == 4
+    assert reasoning == (
+        "(✅ prospect title: VP) (✅ prospect title: Sales) "
+        "(✅ prospect skills: negotiation) "
+        "(✅ company location: United States) (✅ company size: 50) "
+    )
+
+    _, score, reasoning = results[1]
+    assert reasoning.startswith("(❌ prospect title: Intern) ")
+
+    _, score, reasoning = results[4]
+    assert "(❌ company location: No Match)" in reasoning
+
+
+@use_app_context
+def test_matcher_score_segment_matches_score_one_prospect_segment():
+    client = basic_client()
+    sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, sdr)
+    ruleset = basic_icp_scoring_ruleset(archetype.id)
+    dealbreaker = {"included_individual_title_keywords": 0}
+    matcher = compile_icp_scoring_ruleset(ruleset)
+
+    prospects = [
+        basic_enriched_prospect_company(1),
+        basic_enriched_prospect_company(2, title="Engineer"),
+        basic_enriched_prospect_company(3, company_name="Acme Staffing"),
+    ]
+
+    results = matcher.score_segment_batch(prospects)
+    for prospect, result in zip(prospects, results):
+        assert result == score_one_prospect_segment(
+            prospect, ruleset, dealbreaker, None
+        )
+
+    _, score, company_score, individual_reasoning, company_reasoning, _ = results[0]
+    assert score == 3
+    assert company_score == 2
+    assert individual_reasoning["included_individual_title_keywords"]["answer"] == "YES"
+
+    _, score, _, individual_reasoning, _, _ = results[1]
+    assert score == -1
+    assert (
+        individual_reasoning["included_individual_title_keywords"]["reasoning"]
+        == "Engineer - dealbreaker"
+    )
+
+    _, _, company_score, _, company_reasoning, _ = results[2]
+    assert company_score == -1
+    assert company_reasoning["excluded_company_name_keywords"]["answer"] == "NO"
@@ -0,0 +1,268 @@
+from app import db
+from tests.test_utils.decorators import use_app_context
+from tests.test_utils.test_utils import (
+    test_app,
+    basic_client,
+    basic_client_sdr,
+    basic_archetype,
+    basic_prospect,
+)
+from src.prospecting.models import Prospect
+from src.prospecting.icp_score.models import (
+    ICPScoringJobQueue,
+    ICPScoringJobQueueStatus,
+    ICPScoringRuleset,
+)
+from src.prospecting.icp_score.services import (
+    EnrichedProspectCompany,
+    bucket_icp_score,
+    build_icp_score_mapping,
+    bulk_update_prospect_icp_scores,
+    get_raw_enriched_prospect_companies_list,
+    get_stale_icp_prospect_ids,
+    iter_raw_enriched_prospect_companies_batches,
+    score_icp_scoring_shard,
+    start_sharded_icp_scoring_job,
+    update_prospects,
+)
+from model_import import ResearchPayload
+import mock
+
+
+def test_bucket_icp_score():
+    assert bucket_icp_score(-1, 4) == 0
+    assert bucket_icp_score(3, 0) == 0
+    assert bucket_icp_score(0, 4) == 1
+    assert bucket_icp_score(1, 4) == 1
+    assert bucket_icp_score(2, 4) == 2
+    assert bucket_icp_score(3, 4) == 3
+    assert bucket_icp_score(4, 4) == 4
+
+
+@use_app_context
+def test_bulk_update_prospect_icp_scores():
+    client = basic_client()
+    sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, sdr)
+    prospect_1 = basic_prospect(client, archetype, sdr)
+    prospect_2 = basic_prospect(client, archetype, sdr)
+    prospect_1_id = prospect_1.id
+    prospect_2_id = prospect_2.id
+
+    epc_1 = EnrichedProspectCompany()
+    epc_1.prospect_id = prospect_1_id
+    epc_2 = EnrichedProspectCompany()
+    epc_2.prospect_id = prospect_2_id
+
+    results = [
+        (epc_1, 3, 2, {"title": {"answer": "YES"}}, {}, "(✅ prospect title: VP) "),
+        (epc_2, -1, 1, {"title": {"answer": "NO"}}, {}, ""),
+    ]
+    updated_mapping, individual_scores, company_scores = build_icp_score_mapping(
+        results=results, individual_count=3, company_count=2
+    )
+    assert individual_scores == {prospect_1_id: 3, prospect_2_id: -1}
+    assert company_scores == {prospect_1_id: 2, prospect_2_id: 1}
+
+    bulk_update_prospect_icp_scores(updated_mapping)
+    db.session.commit()
+
+    prospect_1: Prospect = Prospect.query.get(prospect_1_id)
+    assert prospect_1.icp_fit_score == 4
+    assert prospect_1.icp_prospect_fit_score == 4
+    assert prospect_1.icp_company_fit_score == 4
+    assert prospect_1.icp_fit_reason == "(✅ prospect title: VP) "
+    assert prospect_1.icp_fit_reason_v2 == {"title": {"answer": "YES"}}
+
+    prospect_2: Prospect = Prospect.query.get(prospect_2_id)
+    assert prospect_2.icp_fit_score == 0
+    assert prospect_2.icp_prospect_fit_score == 0
+    assert prospect_2.icp_company_fit_score == 2
+    assert prospect_2.icp_fit_reason == ""
+
+
+def read_icp_enrichment(archetype_id: int) -> dict:
+    return {
+        enriched.prospect_id: enriched.icp_enrichment_updated_at
+        for batch in iter_raw_enriched_prospect_companies_batches(
+            client_archetype_id=archetype_id
+        )
+        for enriched in batch
+    }
+
+
+def write_icp_scores(enrichment: dict, ruleset_hash: str):
+    """Writes scores the way ICP scoring does, stamped with the enrichment that was read."""
+    update_prospects(
+        [
+            {
+                "id": prospect_id,
+                "icp_fit_score": 2,
+                "icp_fit_last_hash": ruleset_hash,
+                "icp_fit_enrichment_updated_at": icp_enrichment_updated_at,
+            }
+            for prospect_id, icp_enrichment_updated_at in enrichment.items()
+        ]
+    )
+
+
+@use_app_context
+def test_get_stale_icp_prospect_ids():
+    client = basic_client()
+    sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, sdr)
+    archetype_id = archetype.id
+    prospect_1 = basic_prospect(client, archetype, sdr)
+    prospect_2 = basic_prospect(client, archetype, sdr)
+    prospect_1_id = prospect_1.id
+    prospect_2_id = prospect_2.id
+
+    assert sorted(get_stale_icp_prospect_ids(archetype_id, "hash_1")) == sorted(
+        [prospect_1_id, prospect_2_id]
+    )
+
+    write_icp_scores(read_icp_enrichment(archetype_id), "hash_1")
+    assert get_stale_icp_prospect_ids(archetype_id, "hash_1") == []
+    assert sorted(get_stale_icp_prospect_ids(archetype_id, "hash_2")) == sorted(
+        [prospect_1_id, prospect_2_id]
+    )
+    assert sorted(
+        get_stale_icp_prospect_ids(archetype_id, "hash_1", force_full_rescore=True)
+    ) == sorted([prospect_1_id, prospect_2_id])
+
+    prospect_2: Prospect = Prospect.query.get(prospect_2_id)
+    prospect_2.title = "Chief Revenue Officer"
+    db.session.commit()
+    assert get_stale_icp_prospect_ids(archetype_id, "hash_1") == [prospect_2_id]
+
+    # Unrelated fields don't count
+    prospect_1: Prospect = Prospect.query.get(prospect_1_id)
+    prospect_1.icp_fit_score = 3
+    db.session.commit()
+    assert get_stale_icp_prospect_ids(archetype_id, "hash_1") == [prospect_2_id]
+
+    # A change made after the data was read for scoring leaves the prospect stale
+    enrichment = read_icp_enrichment(archetype_id)
+    prospect_2: Prospect = Prospect.query.get(prospect_2_id)
+    prospect_2.industry = "Software"
+    db.session.commit()
+    write_icp_scores(enrichment, "hash_1")
+    assert get_stale_icp_prospect_ids(archetype_id, "hash_1") == [prospect_2_id]
+
+    # Research payload fields the ruleset scores against count too
+    write_icp_scores(read_icp_enrichment(archetype_id), "hash_1")
+    db.session.add(
+        ResearchPayload(
+            prospect_id=prospect_1_id,
+            research_type="LINKEDIN_ISCRAPER",
+            payload={"personal": {"location": "San Francisco", "skills": ["Sales"]}},
+        )
+    )
+    db.session.commit()
+    assert get_stale_icp_prospect_ids(archetype_id, "hash_1") == [prospect_1_id]
+
+    write_icp_scores(read_icp_enrichment(archetype_id), "hash_1")
+    assert get_stale_icp_prospect_ids(archetype_id, "hash_1") == []
+
+
+@use_app_context
+def test_iter_raw_enriched_prospect_companies_batches():
+    client = basic_client()
+    sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, sdr)
+    prospect_ids = [basic_prospect(client, archetype, sdr).id for _ in range(5)]
+
+    batches = list(
+        iter_raw_enriched_prospect_companies_batches(
+            client_archetype_id=archetype.id, batch_size=2
+        )
+    )
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    streamed = {epc.prospect_id: epc for batch in batches for epc in batch}
+    assert sorted(streamed.keys()) == sorted(prospect_ids)
+
+    loaded = get_raw_enriched_prospect_companies_list(client_archetype_id=archetype.id)
+    for prospect_id, epc in loaded.items():
+        assert streamed[prospect_id].to_dict() == epc.to_dict()
+
+
+def create_icp_scoring_job(client_sdr_id: int, client_archetype_id: int, prospect_ids: list[int]) -> int:
+    icp_scoring_job = ICPScoringJobQueue(
+        client_sdr_id=client_sdr_id,
+        client_archetype_id=client_archetype_id,
+        prospect_ids=prospect_ids,
+        run_status=ICPScoringJobQueueStatus.PENDING,
+        attempts=0,
+    )
+    db.session.add(icp_scoring_job)
+    db.session.commit()
+    return icp_scoring_job.id
+
+
+@use_app_context
+@mock.patch("src.prospecting.icp_score.services.create_icp_ai_filter_research_point_types")
+@mock.patch("src.prospecting.icp_score.services.send_socket_message")
+@mock.patch("src.prospecting.icp_score.services.score_icp_scoring_shard.apply_async")
+def test_sharded_icp_scoring_job(
+    apply_async_mock, send_socket_message_mock, research_point_types_mock
+):
+    client = basic_client()
+    sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, sdr)
+    prospect_ids = [basic_prospect(client, archetype, sdr).id for _ in range(5)]
+    db.session.add(
+        ICPScoringRuleset(
+            client_archetype_id=archetype.id,
+            included_individual_title_keywords=["VP"],
+        )
+    )
+    db.session.commit()
+    icp_scoring_job_id = create_icp_scoring_job(sdr.id, archetype.id, prospect_ids)
+
+    assert start_sharded_icp_scoring_job(
+        icp_scoring_job_id, archetype.id, shard_size=2
+    ) == 3
+    shard_args = [call.kwargs["args"] for call in apply_async_mock.call_args_list]
+    assert [args[4] for args in shard_args] == [0, 1, 2]
+
+    # A redelivered shard is only counted once
+    for args in [shard_args[0], shard_args[0], shard_args[1]]:
+        score_icp_scoring_shard(*args[:-1], score_ai=False)
+
+    icp_scoring_job: ICPScoringJobQueue = ICPScoringJobQueue.query.get(icp_scoring_job_id)
+    assert icp_scoring_job.run_status == ICPScoringJobQueueStatus.IN_PROGRESS
+    assert icp_scoring_job.shards_completed == 2
+    assert sorted(icp_scoring_job.completed_shards) == [0, 1]
+    research_point_types_mock.assert_not_called()
+
+    # The last shard finalizes the job
+    score_icp_scoring_shard(*shard_args[2][:-1], score_ai=False)
+
+    db.session.expire_all()
+    icp_scoring_job = ICPScoringJobQueue.query.get(icp_scoring_job_id)
+    assert icp_scoring_job.run_status == ICPScoringJobQueueStatus.COMPLETED
+    assert icp_scoring_job.shards_completed == 3
+    assert icp_scoring_job.prospects_scored == 5
+    research_point_types_mock.assert_called_once()
+
+
+@use_app_context
+@mock.patch("src.prospecting.icp_score.services.score_icp_scoring_shard.apply_async")
+def test_sharded_icp_scoring_job_without_ruleset(apply_async_mock):
+    client = basic_client()
+    sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, sdr)
+    prospect_ids = [basic_prospect(client, archetype, sdr).id for _ in range(2)]
+    icp_scoring_job_id = create_icp_scoring_job(sdr.id, archetype.id, prospect_ids)
+
+    start_sharded_icp_scoring_job(icp_scoring_job_id, archetype.id, shard_size=1)
+    args = apply_async_mock.call_args_list[0].kwargs["args"]
+    assert score_icp_scoring_shard(*args) is False
+
+    # Failed jobs can be started again
+    db.session.expire_all()
+    icp_scoring_job: ICPScoringJobQueue = ICPScoringJobQueue.query.get(icp_scoring_job_id)
+    assert icp_scoring_job.run_status == ICPScoringJobQueueStatus.FAILED
+    assert icp_scoring_job.error_message == "ICP scoring ruleset not found"
+    assert start_sharded_icp_scoring_job(icp_scoring_job_id, archetype.id, shard_size=1) == 2
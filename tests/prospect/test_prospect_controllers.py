@@ -50,6 +50,46 @@ def test_search_prospects_endpoint():
     assert response.status_code == 200
 
 
+@use_app_context
+def test_get_prospects_stream():
+    c = basic_client()
+    a = basic_archetype(c)
+    c_sdr = basic_client_sdr(c)
+    for full_name in ["david", "adam", "ben"]:
+        basic_prospect(c, a, c_sdr, full_name=full_name, company="SellScale")
+
+    def post(payload: dict):
+        return app.test_client().post(
+            "prospect/get_prospects",
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": "Bearer {}".format(get_login_token()),
+            },
+            data=json.dumps(payload),
+        )
+
+    response = post(
+        {
+            "format": "ndjson",
+            "show_purgatory": True,
+            "ordering": [{"field": "full_name", "direction": 1}],
+        }
+    )
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [row["full_name"] for row in rows] == ["adam", "ben", "david"]
+
+    response = post({"format": "csv", "show_purgatory": False})
+    assert response.status_code == 200
+    lines = response.data.decode().splitlines()
+    assert lines[0].startswith("id,full_name")
+    assert len(lines) == 4
+
+    # Invalid filters fail before the stream starts
+    response = post({"format": "ndjson", "status": ["NOT_A_STATUS"]})
+    assert response.status_code == 400
+
+
 @use_app_context
 def test_get_prospects():
     c = basic_client()
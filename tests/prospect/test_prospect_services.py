@@ -173,6 +173,34 @@ def test_get_prospects():
     assert prospects[0].company == "scalingsell"
 
 
+@use_app_context
+def test_get_prospects_cursor():
+    c = basic_client()
+    a = basic_archetype(c)
+    c_sdr = basic_client_sdr(c)
+    for full_name in ["david", "adam", "ben", "adam", "carl"]:
+        basic_prospect(c, a, c_sdr, full_name=full_name, company="SellScale")
+
+    order = [{"field": "full_name", "direction": 1}]
+    names = []
+    cursor = None
+    for _ in range(3):
+        returned = get_prospects(c_sdr.id, limit=2, ordering=order, cursor=cursor)
+        assert returned.get("total_count") == 5
+        names.extend(p.full_name for p in returned.get("prospects"))
+        cursor = returned.get("next_cursor")
+        if not cursor:
+            break
+    assert names == ["adam", "adam", "ben", "carl", "david"]
+    assert cursor is None
+
+    try:
+        get_prospects(c_sdr.id, limit=2, ordering=order, cursor="not a cursor")
+        assert False
+    except ValueError:
+        assert True
+
+
 @use_app_context
 def test_get_prospect_generated_message():
     client = basic_client()
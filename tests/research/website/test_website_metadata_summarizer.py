@@ -0,0 +1,71 @@
+import mock
+from datetime import datetime, timedelta
+
+from app import db
+from tests.test_utils.decorators import use_app_context
+from tests.test_utils.test_utils import test_app
+from src.research.models import WebsiteMetadataCache
+from src.research.website.website_metadata_summarizer import (
+    WebsiteMetadataStore,
+    normalize_website_url,
+)
+
+WEBSITE_DETAILS = {
+    "description": "test-description",
+    "summary": "test-summary",
+    "products": ["CRM"],
+    "industries": ["software"],
+    "target_profiles": ["sales teams"],
+    "company_type": "B2B",
+    "location": "Global",
+    "highlights": ["raised $1M"],
+    "company_name": "Acme",
+}
+
+
+def test_normalize_website_url():
+    assert normalize_website_url("https://www.Acme.com/") == "acme.com"
+    assert normalize_website_url("acme.com") == "acme.com"
+    assert (
+        normalize_website_url("HTTP://WWW.acme.com/About/?utm_source=li&b=2&a=1#team")
+        == "acme.com/About?a=1&b=2"
+    )
+    assert normalize_website_url("https://acme.com:8080/?gclid=123") == "acme.com:8080"
+
+
+@use_app_context
+@mock.patch(
+    "src.research.website.website_metadata_summarizer.get_redis_client",
+    return_value=None,
+)
+def test_website_metadata_store_get_or_fetch(redis_mock):
+    store = WebsiteMetadataStore()
+    fetch = mock.MagicMock(
+        side_effect=lambda url: {**WEBSITE_DETAILS, "website_url": url}
+    )
+
+    details = store.get_or_fetch("https://www.acme.com/", fetch=fetch)
+    assert details["summary"] == "test-summary"
+    assert fetch.call_count == 1
+
+    # Served from the local tier, then from the table, for any form of the URL
+    assert store.get_or_fetch("acme.com", fetch=fetch)["summary"] == "test-summary"
+    store.clear_local()
+    assert (
+        store.get_or_fetch("http://acme.com?utm_source=li", fetch=fetch)["summary"]
+        == "test-summary"
+    )
+    assert fetch.call_count == 1
+
+    cached: WebsiteMetadataCache = WebsiteMetadataCache.query.filter_by(
+        normalized_url="acme.com"
+    ).one()
+    assert cached.twitter_url == ""
+
+    # Stale entries are refreshed in place
+    cached.updated_at = datetime.now() - timedelta(days=365)
+    db.session.commit()
+    store.clear_local()
+    store.get_or_fetch("acme.com", fetch=fetch)
+    assert fetch.call_count == 2
+    assert WebsiteMetadataCache.query.filter_by(normalized_url="acme.com").count() == 1
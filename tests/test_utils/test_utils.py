@@ -4,6 +4,8 @@ import pytest
 from app import db
 from config import TestingConfig
 from model_import import (
+    CampaignAnalyticsRollup,
+    CampaignAnalyticsRollupWatermark,
     Client,
     ClientArchetype,
     Echo,
@@ -74,7 +76,7 @@ from datetime import datetime, time, timedelta
 from src.email_scheduling.models import EmailMessagingSchedule
 
 from src.email_sequencing.models import EmailSequenceStep, EmailSubjectLineTemplate
-from src.prospecting.icp_score.models import ICPScoringRuleset
+from src.prospecting.icp_score.models import ICPScoringJobQueue, ICPScoringRuleset
 from src.utils.datetime.dateutils import get_current_monday_friday
 
 ENV = os.environ.get("FLASK_ENV")
@@ -126,6 +128,8 @@ def test_app():
         clear_all_entities(ResponseConfiguration)
         clear_all_entities(GeneratedMessageFeedback)
         clear_all_entities(SightOnboarding)
+        clear_all_entities(CampaignAnalyticsRollup)
+        clear_all_entities(CampaignAnalyticsRollupWatermark)
         clear_all_entities(ProspectEmailStatusRecords)
         clear_all_entities(ProspectEmail)
         clear_all_entities(AccountResearchPoints)
@@ -147,6 +151,7 @@ def test_app():
         clear_all_entities(DemoFeedback)
         clear_all_entities(Prospect)
         clear_all_entities(StackRankedMessageGenerationConfiguration)
+        clear_all_entities(ICPScoringJobQueue)
         clear_all_entities(ICPScoringRuleset)
         clear_all_entities(ClientArchetype)
         clear_all_entities(PhantomBusterSalesNavigatorLaunch)
@@ -156,6 +161,11 @@ def test_app():
         clear_all_entities(Client)
         clear_all_entities(Editor)
 
+    # Tokens are reused across tests, but the SDRs they belong to are not
+    from src.authentication.token_cache import auth_token_cache
+
+    auth_token_cache.clear()
+
     return app
 
 
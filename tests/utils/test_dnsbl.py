@@ -0,0 +1,42 @@
+import dns.resolver
+import mock
+
+from src.utils.domains.dnsbl import DNSBL_LISTS, DNSBLChecker
+
+
+def resolve(query: str, record_type: str):
+    if query == "listed.com.dbl.spamhaus.org":
+        return [mock.MagicMock(address="127.0.1.2")]
+    if query.endswith("multi.surbl.org"):
+        raise dns.resolver.Timeout()
+    raise dns.resolver.NXDOMAIN()
+
+
+def test_dnsbl_checker_check_domains():
+    checker = DNSBLChecker()
+    checker._resolver = mock.MagicMock()
+    checker._resolver.resolve.side_effect = resolve
+
+    results = checker.check_domains(["listed.com", "clean.com", "clean.com"])
+    assert list(results.keys()) == ["listed.com", "clean.com"]
+
+    listed = results["listed.com"]
+    for results_key, (_, list_zones) in DNSBL_LISTS.items():
+        assert [r["list_name"] for r in listed[results_key]] == list_zones
+    statuses = {r["list_name"]: r["status"] for r in listed["blacklists"]}
+    assert statuses["dbl.spamhaus.org"] == "listed"
+    assert statuses["multi.surbl.org"] == "timeout"
+    assert statuses["black.uribl.com"] == "not_listed"
+    assert listed["whitelists"][0] == {
+        "domain": "listed.com",
+        "list_type": "whitelist",
+        "list_name": "white.dnsbl.brukalai.lt",
+        "status": "not_listed",
+    }
+
+    lists_count = sum(len(list_zones) for _, list_zones in DNSBL_LISTS.values())
+    assert checker._resolver.resolve.call_count == 2 * lists_count
+
+    # Everything but the timeouts is served from the cache
+    checker.check_domains(["listed.com"])
+    assert checker._resolver.resolve.call_count == 2 * lists_count + 1
@@ -0,0 +1,32 @@
+import datetime
+
+from src.prospecting.models import ProspectStatus
+from src.utils.keyset import decode_cursor, encode_cursor, get_next_cursor
+
+
+def test_encode_decode_cursor():
+    cursor = encode_cursor(
+        [ProspectStatus.PROSPECTED, datetime.datetime(2023, 1, 2, 3, 4), None, 7]
+    )
+    assert decode_cursor(cursor, 4) == [
+        "PROSPECTED",
+        "2023-01-02T03:04:00",
+        None,
+        7,
+    ]
+
+    for invalid_cursor in ["not a cursor", encode_cursor([1, 2])]:
+        try:
+            decode_cursor(invalid_cursor, 4)
+            assert False
+        except ValueError:
+            assert True
+
+
+def test_get_next_cursor():
+    rows = [{"id": 1}, {"id": 2}]
+    assert get_next_cursor(rows, lambda row: [row["id"]], limit=2) == encode_cursor(
+        [2]
+    )
+    assert get_next_cursor(rows, lambda row: [row["id"]], limit=3) is None
+    assert get_next_cursor([], lambda row: [row["id"]], limit=2) is None
@@ -0,0 +1,81 @@
+from sqlalchemy.dialects import postgresql
+
+from tests.test_utils.decorators import use_app_context
+from tests.test_utils.test_utils import (
+    test_app,
+    basic_client,
+    basic_client_sdr,
+    basic_archetype,
+    basic_prospect,
+)
+from src.prospecting.models import Prospect
+from src.segment.services import (
+    count_prospects_by_segment_filters,
+    find_prospects_by_segment_filters,
+)
+from src.utils.keyword_search import clean_keywords, escape_like, keyword_filters
+
+
+def compile_filter(clause) -> str:
+    return str(
+        clause.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def test_escape_like():
+    assert escape_like("50%_off") == "50\\%\\_off"
+    assert escape_like("a\\b") == "a\\\\b"
+    assert escape_like("director") == "director"
+
+
+def test_clean_keywords():
+    assert clean_keywords([" CEO ", "ceo", "", None, "Founder"]) == ["CEO", "Founder"]
+    assert clean_keywords(None) == []
+
+
+def test_keyword_filters():
+    assert keyword_filters([Prospect.title], [], None) == []
+
+    included, = keyword_filters([Prospect.title], included_keywords=["ceo", "cto"])
+    sql = compile_filter(included)
+    assert "prospect.title ILIKE '%ceo%'" in sql
+    assert " OR " in sql
+
+    excluded = keyword_filters(
+        [Prospect.education_1, Prospect.education_2], excluded_keywords=["mba"]
+    )
+    assert len(excluded) == 2
+    assert "NOT ILIKE '%mba%'" in compile_filter(excluded[0])
+
+    match_all, = keyword_filters(
+        [Prospect.title], included_keywords=["vp", "sales"], match_all_included=True
+    )
+    assert " AND " in compile_filter(match_all)
+
+
+@use_app_context
+def test_count_prospects_by_segment_filters():
+    client = basic_client()
+    client_sdr = basic_client_sdr(client)
+    archetype = basic_archetype(client, client_sdr)
+    basic_prospect(client, archetype, client_sdr, title="VP of Sales", company="Acme")
+    basic_prospect(client, archetype, client_sdr, title="Sales Director", company="Acme")
+    basic_prospect(client, archetype, client_sdr, title="100% Remote Engineer", company="Initech")
+
+    filters = dict(
+        included_title_keywords=["sales", "SALES", " "],
+        excluded_title_keywords=["director"],
+    )
+    assert count_prospects_by_segment_filters(client_sdr_id=client_sdr.id, **filters) == 1
+    prospects = find_prospects_by_segment_filters(client_sdr_id=client_sdr.id, **filters)
+    assert [p["title"] for p in prospects] == ["VP of Sales"]
+
+    # Wildcards in keywords are matched literally
+    assert count_prospects_by_segment_filters(
+        client_sdr_id=client_sdr.id, included_title_keywords=["100%"]
+    ) == 1
+    assert count_prospects_by_segment_filters(
+        client_sdr_id=client_sdr.id, included_title_keywords=["V_"]
+    ) == 0
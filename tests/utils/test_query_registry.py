@@ -0,0 +1,36 @@
+from typing import NamedTuple
+
+from tests.test_utils.decorators import use_app_context
+from tests.test_utils.test_utils import test_app
+from src.utils.query_registry import QueryRegistry
+
+
+class NumberRow(NamedTuple):
+    number: int
+    label: str
+
+
+@use_app_context
+def test_query_registry():
+    registry = QueryRegistry()
+    query = registry.register(
+        "test.number",
+        "select cast(:number as integer) number, cast(:label as varchar) label",
+        row_type=NumberRow,
+    )
+
+    assert query.first(number=1, label="one") == NumberRow(number=1, label="one")
+    assert query.all(number=2, label="two")[0][1] == "two"
+    assert query.dicts(number=3, label="three") == [{"number": 3, "label": "three"}]
+    assert query.scalar(number=4, label="four") == 4
+
+    stats = registry.get_stats()
+    assert len(stats) == 1
+    assert stats[0]["name"] == "test.number"
+    assert stats[0]["calls"] == 4
+
+    try:
+        registry.register("test.number", "select 1")
+        assert False
+    except ValueError:
+        assert True
@@ -0,0 +1,42 @@
+import mock
+
+from src.utils.rate_limiter import TokenBucket, acquire_rate_limit
+
+
+@mock.patch("src.utils.rate_limiter.time.sleep")
+@mock.patch("src.utils.rate_limiter.get_redis_client", return_value=None)
+def test_acquire_rate_limit_without_redis(redis_mock, sleep_mock):
+    buckets = [TokenBucket(key="test_rate_limit:without_redis", capacity=60)]
+
+    # Goes ahead right away
+    assert acquire_rate_limit(buckets, max_wait_seconds=1) is False
+    sleep_mock.assert_not_called()
+
+    # Spaced out at the bucket's rate, one call per second
+    assert acquire_rate_limit(buckets, max_wait_seconds=1, local_fallback=True) is False
+    assert acquire_rate_limit(buckets, max_wait_seconds=1, local_fallback=True) is False
+    waits = [call.args[0] for call in sleep_mock.call_args_list]
+    assert waits[0] == 0
+    assert 0.9 < waits[1] <= 1
+
+
+@mock.patch("src.utils.rate_limiter.time.sleep")
+@mock.patch("src.utils.rate_limiter.get_redis_client")
+def test_acquire_rate_limit_waits_on_shared_buckets(redis_mock, sleep_mock):
+    script = mock.Mock(side_effect=[250, 0])
+    redis_mock.return_value.register_script.return_value = script
+
+    buckets = [
+        TokenBucket(key="test_rate_limit:requests", capacity=60),
+        TokenBucket(key="test_rate_limit:tokens", capacity=6000, cost=100),
+    ]
+    with mock.patch("src.utils.rate_limiter._token_bucket_script", None):
+        assert acquire_rate_limit(buckets, max_wait_seconds=10) is True
+
+    assert script.call_count == 2
+    assert script.call_args.kwargs["keys"] == [
+        "test_rate_limit:requests",
+        "test_rate_limit:tokens",
+    ]
+    assert script.call_args.kwargs["args"] == [60, 0.001, 1, 6000, 0.1, 100]
+    assert 0.25 <= sleep_mock.call_args.args[0] <= 0.3
@@ -0,0 +1,208 @@
+import json
+import mock
+import time
+
+from app import db
+from tests.test_utils.decorators import use_app_context
+from tests.test_utils.test_utils import test_app, basic_client
+from model_import import Client
+from src.utils.slack_outbox import (
+    SLACK_COALESCED_TEXT_LIMIT,
+    SLACK_OUTBOX_KEY,
+    SLACK_OUTBOX_PROCESSING_TOKENS_KEY,
+    coalesce_slack_messages,
+    flush_slack_outbox_once,
+    requeue_abandoned_slack_outbox_entries,
+    send_to_slack_webhook,
+    update_last_slack_msg_dates,
+)
+
+
+def outbox_entry(message: str, blocks: list = []) -> dict:
+    return {
+        "webhook_url": "https://hooks.slack.com/services/test",
+        "message": message,
+        "blocks": blocks,
+        "attempts": 0,
+        "not_before": 0,
+    }
+
+
+class FakeRedis:
+    """The list and set commands the outbox uses, in memory."""
+
+    def __init__(self):
+        self.lists = {}
+        self.sets = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def lmove(self, source, destination, where_from, where_to):
+        if not self.lists.get(source):
+            return None
+        value = self.lists[source].pop(0 if where_from == "LEFT" else -1)
+        self.lists.setdefault(destination, []).append(value)
+        return value
+
+    def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+
+    def sadd(self, key, value):
+        self.sets.setdefault(key, set()).add(value)
+
+    def srem(self, key, value):
+        self.sets.get(key, set()).discard(value)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+
+class FakePipeline:
+    def __init__(self, redis_client: FakeRedis):
+        self.redis_client = redis_client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        return [getattr(self.redis_client, name)(*args) for name, args in self.commands]
+
+
+def test_coalesce_slack_messages():
+    block = [{"type": "section", "text": {"type": "mrkdwn", "text": "hi"}}]
+    entries = [
+        outbox_entry("one"),
+        outbox_entry("two"),
+        outbox_entry("with blocks", blocks=block),
+        outbox_entry("three"),
+    ]
+
+    posts = coalesce_slack_messages(entries)
+    assert [(len(p[0]), p[1], p[2]) for p in posts] == [
+        (2, "one\n\ntwo", []),
+        (1, "with blocks", block),
+        (1, "three", []),
+    ]
+
+
+def test_coalesce_slack_messages_respects_text_limit():
+    long_message = "x" * (SLACK_COALESCED_TEXT_LIMIT - 10)
+    posts = coalesce_slack_messages([outbox_entry(long_message), outbox_entry("y" * 20)])
+    assert [p[1] for p in posts] == [long_message, "y" * 20]
+
+
+@mock.patch("src.utils.slack_outbox.time.sleep")
+@mock.patch("src.utils.slack_outbox.WebhookClient")
+def test_send_to_slack_webhook_retries(webhook_client_mock, sleep_mock):
+    webhook = webhook_client_mock.return_value
+    webhook.send.side_effect = [
+        mock.MagicMock(status_code=200),
+        mock.MagicMock(status_code=500),
+        mock.MagicMock(status_code=429, headers={"Retry-After": "15"}),
+    ]
+    block = [{"type": "divider"}]
+    entries = [
+        outbox_entry("sent", blocks=block),
+        outbox_entry("server error", blocks=block),
+        outbox_entry("rate limited", blocks=block),
+        outbox_entry("after rate limit", blocks=block),
+    ]
+
+    delivered, retry_entries = send_to_slack_webhook(
+        "https://hooks.slack.com/services/test", entries
+    )
+    assert delivered
+    assert webhook.send.call_count == 3
+    assert [e["message"] for e in retry_entries] == [
+        "server error",
+        "rate limited",
+        "after rate limit",
+    ]
+    assert retry_entries[0]["attempts"] == 1
+    assert retry_entries[1]["attempts"] == 0
+    assert retry_entries[1]["not_before"] > retry_entries[0]["not_before"]
+
+
+
+@mock.patch("src.utils.slack_outbox.time.sleep")
+@mock.patch("src.utils.slack_outbox.WebhookClient")
+def test_send_to_slack_webhook_stops_at_deadline(webhook_client_mock, sleep_mock):
+    webhook = webhook_client_mock.return_value
+    webhook.send.return_value = mock.MagicMock(status_code=200)
+    block = [{"type": "divider"}]
+    entries = [outbox_entry(message, blocks=block) for message in ["one", "two", "three"]]
+
+    delivered, retry_entries = send_to_slack_webhook(
+        "https://hooks.slack.com/services/test", entries, deadline=time.monotonic()
+    )
+    assert delivered
+    assert webhook.send.call_count == 1
+    # Left for the next flush, without using up an attempt
+    assert [e["message"] for e in retry_entries] == ["two", "three"]
+    assert all(e["attempts"] == 0 for e in retry_entries)
+    sleep_mock.assert_not_called()
+
+
+@mock.patch("src.utils.slack_outbox.update_last_slack_msg_dates")
+@mock.patch("src.utils.slack_outbox.send_to_slack_webhook")
+def test_flush_slack_outbox_once_keeps_entries_until_sent(send_mock, update_mock):
+    redis_client = FakeRedis()
+    redis_client.rpush(
+        SLACK_OUTBOX_KEY, *[json.dumps(outbox_entry(m)) for m in ["one", "two", "three"]]
+    )
+
+    # A flush that dies mid-batch leaves its entries on the processing list
+    send_mock.side_effect = Exception("Worker lost")
+    redis_client.sadd(SLACK_OUTBOX_PROCESSING_TOKENS_KEY, "crashed")
+    try:
+        flush_slack_outbox_once(redis_client, "slack_outbox:processing:crashed", batch_size=2)
+        assert False
+    except Exception as e:
+        assert str(e) == "Worker lost"
+    assert len(redis_client.lrange("slack_outbox:processing:crashed", 0, -1)) == 2
+    assert len(redis_client.lrange(SLACK_OUTBOX_KEY, 0, -1)) == 1
+
+    # The next flush puts them back on the outbox
+    requeue_abandoned_slack_outbox_entries(redis_client, "next")
+    assert [
+        json.loads(raw)["message"] for raw in redis_client.lrange(SLACK_OUTBOX_KEY, 0, -1)
+    ] == ["three", "one", "two"]
+    assert redis_client.smembers(SLACK_OUTBOX_PROCESSING_TOKENS_KEY) == set()
+
+    # Sent entries are dropped, retries are pushed back
+    def send(webhook_url, entries, deadline=None):
+        return True, [entry for entry in entries if entry["message"] == "one"]
+
+    send_mock.side_effect = send
+    assert flush_slack_outbox_once(redis_client, "slack_outbox:processing:next") == 3
+    assert redis_client.lrange("slack_outbox:processing:next", 0, -1) == []
+    assert [
+        json.loads(raw)["message"] for raw in redis_client.lrange(SLACK_OUTBOX_KEY, 0, -1)
+    ] == ["one"]
+
+@use_app_context
+def test_update_last_slack_msg_dates():
+    notified_client = basic_client()
+    notified_client.pipeline_notifications_webhook_url = (
+        "https://hooks.slack.com/services/notified"
+    )
+    other_client = basic_client()
+    other_client.pipeline_notifications_webhook_url = (
+        "https://hooks.slack.com/services/other"
+    )
+    db.session.commit()
+    notified_client_id = notified_client.id
+    other_client_id = other_client.id
+
+    update_last_slack_msg_dates(["https://hooks.slack.com/services/notified"])
+
+    assert Client.query.get(notified_client_id).last_slack_msg_date is not None
+    assert Client.query.get(other_client_id).last_slack_msg_date is None
@@ -0,0 +1,83 @@
+import mock
+
+from tests.test_utils.decorators import use_app_context
+from tests.test_utils.test_utils import test_app, basic_client, basic_client_sdr
+from src.voyager.instrumentation import (
+    VoyagerMetrics,
+    VoyagerPayloadSampler,
+    VoyagerRetryPolicy,
+    get_voyager_endpoint,
+)
+from src.voyager.linkedin import LinkedIn
+
+
+def test_get_voyager_endpoint():
+    assert (
+        get_voyager_endpoint("/messaging/conversations/2-YjU4NzQ1ZDAtOGM2Mi00/events?start=20")
+        == "/messaging/conversations/{id}/events"
+    )
+    assert (
+        get_voyager_endpoint("/identity/profiles/john-doe/profileView")
+        == "/identity/profiles/{id}/profileView"
+    )
+    assert (
+        get_voyager_endpoint("/voyagerMessagingDashMessengerMessages/urn:li:msg_message:1")
+        == "/voyagerMessagingDashMessengerMessages/{id}"
+    )
+    assert get_voyager_endpoint("/me") == "/me"
+
+
+def test_voyager_retry_policy():
+    policy = VoyagerRetryPolicy(max_attempts=3, backoff_base_seconds=1, backoff_max_seconds=3)
+    assert policy.should_retry(429, 1)
+    assert policy.should_retry(400, 2)
+    assert not policy.should_retry(400, 3)
+    assert not policy.should_retry(200, 1)
+    assert not policy.should_retry(403, 1)
+    for attempt in range(1, 6):
+        assert 0 <= policy.get_delay(attempt) <= 3
+
+
+def test_voyager_metrics():
+    metrics = VoyagerMetrics(buckets=[0.5, 1])
+    with mock.patch("src.voyager.instrumentation.get_redis_client", return_value=None):
+        metrics.record("GET", "/me", 1, 200, 0.2)
+        metrics.record("GET", "/me", 1, 429, 0.7)
+        metrics.record("GET", "/me", 1, None, 5)
+
+    stats = metrics.get_stats()
+    assert len(stats) == 1
+    assert stats[0]["count"] == 3
+    assert stats[0]["status_codes"] == {"200": 1, "429": 1, "error": 1}
+    assert stats[0]["latency_buckets"] == {"le_0.5": 1, "le_1": 1, "le_inf": 1}
+
+
+def test_voyager_payload_sampler():
+    sampler = VoyagerPayloadSampler(sample_rate=0, max_entries=2, capture_file=None)
+    assert not sampler.maybe_capture("GET", "/me", 1, 200, "ok")
+    assert sampler.maybe_capture("GET", "/me", 1, 500, "error 1")
+    assert sampler.maybe_capture("GET", "/me", 1, 500, "error 2")
+    assert sampler.maybe_capture("GET", "/me", 1, None, None, error="timeout")
+    assert [s["body"] for s in sampler.get_samples()] == ["error 2", ""]
+
+
+@use_app_context
+@mock.patch("src.voyager.linkedin.sleep")
+@mock.patch("src.voyager.instrumentation.get_redis_client", return_value=None)
+def test_linkedin_request_retries_are_bounded(redis_mock, sleep_mock):
+    client = basic_client()
+    client_sdr = basic_client_sdr(client)
+
+    api = LinkedIn(
+        client_sdr.id,
+        authenticate=False,
+        retry_policy=VoyagerRetryPolicy(max_attempts=3),
+    )
+    with mock.patch.object(
+        api.client.session, "request", return_value=mock.MagicMock(status_code=400)
+    ) as request_mock:
+        res = api._fetch("/me", evade=lambda request_count: None)
+
+    assert res.status_code == 400
+    assert request_mock.call_count == 3
+    assert api.request_count == 3
@@ -0,0 +1,59 @@
+import mock
+
+from app import db
+from tests.test_utils.decorators import use_app_context
+from tests.test_utils.test_utils import test_app, basic_client, basic_client_sdr
+from src.voyager.session_pool import LinkedInSessionPool
+
+
+@use_app_context
+@mock.patch("src.voyager.session_pool.Client")
+def test_linkedin_session_pool_reuses_clients(client_mock):
+    client_mock.side_effect = lambda: mock.MagicMock()
+    client = basic_client()
+    client_sdr = basic_client_sdr(client)
+    client_sdr.li_at_token = "li_at_1"
+    db.session.commit()
+
+    pool = LinkedInSessionPool()
+    first = pool.get_client(client_sdr)
+    assert pool.get_client(client_sdr) is first
+    assert first.authenticate.call_count == 1
+
+    # A new cookie invalidates the pooled client
+    client_sdr.li_at_token = "li_at_2"
+    db.session.commit()
+    second = pool.get_client(client_sdr)
+    assert second is not first
+    assert pool.size() == 1
+
+    pool.invalidate(client_sdr.id)
+    assert pool.size() == 0
+    second.session.close.assert_called_once()
+
+
+@use_app_context
+@mock.patch("src.voyager.session_pool.Client")
+def test_linkedin_session_pool_eviction(client_mock):
+    client_mock.side_effect = lambda: mock.MagicMock()
+    client = basic_client()
+    client_sdrs = [basic_client_sdr(client) for _ in range(3)]
+    for i, client_sdr in enumerate(client_sdrs):
+        client_sdr.li_at_token = f"li_at_{i}"
+    db.session.commit()
+
+    pool = LinkedInSessionPool(max_size=2)
+    for client_sdr in client_sdrs:
+        pool.get_client(client_sdr)
+    assert pool.size() == 2
+
+    # Invalid cookies are never pooled
+    client_sdrs[0].li_at_token = "INVALID"
+    pool.get_client(client_sdrs[0])
+    assert pool.size() == 2
+
+    pool = LinkedInSessionPool(max_idle_seconds=0)
+    pooled = pool.get_client(client_sdrs[1])
+    with mock.patch("src.voyager.session_pool.time.time", return_value=10**10):
+        assert pool.get_client(client_sdrs[1]) is not pooled
+    pooled.session.close.assert_called_once()